@@ -42,4 +42,31 @@ httpClient.interceptors.response.use(
   }
 );
 
+export type Page<T> = { results: T[]; next: string | null };
+
+type Params = Record<string, unknown>;
+
+/** Una página de una lista con cursor; ``next`` es el enlace que devolvió la página anterior. */
+export const fetchPage = async <T,>(url: string, params?: Params, next?: string | null): Promise<Page<T>> => {
+  const { data } = next ? await httpClient.get(next) : await httpClient.get(url, { params });
+  // Acciones como ``mis-rutas`` (o el servidor con LISTAS_SIN_PAGINAR) responden un arreglo.
+  if (Array.isArray(data)) return { results: data as T[], next: null };
+  return { results: data.results as T[], next: data.next };
+};
+
+/**
+ * Todas las páginas de una lista. Solo para catálogos que una pantalla necesita
+ * completos (opciones de un selector o cruces por colaborador).
+ */
+export const fetchAll = async <T,>(url: string, params?: Params): Promise<T[]> => {
+  const items: T[] = [];
+  let page = await fetchPage<T>(url, { ...params, page_size: 500 });
+  items.push(...page.results);
+  while (page.next) {
+    page = await fetchPage<T>(url, undefined, page.next);
+    items.push(...page.results);
+  }
+  return items;
+};
+
 export default httpClient;
@@ -0,0 +1,60 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+import { Page } from '@api/httpClient';
+
+type Options = {
+  // Sin habilitar no se pide nada (p. ej. mientras no hay usuario).
+  enabled?: boolean;
+  // Al cambiar (filtros, usuario) la lista vuelve a la primera página.
+  key?: string;
+};
+
+/** Lista por páginas: carga la primera y ``loadMore`` pide la siguiente con su cursor. */
+export const usePaginatedList = <T,>(
+  fetcher: (next?: string | null) => Promise<Page<T>>,
+  { enabled = true, key = '' }: Options = {},
+) => {
+  const [items, setItems] = useState<T[]>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState(false);
+  const fetcherRef = useRef(fetcher);
+  fetcherRef.current = fetcher;
+  // Descarta respuestas de una carga anterior.
+  const version = useRef(0);
+
+  const request = useCallback(async (cursor: string | null) => {
+    const current = version.current;
+    setLoading(true);
+    setError(false);
+    try {
+      const page = await fetcherRef.current(cursor);
+      if (current !== version.current) return;
+      setItems((previous) => (cursor ? [...previous, ...page.results] : page.results));
+      setNext(page.next);
+    } catch (err) {
+      console.error(err);
+      if (current === version.current) setError(true);
+    } finally {
+      if (current === version.current) setLoading(false);
+    }
+  }, []);
+
+  const reload = useCallback(async () => {
+    version.current += 1;
+    await request(null);
+  }, [request]);
+
+  useEffect(() => {
+    version.current += 1;
+    setItems([]);
+    setNext(null);
+    if (enabled) request(null);
+  }, [enabled, key, request]);
+
+  const loadMore = useCallback(async () => {
+    if (next && !loading) await request(next);
+  }, [next, loading, request]);
+
+  return { items, setItems, loading, error, hasMore: Boolean(next), loadMore, reload };
+};
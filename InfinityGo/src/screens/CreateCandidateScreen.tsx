@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { ScrollView, StyleSheet, Text, TextInput, TouchableOpacity, View } from 'react-native';
 
+import { usePaginatedList } from '@hooks/usePaginatedList';
 import { Candidate, CandidatePayload, createCandidate, fetchCandidates, updateCandidate } from '@services/candidateService';
 import { useAuthContext } from '@store/AuthContext';
 
@@ -15,33 +16,23 @@ const emptyForm: CandidatePayload & { password?: string } = {
 const CreateCandidateScreen: React.FC = () => {
   const { user } = useAuthContext();
   const [form, setForm] = useState(emptyForm);
-  const [candidates, setCandidates] = useState<Candidate[]>([]);
+  const {
+    items: candidates,
+    loading,
+    error: listError,
+    hasMore,
+    loadMore,
+    reload: loadCandidates,
+  } = usePaginatedList(fetchCandidates, { enabled: user?.role === 'ADMIN' });
   const [editingId, setEditingId] = useState<number | null>(null);
   const [saving, setSaving] = useState(false);
-  const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [message, setMessage] = useState<string | null>(null);
   const [credentials, setCredentials] = useState<string | null>(null);
 
-  const loadCandidates = async () => {
-    if (user?.role !== 'ADMIN') return;
-    setLoading(true);
-    setError(null);
-    try {
-      const data = await fetchCandidates();
-      setCandidates(data);
-    } catch (err) {
-      console.error(err);
-      setError('No pudimos cargar los candidatos existentes.');
-    } finally {
-      setLoading(false);
-    }
-  };
-
   useEffect(() => {
-    loadCandidates();
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [user?.role]);
+    if (listError) setError('No pudimos cargar los candidatos existentes.');
+  }, [listError]);
 
   const handleSubmit = async () => {
     if (user?.role !== 'ADMIN') return;
@@ -178,9 +169,9 @@ const CreateCandidateScreen: React.FC = () => {
 
       <View style={styles.card}>
         <Text style={styles.cardTitle}>Candidatos registrados</Text>
-        {loading && <Text style={styles.muted}>Cargando candidatos...</Text>}
+        {loading && candidates.length === 0 && <Text style={styles.muted}>Cargando candidatos...</Text>}
         {!loading && candidates.length === 0 && <Text style={styles.muted}>Aún no hay candidatos.</Text>}
-        {!loading &&
+        {candidates.length > 0 &&
           candidates.map((candidate) => (
             <TouchableOpacity key={candidate.id} style={styles.listItem} onPress={() => startEdit(candidate)}>
               <View>
@@ -193,6 +184,11 @@ const CreateCandidateScreen: React.FC = () => {
               <Text style={styles.editTag}>Editar</Text>
             </TouchableOpacity>
           ))}
+        {hasMore && (
+          <TouchableOpacity style={styles.secondaryButton} onPress={loadMore} disabled={loading}>
+            <Text style={styles.secondaryButtonText}>{loading ? 'Cargando...' : 'Cargar más'}</Text>
+          </TouchableOpacity>
+        )}
       </View>
     </ScrollView>
   );
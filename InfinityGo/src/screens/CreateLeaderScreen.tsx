@@ -1,8 +1,16 @@
 import React, { useEffect, useState } from 'react';
 import { ActivityIndicator, ScrollView, StyleSheet, Text, TextInput, TouchableOpacity, View } from 'react-native';
 
+import { usePaginatedList } from '@hooks/usePaginatedList';
 import { fetchMunicipios, Municipio } from '@services/territoryService';
-import { assignMunicipiosToUser, createUser, fetchUsersByRole, updateLeaderMeta, updateUser, UserResponse } from '@services/userService';
+import {
+  assignMunicipiosToUser,
+  createUser,
+  fetchUsersPageByRole,
+  updateLeaderMeta,
+  updateUser,
+  UserResponse,
+} from '@services/userService';
 import { useAuthContext } from '@store/AuthContext';
 
 const initialForm = {
@@ -19,11 +27,17 @@ const CreateLeaderScreen: React.FC = () => {
   const [municipios, setMunicipios] = useState<Municipio[]>([]);
   const [selectedMunicipios, setSelectedMunicipios] = useState<number[]>([]);
   const [loading, setLoading] = useState(true);
-  const [listLoading, setListLoading] = useState(false);
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [message, setMessage] = useState<string | null>(null);
-  const [leaders, setLeaders] = useState<UserResponse[]>([]);
+  const {
+    items: leaders,
+    loading: listLoading,
+    error: listError,
+    hasMore,
+    loadMore,
+    reload: reloadLeaders,
+  } = usePaginatedList((next) => fetchUsersPageByRole('LIDER', next), { enabled: user?.role === 'ADMIN' });
   const [editingId, setEditingId] = useState<number | null>(null);
   const [metaVotantes, setMetaVotantes] = useState('');
 
@@ -45,23 +59,8 @@ const CreateLeaderScreen: React.FC = () => {
   }, []);
 
   useEffect(() => {
-    const loadLeaders = async () => {
-      if (user?.role !== 'ADMIN') return;
-      setListLoading(true);
-      try {
-        const data = await fetchUsersByRole('LIDER');
-        setLeaders(data);
-      } catch (err) {
-        console.error(err);
-        setError('No pudimos cargar los líderes existentes.');
-      } finally {
-        setListLoading(false);
-      }
-    };
-
-    loadLeaders();
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [user?.role]);
+    if (listError) setError('No pudimos cargar los líderes existentes.');
+  }, [listError]);
 
   const toggleMunicipio = (id: number) => {
     setSelectedMunicipios((prev) => (prev.includes(id) ? prev.filter((item) => item !== id) : [...prev, id]));
@@ -123,8 +122,7 @@ const CreateLeaderScreen: React.FC = () => {
       setMetaVotantes('');
       setEditingId(null);
       setError(null);
-      const data = await fetchUsersByRole('LIDER');
-      setLeaders(data);
+      await reloadLeaders();
     } catch (err) {
       console.error(err);
       setError('No pudimos guardar el líder. Revisa los datos.');
@@ -251,9 +249,9 @@ const CreateLeaderScreen: React.FC = () => {
 
       <View style={styles.card}>
         <Text style={styles.cardTitle}>Líderes existentes</Text>
-        {listLoading && <Text style={styles.muted}>Cargando líderes...</Text>}
+        {listLoading && leaders.length === 0 && <Text style={styles.muted}>Cargando líderes...</Text>}
         {!listLoading && leaders.length === 0 && <Text style={styles.muted}>Aún no hay líderes registrados.</Text>}
-        {!listLoading &&
+        {leaders.length > 0 &&
           leaders.map((leader) => (
             <TouchableOpacity key={leader.id} style={styles.listItem} onPress={() => startEdit(leader)}>
               <View>
@@ -265,6 +263,11 @@ const CreateLeaderScreen: React.FC = () => {
               <Text style={styles.editTag}>Editar</Text>
             </TouchableOpacity>
           ))}
+        {hasMore && (
+          <TouchableOpacity style={styles.secondaryButton} onPress={loadMore} disabled={listLoading}>
+            <Text style={styles.secondaryButtonText}>{listLoading ? 'Cargando...' : 'Cargar más'}</Text>
+          </TouchableOpacity>
+        )}
       </View>
     </ScrollView>
   );
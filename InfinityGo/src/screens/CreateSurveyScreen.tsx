@@ -17,9 +17,9 @@ import {
   fetchSurveys,
   Need,
   SurveyDetail,
-  SurveyRow,
   updateSurvey,
 } from '@services/surveyService';
+import { usePaginatedList } from '@hooks/usePaginatedList';
 import { fetchMunicipios, fetchZonas, Municipio, Zona } from '@services/territoryService';
 import { useAuthContext } from '@store/AuthContext';
 
@@ -76,11 +76,17 @@ const CreateSurveyScreen: React.FC = () => {
   const [selectedNeeds, setSelectedNeeds] = useState<number[]>([]);
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
-  const [listLoading, setListLoading] = useState(false);
   const [detailLoading, setDetailLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [message, setMessage] = useState<string | null>(null);
-  const [surveys, setSurveys] = useState<SurveyRow[]>([]);
+  const {
+    items: surveys,
+    loading: listLoading,
+    error: listError,
+    hasMore,
+    loadMore,
+    reload: reloadSurveys,
+  } = usePaginatedList(fetchSurveys, { enabled: user?.role === 'ADMIN' });
   const [editingSurveyId, setEditingSurveyId] = useState<number | null>(null);
   const [form, setForm] = useState({
     zonaId: '',
@@ -128,23 +134,8 @@ const CreateSurveyScreen: React.FC = () => {
   }, []);
 
   useEffect(() => {
-    const loadSurveys = async () => {
-      if (user?.role !== 'ADMIN') return;
-      setListLoading(true);
-      try {
-        const data = await fetchSurveys();
-        setSurveys(data);
-      } catch (err) {
-        console.error(err);
-        setError('No pudimos cargar las encuestas existentes.');
-      } finally {
-        setListLoading(false);
-      }
-    };
-
-    loadSurveys();
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [user?.role]);
+    if (listError) setError('No pudimos cargar las encuestas existentes.');
+  }, [listError]);
 
   const filteredZonas = useMemo(() => {
     if (!selectedMunicipio) return zonas;
@@ -240,8 +231,7 @@ const CreateSurveyScreen: React.FC = () => {
         lon: '',
       }));
       setEditingSurveyId(null);
-      const data = await fetchSurveys();
-      setSurveys(data);
+      await reloadSurveys();
     } catch (err) {
       console.error(err);
       setError('No pudimos guardar la encuesta. Revisa los datos enviados.');
@@ -590,9 +580,9 @@ const CreateSurveyScreen: React.FC = () => {
 
       <View style={styles.card}>
         <Text style={styles.cardTitle}>Encuestas registradas</Text>
-        {listLoading && <Text style={styles.muted}>Cargando encuestas...</Text>}
+        {listLoading && surveys.length === 0 && <Text style={styles.muted}>Cargando encuestas...</Text>}
         {!listLoading && surveys.length === 0 && <Text style={styles.muted}>Aún no hay encuestas registradas.</Text>}
-        {!listLoading &&
+        {surveys.length > 0 &&
           surveys.map((survey) => (
             <TouchableOpacity key={survey.id} style={styles.listItem} onPress={() => startEdit(survey.id)}>
               <View>
@@ -603,6 +593,11 @@ const CreateSurveyScreen: React.FC = () => {
               <Text style={styles.editTag}>Editar</Text>
             </TouchableOpacity>
           ))}
+        {hasMore && (
+          <TouchableOpacity style={styles.secondaryButton} onPress={loadMore} disabled={listLoading}>
+            <Text style={styles.secondaryButtonText}>{listLoading ? 'Cargando...' : 'Cargar más'}</Text>
+          </TouchableOpacity>
+        )}
       </View>
     </ScrollView>
   );
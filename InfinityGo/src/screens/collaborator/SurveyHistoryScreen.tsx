@@ -1,46 +1,36 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import { ActivityIndicator, RefreshControl, ScrollView, StyleSheet, Text, TouchableOpacity, View } from 'react-native';
 import { AndroidEvent, DateTimePickerAndroid } from '@react-native-community/datetimepicker';
 
-import { fetchSurveys, SurveyRow } from '@services/surveyService';
+import { usePaginatedList } from '@hooks/usePaginatedList';
+import { fetchSurveys } from '@services/surveyService';
 import { filterSurveysByDate } from '@services/collaboratorService';
 import { useAuthContext } from '@store/AuthContext';
 
 const SurveyHistoryScreen: React.FC = () => {
   const { user } = useAuthContext();
-  const [surveys, setSurveys] = useState<SurveyRow[]>([]);
-  const [filtered, setFiltered] = useState<SurveyRow[]>([]);
-  const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
-  const [error, setError] = useState<string | null>(null);
   const [startDate, setStartDate] = useState<Date | null>(null);
   const [endDate, setEndDate] = useState<Date | null>(null);
 
   const isCollaborator = (user?.role || '').toUpperCase() === 'COLABORADOR';
 
-  const load = async () => {
-    setError(null);
-    setLoading(true);
-    try {
-      const data = await fetchSurveys();
-      setSurveys(data);
-      setFiltered(filterSurveysByDate(data, startDate, endDate));
-    } catch (loadError) {
-      console.error(loadError);
-      setError('No pudimos cargar tu historial de encuestas.');
-    } finally {
-      setLoading(false);
-      setRefreshing(false);
-    }
-  };
+  const {
+    items: surveys,
+    loading,
+    error: loadError,
+    hasMore,
+    loadMore,
+    reload,
+  } = usePaginatedList(fetchSurveys, { enabled: Boolean(user), key: String(user?.id ?? '') });
+  const error = loadError ? 'No pudimos cargar tu historial de encuestas.' : null;
 
   useEffect(() => {
-    load();
-  }, [user?.id]);
+    if (!loading) setRefreshing(false);
+  }, [loading]);
 
-  useEffect(() => {
-    setFiltered(filterSurveysByDate(surveys, startDate, endDate));
-  }, [startDate, endDate, surveys]);
+  // El filtro de fechas aplica sobre las páginas cargadas; llegan de la más reciente a la más antigua.
+  const filtered = useMemo(() => filterSurveysByDate(surveys, startDate, endDate), [startDate, endDate, surveys]);
 
   const openDatePicker = (type: 'start' | 'end') => {
     const currentValue = type === 'start' ? startDate ?? new Date() : endDate ?? new Date();
@@ -64,7 +54,7 @@ const SurveyHistoryScreen: React.FC = () => {
 
   const onRefresh = () => {
     setRefreshing(true);
-    load();
+    reload();
   };
 
   if (!isCollaborator) {
@@ -103,9 +93,9 @@ const SurveyHistoryScreen: React.FC = () => {
 
       <View style={styles.card}>
         <Text style={styles.cardTitle}>Encuestas</Text>
-        {loading && <Text style={styles.muted}>Cargando encuestas...</Text>}
+        {loading && surveys.length === 0 && <Text style={styles.muted}>Cargando encuestas...</Text>}
         {!loading && filtered.length === 0 && <Text style={styles.muted}>Aún no tienes encuestas registradas.</Text>}
-        {!loading &&
+        {surveys.length > 0 &&
           filtered.map((survey) => (
             <View key={survey.id} style={styles.listItem}>
               <View style={styles.listMeta}>
@@ -119,6 +109,11 @@ const SurveyHistoryScreen: React.FC = () => {
               </View>
             </View>
           ))}
+        {hasMore && (
+          <TouchableOpacity style={styles.moreButton} onPress={loadMore} disabled={loading}>
+            <Text style={styles.moreButtonText}>{loading ? 'Cargando...' : 'Cargar más'}</Text>
+          </TouchableOpacity>
+        )}
       </View>
     </ScrollView>
   );
@@ -170,6 +165,15 @@ const styles = StyleSheet.create({
     color: '#0369a1',
     fontWeight: '700',
   },
+  moreButton: {
+    marginTop: 12,
+    paddingVertical: 10,
+    borderRadius: 10,
+    borderWidth: 1,
+    borderColor: '#cbd5e1',
+    alignItems: 'center',
+  },
+  moreButtonText: { color: '#0f172a', fontWeight: '600' },
   centered: { flex: 1, justifyContent: 'center', alignItems: 'center', padding: 16 },
   warning: { color: '#b45309', textAlign: 'center' },
 });
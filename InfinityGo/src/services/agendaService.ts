@@ -1,4 +1,4 @@
-import api from '@api/httpClient';
+import api, { fetchPage } from '@api/httpClient';
 import { endpoints } from '@api/endpoints';
 
 export interface Agenda {
@@ -11,10 +11,7 @@ export interface Agenda {
   candidato?: number | null;
 }
 
-export const fetchAgendas = async () => {
-  const { data } = await api.get<Agenda[]>(endpoints.agenda.base);
-  return data;
-};
+export const fetchAgendas = (next?: string | null) => fetchPage<Agenda>(endpoints.agenda.base, undefined, next);
 
 export const createAgenda = async (payload: {
   titulo: string;
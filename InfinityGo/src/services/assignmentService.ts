@@ -1,4 +1,4 @@
-import api from '@api/httpClient';
+import api, { fetchAll } from '@api/httpClient';
 import { endpoints } from '@api/endpoints';
 
 export interface ZoneAssignment {
@@ -14,8 +14,8 @@ export interface ZoneAssignment {
 }
 
 export const fetchAssignments = async (params?: { colaborador?: string | number; municipio?: string | number }) => {
-  const { data } = await api.get<ZoneAssignment[]>(endpoints.assignments.base, { params });
-  return data;
+  // Completas: se cruzan por colaborador y zona.
+  return fetchAll<ZoneAssignment>(endpoints.assignments.base, params);
 };
 
 export const createAssignment = async (payload: { colaborador_id: number; zona_id: number }) => {
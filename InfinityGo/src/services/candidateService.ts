@@ -1,4 +1,4 @@
-import api from '@api/httpClient';
+import api, { fetchPage } from '@api/httpClient';
 import { endpoints } from '@api/endpoints';
 
 export interface Candidate {
@@ -22,10 +22,8 @@ export interface CandidatePayload {
   password?: string;
 }
 
-export const fetchCandidates = async () => {
-  const { data } = await api.get<Candidate[]>(endpoints.candidates.base);
-  return data;
-};
+export const fetchCandidates = (next?: string | null) =>
+  fetchPage<Candidate>(endpoints.candidates.base, undefined, next);
 
 export const fetchCurrentCandidate = async () => {
   const { data } = await api.get<Candidate>(endpoints.candidates.me);
@@ -1,5 +1,5 @@
 import { CoverageZone, fetchCoverageZones } from '@services/dashboardService';
-import { SurveyRow, fetchSurveys } from '@services/surveyService';
+import { SurveyRow, fetchAllSurveys } from '@services/surveyService';
 
 export interface CollaboratorMetrics {
   totalSurveys: number;
@@ -32,12 +32,12 @@ const calculateMetrics = (coverage: CoverageZone[], surveys: SurveyRow[]): Colla
 };
 
 export const fetchCollaboratorDashboard = async (): Promise<CollaboratorDashboardData> => {
-  const [coverage, surveys] = await Promise.all([fetchCoverageZones(), fetchSurveys()]);
+  const [coverage, surveys] = await Promise.all([fetchCoverageZones(), fetchAllSurveys()]);
   return { coverage, surveys, metrics: calculateMetrics(coverage, surveys) };
 };
 
 export const fetchCollaboratorProgress = async () => {
-  const [coverage, surveys] = await Promise.all([fetchCoverageZones(), fetchSurveys()]);
+  const [coverage, surveys] = await Promise.all([fetchCoverageZones(), fetchAllSurveys()]);
   return { coverage, surveys, metrics: calculateMetrics(coverage, surveys) };
 };
 
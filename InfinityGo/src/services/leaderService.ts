@@ -1,6 +1,6 @@
 import { CoverageZone, CollaboratorProgress, fetchCollaboratorProgress, fetchCoverageZones } from '@services/dashboardService';
 import { fetchUsersByRole, UserResponse } from '@services/userService';
-import { fetchSurveys } from '@services/surveyService';
+import { fetchAllSurveys } from '@services/surveyService';
 
 export interface LeaderDashboardData {
   collaborators: UserResponse[];
@@ -55,7 +55,7 @@ export const fetchLeaderDashboard = async (): Promise<LeaderDashboardData> => {
 };
 
 export const fetchLeaderSurveyStats = async (): Promise<LeaderSurveyStats> => {
-  const surveys = await fetchSurveys();
+  const surveys = await fetchAllSurveys();
   const validVoters = surveys.filter((survey) => survey.votante_valido).length;
   return { validVoters, totalSurveys: surveys.length };
 };
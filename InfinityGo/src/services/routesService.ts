@@ -1,4 +1,4 @@
-import api from '@api/httpClient';
+import api, { fetchPage } from '@api/httpClient';
 import { endpoints } from '@api/endpoints';
 
 export interface RutaZona {
@@ -15,10 +15,9 @@ export interface Ruta {
   ruta_zonas: RutaZona[];
 }
 
-export const fetchRutas = async (isCollaborator: boolean) => {
+export const fetchRutas = async (isCollaborator: boolean, next?: string | null) => {
   const endpoint = isCollaborator ? endpoints.routes.mine : endpoints.routes.base;
-  const { data } = await api.get<Ruta[]>(endpoint);
-  return data;
+  return fetchPage<Ruta>(endpoint, undefined, next);
 };
 
 export const createRuta = async (payload: { nombre_ruta: string; fecha_inicio?: string | null; fecha_fin?: string | null; ruta_zonas: RutaZona[] }) => {
@@ -1,4 +1,4 @@
-import api from '@api/httpClient';
+import api, { fetchAll, fetchPage } from '@api/httpClient';
 import { endpoints } from '@api/endpoints';
 
 export interface SurveyPayload {
@@ -46,10 +46,10 @@ export const createSurvey = async (payload: SurveyPayload) => {
   await api.post(endpoints.surveys.base, payload);
 };
 
-export const fetchSurveys = async () => {
-  const { data } = await api.get<SurveyRow[]>(endpoints.surveys.base);
-  return data;
-};
+export const fetchSurveys = (next?: string | null) => fetchPage<SurveyRow>(endpoints.surveys.base, undefined, next);
+
+/** Todas las encuestas visibles; solo para las métricas que se calculan en el dispositivo. */
+export const fetchAllSurveys = () => fetchAll<SurveyRow>(endpoints.surveys.base);
 
 export const fetchSurveyDetail = async (id: number) => {
   const { data } = await api.get<SurveyDetail>(`${endpoints.surveys.base}${id}/`);
@@ -61,6 +61,5 @@ export const updateSurvey = async (id: number, payload: Partial<SurveyPayload>)
 };
 
 export const fetchNeeds = async () => {
-  const { data } = await api.get<Need[]>(endpoints.needs.base);
-  return data;
+  return fetchAll<Need>(endpoints.needs.base);
 };
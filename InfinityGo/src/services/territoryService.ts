@@ -1,4 +1,4 @@
-import api from '@api/httpClient';
+import api, { fetchAll } from '@api/httpClient';
 import { endpoints } from '@api/endpoints';
 
 export interface Departamento {
@@ -22,20 +22,15 @@ export interface Zona {
 }
 
 export const fetchDepartamentos = async () => {
-  const { data } = await api.get<Departamento[]>(endpoints.territory.departamentos);
-  return data;
+  return fetchAll<Departamento>(endpoints.territory.departamentos);
 };
 
 export const fetchMunicipios = async (userId?: number) => {
-  const { data } = await api.get<Municipio[]>(
-    userId ? `${endpoints.users.base}${userId}/municipios/` : endpoints.territory.municipios,
-  );
-  return data;
+  return fetchAll<Municipio>(userId ? `${endpoints.users.base}${userId}/municipios/` : endpoints.territory.municipios);
 };
 
 export const fetchZonas = async (params?: { municipio?: number | string }) => {
-  const { data } = await api.get<Zona[]>(endpoints.territory.zonas, { params });
-  return data;
+  return fetchAll<Zona>(endpoints.territory.zonas, params);
 };
 
 export const createDepartamento = async (payload: { nombre: string; codigo?: string }) => {
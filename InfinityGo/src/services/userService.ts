@@ -1,4 +1,4 @@
-import api from '@api/httpClient';
+import api, { fetchAll, fetchPage } from '@api/httpClient';
 import { endpoints } from '@api/endpoints';
 
 export interface UserPayload {
@@ -16,10 +16,11 @@ export interface UserResponse extends UserPayload {
   meta_votantes?: number;
 }
 
-export const fetchUsersByRole = async (role: UserPayload['role']) => {
-  const { data } = await api.get<UserResponse[]>(endpoints.users.base, { params: { role } });
-  return data;
-};
+// Completos: alimentan selectores y el cruce del equipo de un líder con sus asignaciones.
+export const fetchUsersByRole = async (role: UserPayload['role']) => fetchAll<UserResponse>(endpoints.users.base, { role });
+
+export const fetchUsersPageByRole = (role: UserPayload['role'], next?: string | null) =>
+  fetchPage<UserResponse>(endpoints.users.base, { role }, next);
 
 export const createUser = async (payload: UserPayload) => {
   const { data } = await api.post<UserResponse>(endpoints.users.base, payload);
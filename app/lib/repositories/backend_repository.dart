@@ -23,9 +23,9 @@ class BackendRepository {
     return DashboardBundle(coverage: coverage, resumen: resumen);
   }
 
-  Future<List<SurveyRow>> fetchSurveys() async {
-    final List<dynamic> data = await _apiClient.get('/encuestas/') as List<dynamic>;
-    return data.map((dynamic e) => SurveyRow.fromJson(e as Map<String, dynamic>)).toList();
+  Future<ApiPage<SurveyRow>> fetchSurveys({String? next}) async {
+    final ApiPage<dynamic> page = await _apiClient.getPage('/encuestas/', next: next);
+    return page.map((dynamic e) => SurveyRow.fromJson(e as Map<String, dynamic>));
   }
 
   Future<void> submitSurvey({
@@ -49,34 +49,29 @@ class BackendRepository {
     });
   }
 
-  Future<List<AgendaItem>> fetchAgenda() async {
-    final dynamic data = await _apiClient.get('/agenda/');
-    if (data is! List<dynamic>) return <AgendaItem>[];
-    return data.map((dynamic e) => AgendaItem.fromJson(e as Map<String, dynamic>)).toList();
+  Future<ApiPage<AgendaItem>> fetchAgenda({String? next}) async {
+    final ApiPage<dynamic> page = await _apiClient.getPage('/agenda/', next: next);
+    return page.map((dynamic e) => AgendaItem.fromJson(e as Map<String, dynamic>));
   }
 
-  Future<List<AssignmentRow>> fetchAssignments() async {
-    final dynamic data = await _apiClient.get('/asignaciones/');
-    if (data is! List<dynamic>) return <AssignmentRow>[];
-    return data.map((dynamic e) => AssignmentRow.fromJson(e as Map<String, dynamic>)).toList();
+  Future<ApiPage<AssignmentRow>> fetchAssignments({String? next}) async {
+    final ApiPage<dynamic> page = await _apiClient.getPage('/asignaciones/', next: next);
+    return page.map((dynamic e) => AssignmentRow.fromJson(e as Map<String, dynamic>));
   }
 
-  Future<List<CollaboratorRow>> fetchCollaborators() async {
-    final dynamic data = await _apiClient.get('/colaboradores/');
-    if (data is! List<dynamic>) return <CollaboratorRow>[];
-    return data.map((dynamic e) => CollaboratorRow.fromJson(e as Map<String, dynamic>)).toList();
+  Future<ApiPage<CollaboratorRow>> fetchCollaborators({String? next}) async {
+    final ApiPage<dynamic> page = await _apiClient.getPage('/colaboradores/', next: next);
+    return page.map((dynamic e) => CollaboratorRow.fromJson(e as Map<String, dynamic>));
   }
 
-  Future<List<LeaderRow>> fetchLeaders() async {
-    final dynamic data = await _apiClient.get('/lideres/');
-    if (data is! List<dynamic>) return <LeaderRow>[];
-    return data.map((dynamic e) => LeaderRow.fromJson(e as Map<String, dynamic>)).toList();
+  Future<ApiPage<LeaderRow>> fetchLeaders({String? next}) async {
+    final ApiPage<dynamic> page = await _apiClient.getPage('/lideres/', next: next);
+    return page.map((dynamic e) => LeaderRow.fromJson(e as Map<String, dynamic>));
   }
 
-  Future<List<CandidateRow>> fetchCandidates() async {
-    final dynamic data = await _apiClient.get('/candidatos/');
-    if (data is! List<dynamic>) return <CandidateRow>[];
-    return data.map((dynamic e) => CandidateRow.fromJson(e as Map<String, dynamic>)).toList();
+  Future<ApiPage<CandidateRow>> fetchCandidates({String? next}) async {
+    final ApiPage<dynamic> page = await _apiClient.getPage('/candidatos/', next: next);
+    return page.map((dynamic e) => CandidateRow.fromJson(e as Map<String, dynamic>));
   }
 
   Future<Map<String, dynamic>> fetchUnifiedReport() async {
@@ -43,6 +43,19 @@ class ApiClient {
     return _decodeResponse(response);
   }
 
+  /// Una página de una lista con cursor; [next] es el enlace de la página anterior.
+  Future<ApiPage<dynamic>> getPage(String path, {Map<String, dynamic>? query, String? next}) async {
+    final dynamic data = next != null
+        ? _decodeResponse(await http.get(Uri.parse(next), headers: _headers()))
+        : await get(path, query: query);
+    // Acciones como mis-rutas (o el servidor con LISTAS_SIN_PAGINAR) responden un arreglo.
+    if (data is List<dynamic>) return ApiPage<dynamic>(results: data, next: null);
+    if (data is Map<String, dynamic> && data['results'] is List<dynamic>) {
+      return ApiPage<dynamic>(results: data['results'] as List<dynamic>, next: data['next'] as String?);
+    }
+    return const ApiPage<dynamic>(results: <dynamic>[], next: null);
+  }
+
   Future<dynamic> post(String path, {Map<String, dynamic>? body}) async {
     final http.Response response = await http.post(
       _url(path),
@@ -76,6 +89,15 @@ class ApiClient {
   }
 }
 
+class ApiPage<T> {
+  const ApiPage({required this.results, required this.next});
+
+  final List<T> results;
+  final String? next;
+
+  ApiPage<R> map<R>(R Function(T item) convert) => ApiPage<R>(results: results.map(convert).toList(), next: next);
+}
+
 class ApiException implements Exception {
   ApiException({required this.status, required this.body});
   final int status;
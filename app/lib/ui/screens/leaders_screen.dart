@@ -2,6 +2,7 @@ import 'package:flutter/material.dart';
 
 import '../../models/catalogs.dart';
 import '../../repositories/backend_repository.dart';
+import '../widgets/paginated_list.dart';
 
 class LeadersScreen extends StatefulWidget {
   const LeadersScreen({super.key, required this.repository});
@@ -13,46 +14,16 @@ class LeadersScreen extends StatefulWidget {
 }
 
 class _LeadersScreenState extends State<LeadersScreen> {
-  late Future<List<LeaderRow>> _future;
-
-  @override
-  void initState() {
-    super.initState();
-    _future = _load();
-  }
-
-  Future<List<LeaderRow>> _load() async {
-    return widget.repository.fetchLeaders();
-  }
-
   @override
   Widget build(BuildContext context) {
-    return FutureBuilder<List<LeaderRow>>(
-      future: _future,
-      builder: (BuildContext context, AsyncSnapshot<List<LeaderRow>> snapshot) {
-        if (snapshot.connectionState == ConnectionState.waiting) {
-          return const Center(child: CircularProgressIndicator());
-        }
-        if (snapshot.hasError) {
-          return Center(child: Text('No pudimos cargar líderes: ${snapshot.error}'));
-        }
-        final List<LeaderRow> leaders = snapshot.data ?? <LeaderRow>[];
-        return RefreshIndicator(
-          onRefresh: () async => setState(() => _future = _load()),
-          child: ListView.builder(
-            padding: const EdgeInsets.all(12),
-            itemCount: leaders.length,
-            itemBuilder: (BuildContext context, int index) {
-              final LeaderRow row = leaders[index];
-              return ListTile(
-                leading: const Icon(Icons.badge_outlined),
-                title: Text(row.name),
-                subtitle: Text(row.phone),
-              );
-            },
-          ),
-        );
-      },
+    return PaginatedList<LeaderRow>(
+      load: (String? next) => widget.repository.fetchLeaders(next: next),
+      errorText: 'No pudimos cargar líderes',
+      itemBuilder: (BuildContext context, LeaderRow row) => ListTile(
+        leading: const Icon(Icons.badge_outlined),
+        title: Text(row.name),
+        subtitle: Text(row.phone),
+      ),
     );
   }
 }
@@ -2,6 +2,7 @@ import 'package:flutter/material.dart';
 
 import '../../models/survey.dart';
 import '../../repositories/backend_repository.dart';
+import '../widgets/paginated_list.dart';
 
 class SurveyListScreen extends StatefulWidget {
   const SurveyListScreen({super.key, required this.repository});
@@ -13,104 +14,74 @@ class SurveyListScreen extends StatefulWidget {
 }
 
 class _SurveyListScreenState extends State<SurveyListScreen> {
-  late Future<List<SurveyRow>> _future;
   String? _municipioFilter;
 
-  @override
-  void initState() {
-    super.initState();
-    _future = _load();
-  }
-
-  Future<List<SurveyRow>> _load() async {
-    return widget.repository.fetchSurveys();
-  }
-
   @override
   Widget build(BuildContext context) {
-    return FutureBuilder<List<SurveyRow>>(
-      future: _future,
-      builder: (BuildContext context, AsyncSnapshot<List<SurveyRow>> snapshot) {
-        if (snapshot.connectionState == ConnectionState.waiting) {
-          return const Center(child: CircularProgressIndicator());
-        }
-        if (snapshot.hasError) {
-          return Center(child: Text('Error al cargar encuestas: ${snapshot.error}'));
-        }
-        final List<SurveyRow> surveys = snapshot.data!;
+    // El filtro por municipio aplica sobre las páginas cargadas.
+    return PaginatedList<SurveyRow>(
+      load: (String? next) => widget.repository.fetchSurveys(next: next),
+      errorText: 'Error al cargar encuestas',
+      filter: _municipioFilter == null || _municipioFilter!.isEmpty
+          ? null
+          : (SurveyRow s) => s.municipioNombre == _municipioFilter,
+      header: (BuildContext context, List<SurveyRow> surveys, VoidCallback reload) {
         final List<String> municipios = surveys
             .map((SurveyRow s) => s.municipioNombre ?? '-')
             .toSet()
             .toList()
           ..sort();
-        final Iterable<SurveyRow> filtered = _municipioFilter == null || _municipioFilter!.isEmpty
-            ? surveys
-            : surveys.where((SurveyRow s) => s.municipioNombre == _municipioFilter);
-        return Column(
-          children: [
-            Padding(
-              padding: const EdgeInsets.all(12),
-              child: Row(
-                children: [
-                  const Text('Municipio:'),
-                  const SizedBox(width: 8),
-                  DropdownButton<String?>(
-                    value: _municipioFilter,
-                    items: [
-                      const DropdownMenuItem<String?>(value: null, child: Text('Todos')),
-                      ...municipios
-                          .map(
-                            (String muni) => DropdownMenuItem<String?>(
-                              value: muni,
-                              child: Text(muni),
-                            ),
-                          )
-                          .toList(),
-                    ],
-                    onChanged: (String? value) => setState(() => _municipioFilter = value),
-                  ),
-                  const Spacer(),
-                  IconButton(
-                    icon: const Icon(Icons.refresh),
-                    onPressed: () => setState(() => _future = _load()),
-                  ),
+        return Padding(
+          padding: const EdgeInsets.all(12),
+          child: Row(
+            children: [
+              const Text('Municipio:'),
+              const SizedBox(width: 8),
+              DropdownButton<String?>(
+                value: municipios.contains(_municipioFilter) ? _municipioFilter : null,
+                items: [
+                  const DropdownMenuItem<String?>(value: null, child: Text('Todos')),
+                  ...municipios
+                      .map(
+                        (String muni) => DropdownMenuItem<String?>(
+                          value: muni,
+                          child: Text(muni),
+                        ),
+                      )
+                      .toList(),
                 ],
+                onChanged: (String? value) => setState(() => _municipioFilter = value),
               ),
-            ),
-            Expanded(
-              child: RefreshIndicator(
-                onRefresh: () async => setState(() => _future = _load()),
-                child: ListView(
-                  padding: const EdgeInsets.all(12),
-                  children: filtered
-                      .map((SurveyRow survey) => Card(
-                            child: ListTile(
-                              title: Text(survey.nombreCiudadano ?? 'Ciudadano sin nombre'),
-                              subtitle: Text(
-                                '${survey.municipioNombre ?? '-'} · ${survey.zonaNombre ?? survey.zona} · ${survey.telefono}',
-                              ),
-                              trailing: Column(
-                                crossAxisAlignment: CrossAxisAlignment.end,
-                                mainAxisAlignment: MainAxisAlignment.center,
-                                children: [
-                                  Text(survey.casoCritico ? 'Crítico' : 'Normal',
-                                      style: TextStyle(
-                                        color: survey.casoCritico ? Colors.red : Colors.green,
-                                        fontWeight: FontWeight.bold,
-                                      )),
-                                  Text('${survey.necesidades.length} necesidades'),
-                                ],
-                              ),
-                              onTap: () => _showDetails(context, survey),
-                            ),
-                          ))
-                      .toList(),
-                ),
+              const Spacer(),
+              IconButton(
+                icon: const Icon(Icons.refresh),
+                onPressed: reload,
               ),
-            ),
-          ],
+            ],
+          ),
         );
       },
+      itemBuilder: (BuildContext context, SurveyRow survey) => Card(
+        child: ListTile(
+          title: Text(survey.nombreCiudadano ?? 'Ciudadano sin nombre'),
+          subtitle: Text(
+            '${survey.municipioNombre ?? '-'} · ${survey.zonaNombre ?? survey.zona} · ${survey.telefono}',
+          ),
+          trailing: Column(
+            crossAxisAlignment: CrossAxisAlignment.end,
+            mainAxisAlignment: MainAxisAlignment.center,
+            children: [
+              Text(survey.casoCritico ? 'Crítico' : 'Normal',
+                  style: TextStyle(
+                    color: survey.casoCritico ? Colors.red : Colors.green,
+                    fontWeight: FontWeight.bold,
+                  )),
+              Text('${survey.necesidades.length} necesidades'),
+            ],
+          ),
+          onTap: () => _showDetails(context, survey),
+        ),
+      ),
     );
   }
 
@@ -0,0 +1,137 @@
+import 'package:flutter/material.dart';
+
+import '../../services/api_client.dart';
+
+/// Lista con scroll infinito: pide la página siguiente al acercarse al final.
+class PaginatedList<T> extends StatefulWidget {
+  const PaginatedList({
+    super.key,
+    required this.load,
+    required this.itemBuilder,
+    required this.errorText,
+    this.emptyText = 'Sin registros',
+    this.filter,
+    this.header,
+    this.separated = false,
+  });
+
+  final Future<ApiPage<T>> Function(String? next) load;
+  final Widget Function(BuildContext context, T item) itemBuilder;
+  final String errorText;
+  final String emptyText;
+  // El filtro aplica sobre las páginas cargadas.
+  final bool Function(T item)? filter;
+  final Widget Function(BuildContext context, List<T> items, VoidCallback reload)? header;
+  final bool separated;
+
+  @override
+  State<PaginatedList<T>> createState() => _PaginatedListState<T>();
+}
+
+class _PaginatedListState<T> extends State<PaginatedList<T>> {
+  final List<T> _items = <T>[];
+  String? _next;
+  bool _loading = false;
+  bool _started = false;
+  Object? _error;
+  // Descarta respuestas de una carga anterior al refrescar.
+  int _version = 0;
+
+  @override
+  void initState() {
+    super.initState();
+    _reload();
+  }
+
+  Future<void> _reload() async {
+    _version++;
+    setState(() {
+      _items.clear();
+      _next = null;
+      _started = false;
+    });
+    await _request(null);
+  }
+
+  Future<void> _request(String? cursor) async {
+    final int version = _version;
+    setState(() {
+      _loading = true;
+      _error = null;
+    });
+    try {
+      final ApiPage<T> page = await widget.load(cursor);
+      if (!mounted || version != _version) return;
+      setState(() {
+        _items.addAll(page.results);
+        _next = page.next;
+        _started = true;
+      });
+    } catch (error) {
+      if (!mounted || version != _version) return;
+      setState(() => _error = error);
+    } finally {
+      if (mounted && version == _version) setState(() => _loading = false);
+    }
+  }
+
+  bool _onScroll(ScrollNotification notification) {
+    if (_next != null && !_loading && notification.metrics.extentAfter < 300) {
+      _request(_next);
+    }
+    return false;
+  }
+
+  @override
+  Widget build(BuildContext context) {
+    if (!_started && _loading) {
+      return const Center(child: CircularProgressIndicator());
+    }
+    if (!_started && _error != null) {
+      return Center(child: Text('${widget.errorText}: $_error'));
+    }
+    final List<T> visible = widget.filter == null ? _items : _items.where(widget.filter!).toList();
+    final bool more = _next != null;
+    final Widget list = NotificationListener<ScrollNotification>(
+      onNotification: _onScroll,
+      child: RefreshIndicator(
+        onRefresh: _reload,
+        child: visible.isEmpty && !more
+            ? ListView(
+                children: [
+                  Padding(padding: const EdgeInsets.all(24), child: Center(child: Text(widget.emptyText))),
+                ],
+              )
+            : ListView.separated(
+                padding: const EdgeInsets.all(12),
+                physics: const AlwaysScrollableScrollPhysics(),
+                itemCount: visible.length + (more ? 1 : 0),
+                itemBuilder: (BuildContext context, int index) {
+                  if (index == visible.length) {
+                    return Padding(
+                      padding: const EdgeInsets.all(12),
+                      child: Center(
+                        child: _loading
+                            ? const CircularProgressIndicator()
+                            : TextButton(
+                                onPressed: () => _request(_next),
+                                child: Text(_error != null ? 'Reintentar' : 'Cargar más'),
+                              ),
+                      ),
+                    );
+                  }
+                  return widget.itemBuilder(context, visible[index]);
+                },
+                separatorBuilder: (_, __) => widget.separated ? const Divider() : const SizedBox.shrink(),
+              ),
+      ),
+    );
+    if (widget.header == null) return list;
+    return Column(
+      children: [
+        widget.header!(context, _items, _reload),
+        Expanded(child: list),
+      ],
+    );
+  }
+}
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0006_user_meta_votantes_positive"),
+        ("surveys", "0006_resumenlider"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="user",
+            name="score_confiabilidad",
+        ),
+    ]
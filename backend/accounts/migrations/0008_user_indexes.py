@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0007_remove_user_score_confiabilidad"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["role", "name"], name="accounts_user_rol_nombre"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["created_by", "role"], name="accounts_user_creador_rol"),
+        ),
+    ]
@@ -17,7 +17,6 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=Roles.choices, default=Roles.COLABORADOR)
     is_active = models.BooleanField(default=True)
     meta_votantes = models.PositiveIntegerField(default=0)
-    score_confiabilidad = models.FloatField(default=0.0, editable=False)
     created_by = models.ForeignKey(
         "self",
         null=True,
@@ -29,6 +28,14 @@ class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["name"]
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Listados por rol ordenados por nombre (líderes, colaboradores).
+            models.Index(fields=["role", "name"], name="accounts_user_rol_nombre"),
+            # Colaboradores creados por un líder.
+            models.Index(fields=["created_by", "role"], name="accounts_user_creador_rol"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -47,3 +54,8 @@ class User(AbstractUser):
     @property
     def is_candidate(self):
         return self.role == self.Roles.CANDIDATO
+
+    @property
+    def score_confiabilidad(self):
+        resumen = getattr(self, "resumen_encuestas", None)
+        return resumen.score_confiabilidad if resumen else 0
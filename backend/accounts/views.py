@@ -56,6 +56,10 @@ class UserViewSet(
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        # Filtro en el servidor: las listas llegan por páginas y filtrar en el cliente las dejaría a medias.
+        rol = self.request.query_params.get("role")
+        if rol:
+            queryset = queryset.filter(role=rol)
         requester = self.request.user
         if requester.is_admin:
             return queryset
@@ -107,7 +111,7 @@ class UserViewSet(
         if request.method == "GET":
             if not (request.user.is_admin or request.user == leader):
                 raise PermissionDenied("No tienes permiso para ver estos municipios.")
-            data = MunicipioSerializer(leader.municipios.all(), many=True).data
+            data = MunicipioSerializer(leader.municipios.select_related("departamento"), many=True).data
             return Response(data)
 
         if not request.user.is_admin:
@@ -122,7 +126,7 @@ class UserViewSet(
 
         municipios = Municipio.objects.filter(id__in=municipio_ids)
         leader.municipios.set(municipios)
-        data = MunicipioSerializer(leader.municipios.all(), many=True).data
+        data = MunicipioSerializer(leader.municipios.select_related("departamento"), many=True).data
         return Response(data)
 
 class LeaderMetaView(APIView):
@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("agenda", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="agenda",
+            index=models.Index(fields=["lider", "fecha"], name="agenda_lider_fecha"),
+        ),
+    ]
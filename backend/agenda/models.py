@@ -34,6 +34,10 @@ class Agenda(models.Model):
 
     class Meta:
         ordering = ["-fecha", "-hora_inicio"]
+        indexes = [
+            # Agenda de un líder en su orden por fecha.
+            models.Index(fields=["lider", "fecha"], name="agenda_lider_fecha"),
+        ]
         verbose_name = "Agenda"
         verbose_name_plural = "Agendas"
 
@@ -2,10 +2,11 @@ from rest_framework import serializers
 
 from accounts.models import User
 from candidates.models import Candidato
+from pitpc.serializers import SparseFieldsMixin
 from .models import Agenda
 
 
-class AgendaSerializer(serializers.ModelSerializer):
+class AgendaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     lider_nombre = serializers.CharField(source="lider.name", read_only=True)
     candidato_nombre = serializers.CharField(source="candidato.nombre", read_only=True)
     candidato_email = serializers.EmailField(source="candidato.usuario.email", read_only=True)
@@ -13,7 +13,7 @@ class AgendaViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ["estado", "candidato"]
     search_fields = ["titulo", "descripcion", "lugar", "candidato__nombre"]
-    ordering = ["-fecha", "-hora_inicio"]
+    ordering = ["-fecha", "-hora_inicio", "-id"]
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -0,0 +1,172 @@
+"""Motor de alertas por líder.
+
+Las estadísticas de todos los líderes se cargan con una consulta agrupada por
+líder y día; cada regla registrada las recorre en memoria, de modo que agregar
+un tipo de alerta no agrega consultas.
+"""
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from accounts.models import User
+from surveys.cache import marca_encuestas
+from surveys.models import Encuesta, ResumenLider
+from surveys.services import lider_propietario
+
+PRIORIDAD_NIVEL = {"ALTO": 0, "MEDIO": 1, "BAJO": 2}
+
+REGLAS = []
+
+
+def regla(func):
+    """Registra una regla ``func(lider, contexto)`` que devuelve una lista de alertas."""
+    REGLAS.append(func)
+    return func
+
+
+def _fecha_setting(nombre):
+    valor = getattr(settings, nombre, None)
+    if isinstance(valor, str):
+        return datetime.date.fromisoformat(valor)
+    return valor
+
+
+def _alerta(tipo, nivel, lider, mensaje, contexto):
+    return {
+        "tipo": tipo,
+        "nivel": nivel,
+        "leader_id": lider["id"],
+        "leader_nombre": lider["nombre"],
+        "mensaje": mensaje,
+        "fecha_evaluacion": contexto["hoy"].isoformat(),
+    }
+
+
+def cargar_estadisticas():
+    """Totales de encuestas por líder (total y válidas) y su última fecha con una válida."""
+    lideres = {
+        item["id"]: {
+            "id": item["id"],
+            "nombre": item["name"],
+            "meta_votantes": item["meta_votantes"],
+            "total": 0,
+            "validas": 0,
+            "ultima_fecha_valida": None,
+        }
+        for item in User.objects.filter(role=User.Roles.LIDER).values("id", "name", "meta_votantes")
+    }
+    por_dia = (
+        Encuesta.objects.annotate(lider=lider_propietario())
+        .filter(lider__in=list(lideres))
+        .values("lider", "fecha_creacion")
+        .annotate(total=Count("id"), validas=Count("id", filter=Q(votante_valido=True)))
+        .order_by()
+    )
+    for item in por_dia:
+        lider = lideres[item["lider"]]
+        lider["total"] += item["total"]
+        lider["validas"] += item["validas"]
+        if item["validas"] and (
+            lider["ultima_fecha_valida"] is None or item["fecha_creacion"] > lider["ultima_fecha_valida"]
+        ):
+            lider["ultima_fecha_valida"] = item["fecha_creacion"]
+    return list(lideres.values())
+
+
+@regla
+def lider_inactivo(lider, contexto):
+    ultima = lider["ultima_fecha_valida"]
+    if ultima and (contexto["hoy"] - ultima).days <= 5:
+        return []
+    return [
+        _alerta(
+            "lider_inactivo",
+            "ALTO",
+            lider,
+            f"Líder {lider['nombre']}: sin registros válidos en los últimos 5 días.",
+            contexto,
+        )
+    ]
+
+
+@regla
+def meta_en_riesgo(lider, contexto):
+    inicio, fin, hoy = contexto["campaign_start"], contexto["campaign_end"], contexto["hoy"]
+    if not (inicio and fin and lider["meta_votantes"]):
+        return []
+    days_elapsed = max(1, (hoy - inicio).days + 1)
+    days_remaining = max(0, (fin - hoy).days)
+    ritmo_diario = lider["validas"] / days_elapsed
+    if lider["validas"] + (ritmo_diario * days_remaining) >= lider["meta_votantes"]:
+        return []
+    return [
+        _alerta(
+            "meta_en_riesgo",
+            "MEDIO",
+            lider,
+            f"Líder {lider['nombre']}: al ritmo actual no alcanzará la meta asignada.",
+            contexto,
+        )
+    ]
+
+
+@regla
+def baja_calidad_registros(lider, contexto):
+    if not lider["total"]:
+        return []
+    porcentaje_invalidos = ((lider["total"] - lider["validas"]) / lider["total"]) * 100
+    if porcentaje_invalidos <= 40:
+        return []
+    return [
+        _alerta(
+            "baja_calidad_registros",
+            "MEDIO",
+            lider,
+            f"Líder {lider['nombre']}: alto porcentaje de registros no válidos.",
+            contexto,
+        )
+    ]
+
+
+def evaluar_alertas(hoy=None, reglas=None):
+    contexto = {
+        "hoy": hoy or datetime.date.today(),
+        "campaign_start": _fecha_setting("CAMPAIGN_START_DATE"),
+        "campaign_end": _fecha_setting("CAMPAIGN_END_DATE"),
+    }
+    alertas = []
+    for lider in cargar_estadisticas():
+        for evaluar in reglas or REGLAS:
+            alertas.extend(evaluar(lider, contexto))
+    alertas.sort(key=lambda item: (PRIORIDAD_NIVEL.get(item["nivel"], 3), item["leader_nombre"]))
+    return alertas
+
+
+def marca_lideres():
+    """Marcador de los líderes: su nombre y meta, y el último recuento de sus encuestas.
+
+    Reasignar un colaborador o cambiar un rol recuenta ``ResumenLider`` sin
+    tocar las encuestas, así que ``marca_encuestas`` no lo ve.
+    """
+    resumen = ResumenLider.objects.aggregate(marca=Max("actualizado_en"), total=Count("lider"))
+    lideres = User.objects.filter(role=User.Roles.LIDER).order_by("id").values_list("id", "name", "meta_votantes")
+    return [resumen["marca"], resumen["total"], *lideres]
+
+
+def alertas_en_cache():
+    """Alertas del día, recalculadas cuando cambian las encuestas o los líderes, o vence la ventana.
+
+    La llave lleva las marcas de encuestas y de líderes de la base, comunes a
+    todos los procesos.
+    """
+    hoy = datetime.date.today()
+    marca = hashlib.sha1("|".join(map(str, [*marca_encuestas(), *marca_lideres()])).encode()).hexdigest()
+    key = f"dashboard:alertas:{marca}:{hoy.isoformat()}"
+    alertas = cache.get(key)
+    if alertas is None:
+        alertas = evaluar_alertas(hoy)
+        cache.set(key, alertas, getattr(settings, "ALERTAS_CACHE_SEGUNDOS", 300))
+    return alertas
@@ -1,3 +1,132 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from surveys.models import Encuesta
+from territory.models import Departamento, Municipio, Zona
+from .alerts import REGLAS, alertas_en_cache, evaluar_alertas
+
+HOY = datetime.date.today()
+
+
+@override_settings(
+    CAMPAIGN_START_DATE=HOY - datetime.timedelta(days=9), CAMPAIGN_END_DATE=HOY + datetime.timedelta(days=10)
+)
+class AlertasTests(TestCase):
+    """Cada regla recorre las estadísticas por líder en memoria y la caché sigue a las encuestas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        # Al día y con meta alcanzable: ninguna alerta.
+        cls.activo = User.objects.create(email="a@example.com", name="Activo", role=User.Roles.LIDER, meta_votantes=4)
+        # Sin encuestas: inactivo y con la meta en riesgo.
+        cls.inactivo = User.objects.create(
+            email="i@example.com", name="Inactivo", role=User.Roles.LIDER, meta_votantes=50
+        )
+        # Sus colaboradores registran más de un 40 % de encuestas no válidas.
+        cls.descuidado = User.objects.create(email="d@example.com", name="Descuidado", role=User.Roles.LIDER)
+        cls.colaborador = colaborador = User.objects.create(
+            email="c@example.com", name="C", role=User.Roles.COLABORADOR, created_by=cls.descuidado
+        )
+        cls.cedula = 0
+        for _ in range(3):
+            cls._encuesta(cls.activo, valida=True)
+        cls._encuesta(colaborador, valida=True)
+        cls._encuesta(colaborador, valida=False)
+        cls._encuesta(colaborador, valida=False)
+
+    @classmethod
+    def _encuesta(cls, colaborador, valida):
+        cls.cedula += 1
+        return Encuesta.objects.create(
+            zona=cls.zona,
+            colaborador=colaborador,
+            cedula=str(cls.cedula),
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+            nivel_afinidad=1,
+            disposicion_voto=1 if valida else 3,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _tipos(self, alertas):
+        return sorted((alerta["leader_nombre"], alerta["tipo"]) for alerta in alertas)
+
+    def test_reglas(self):
+        self.assertEqual(
+            self._tipos(evaluar_alertas(HOY)),
+            [
+                ("Descuidado", "baja_calidad_registros"),
+                ("Inactivo", "lider_inactivo"),
+                ("Inactivo", "meta_en_riesgo"),
+            ],
+        )
+        # Seis días después sin registros válidos todos quedan inactivos.
+        despues = evaluar_alertas(HOY + datetime.timedelta(days=6))
+        self.assertEqual(
+            sorted(alerta["leader_nombre"] for alerta in despues if alerta["tipo"] == "lider_inactivo"),
+            ["Activo", "Descuidado", "Inactivo"],
+        )
+
+    def test_orden_por_nivel_y_nombre(self):
+        alertas = evaluar_alertas(HOY)
+        self.assertEqual(
+            [(alerta["nivel"], alerta["leader_nombre"]) for alerta in alertas],
+            [("ALTO", "Inactivo"), ("MEDIO", "Descuidado"), ("MEDIO", "Inactivo")],
+        )
+        self.assertEqual({alerta["fecha_evaluacion"] for alerta in alertas}, {HOY.isoformat()})
+
+    @override_settings(CAMPAIGN_START_DATE=None)
+    def test_sin_campana_no_evalua_la_meta(self):
+        self.assertNotIn("meta_en_riesgo", {alerta["tipo"] for alerta in evaluar_alertas(HOY)})
+
+    def test_una_regla_mas_no_agrega_consultas(self):
+        def siempre(lider, contexto):
+            return [{"tipo": "prueba", "nivel": "BAJO", "leader_nombre": lider["nombre"]}]
+
+        with self.assertNumQueries(2):
+            evaluar_alertas(HOY)
+        with self.assertNumQueries(2):
+            alertas = evaluar_alertas(HOY, reglas=REGLAS + [siempre])
+        self.assertEqual(sum(alerta["tipo"] == "prueba" for alerta in alertas), 3)
+
+    def test_cache_sigue_la_marca_de_encuestas(self):
+        self.assertEqual(len(alertas_en_cache()), 3)
+        with self.assertNumQueries(5):
+            # En caché solo se leen las marcas de encuestas y de líderes.
+            alertas_en_cache()
+        # Una escritura desde cualquier proceso mueve la marca de la base.
+        for _ in range(3):
+            self._encuesta(self.inactivo, valida=True)
+        self.assertEqual(
+            self._tipos(alertas_en_cache()),
+            [("Descuidado", "baja_calidad_registros"), ("Inactivo", "meta_en_riesgo")],
+        )
+
+    def test_cache_sigue_a_los_duenos_de_las_encuestas(self):
+        self.assertEqual(len(alertas_en_cache()), 3)
+        # Reasignar el colaborador mueve sus encuestas de líder sin tocarlas.
+        self.colaborador.created_by = self.inactivo
+        self.colaborador.save()
+        self.assertEqual(
+            self._tipos(alertas_en_cache()),
+            [
+                ("Descuidado", "lider_inactivo"),
+                ("Inactivo", "baja_calidad_registros"),
+                ("Inactivo", "meta_en_riesgo"),
+            ],
+        )
+        # Un líder que deja el rol sale de las alertas.
+        self.inactivo.role = User.Roles.ADMIN
+        self.inactivo.save()
+        self.assertEqual(self._tipos(alertas_en_cache()), [("Descuidado", "lider_inactivo")])
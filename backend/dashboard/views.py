@@ -1,7 +1,6 @@
 import datetime
 
-from django.conf import settings
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Sum
 from django.db.models.functions import Coalesce
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -9,9 +8,32 @@ from rest_framework.response import Response
 
 from accounts.models import User
 from accounts.permissions import IsAdminOrCandidate, IsCandidate, IsNonCandidate
-from surveys.models import CasoCiudadano, Encuesta, EncuestaNecesidad
-from territory.models import Zona, ZonaAsignacion
-from surveys.services import calcular_cobertura_por_zona
+from pitpc.conditional import condicional
+from surveys.models import CasoCiudadano, CoberturaZona, Encuesta, EncuestaNecesidad
+from territory.geo import area_de_peticion, dentro, q_caja
+from territory.models import Municipio, Zona, ZonaAsignacion
+from surveys.cache import marca_encuestas
+from surveys.services import agregados_por_lider, calcular_cobertura_por_zona, zonas_fuera_de_area
+from surveys.tiles import ZOOM_MAXIMO, tesela
+from sync.services import marca_territorio
+from .alerts import alertas_en_cache
+
+
+def _version_tablero(casos=False, territorio=True):
+    def version(request):
+        if getattr(request.user, "role", None) == User.Roles.COLABORADOR:
+            return None
+        return marca_encuestas(casos=casos) + (marca_territorio() if territorio else [])
+
+    return version
+
+
+def _area(request):
+    """Área del mapa pedida (``bbox`` o ``lat``/``lon``/``radio``), o una respuesta 400."""
+    try:
+        return area_de_peticion(request.query_params), None
+    except ValueError as error:
+        return None, Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 class DashboardViewSet(viewsets.ViewSet):
@@ -29,6 +51,7 @@ class DashboardViewSet(viewsets.ViewSet):
         return self.resumen(request)
 
     @action(detail=False, methods=["get"], url_path="resumen")
+    @condicional(_version_tablero(casos=True))
     def resumen(self, request):
         denial = self._deny_for_collaborator(request)
         if denial:
@@ -42,7 +65,10 @@ class DashboardViewSet(viewsets.ViewSet):
             .annotate(total=Count("id"))
             .order_by("-total")[:3]
         )
-        casos_activos = CasoCiudadano.objects.exclude(estado=CasoCiudadano.Estado.ATENDIDO).count()
+        # ``estado IN`` y no ``<>`` para que el conteo use el índice por estado.
+        casos_activos = CasoCiudadano.objects.filter(
+            estado__in=[CasoCiudadano.Estado.REGISTRADO, CasoCiudadano.Estado.EN_REVISION]
+        ).count()
         data = {
             "total_encuestas": total_encuestas,
             "zonas_cumplidas": zonas_cumplidas,
@@ -53,13 +79,36 @@ class DashboardViewSet(viewsets.ViewSet):
         return Response(data)
 
     @action(detail=False, methods=["get"], url_path="mapa")
+    @condicional(_version_tablero())
     def mapa(self, request):
         denial = self._deny_for_collaborator(request)
         if denial:
             return denial
-        return Response(calcular_cobertura_por_zona())
+        area, error = _area(request)
+        if error:
+            return error
+        return Response(calcular_cobertura_por_zona(area=area))
+
+    @action(detail=False, methods=["get"], url_path="teselas")
+    def teselas(self, request):
+        denial = self._deny_for_collaborator(request)
+        if denial:
+            return denial
+        try:
+            z, x, y = (int(request.query_params[clave]) for clave in ("z", "x", "y"))
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "Indica la tesela con z, x e y enteros."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 0 <= z <= ZOOM_MAXIMO or not (0 <= x < 2**z and 0 <= y < 2**z):
+            return Response(
+                {"detail": f"Tesela fuera de rango: z entre 0 y {ZOOM_MAXIMO}, x e y entre 0 y 2^z - 1."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(tesela(z, x, y))
 
     @action(detail=False, methods=["get"], url_path="encuestas_por_dia")
+    @condicional(_version_tablero(territorio=False))
     def encuestas_por_dia(self, request):
         denial = self._deny_for_collaborator(request)
         if denial:
@@ -143,29 +192,44 @@ class DashboardViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["get"], url_path="candidato", permission_classes=[IsCandidate])
     def candidato(self, request):
-        total_registros = Encuesta.objects.count()
-        votantes_validos = Encuesta.objects.filter(votante_valido=True).count()
-        votantes_potenciales = Encuesta.objects.filter(votante_potencial=True).count()
-
+        area, error = _area(request)
+        if error:
+            return error
+        en_area = None
+        if area:
+            # Los totales y las alertas siguen siendo globales; el área solo recorta el mapa.
+            en_area = {
+                pk
+                for pk, lat, lon in Municipio.objects.filter(q_caja(area["caja"])).values_list("id", "lat", "lon")
+                if dentro(area, lat, lon)
+            }
         municipios_qs = (
-            Encuesta.objects.values(
+            CoberturaZona.objects.values(
                 "zona__municipio_id",
                 "zona__municipio__nombre",
                 "zona__municipio__lat",
                 "zona__municipio__lon",
             )
             .annotate(
-                total=Count("id"),
-                validos=Count("id", filter=Q(votante_valido=True)),
-                potenciales=Count("id", filter=Q(votante_potencial=True)),
+                total=Sum("total_encuestas"),
+                validos=Sum("votantes_validos"),
+                potenciales=Sum("votantes_potenciales"),
             )
+            .filter(total__gt=0)
             .order_by("zona__municipio__nombre")
         )
-        cobertura_municipios = []
+        total_registros = 0
+        votantes_validos = 0
+        votantes_potenciales = 0
+        municipios = []
         for item in municipios_qs:
             total = item["total"] or 0
             validos = item["validos"] or 0
-            cobertura_municipios.append(
+            potenciales = item["potenciales"] or 0
+            total_registros += total
+            votantes_validos += validos
+            votantes_potenciales += potenciales
+            municipios.append(
                 {
                     "municipio_id": item["zona__municipio_id"],
                     "municipio_nombre": item["zona__municipio__nombre"],
@@ -173,56 +237,54 @@ class DashboardViewSet(viewsets.ViewSet):
                     "lon": item["zona__municipio__lon"],
                     "total_registros": total,
                     "votantes_validos": validos,
-                    "votantes_potenciales": item["potenciales"] or 0,
+                    "votantes_potenciales": potenciales,
                     "cumplimiento_porcentaje": round((validos / total) * 100, 2) if total else 0,
                 }
             )
 
-        leaders = User.objects.filter(role=User.Roles.LIDER).order_by("name")
+        cobertura_municipios = [
+            municipio for municipio in municipios if en_area is None or municipio["municipio_id"] in en_area
+        ]
+
+        por_lider = agregados_por_lider()
+        leaders = User.objects.filter(role=User.Roles.LIDER).order_by("name").values(
+            "id", "name", "meta_votantes"
+        )
         ranking = []
         alertas = []
         today = datetime.date.today()
         for leader in leaders:
-            leader_encuestas = Encuesta.objects.filter(
-                Q(colaborador=leader) | Q(colaborador__created_by=leader)
-            )
-            total = leader_encuestas.count()
-            validos = leader_encuestas.filter(votante_valido=True).count()
-            meta = leader.meta_votantes or 0
-            cumplimiento = round((validos / meta) * 100, 2) if meta else 0
-            score = round((validos / total) * 100, 2) if total else 0
-            if leader.score_confiabilidad != score:
-                leader.score_confiabilidad = score
-                leader.save(update_fields=["score_confiabilidad"])
+            agregado = por_lider.get(leader["id"], {})
+            total = agregado.get("total", 0)
+            validos = agregado.get("validas", 0)
+            meta = leader["meta_votantes"] or 0
             ranking.append(
                 {
-                    "lider_id": leader.id,
-                    "lider_nombre": leader.name,
+                    "lider_id": leader["id"],
+                    "lider_nombre": leader["name"],
                     "meta_votantes": meta,
                     "votantes_validos": validos,
-                    "cumplimiento_porcentaje": cumplimiento,
-                    "score_confiabilidad": score,
+                    "cumplimiento_porcentaje": round((validos / meta) * 100, 2) if meta else 0,
+                    "score_confiabilidad": round((validos / total) * 100, 2) if total else 0,
                 }
             )
-            last_survey = leader_encuestas.order_by("-fecha_creacion").values_list(
-                "fecha_creacion", flat=True
-            ).first()
+            last_survey = agregado.get("ultima_fecha")
             if not last_survey or (today - last_survey).days > 14:
                 alertas.append(
                     {
                         "tipo": "lider_sin_registros",
-                        "mensaje": f"{leader.name} no registra encuestas recientes.",
+                        "mensaje": f"{leader['name']} no registra encuestas recientes.",
                     }
                 )
             if total and (validos / total) < 0.6:
                 alertas.append(
                     {
                         "tipo": "lider_registros_invalidos",
-                        "mensaje": f"{leader.name} tiene baja confiabilidad en registros.",
+                        "mensaje": f"{leader['name']} tiene baja confiabilidad en registros.",
                     }
                 )
 
-        for municipio in cobertura_municipios:
+        for municipio in municipios:
             if municipio["total_registros"] and municipio["cumplimiento_porcentaje"] < 30:
                 alertas.append(
                     {
@@ -231,6 +293,17 @@ class DashboardViewSet(viewsets.ViewSet):
                     }
                 )
 
+        for zona in zonas_fuera_de_area():
+            alertas.append(
+                {
+                    "tipo": "zona_fuera_de_area",
+                    "mensaje": (
+                        f"{zona['porcentaje_fuera']}% de las encuestas de {zona['zona_nombre']} "
+                        "se registraron fuera de la zona."
+                    ),
+                }
+            )
+
         data = {
             "total_registros": total_registros,
             "votantes_validos": votantes_validos,
@@ -243,71 +316,4 @@ class DashboardViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["get"], url_path="alertas", permission_classes=[IsAdminOrCandidate])
     def alertas(self, request):
-        today = datetime.date.today()
-        campaign_start = getattr(settings, "CAMPAIGN_START_DATE", None)
-        campaign_end = getattr(settings, "CAMPAIGN_END_DATE", None)
-        if isinstance(campaign_start, str):
-            campaign_start = datetime.date.fromisoformat(campaign_start)
-        if isinstance(campaign_end, str):
-            campaign_end = datetime.date.fromisoformat(campaign_end)
-
-        alerts = []
-        leaders = User.objects.filter(role=User.Roles.LIDER).order_by("name")
-        for leader in leaders:
-            encuestas_qs = Encuesta.objects.filter(
-                Q(colaborador=leader) | Q(colaborador__created_by=leader)
-            )
-            valid_qs = encuestas_qs.filter(votante_valido=True)
-            valid_count = valid_qs.count()
-            total_count = encuestas_qs.count()
-            last_valid_date = valid_qs.order_by("-fecha_creacion").values_list(
-                "fecha_creacion", flat=True
-            ).first()
-
-            if not last_valid_date or (today - last_valid_date).days > 5:
-                alerts.append(
-                    {
-                        "tipo": "lider_inactivo",
-                        "nivel": "ALTO",
-                        "leader_id": leader.id,
-                        "leader_nombre": leader.name,
-                        "mensaje": f"Líder {leader.name}: sin registros válidos en los últimos 5 días.",
-                        "fecha_evaluacion": today.isoformat(),
-                    }
-                )
-
-            if campaign_start and campaign_end and leader.meta_votantes:
-                days_elapsed = max(1, (today - campaign_start).days + 1)
-                days_remaining = max(0, (campaign_end - today).days)
-                ritmo_diario = valid_count / days_elapsed
-                proyeccion_total = valid_count + (ritmo_diario * days_remaining)
-                if proyeccion_total < leader.meta_votantes:
-                    alerts.append(
-                        {
-                            "tipo": "meta_en_riesgo",
-                            "nivel": "MEDIO",
-                            "leader_id": leader.id,
-                            "leader_nombre": leader.name,
-                            "mensaje": f"Líder {leader.name}: al ritmo actual no alcanzará la meta asignada.",
-                            "fecha_evaluacion": today.isoformat(),
-                        }
-                    )
-
-            if total_count:
-                invalid_count = total_count - valid_count
-                porcentaje_invalidos = (invalid_count / total_count) * 100
-                if porcentaje_invalidos > 40:
-                    alerts.append(
-                        {
-                            "tipo": "baja_calidad_registros",
-                            "nivel": "MEDIO",
-                            "leader_id": leader.id,
-                            "leader_nombre": leader.name,
-                            "mensaje": f"Líder {leader.name}: alto porcentaje de registros no válidos.",
-                            "fecha_evaluacion": today.isoformat(),
-                        }
-                    )
-
-        priority = {"ALTO": 0, "MEDIO": 1, "BAJO": 2}
-        alerts.sort(key=lambda item: (priority.get(item["nivel"], 3), item["leader_nombre"]))
-        return Response(alerts)
+        return Response(alertas_en_cache())
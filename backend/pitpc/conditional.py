@@ -0,0 +1,29 @@
+import hashlib
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
+
+
+def calcular_etag(request, partes):
+    """ETag fuerte de la representación: ruta con parámetros, ``Accept`` y marcadores de versión."""
+    base = "|".join(
+        [request.get_full_path(), request.META.get("HTTP_ACCEPT", "")] + [str(parte) for parte in partes]
+    )
+    return hashlib.sha1(base.encode()).hexdigest()
+
+
+def condicional(version):
+    """GET condicional para métodos de vistas DRF.
+
+    ``version(request)`` devuelve los marcadores de los datos que sirve la
+    vista (o ``None`` para no usar ETag). Si ``If-None-Match`` coincide se
+    responde ``304`` sin ejecutar la vista.
+    """
+
+    def etag_func(request, *args, **kwargs):
+        partes = version(request)
+        if partes is None:
+            return None
+        return calcular_etag(request, partes)
+
+    return method_decorator(etag(etag_func))
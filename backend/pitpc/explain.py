@@ -0,0 +1,30 @@
+"""Lectura del plan de ejecución de un queryset (``EXPLAIN``) en SQLite y MySQL."""
+from django.db import connections
+
+
+def plan(queryset):
+    """Filas del plan como texto, una por paso."""
+    conexion = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    with conexion.cursor() as cursor:
+        if conexion.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [fila[3] for fila in cursor.fetchall()]
+        cursor.execute(f"EXPLAIN {sql}", params)
+        columnas = [columna[0] for columna in cursor.description]
+        return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+
+def recorridos_completos(queryset):
+    """Tablas que el plan recorre completas, sin índice."""
+    conexion = connections[queryset.db]
+    pasos = plan(queryset)
+    if conexion.vendor == "sqlite":
+        # "SCAN tabla" sin "USING ... INDEX"; los recorridos de subconsultas no son tablas.
+        return [
+            paso.split()[1]
+            for paso in pasos
+            if paso.startswith("SCAN ") and " USING " not in paso and not paso.startswith("SCAN SUBQUERY")
+        ]
+    # MySQL: type=ALL es lectura completa; las tablas derivadas (<derived2>) no cuentan.
+    return [paso["table"] for paso in pasos if paso["type"] == "ALL" and not str(paso["table"]).startswith("<")]
@@ -0,0 +1,211 @@
+"""Instrumentación por petición: tiempo total, SQL, consultas repetidas y serializadores.
+
+Se activa con ``INSTRUMENTACION``. Apagada, el middleware se retira de la
+cadena al arrancar (``MiddlewareNotUsed``) y no agrega trabajo a las
+peticiones. Encendida, cada respuesta lleva ``Server-Timing``, se escribe una
+línea JSON en el logger ``pitpc.instrumentacion`` y se guardan las últimas
+``INSTRUMENTACION_MUESTRAS`` mediciones por vista para los percentiles de
+``/api/admin/rendimiento/``. Los percentiles son del proceso que responde.
+En las respuestas en flujo la medición sigue mientras se genera el cuerpo y la
+muestra se guarda al terminar de enviarlo.
+"""
+import contextvars
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsAdmin
+
+logger = logging.getLogger("pitpc.instrumentacion")
+
+_medicion = contextvars.ContextVar("medicion", default=None)
+_muestras = defaultdict(deque)
+_candado = threading.Lock()
+_LISTA_IN = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+def huella_sql(sql):
+    """SQL sin la longitud de las listas ``IN``: un bucle N+1 deja la misma huella."""
+    return _LISTA_IN.sub("IN (...)", sql)
+
+
+class _Medicion:
+    def __init__(self):
+        self.db = 0.0
+        self.serializador = 0.0
+        self.consultas = 0
+        self.huellas = Counter()
+        self.profundidad = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - inicio
+            self.consultas += 1
+            self.huellas[huella_sql(sql)] += 1
+
+    def repetidas(self, limite=5):
+        return [
+            {"sql": huella[:300], "veces": veces}
+            for huella, veces in self.huellas.most_common(limite)
+            if veces > 1
+        ]
+
+
+def _instrumentar_serializadores():
+    """Envuelve ``BaseSerializer.data`` para medir la serialización de la respuesta."""
+    original = serializers.BaseSerializer.data
+    if getattr(original.fget, "instrumentado", False):
+        return
+
+    def data(self):
+        medicion = _medicion.get()
+        if medicion is None:
+            return original.fget(self)
+        # ``Serializer.data`` y ``ListSerializer.data`` llaman a este mismo getter con super().
+        medicion.profundidad += 1
+        inicio = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            medicion.profundidad -= 1
+            if not medicion.profundidad:
+                medicion.serializador += time.perf_counter() - inicio
+
+    data.instrumentado = True
+    serializers.BaseSerializer.data = property(data)
+
+
+def _registrar(vista, muestra):
+    """Guarda ``(total_ms, db_ms, consultas, serializador_ms)`` en la ventana de la vista."""
+    with _candado:
+        muestras = _muestras[vista]
+        if muestras.maxlen != settings.INSTRUMENTACION_MUESTRAS:
+            muestras = _muestras[vista] = deque(muestras, maxlen=settings.INSTRUMENTACION_MUESTRAS)
+        muestras.append(muestra)
+
+
+def _percentiles(valores):
+    ordenados = sorted(valores)
+    ultimo = len(ordenados) - 1
+
+    def rango(p):
+        return round(ordenados[min(ultimo, int(p * len(ordenados)))], 2)
+
+    return {"p50": rango(0.5), "p90": rango(0.9), "p99": rango(0.99), "max": round(ordenados[-1], 2)}
+
+
+def resumen():
+    """Percentiles por vista de las muestras guardadas, de la más lenta (p90) a la más rápida."""
+    with _candado:
+        copia = {vista: list(muestras) for vista, muestras in _muestras.items()}
+    rutas = []
+    for vista, muestras in copia.items():
+        total, db, consultas, serializador = zip(*muestras)
+        rutas.append(
+            {
+                "vista": vista,
+                "peticiones": len(muestras),
+                "total_ms": _percentiles(total),
+                "db_ms": _percentiles(db),
+                "consultas": _percentiles(consultas),
+                "serializador_ms": _percentiles(serializador),
+            }
+        )
+    return sorted(rutas, key=lambda ruta: ruta["total_ms"]["p90"], reverse=True)
+
+
+class InstrumentacionMiddleware:
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTACION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _instrumentar_serializadores()
+
+    def __call__(self, request):
+        medicion = _Medicion()
+        inicio = time.perf_counter()
+        with self._midiendo(medicion):
+            response = self.get_response(request)
+        response["Server-Timing"] = self._server_timing(medicion, inicio)
+        # Un ``FileResponse`` de archivo no consulta la base y envolverlo le quitaría
+        # ``wsgi.file_wrapper``; se mide hasta las cabeceras como el resto.
+        if response.streaming and getattr(response, "file_to_stream", None) is None:
+            # El cuerpo se genera (y consulta la base) mientras se envía: la medición
+            # termina con el flujo. ``Server-Timing`` sale con las cabeceras y cubre
+            # solo hasta ahí.
+            response.streaming_content = self._flujo(response.streaming_content, medicion, inicio, request, response)
+        else:
+            self._terminar(medicion, inicio, request, response)
+        return response
+
+    @contextmanager
+    def _midiendo(self, medicion):
+        token = _medicion.set(medicion)
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(medicion))
+                yield
+        finally:
+            _medicion.reset(token)
+
+    def _flujo(self, contenido, medicion, inicio, request, response):
+        try:
+            with self._midiendo(medicion):
+                yield from contenido
+        finally:
+            self._terminar(medicion, inicio, request, response)
+
+    def _server_timing(self, medicion, inicio):
+        return ", ".join(
+            [
+                f"total;dur={(time.perf_counter() - inicio) * 1000:.1f}",
+                f'db;dur={medicion.db * 1000:.1f};desc="{medicion.consultas} consultas"',
+                f"serializador;dur={medicion.serializador * 1000:.1f}",
+            ]
+        )
+
+    def _terminar(self, medicion, inicio, request, response):
+        """Escribe la línea del log y guarda la muestra de la vista."""
+        total = (time.perf_counter() - inicio) * 1000
+        db = medicion.db * 1000
+        serializador = medicion.serializador * 1000
+        coincidencia = getattr(request, "resolver_match", None)
+        vista = f"{request.method} {coincidencia.view_name if coincidencia else 'sin_ruta'}"
+        logger.info(
+            json.dumps(
+                {
+                    "vista": vista,
+                    "ruta": request.path,
+                    "estado": response.status_code,
+                    "total_ms": round(total, 2),
+                    "db_ms": round(db, 2),
+                    "consultas": medicion.consultas,
+                    "serializador_ms": round(serializador, 2),
+                    "repetidas": medicion.repetidas(),
+                },
+                ensure_ascii=False,
+            )
+        )
+        _registrar(vista, (total, db, medicion.consultas, serializador))
+
+
+class RendimientoView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response({"activo": settings.INSTRUMENTACION, "vistas": resumen()})
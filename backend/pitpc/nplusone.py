@@ -0,0 +1,50 @@
+"""Detector de consultas N+1 para los tests.
+
+Una vista sin N+1 hace el mismo número de consultas con pocas filas que con
+muchas. ``ConsultasConstantesMixin`` corre la misma petición antes y después de
+hacer crecer los datos y falla si el conteo cambió, mostrando las consultas que
+aparecieron de más.
+"""
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .instrumentation import huella_sql
+
+
+def medir_consultas(operacion):
+    """Corre ``operacion`` sin caché y devuelve ``(resultado, consultas)``."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as capturadas:
+        resultado = operacion()
+        # Las respuestas en flujo consultan al recorrerse.
+        if getattr(resultado, "streaming", False):
+            b"".join(resultado.streaming_content)
+    return resultado, [consulta["sql"] for consulta in capturadas.captured_queries]
+
+
+def consultas_de_mas(antes, despues):
+    """Huellas SQL que se repiten más veces en ``despues`` que en ``antes``."""
+    diferencia = Counter(map(huella_sql, despues)) - Counter(map(huella_sql, antes))
+    return [f"{veces}x {sql[:200]}" for sql, veces in diferencia.most_common(5)]
+
+
+class ConsultasConstantesMixin:
+    def assertConsultasConstantes(self, operacion, crecer, msg=None):
+        """``operacion`` debe hacer las mismas consultas antes y después de ``crecer()``."""
+        _, antes = medir_consultas(operacion)
+        crecer()
+        _, despues = medir_consultas(operacion)
+        self.assertConteoIgual(antes, despues, msg)
+
+    def assertConteoIgual(self, antes, despues, msg=None):
+        if len(antes) == len(despues):
+            return
+        detalle = "\n  ".join(consultas_de_mas(antes, despues))
+        self.fail(
+            self._formatMessage(
+                msg, f"{len(antes)} consultas con pocos datos, {len(despues)} con más:\n  {detalle}"
+            )
+        )
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Paginación por cursor sobre la llave primaria.
+
+    Toda lista responde por páginas (``results`` y el enlace ``next``). Mientras
+    ``LISTAS_SIN_PAGINAR`` esté activo, las peticiones sin ``cursor`` ni
+    ``page_size`` responden completas como antes, para clientes viejos.
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "-id"
+
+    def get_page_size(self, request):
+        params = request.query_params
+        if (
+            settings.LISTAS_SIN_PAGINAR
+            and self.cursor_query_param not in params
+            and self.page_size_query_param not in params
+        ):
+            return None
+        return super().get_page_size(request)
+
+
+class RankingPagination(PageNumberPagination):
+    """Páginas numeradas para resultados ordenados por relevancia, donde no hay llave estable."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+def _despues_de(campos, valores):
+    """Filtro ``(campos) > (valores)`` en orden lexicográfico ascendente."""
+    condicion = Q()
+    for indice, campo in enumerate(campos):
+        paso = Q(**{f"{campo}__gt": valores[indice]})
+        for anterior, valor in zip(campos[:indice], valores[:indice]):
+            paso &= Q(**{anterior: valor})
+        condicion |= paso
+    return condicion
+
+
+def lotes_por_llave(queryset, orden=("id",), tamano=1000):
+    """Recorre un ``values()`` en lotes por llave (keyset) ordenados por ``orden``.
+
+    Cada lote es una consulta acotada, así la memoria no depende del total de
+    filas aunque el driver cargue completo cada resultado (MySQL). ``orden``
+    debe identificar la fila, terminar en una llave única y estar entre los
+    campos seleccionados.
+    """
+    ultimo = None
+    while True:
+        lote = queryset.order_by(*orden)
+        if ultimo is not None:
+            lote = lote.filter(_despues_de(orden, ultimo))
+        filas = list(lote[:tamano])
+        if filas:
+            yield filas
+        if len(filas) < tamano:
+            return
+        ultimo = [filas[-1][campo] for campo in orden]
+
+
+def iterar_por_llave(queryset, orden=("id",), tamano=1000):
+    """Como ``lotes_por_llave`` pero fila por fila."""
+    for filas in lotes_por_llave(queryset, orden, tamano):
+        yield from filas
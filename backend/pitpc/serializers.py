@@ -0,0 +1,30 @@
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+
+
+def campos_solicitados(request):
+    """Campos pedidos con ``?fields=a,b`` en una lectura, o ``None`` si se piden todos."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    valor = request.query_params.get(FIELDS_PARAM)
+    if not valor:
+        return None
+    return {campo.strip() for campo in valor.split(",") if campo.strip()}
+
+
+def incluye_campo(request, nombre):
+    campos = campos_solicitados(request)
+    return campos is None or nombre in campos
+
+
+class SparseFieldsMixin:
+    """Recorta el serializador raíz a los campos de ``?fields=`` (sparse fieldsets)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = campos_solicitados(kwargs.get("context", {}).get("request"))
+        if campos is None:
+            return
+        for nombre in set(self.fields) - campos:
+            self.fields.pop(nombre)
@@ -15,6 +15,20 @@ env = environ.Env(
     DB_HOST=(str, "srv1242.hstgr.io"),
     DB_PORT=(int, 3306),
     DATABASE_URL=(str, ""),
+    CACHE_URL=(str, "locmemcache://"),
+    ALERTAS_CACHE_SEGUNDOS=(int, 300),
+    TESELAS_CACHE_SEGUNDOS=(int, 3600),
+    GEOCERCA_MARGEN_METROS=(int, 100),
+    GEOCERCA_RECHAZAR=(bool, False),
+    GEOCERCA_ALERTA_PORCENTAJE=(int, 20),
+    GEOCERCA_ALERTA_MINIMO=(int, 10),
+    ENCUESTAS_LOTE_MAXIMO=(int, 500),
+    SYNC_RETENCION_DIAS=(int, 30),
+    LISTAS_SIN_PAGINAR=(bool, False),
+    REPORTES_WORKER_LOCAL=(bool, False),
+    REPORTES_RETENCION_DIAS=(int, 7),
+    INSTRUMENTACION=(bool, False),
+    INSTRUMENTACION_MUESTRAS=(int, 500),
 )
 
 environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
@@ -45,9 +59,13 @@ INSTALLED_APPS = [
     "surveys",
     "routes",
     "dashboard",
+    "reports",
+    "sync",
 ]
 
 MIDDLEWARE = [
+    # Primero para medir toda la petición; sin INSTRUMENTACION se retira al arrancar.
+    "pitpc.instrumentation.InstrumentacionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -95,6 +113,42 @@ else:
         }
     }
 
+CACHES = {"default": env.cache("CACHE_URL")}
+
+ALERTAS_CACHE_SEGUNDOS = env("ALERTAS_CACHE_SEGUNDOS")
+# La llave de cada tesela lleva una marca leída de la base; el vencimiento solo libera memoria.
+TESELAS_CACHE_SEGUNDOS = env("TESELAS_CACHE_SEGUNDOS")
+# Tolerancia del GPS al verificar el punto de una encuesta contra el límite de su zona.
+GEOCERCA_MARGEN_METROS = env("GEOCERCA_MARGEN_METROS")
+# Con True se rechazan las encuestas fuera de la zona; si no, solo se marcan.
+GEOCERCA_RECHAZAR = env("GEOCERCA_RECHAZAR")
+# Una zona es sospechosa con este porcentaje de encuestas fuera, sobre al menos el mínimo verificadas.
+GEOCERCA_ALERTA_PORCENTAJE = env("GEOCERCA_ALERTA_PORCENTAJE")
+GEOCERCA_ALERTA_MINIMO = env("GEOCERCA_ALERTA_MINIMO")
+ENCUESTAS_LOTE_MAXIMO = env("ENCUESTAS_LOTE_MAXIMO")
+SYNC_RETENCION_DIAS = env("SYNC_RETENCION_DIAS")
+# Transitorio: con True las listas sin ``cursor`` ni ``page_size`` responden completas,
+# para clientes instalados que aún esperan un arreglo. Retirar cuando todos sigan el cursor.
+LISTAS_SIN_PAGINAR = env("LISTAS_SIN_PAGINAR")
+# Por defecto los reportes los procesa el comando run_report_worker (un proceso aparte).
+# True los procesa un hilo del proceso web: solo para desarrollo, muere con el proceso.
+REPORTES_WORKER_LOCAL = env("REPORTES_WORKER_LOCAL")
+# Días que se guardan los trabajos de reporte terminados y sus PDF (prune_report_jobs).
+REPORTES_RETENCION_DIAS = env("REPORTES_RETENCION_DIAS")
+# Server-Timing, log por petición y percentiles en /api/admin/rendimiento/.
+INSTRUMENTACION = env("INSTRUMENTACION")
+INSTRUMENTACION_MUESTRAS = env("INSTRUMENTACION_MUESTRAS")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"mensaje": {"format": "%(message)s"}},
+    "handlers": {"consola": {"class": "logging.StreamHandler", "formatter": "mensaje"}},
+    "loggers": {
+        "pitpc.instrumentacion": {"handlers": ["consola"], "level": "INFO", "propagate": False},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -135,6 +189,7 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    "DEFAULT_PAGINATION_CLASS": "pitpc.pagination.KeysetPagination",
 }
 
 AUTHENTICATION_BACKENDS = [
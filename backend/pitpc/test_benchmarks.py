@@ -0,0 +1,330 @@
+"""Suite de rendimiento de los endpoints más usados.
+
+Siembra un volumen fijo con ``seed_load`` y mide cada endpoint: tiempo (mejor
+de varias corridas), número de consultas SQL y pico de memoria de Python. Los
+valores se comparan contra una línea base; una regresión falla el test.
+
+``EndpointsConsultasTests`` siembra un volumen chico y corre en cada
+``manage.py test``: exige consultas y memoria contra ``benchmarks_chico.json``.
+``EndpointsBenchmarkTests`` siembra el volumen de referencia, que tarda
+minutos, y solo corre con ``BENCHMARK=1`` contra ``benchmarks.json``. El tiempo
+cambia entre máquinas y con la carga: solo se exige en esta última y con
+``BENCHMARK_TIEMPOS=1``.
+
+Para registrar nuevas líneas base después de un cambio intencional::
+
+    BENCHMARK_ACTUALIZAR=1 python manage.py test pitpc.test_benchmarks
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from reports.jobs import procesar
+from reports.models import TrabajoReporte
+from surveys.models import Encuesta, Necesidad
+from surveys.tiles import tesela_de_punto
+from territory.models import ZonaAsignacion
+
+ACTUALIZAR = os.environ.get("BENCHMARK_ACTUALIZAR") == "1"
+EJECUTAR = ACTUALIZAR or os.environ.get("BENCHMARK") == "1"
+TIEMPOS = os.environ.get("BENCHMARK_TIEMPOS") == "1"
+# Holgura para el tiempo: varía entre máquinas; las consultas no.
+TOLERANCIA_TIEMPO = float(os.environ.get("BENCHMARK_TOLERANCIA", "1.5"))
+TOLERANCIA_MEMORIA = 1.25
+CORRIDAS = 3
+COMENTARIO = (
+    "Las calles del barrio siguen sin pavimentar y cuando llueve se inundan las casas de la parte baja; "
+    "falta alumbrado en el parque, los jóvenes no tienen canchas ni programas de deporte, el agua llega "
+    "pocas horas al día y el puesto de salud no tiene médico los fines de semana."
+)
+
+# Volumen de referencia: con él se detectan los costos que crecen con los datos.
+VOLUMEN = {
+    "departamentos": 4,
+    "municipios": 30,
+    "zonas": 1500,
+    "lideres": 25,
+    "colaboradores": 600,
+    "encuestas": 20000,
+    "rutas": 300,
+    "agendas": 500,
+    "hasta": date(2026, 6, 30),
+    "seed": 16,
+}
+# Volumen chico para la corrida normal: siembra en segundos y cubre los mismos caminos.
+VOLUMEN_CHICO = {
+    **VOLUMEN,
+    "municipios": 6,
+    "zonas": 120,
+    "lideres": 4,
+    "colaboradores": 40,
+    "encuestas": 1500,
+    "rutas": 20,
+    "agendas": 30,
+}
+
+
+class EndpointsMedicion:
+    """Mediciones comunes; cada suite define su volumen y su línea base."""
+
+    volumen = None
+    lineas_base_ruta = None
+    exigir_tiempos = False
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media.name))
+        super().setUpClass()
+        cls.resultados = {}
+        ruta = cls.lineas_base_ruta
+        cls.lineas_base = json.loads(ruta.read_text()) if ruta.exists() else {}
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media.cleanup()
+        if EJECUTAR:
+            cls._imprimir()
+        if ACTUALIZAR and cls.resultados:
+            lineas = {**cls.lineas_base, **cls.resultados}
+            cls.lineas_base_ruta.write_text(json.dumps(dict(sorted(lineas.items())), indent=2) + "\n")
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_load", stdout=StringIO(), **cls.volumen)
+        cls.admin = User.objects.create(email="admin@bench.local", name="Admin", role=User.Roles.ADMIN)
+        cls.lider = User.objects.get(email="lider1@carga.pitpc.com")
+        cls.candidato = User.objects.get(role=User.Roles.CANDIDATO)
+        asignacion = ZonaAsignacion.objects.order_by("id").first()
+        cls.colaborador = asignacion.colaborador
+        cls.zona_colaborador = asignacion.zona_id
+        # Un área de unos 20 km alrededor del municipio de esa zona.
+        municipio = asignacion.zona.municipio
+        cls.centro = (float(municipio.lat), float(municipio.lon))
+        cls.bbox = f"{cls.centro[1] - 0.1},{cls.centro[0] - 0.1},{cls.centro[1] + 0.1},{cls.centro[0] + 0.1}"
+        cls.necesidades = list(Necesidad.objects.values_list("id", flat=True)[:3])
+        # El colaborador más activo: con el sesgo Zipf tiene miles de encuestas.
+        cls.colaborador_activo = (
+            User.objects.filter(role=User.Roles.COLABORADOR)
+            .annotate(total=Count("encuestas"))
+            .order_by("-total", "id")
+            .first()
+        )
+        cls.cedula = 800000000
+
+    @classmethod
+    def _imprimir(cls):
+        if not cls.resultados:
+            return
+        lineas = ["", f"{'endpoint':40} {'s':>8} {'consultas':>10} {'MB':>8}"]
+        for nombre, valores in sorted(cls.resultados.items()):
+            lineas.append(
+                f"{nombre:40} {valores['segundos']:8.3f} {valores['consultas']:10d} {valores['memoria_mb']:8.2f}"
+            )
+        sys.stderr.write("\n".join(lineas) + "\n")
+
+    def _cliente(self, usuario):
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(usuario)
+        return cliente
+
+    def _encuesta(self):
+        type(self).cedula += 1
+        return {
+            "zona": self.zona_colaborador,
+            "cedula": str(self.cedula),
+            "telefono": "3001234567",
+            "tipo_vivienda": "PROPIA",
+            "rango_edad": "26-40",
+            "ocupacion": "EMPLEADO",
+            "consentimiento": True,
+            "nivel_afinidad": 1,
+            "disposicion_voto": 1,
+            "capacidad_influencia": 1,
+            # Un comentario largo y un punto: cada término y la celda del mapa suman en los contadores.
+            "comentario_problema": COMENTARIO,
+            "lat": round(6.2518 + (self.cedula % 100) / 10000, 6),
+            "lon": -75.5636,
+            "necesidades": [
+                {"necesidad_id": necesidad, "prioridad": prioridad}
+                for prioridad, necesidad in enumerate(self.necesidades, start=1)
+            ],
+        }
+
+    def medir(self, nombre, operacion):
+        """Corre ``operacion`` (sin caché) y compara tiempo, consultas y memoria con la línea base."""
+        tiempos = []
+        for corrida in range(CORRIDAS):
+            cache.clear()
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                operacion()
+                tiempos.append(time.perf_counter() - inicio)
+            if corrida == 0:
+                total_consultas = len(consultas)
+        cache.clear()
+        tracemalloc.start()
+        try:
+            operacion()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        medido = {
+            "segundos": round(min(tiempos), 4),
+            "consultas": total_consultas,
+            "memoria_mb": round(pico / (1024 * 1024), 2),
+        }
+        self.resultados[nombre] = medido
+        if ACTUALIZAR:
+            return
+        base = self.lineas_base.get(nombre)
+        self.assertIsNotNone(base, f"{nombre}: sin línea base; corre con BENCHMARK_ACTUALIZAR=1")
+        self.assertLessEqual(
+            medido["consultas"], base["consultas"], f"{nombre}: más consultas que la línea base ({medido} vs {base})"
+        )
+        if self.exigir_tiempos:
+            self.assertLessEqual(
+                medido["segundos"],
+                base["segundos"] * TOLERANCIA_TIEMPO + 0.05,
+                f"{nombre}: más lento que la línea base ({medido} vs {base})",
+            )
+        self.assertLessEqual(
+            medido["memoria_mb"],
+            base["memoria_mb"] * TOLERANCIA_MEMORIA + 1,
+            f"{nombre}: más memoria que la línea base ({medido} vs {base})",
+        )
+
+    def medir_get(self, nombre, usuario, url):
+        cliente = self._cliente(usuario)
+
+        def operacion():
+            respuesta = cliente.get(url)
+            self.assertEqual(respuesta.status_code, 200, respuesta.content[:200])
+
+        self.medir(nombre, operacion)
+
+    # reports
+
+    def test_reporte_lista(self):
+        self.medir_get("reporte_lista", self.admin, "/api/reportes/")
+
+    def test_reporte_pdf(self):
+        cliente = self._cliente(self.admin)
+
+        def operacion():
+            TrabajoReporte.objects.all().delete()
+            respuesta = cliente.post("/api/reportes/trabajos/", {}, format="json")
+            self.assertEqual(respuesta.status_code, 202)
+            self.assertTrue(procesar(respuesta.data["id"]))
+
+        self.medir("reporte_pdf", operacion)
+
+    # dashboard
+
+    def test_dashboard_resumen(self):
+        self.medir_get("dashboard_resumen", self.admin, "/api/dashboard/resumen/")
+
+    def test_dashboard_mapa(self):
+        self.medir_get("dashboard_mapa", self.admin, "/api/dashboard/mapa/")
+
+    def test_dashboard_candidato(self):
+        self.medir_get("dashboard_candidato", self.candidato, "/api/dashboard/candidato/")
+
+    def test_dashboard_area(self):
+        mapa = f"/api/dashboard/mapa/?bbox={self.bbox}"
+        candidato = f"/api/dashboard/candidato/?lat={self.centro[0]}&lon={self.centro[1]}&radio=10000"
+        self.assertTrue(self._cliente(self.admin).get(mapa).data)
+        self.assertTrue(self._cliente(self.candidato).get(candidato).data["cobertura_municipios"])
+        self.medir_get("dashboard_mapa_bbox", self.admin, mapa)
+        self.medir_get("dashboard_candidato_radio", self.candidato, candidato)
+
+    def test_dashboard_teselas(self):
+        punto = (
+            Encuesta.objects.filter(zona_id=self.zona_colaborador, lat__isnull=False)
+            .values_list("lat", "lon")
+            .first()
+        )
+        lat, lon = float(punto[0]), float(punto[1])
+        # Zoom bajo sale de los contadores por celda; zoom alto, de las encuestas.
+        urls = {
+            z: "/api/dashboard/teselas/?z={}&x={}&y={}".format(z, *tesela_de_punto(lat, lon, z)) for z in (10, 15)
+        }
+        cliente = self._cliente(self.admin)
+        totales = {z: cliente.get(url).data["total"] for z, url in urls.items()}
+        self.assertGreater(totales[10], 0)
+        self.assertGreater(totales[15], 0)
+        self.medir_get("dashboard_teselas_contadores", self.admin, urls[10])
+        self.medir_get("dashboard_teselas_encuestas", self.admin, urls[15])
+
+        # Con las teselas en caché, una encuesta nueva en el punto las invalida.
+        for url in urls.values():
+            cliente.get(url)
+        respuesta = self._cliente(self.colaborador).post(
+            "/api/encuestas/", {**self._encuesta(), "lat": lat, "lon": lon}, format="json"
+        )
+        self.assertEqual(respuesta.status_code, 201, respuesta.content[:200])
+        for z, url in urls.items():
+            self.assertEqual(cliente.get(url).data["total"], totales[z] + 1)
+
+    def test_dashboard_alertas(self):
+        self.medir_get("dashboard_alertas", self.admin, "/api/dashboard/alertas/")
+
+    def test_dashboard_avance_colaboradores(self):
+        self.medir_get("dashboard_avance_colaboradores", self.admin, "/api/dashboard/avance_colaboradores/")
+        self.medir_get("dashboard_avance_colaboradores_lider", self.lider, "/api/dashboard/avance_colaboradores/")
+
+    # surveys
+
+    def test_cobertura(self):
+        self.medir_get("cobertura_admin", self.admin, "/api/cobertura/zonas")
+        self.medir_get("cobertura_colaborador", self.colaborador, "/api/cobertura/zonas")
+
+    def test_encuestas_crear(self):
+        cliente = self._cliente(self.colaborador)
+
+        def operacion():
+            respuesta = cliente.post("/api/encuestas/", self._encuesta(), format="json")
+            self.assertEqual(respuesta.status_code, 201, respuesta.content[:200])
+
+        self.medir("encuestas_crear", operacion)
+
+    def test_encuestas_lista(self):
+        self.medir_get("encuestas_lista_pagina", self.admin, "/api/encuestas/?page_size=100")
+        self.medir_get("encuestas_lista_colaborador", self.colaborador_activo, "/api/encuestas/")
+
+    # routes
+
+    def test_rutas_lista(self):
+        self.medir_get("rutas_lista", self.admin, "/api/rutas/")
+
+
+@override_settings(REPORTES_WORKER_LOCAL=False)
+class EndpointsConsultasTests(EndpointsMedicion, TestCase):
+    volumen = VOLUMEN_CHICO
+    lineas_base_ruta = Path(__file__).with_name("benchmarks_chico.json")
+
+
+@tag("benchmark")
+@unittest.skipUnless(EJECUTAR, "Suite de rendimiento: correr con BENCHMARK=1.")
+@override_settings(REPORTES_WORKER_LOCAL=False)
+class EndpointsBenchmarkTests(EndpointsMedicion, TestCase):
+    volumen = VOLUMEN
+    lineas_base_ruta = Path(__file__).with_name("benchmarks.json")
+    exigir_tiempos = TIEMPOS
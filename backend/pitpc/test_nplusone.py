@@ -0,0 +1,199 @@
+"""Ninguna lectura de la API puede hacer más consultas cuando crecen los datos.
+
+Recorre todas las rutas GET registradas en el router de ``pitpc/urls.py`` con
+cada rol, con un lote de datos y con tres, y compara el número de consultas.
+Una ruta nueva queda cubierta al registrarse; si necesita datos que el lote no
+crea, se agregan a ``_crecer``.
+"""
+import tempfile
+from datetime import date, time, timedelta
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from agenda.models import Agenda
+from candidates.models import Candidato
+from reports.models import TrabajoReporte
+from routes.models import RutaColaborador, RutaVisita, RutaZona
+from surveys.counters import reconstruir_cobertura
+from surveys.models import CasoCiudadano, Encuesta, EncuestaNecesidad, Necesidad
+from territory.models import Departamento, MetaZona, Municipio, Zona, ZonaAsignacion
+from .nplusone import ConsultasConstantesMixin, medir_consultas
+from .urls import router
+
+HOY = date(2026, 6, 30)
+
+# N+1 conocidos, pendientes de corregir. El test exige que sigan creciendo: al
+# corregirse hay que quitarlos de aquí.
+PENDIENTES = {}
+
+# Parámetros que algunas rutas exigen para responder con éxito.
+PARAMETROS = {"encuesta-buscar": {"q": "agua"}, "dashboard-teselas": {"z": 14, "x": 4778, "y": 7918}}
+
+
+def rutas_get():
+    """``(basename, nombre, detalle, viewset)`` de cada ruta GET del router."""
+    for _, viewset, basename in router.registry:
+        for ruta in router.get_routes(viewset):
+            # Como ``router.get_urls``: solo las acciones que el viewset implementa.
+            if "get" in router.get_method_map(viewset, ruta.mapping):
+                yield basename, ruta.name.format(basename=basename), ruta.detail, viewset
+
+
+@override_settings(REPORTES_WORKER_LOCAL=False)
+class ConsultasPorRutaTests(ConsultasConstantesMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media.name))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(email="admin@example.com", name="Admin", role=User.Roles.ADMIN)
+        cls.lider = User.objects.create(email="lider@example.com", name="Líder", role=User.Roles.LIDER)
+        cls.colaborador = User.objects.create(
+            email="colaborador@example.com", name="Colaborador", role=User.Roles.COLABORADOR, created_by=cls.lider
+        )
+        cls.candidato = Candidato.objects.create(
+            usuario=User.objects.create(email="candidato@example.com", name="Candidato", role=User.Roles.CANDIDATO),
+            nombre="Candidato",
+            cargo="Alcaldía",
+            partido="Partido",
+        )
+        cls.lotes = 0
+
+    def _crecer(self):
+        """Un lote de datos conectado a los usuarios fijos de cada rol."""
+        type(self).lotes += 1
+        n = self.lotes
+        departamento = Departamento.objects.create(nombre=f"Departamento {n}")
+        municipio = Municipio.objects.create(nombre=f"Municipio {n}", departamento=departamento, lat=6, lon=-75)
+        municipio.lideres.add(self.lider)
+        zonas = [
+            Zona.objects.create(nombre=f"Zona {n}.{i}", tipo="BARRIO", municipio=municipio, lat=6, lon=-75)
+            for i in range(3)
+        ]
+        for zona in zonas:
+            MetaZona.objects.create(zona=zona, meta_encuestas=4)
+        necesidades = [Necesidad.objects.create(nombre=f"Necesidad {n}.{i}") for i in range(2)]
+        colaboradores = [self.colaborador] + [
+            User.objects.create(
+                email=f"colaborador{n}.{i}@example.com",
+                name=f"Colaborador {n}.{i}",
+                role=User.Roles.COLABORADOR,
+                created_by=self.lider,
+            )
+            for i in range(2)
+        ]
+        for colaborador in colaboradores:
+            for zona in zonas:
+                ZonaAsignacion.objects.create(colaborador=colaborador, zona=zona)
+        for i in range(6):
+            encuesta = Encuesta.objects.create(
+                zona=zonas[i % 3],
+                colaborador=colaboradores[i % 3],
+                cedula=f"{n}{i:04d}",
+                telefono="3000000000",
+                tipo_vivienda="PROPIA",
+                rango_edad="26-40",
+                ocupacion="OTRO",
+                consentimiento=True,
+                nivel_afinidad=1 + i % 5,
+                disposicion_voto=1 + i % 3,
+                capacidad_influencia=1,
+                comentario_problema="Falta agua en el barrio",
+                caso_critico=i % 2 == 0,
+                lat=6,
+                lon=-75,
+            )
+            Encuesta.objects.filter(pk=encuesta.pk).update(fecha_creacion=HOY - timedelta(days=i))
+            for prioridad, necesidad in enumerate(necesidades, start=1):
+                EncuestaNecesidad.objects.create(encuesta=encuesta, necesidad=necesidad, prioridad=prioridad)
+            if encuesta.caso_critico:
+                CasoCiudadano.objects.create(encuesta=encuesta, nivel_prioridad=CasoCiudadano.Prioridad.ALTA)
+        for i in range(2):
+            ruta = RutaVisita.objects.create(nombre_ruta=f"Ruta {n}.{i}", lider_creador=self.lider)
+            for zona in zonas:
+                RutaZona.objects.create(ruta=ruta, zona=zona)
+            for colaborador in colaboradores:
+                RutaColaborador.objects.create(ruta=ruta, colaborador=colaborador)
+        Agenda.objects.create(
+            lider=self.lider,
+            candidato=self.candidato,
+            titulo=f"Evento {n}",
+            fecha=HOY,
+            hora_inicio=time(9),
+            hora_fin=time(10),
+            lugar="Plaza",
+        )
+        Candidato.objects.create(
+            usuario=User.objects.create(
+                email=f"candidato{n}@example.com", name=f"Candidato {n}", role=User.Roles.CANDIDATO
+            ),
+            nombre=f"Candidato {n}",
+            cargo="Concejo",
+            partido="Partido",
+        )
+        trabajo = TrabajoReporte.objects.create(
+            huella=f"lote-{n}", estado=TrabajoReporte.Estado.COMPLETADO, solicitado_por=self.admin
+        )
+        trabajo.archivo.save(f"reporte_{n}.pdf", ContentFile(b"%PDF-1.4"))
+        reconstruir_cobertura()
+
+    def _medir_todas(self):
+        """``{(ruta, rol): (estado, consultas)}`` para cada ruta GET y cada rol."""
+        usuarios = {
+            "admin": self.admin,
+            "lider": self.lider,
+            "colaborador": self.colaborador,
+            "candidato": self.candidato.usuario,
+        }
+        medidas = {}
+        for basename, nombre, detalle, viewset in rutas_get():
+            kwargs = {}
+            if detalle:
+                # El último creado, salvo en usuarios: sus municipios son los del líder.
+                objeto = self.lider if basename == "usuario" else viewset.queryset.order_by("-pk").first()
+                kwargs = {"pk": objeto.pk}
+            url = reverse(nombre, kwargs=kwargs)
+            for rol, usuario in usuarios.items():
+                cliente = APIClient(HTTP_HOST="localhost")
+                cliente.force_authenticate(usuario)
+                respuesta, consultas = medir_consultas(lambda: cliente.get(url, PARAMETROS.get(nombre)))
+                medidas[nombre, rol] = (respuesta.status_code, consultas)
+        return medidas
+
+    def test_consultas_constantes_en_todas_las_rutas(self):
+        self._crecer()
+        antes = self._medir_todas()
+        self._crecer()
+        self._crecer()
+        despues = self._medir_todas()
+
+        respondidas = set()
+        crecieron = set()
+        for (nombre, rol), (estado, consultas) in despues.items():
+            estado_antes, consultas_antes = antes[nombre, rol]
+            with self.subTest(ruta=nombre, rol=rol):
+                self.assertEqual(estado, estado_antes)
+                if not 200 <= estado < 300:
+                    continue
+                respondidas.add(nombre)
+                if nombre in PENDIENTES and len(consultas) > len(consultas_antes):
+                    crecieron.add(nombre)
+                    continue
+                self.assertConteoIgual(consultas_antes, consultas, f"{nombre} como {rol}")
+
+        # Cada ruta tiene que haberse medido con al menos un rol.
+        sin_medir = {nombre for _, nombre, _, _ in rutas_get()} - respondidas
+        self.assertEqual(sin_medir, set(), "Rutas sin respuesta exitosa: agrega los datos que necesitan a _crecer")
+        self.assertEqual(set(PENDIENTES) - crecieron, set(), "Ya no crecen con los datos: quítalas de PENDIENTES")
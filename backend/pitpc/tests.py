@@ -0,0 +1,505 @@
+import json
+import random
+import re
+from datetime import date, time, timedelta
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from agenda.models import Agenda
+from candidates.models import Candidato
+from surveys.models import CasoCiudadano, Encuesta, EncuestaNecesidad, Necesidad
+from surveys.services import encuestas_de_lider
+from territory.models import Departamento, MetaZona, Municipio, Zona, ZonaAsignacion
+from . import instrumentation
+from .explain import plan, recorridos_completos
+
+HOY = date(2026, 6, 30)
+
+
+class PlanesDeConsultaTests(TestCase):
+    """Las consultas filtradas de tablero, reporte, encuestas y agenda deben usar índices.
+
+    Cada consulta replica el filtro de su vista sobre un conjunto sembrado y se
+    revisa su ``EXPLAIN``: ninguna tabla puede recorrerse completa.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        azar = random.Random(14)
+        departamento = Departamento.objects.create(nombre="Departamento")
+        municipios = Municipio.objects.bulk_create(
+            Municipio(nombre=f"Municipio {i}", departamento=departamento) for i in range(20)
+        )
+        zonas = Zona.objects.bulk_create(
+            Zona(nombre=f"Zona {i}", tipo="BARRIO", municipio=municipios[i % 20]) for i in range(200)
+        )
+        MetaZona.objects.bulk_create(MetaZona(zona=zona, meta_encuestas=20) for zona in zonas)
+        cls.lideres = User.objects.bulk_create(
+            User(email=f"lider{i}@example.com", name=f"Líder {i}", role=User.Roles.LIDER) for i in range(20)
+        )
+        colaboradores = User.objects.bulk_create(
+            User(
+                email=f"colaborador{i}@example.com",
+                name=f"Colaborador {i}",
+                role=User.Roles.COLABORADOR,
+                created_by=cls.lideres[i % 20],
+            )
+            for i in range(400)
+        )
+        cls.colaborador = colaboradores[0]
+        ZonaAsignacion.objects.bulk_create(
+            ZonaAsignacion(colaborador=colaborador, zona=zonas[indice % 200])
+            for indice, colaborador in enumerate(colaboradores)
+        )
+        necesidades = Necesidad.objects.bulk_create(
+            Necesidad(nombre=nombre) for nombre in ("Agua", "Vías", "Empleo", "Salud", "Educación")
+        )
+        encuestas = Encuesta.objects.bulk_create(
+            Encuesta(
+                zona=azar.choice(zonas),
+                colaborador=azar.choice(colaboradores),
+                fecha_creacion=HOY - timedelta(days=azar.randrange(365)),
+                cedula=str(i),
+                telefono="3000000000",
+                tipo_vivienda="PROPIA",
+                rango_edad="26-40",
+                ocupacion="OTRO",
+                comentario_problema="Falta agua" if i % 4 == 0 else None,
+                votante_valido=i % 3 == 0,
+            )
+            for i in range(8000)
+        )
+        EncuestaNecesidad.objects.bulk_create(
+            EncuestaNecesidad(encuesta=encuesta, necesidad=necesidades[(indice + k) % 5], prioridad=k + 1)
+            for indice, encuesta in enumerate(encuestas)
+            for k in range(2)
+        )
+        estados = list(CasoCiudadano.Estado)
+        prioridades = list(CasoCiudadano.Prioridad)
+        CasoCiudadano.objects.bulk_create(
+            CasoCiudadano(
+                encuesta=encuesta,
+                estado=estados[indice % 3] if indice % 10 == 0 else CasoCiudadano.Estado.ATENDIDO,
+                nivel_prioridad=prioridades[indice % 3] if indice % 10 == 0 else CasoCiudadano.Prioridad.BAJA,
+            )
+            for indice, encuesta in enumerate(encuestas[:3000])
+        )
+        candidato = Candidato.objects.create(
+            usuario=User.objects.create(email="candidato@example.com", name="Candidato", role=User.Roles.CANDIDATO),
+            nombre="Candidato",
+            cargo="Alcaldía",
+            partido="Partido",
+        )
+        Agenda.objects.bulk_create(
+            Agenda(
+                lider=cls.lideres[i % 20],
+                candidato=candidato,
+                titulo=f"Evento {i}",
+                fecha=HOY - timedelta(days=i % 200),
+                hora_inicio=time(9),
+                hora_fin=time(10),
+                lugar="Plaza",
+            )
+            for i in range(2000)
+        )
+        if connection.vendor == "sqlite":
+            # Estadísticas como las que MySQL mantiene solo.
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def assertUsaIndices(self, queryset, catalogos=()):
+        """``catalogos``: tablas de pocas filas que el planificador puede recorrer enteras."""
+        completos = [tabla for tabla in recorridos_completos(queryset) if tabla not in catalogos]
+        self.assertEqual(completos, [], f"Recorrido completo de {completos}: {plan(queryset)}")
+
+    def _semana(self):
+        return Encuesta.objects.filter(fecha_creacion__gte=HOY - timedelta(days=7), fecha_creacion__lte=HOY)
+
+    # dashboard/views.py
+
+    def test_encuestas_por_dia_en_rango(self):
+        self.assertUsaIndices(self._semana().values("fecha_creacion").annotate(total=Count("id")))
+
+    def test_avance_colaboradores_de_un_lider(self):
+        lider = self.lideres[0]
+        encuestas = self._semana().filter(colaborador__created_by=lider)
+        self.assertUsaIndices(encuestas.values("colaborador_id").annotate(total=Count("id")))
+        colaboradores = User.objects.filter(role=User.Roles.COLABORADOR, created_by=lider)
+        self.assertUsaIndices(colaboradores.order_by("name").values("id", "name"))
+        self.assertUsaIndices(
+            ZonaAsignacion.objects.filter(colaborador__in=colaboradores)
+            .values("colaborador_id")
+            .annotate(meta_total=Coalesce(Sum("zona__meta__meta_encuestas"), 0))
+        )
+
+    def test_lideres_por_nombre(self):
+        self.assertUsaIndices(
+            User.objects.filter(role=User.Roles.LIDER).order_by("name").values("id", "name", "meta_votantes")
+        )
+
+    def test_casos_activos(self):
+        self.assertUsaIndices(
+            CasoCiudadano.objects.filter(
+                estado__in=[CasoCiudadano.Estado.REGISTRADO, CasoCiudadano.Estado.EN_REVISION]
+            ).values("id")
+        )
+
+    def test_top_necesidades(self):
+        self.assertUsaIndices(
+            EncuestaNecesidad.objects.values("necesidad__nombre").annotate(total=Count("id")).order_by("-total"),
+            catalogos=[Necesidad._meta.db_table],
+        )
+
+    # reports/services.py
+
+    def test_reporte_en_rango(self):
+        self.assertUsaIndices(
+            self._semana()
+            .values("zona_id", "colaborador_id", "colaborador__name", "fecha_creacion")
+            .annotate(total=Count("id"))
+            .order_by("fecha_creacion")
+        )
+        self.assertUsaIndices(
+            EncuestaNecesidad.objects.filter(
+                encuesta__fecha_creacion__gte=HOY - timedelta(days=7), encuesta__fecha_creacion__lte=HOY
+            )
+            .values("necesidad_id", "encuesta__zona_id")
+            .annotate(total=Count("id"))
+        )
+
+    def test_casos_por_prioridad_y_criticos(self):
+        self.assertUsaIndices(CasoCiudadano.objects.values("nivel_prioridad", "estado").annotate(total=Count("id")))
+        self.assertUsaIndices(
+            CasoCiudadano.objects.filter(nivel_prioridad=CasoCiudadano.Prioridad.ALTA).values(
+                "id", "nivel_prioridad", "estado", "encuesta__zona__nombre", "encuesta__zona__municipio__nombre"
+            )[:20]
+        )
+
+    # surveys/services.py, surveys/views.py
+
+    def test_cobertura_de_colaborador(self):
+        self.assertUsaIndices(self.colaborador.encuestas.values("zona_id").annotate(total=Count("id")))
+        self.assertUsaIndices(
+            EncuestaNecesidad.objects.filter(encuesta__colaborador=self.colaborador)
+            .values("encuesta__zona_id", "necesidad__nombre")
+            .annotate(total=Count("id"))
+        )
+
+    def test_ultima_encuesta_valida_de_lider(self):
+        # counters.py: recalcula la última fecha válida cuando se retira una encuesta.
+        self.assertUsaIndices(
+            encuestas_de_lider(self.lideres[0].id).filter(votante_valido=True).values("fecha_creacion")
+        )
+
+    def test_encuestas_de_lider_por_municipio(self):
+        municipios = list(Municipio.objects.values_list("id", flat=True)[:2])
+        self.assertUsaIndices(Encuesta.objects.filter(zona__municipio_id__in=municipios).values("id"))
+
+    # agenda/views.py, accounts/views.py
+
+    def test_agenda_de_lider(self):
+        self.assertUsaIndices(Agenda.objects.filter(lider=self.lideres[0]).order_by("-fecha", "-hora_inicio", "-id"))
+
+    def test_usuarios_visibles_para_lider(self):
+        lider = self.lideres[0]
+        self.assertUsaIndices(
+            User.objects.filter(Q(role=User.Roles.COLABORADOR, created_by=lider) | Q(id=lider.id))
+        )
+
+
+class PaginacionTests(TestCase):
+    """Las listas responden por páginas aunque el cliente no envíe ``cursor`` ni ``page_size``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(email="admin@example.com", name="Admin", role=User.Roles.ADMIN)
+        departamento = Departamento.objects.create(nombre="Departamento")
+        Municipio.objects.bulk_create(
+            Municipio(nombre=f"Municipio {i}", departamento=departamento) for i in range(150)
+        )
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST="localhost")
+        self.client.force_authenticate(self.admin)
+
+    def test_pagina_por_defecto_y_sigue_el_cursor(self):
+        respuesta = self.client.get("/api/municipios/")
+        self.assertEqual(len(respuesta.data["results"]), 100)
+        ids = [item["id"] for item in respuesta.data["results"]]
+        respuesta = self.client.get(respuesta.data["next"])
+        ids += [item["id"] for item in respuesta.data["results"]]
+        self.assertIsNone(respuesta.data["next"])
+        self.assertEqual(sorted(ids), sorted(Municipio.objects.values_list("id", flat=True)))
+        self.assertEqual(len(self.client.get("/api/municipios/", {"page_size": 1000}).data["results"]), 150)
+
+    @override_settings(LISTAS_SIN_PAGINAR=True)
+    def test_listas_sin_paginar_para_clientes_viejos(self):
+        self.assertEqual(len(self.client.get("/api/municipios/").data), 150)
+        self.assertEqual(len(self.client.get("/api/municipios/", {"page_size": 10}).data["results"]), 10)
+
+    def test_usuarios_por_rol_en_el_servidor(self):
+        lider = User.objects.create(email="lider@example.com", name="Líder", role=User.Roles.LIDER)
+        User.objects.bulk_create(
+            User(email=f"c{i}@example.com", name=f"C{i}", role=User.Roles.COLABORADOR, created_by=lider)
+            for i in range(3)
+        )
+        # Una página de un solo elemento no queda vacía por filtrar en el cliente.
+        respuesta = self.client.get("/api/usuarios/", {"role": "LIDER", "page_size": 1})
+        self.assertEqual([item["id"] for item in respuesta.data["results"]], [lider.id])
+        self.assertIsNone(respuesta.data["next"])
+        self.assertEqual(len(self.client.get("/api/usuarios/", {"role": "COLABORADOR"}).data["results"]), 3)
+
+    def test_municipios_cuentan_sus_zonas(self):
+        municipio = Municipio.objects.order_by("id").first()
+        Zona.objects.bulk_create(Zona(nombre=f"Zona {i}", tipo="BARRIO", municipio=municipio) for i in range(3))
+        totales = {
+            item["id"]: item["total_zonas"]
+            for item in self.client.get("/api/municipios/", {"page_size": 500}).data["results"]
+        }
+        self.assertEqual(totales[municipio.id], 3)
+        self.assertEqual(sum(totales.values()), 3)
+
+
+@override_settings(INSTRUMENTACION=True, INSTRUMENTACION_MUESTRAS=50)
+class InstrumentacionTests(TestCase):
+    """Cada petición medida deja ``Server-Timing``, una línea de log y una muestra para los percentiles."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(email="admin@example.com", name="Admin", role=User.Roles.ADMIN)
+        cls.lider = User.objects.create(email="lider@example.com", name="Líder", role=User.Roles.LIDER)
+        departamento = Departamento.objects.create(nombre="Departamento")
+        municipio = Municipio.objects.create(nombre="Municipio", departamento=departamento)
+        zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        agua = Necesidad.objects.create(nombre="Agua")
+        for cedula in range(1, 4):
+            encuesta = Encuesta.objects.create(
+                zona=zona,
+                colaborador=cls.admin,
+                cedula=str(cedula),
+                telefono="3000000000",
+                tipo_vivienda="PROPIA",
+                rango_edad="26-40",
+                ocupacion="OTRO",
+            )
+            EncuestaNecesidad.objects.create(encuesta=encuesta, necesidad=agua, prioridad=1)
+
+    def setUp(self):
+        instrumentation._muestras.clear()
+
+    def _cliente(self, usuario):
+        # Cada cliente arma su propia cadena de middleware con la configuración vigente.
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(usuario)
+        return cliente
+
+    @override_settings(INSTRUMENTACION=False)
+    def test_apagada_se_retira_de_la_cadena(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            instrumentation.InstrumentacionMiddleware(lambda request: None)
+        respuesta = self._cliente(self.admin).get("/api/municipios/")
+        self.assertNotIn("Server-Timing", respuesta)
+        self.assertEqual(instrumentation.resumen(), [])
+
+    def test_server_timing_y_log(self):
+        with self.assertLogs("pitpc.instrumentacion", "INFO") as registro:
+            respuesta = self._cliente(self.admin).get("/api/municipios/")
+        self.assertRegex(
+            respuesta["Server-Timing"],
+            r'^total;dur=\d+\.\d, db;dur=\d+\.\d;desc="(\d+) consultas", serializador;dur=\d+\.\d$',
+        )
+        linea = json.loads(registro.records[0].getMessage())
+        self.assertEqual(
+            (linea["vista"], linea["ruta"], linea["estado"]), ("GET municipio-list", "/api/municipios/", 200)
+        )
+        consultas = re.search(r'desc="(\d+) consultas"', respuesta["Server-Timing"]).group(1)
+        self.assertEqual(linea["consultas"], int(consultas))
+        self.assertGreater(linea["consultas"], 0)
+
+    def test_huellas_repetidas(self):
+        medicion = instrumentation._Medicion()
+
+        def ejecutar(sql, params, many, context):
+            return None
+
+        for sql in [
+            "SELECT * FROM t WHERE id IN (%s)",
+            "SELECT * FROM t WHERE id IN (%s, %s, %s)",
+            "SELECT * FROM t WHERE id IN (%s, %s)",
+            "SELECT * FROM u WHERE id = %s",
+            "SELECT * FROM u WHERE id = %s",
+            "SELECT * FROM v",
+        ]:
+            medicion(ejecutar, sql, (), False, {})
+        self.assertEqual(medicion.consultas, 6)
+        self.assertEqual(
+            medicion.repetidas(),
+            [
+                {"sql": "SELECT * FROM t WHERE id IN (...)", "veces": 3},
+                {"sql": "SELECT * FROM u WHERE id = %s", "veces": 2},
+            ],
+        )
+
+    def test_flujo_se_mide_hasta_el_final(self):
+        with self.assertLogs("pitpc.instrumentacion", "INFO") as registro:
+            respuesta = self._cliente(self.admin).get("/api/encuestas/exportar/", {"formato": "csv"})
+            # Las cabeceras salen antes del cuerpo: todavía no hay muestra.
+            self.assertIn("Server-Timing", respuesta)
+            self.assertEqual(instrumentation.resumen(), [])
+            al_enviar_cabeceras = int(re.search(r'desc="(\d+) consultas"', respuesta["Server-Timing"]).group(1))
+            cuerpo = b"".join(respuesta.streaming_content).decode()
+        self.assertEqual(len(cuerpo.strip().splitlines()), 4)
+        linea = json.loads(registro.records[-1].getMessage())
+        self.assertEqual(linea["vista"], "GET encuesta-exportar")
+        # Las consultas de los lotes se hacen mientras se envía el cuerpo.
+        self.assertGreater(linea["consultas"], al_enviar_cabeceras)
+        self.assertEqual(instrumentation.resumen()[0]["consultas"]["max"], linea["consultas"])
+        # Al terminar el flujo la conexión queda sin el envoltorio de la medición.
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_percentiles_solo_para_administradores(self):
+        cliente = self._cliente(self.admin)
+        for _ in range(3):
+            cliente.get("/api/municipios/")
+        respuesta = cliente.get("/api/admin/rendimiento/")
+        self.assertTrue(respuesta.data["activo"])
+        vista = next(ruta for ruta in respuesta.data["vistas"] if ruta["vista"] == "GET municipio-list")
+        self.assertEqual(vista["peticiones"], 3)
+        for metrica in ("total_ms", "db_ms", "consultas", "serializador_ms"):
+            self.assertEqual(set(vista[metrica]), {"p50", "p90", "p99", "max"})
+            self.assertLessEqual(vista[metrica]["p50"], vista[metrica]["max"])
+        self.assertEqual(self._cliente(self.lider).get("/api/admin/rendimiento/").status_code, 403)
+
+
+class CondicionalTests(TestCase):
+    """El ETag de los tableros sigue las marcas de la base y ``If-None-Match`` responde 304."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(email="admin@example.com", name="Admin", role=User.Roles.ADMIN)
+        departamento = Departamento.objects.create(nombre="Departamento")
+        cls.municipio = Municipio.objects.create(nombre="Municipio", departamento=departamento)
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=cls.municipio)
+        cls.otra = Zona.objects.create(nombre="Otra", tipo="BARRIO", municipio=cls.municipio)
+        cls.colaboradores = [
+            User.objects.create(email=f"c{i}@example.com", name=f"C{i}", role=User.Roles.COLABORADOR)
+            for i in range(2)
+        ]
+        for colaborador in cls.colaboradores:
+            ZonaAsignacion.objects.create(colaborador=colaborador, zona=cls.zona)
+        cls.agua = Necesidad.objects.create(nombre="Agua")
+        cls.encuesta = cls._encuesta("1")
+        EncuestaNecesidad.objects.create(encuesta=cls.encuesta, necesidad=cls.agua, prioridad=1)
+
+    @classmethod
+    def _encuesta(cls, cedula):
+        return Encuesta.objects.create(
+            zona=cls.zona,
+            colaborador=cls.admin,
+            cedula=cedula,
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+            nivel_afinidad=1,
+            disposicion_voto=1,
+        )
+
+    def _cliente(self, usuario=None):
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(usuario or self.admin)
+        return cliente
+
+    def _etag(self, ruta="/api/dashboard/resumen/", usuario=None):
+        respuesta = self._cliente(usuario).get(ruta)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta["ETag"]
+
+    def assertCambia(self, cambio, ruta="/api/dashboard/resumen/"):
+        antes = self._etag(ruta)
+        cambio()
+        respuesta = self._cliente().get(ruta, HTTP_IF_NONE_MATCH=antes)
+        self.assertEqual(respuesta.status_code, 200, cambio.__name__)
+        self.assertNotEqual(respuesta["ETag"], antes)
+
+    def test_repetir_con_if_none_match_da_304(self):
+        etag = self._etag()
+        cliente = self._cliente()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = cliente.get("/api/dashboard/resumen/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b"")
+        self.assertEqual(respuesta["ETag"], etag)
+        # Solo se leen las marcas; la vista no corre.
+        self.assertFalse(any("surveys_encuesta" in consulta["sql"] for consulta in consultas.captured_queries))
+        # Otra ruta, otros parámetros u otro ``Accept`` son otra representación.
+        self.assertNotEqual(self._etag("/api/dashboard/mapa/"), etag)
+        self.assertNotEqual(self._etag("/api/dashboard/resumen/?x=1"), etag)
+        otra = cliente.get("/api/dashboard/resumen/", HTTP_ACCEPT="application/json; indent=2")
+        self.assertNotEqual(otra["ETag"], etag)
+
+    def test_cambios_de_encuestas_y_necesidades(self):
+        def crear_encuesta():
+            self._encuesta("2")
+
+        def editar_encuesta():
+            encuesta = Encuesta.objects.get(pk=self.encuesta.pk)
+            encuesta.disposicion_voto = 3
+            encuesta.save()
+
+        def borrar_encuesta():
+            Encuesta.objects.filter(cedula="2").delete()
+
+        def crear_necesidad():
+            Necesidad.objects.create(nombre="Vías")
+
+        def cambiar_respuesta():
+            EncuestaNecesidad.objects.filter(encuesta=self.encuesta).get().delete()
+
+        for cambio in (crear_encuesta, editar_encuesta, borrar_encuesta, crear_necesidad, cambiar_respuesta):
+            self.assertCambia(cambio)
+
+    def test_cambios_de_casos(self):
+        def crear_caso():
+            CasoCiudadano.objects.create(encuesta=self.encuesta, nivel_prioridad=CasoCiudadano.Prioridad.ALTA)
+
+        def atender_caso():
+            caso = CasoCiudadano.objects.get()
+            caso.estado = CasoCiudadano.Estado.ATENDIDO
+            caso.save()
+
+        self.assertCambia(crear_caso)
+        self.assertCambia(atender_caso)
+        # El mapa no muestra casos: su ETag no depende de ellos.
+        antes = self._etag("/api/dashboard/mapa/")
+        atender_caso()
+        self.assertEqual(self._etag("/api/dashboard/mapa/"), antes)
+
+    def test_cambios_de_zonas_y_lapidas(self):
+        def editar_zona():
+            self.otra.nombre = "Renombrada"
+            self.otra.save()
+
+        self.assertCambia(editar_zona, "/api/dashboard/mapa/")
+        # La lápida cambia la marca aunque la zona borrada no sea la última editada.
+        Zona.objects.create(nombre="Nueva", tipo="BARRIO", municipio=self.municipio)
+        self.assertCambia(self.otra.delete, "/api/dashboard/mapa/")
+
+    def test_cobertura_por_colaborador(self):
+        ruta = "/api/cobertura/zonas"
+        primero, segundo = (self._etag(ruta, colaborador) for colaborador in self.colaboradores)
+        # Con los mismos datos, cada colaborador tiene su propia representación.
+        self.assertNotEqual(primero, segundo)
+        ZonaAsignacion.objects.create(colaborador=self.colaboradores[0], zona=self.otra)
+        self.assertNotEqual(self._etag(ruta, self.colaboradores[0]), primero)
+        # Los colaboradores no reciben el tablero completo, ni siquiera como 304.
+        respuesta = self._cliente(self.colaboradores[0]).get("/api/dashboard/resumen/")
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertNotIn("ETag", respuesta)
@@ -11,9 +11,11 @@ from accounts.views import AuthViewSet, LeaderMetaView, UserViewSet
 from candidates.views import CandidatoViewSet
 from agenda.views import AgendaViewSet
 from dashboard.views import DashboardViewSet
-from reports.views import ReporteUnicoViewSet
+from pitpc.instrumentation import RendimientoView
+from reports.views import ReporteUnicoViewSet, TrabajoReporteViewSet
 from routes.views import RouteViewSet
 from surveys.views import CoverageView, NeedViewSet, SurveyViewSet
+from sync.views import SyncView
 from territory.views import (
     DepartamentoViewSet,
     MunicipioViewSet,
@@ -39,6 +41,7 @@ router.register(r"encuestas", SurveyViewSet, basename="encuesta")
 router.register(r"necesidades", NeedViewSet, basename="necesidad")
 router.register(r"rutas", RouteViewSet, basename="ruta")
 router.register(r"dashboard", DashboardViewSet, basename="dashboard")
+router.register(r"reportes/trabajos", TrabajoReporteViewSet, basename="reporte-trabajo")
 router.register(r"reportes", ReporteUnicoViewSet, basename="reporte")
 
 urlpatterns = [
@@ -46,6 +49,8 @@ urlpatterns = [
     path("api/auth/login", AuthViewSet.as_view({"post": "login"}), name="login"),
     path("api/auth/refresh", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/cobertura/zonas", CoverageView.as_view(), name="coverage"),
+    path("api/sync/", SyncView.as_view(), name="sync"),
+    path("api/admin/rendimiento/", RendimientoView.as_view(), name="rendimiento"),
     path(
         "api/admin/leaders/<int:leader_id>/meta/",
         LeaderMetaView.as_view(),
@@ -0,0 +1,188 @@
+"""Cola local de trabajos de reporte.
+
+Cada pedido queda como ``TrabajoReporte`` y lo procesa el comando
+``run_report_worker``, que al arrancar retoma lo que quedó a medias. En
+desarrollo puede hacerlo un hilo del propio proceso web (``REPORTES_WORKER_LOCAL``).
+Un trabajo se toma con un UPDATE condicional, así nunca se procesa dos veces
+aunque convivan varios workers.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from routes.models import RutaVisita
+from surveys.cache import marca_encuestas
+from sync.services import marca_territorio
+from .models import TrabajoReporte
+from .pdf import escribir_pdf
+from .services import _parse_date
+
+logger = logging.getLogger(__name__)
+
+# Un trabajo activo más viejo que esto se da por perdido (p. ej. el worker murió).
+TIEMPO_MAXIMO = timedelta(minutes=30)
+
+_cola = queue.Queue()
+_hilo = None
+_candado = threading.Lock()
+
+
+def huella(parametros):
+    """Parámetros normalizados más la versión de los datos que cubre el reporte."""
+    marcas = (
+        marca_encuestas(casos=True)
+        + marca_territorio(asignaciones=True)
+        + [RutaVisita.objects.aggregate(marca=Max("actualizado_en"))["marca"]]
+    )
+    base = json.dumps({"parametros": parametros, "marcas": [str(marca) for marca in marcas]}, sort_keys=True)
+    return hashlib.sha256(base.encode()).hexdigest()
+
+
+def _vencido(trabajo):
+    inicio = trabajo.iniciado_en or trabajo.creado_en
+    return inicio < timezone.now() - TIEMPO_MAXIMO
+
+
+def _reutilizable(trabajo):
+    if trabajo.estado == TrabajoReporte.Estado.COMPLETADO:
+        return bool(trabajo.archivo) and default_storage.exists(trabajo.archivo.name)
+    if trabajo.estado == TrabajoReporte.Estado.FALLIDO:
+        return False
+    return not _vencido(trabajo)
+
+
+def solicitar_reporte(parametros, usuario):
+    """Devuelve el trabajo para ``parametros``; pedidos idénticos sobre los mismos datos lo comparten."""
+    clave = huella(parametros)
+    try:
+        with transaction.atomic():
+            trabajo, creado = TrabajoReporte.objects.get_or_create(
+                huella=clave, defaults={"parametros": parametros, "solicitado_por": usuario}
+            )
+    except IntegrityError:
+        trabajo, creado = TrabajoReporte.objects.get(huella=clave), False
+    if not creado:
+        if _reutilizable(trabajo):
+            return trabajo
+        # Falló, se perdió o le borraron el archivo: se vuelve a encolar una sola vez.
+        reiniciado = TrabajoReporte.objects.filter(pk=trabajo.pk, estado=trabajo.estado).update(
+            estado=TrabajoReporte.Estado.PENDIENTE,
+            error="",
+            creado_en=timezone.now(),
+            iniciado_en=None,
+            terminado_en=None,
+        )
+        trabajo.refresh_from_db()
+        if not reiniciado:
+            return trabajo
+    transaction.on_commit(lambda: encolar(trabajo.pk))
+    return trabajo
+
+
+def encolar(trabajo_id):
+    if not settings.REPORTES_WORKER_LOCAL:
+        return
+    global _hilo
+    with _candado:
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_atender_cola, name="reportes", daemon=True)
+            _hilo.start()
+            # Los pendientes de un proceso anterior se perdieron con su cola en memoria.
+            for pendiente in TrabajoReporte.objects.filter(estado=TrabajoReporte.Estado.PENDIENTE).exclude(
+                pk=trabajo_id
+            ).values_list("pk", flat=True):
+                _cola.put(pendiente)
+    _cola.put(trabajo_id)
+
+
+def _atender_cola():
+    while True:
+        trabajo_id = _cola.get()
+        try:
+            procesar(trabajo_id)
+        except Exception:
+            logger.exception("Error procesando el trabajo de reporte %s", trabajo_id)
+        finally:
+            close_old_connections()
+
+
+def procesar(trabajo_id):
+    """Genera el PDF de un trabajo pendiente; devuelve ``False`` si otro worker ya lo tomó."""
+    tomado = TrabajoReporte.objects.filter(
+        pk=trabajo_id, estado=TrabajoReporte.Estado.PENDIENTE
+    ).update(estado=TrabajoReporte.Estado.EN_PROCESO, iniciado_en=timezone.now())
+    if not tomado:
+        return False
+    trabajo = TrabajoReporte.objects.get(pk=trabajo_id)
+    nombre = f"reportes/reporte_{trabajo.pk}.pdf"
+    ruta = default_storage.path(nombre)
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.tmp"
+        escribir_pdf(
+            temporal,
+            _parse_date(trabajo.parametros.get("start_date")),
+            _parse_date(trabajo.parametros.get("end_date")),
+        )
+        os.replace(temporal, ruta)
+    except Exception as exc:
+        logger.exception("No se pudo generar el reporte %s", trabajo.pk)
+        trabajo.estado = TrabajoReporte.Estado.FALLIDO
+        trabajo.error = str(exc)
+    else:
+        trabajo.estado = TrabajoReporte.Estado.COMPLETADO
+        trabajo.archivo.name = nombre
+    trabajo.terminado_en = timezone.now()
+    trabajo.save(update_fields=["estado", "error", "archivo", "terminado_en"])
+    return True
+
+
+def depurar():
+    """Borra trabajos terminados (y su PDF) vencidos o reemplazados; devuelve cuántos borró.
+
+    Vencido es el que terminó hace más de ``REPORTES_RETENCION_DIAS``; reemplazado,
+    el que tiene un pedido más reciente con los mismos parámetros sobre otros datos.
+    """
+    terminados = [TrabajoReporte.Estado.COMPLETADO, TrabajoReporte.Estado.FALLIDO]
+    limite = timezone.now() - timedelta(days=settings.REPORTES_RETENCION_DIAS)
+    borrar = set(
+        TrabajoReporte.objects.filter(estado__in=terminados, terminado_en__lt=limite).values_list("pk", flat=True)
+    )
+    vistos = set()
+    trabajos = TrabajoReporte.objects.order_by("-creado_en", "-pk").values_list("pk", "parametros", "estado")
+    for pk, parametros, estado in trabajos.iterator():
+        clave = json.dumps(parametros, sort_keys=True)
+        if clave in vistos and estado in terminados:
+            borrar.add(pk)
+        vistos.add(clave)
+    viejos = TrabajoReporte.objects.filter(pk__in=borrar)
+    for nombre in viejos.exclude(archivo="").values_list("archivo", flat=True):
+        default_storage.delete(nombre)
+    borrados, _ = viejos.delete()
+    return borrados
+
+
+def recuperar(antes_de):
+    """Devuelve a PENDIENTE los trabajos que quedaron EN_PROCESO desde antes de ``antes_de``."""
+    return TrabajoReporte.objects.filter(
+        estado=TrabajoReporte.Estado.EN_PROCESO, iniciado_en__lt=antes_de
+    ).update(estado=TrabajoReporte.Estado.PENDIENTE, iniciado_en=None)
+
+
+def pendientes():
+    """Trabajos que un worker debe tomar: pendientes y activos vencidos."""
+    limite = timezone.now() - TIEMPO_MAXIMO
+    return TrabajoReporte.objects.filter(
+        Q(estado=TrabajoReporte.Estado.PENDIENTE)
+        | Q(estado=TrabajoReporte.Estado.EN_PROCESO, iniciado_en__lt=limite)
+    ).order_by("creado_en")
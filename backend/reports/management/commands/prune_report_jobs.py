@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reports.jobs import depurar
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina los trabajos de reporte terminados más viejos que REPORTES_RETENCION_DIAS "
+        "y los reemplazados por un pedido más reciente con los mismos parámetros, con sus PDF"
+    )
+
+    def handle(self, *args, **options):
+        borrados = depurar()
+        self.stdout.write(self.style.SUCCESS(f"{borrados} trabajos de reporte eliminados"))
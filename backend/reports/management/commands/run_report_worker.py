@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from reports.jobs import pendientes, procesar, recuperar
+from reports.models import TrabajoReporte
+
+
+class Command(BaseCommand):
+    help = "Procesa los trabajos de reporte pendientes (worker fuera del proceso web)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Procesa lo pendiente y termina")
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre consultas")
+        parser.add_argument(
+            "--sin-recuperar",
+            action="store_true",
+            help="No retomar lo que quedó EN_PROCESO (workers adicionales junto al principal)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["sin_recuperar"]:
+            # Lo que quedó EN_PROCESO al arrancar era de un worker que murió.
+            recuperados = recuperar(timezone.now())
+            if recuperados:
+                self.stdout.write(f"{recuperados} reportes retomados")
+        while True:
+            for trabajo in pendientes():
+                if trabajo.estado == TrabajoReporte.Estado.EN_PROCESO:
+                    # El worker que lo tenía no terminó a tiempo.
+                    TrabajoReporte.objects.filter(pk=trabajo.pk, estado=trabajo.estado).update(
+                        estado=TrabajoReporte.Estado.PENDIENTE
+                    )
+                if procesar(trabajo.pk):
+                    trabajo.refresh_from_db()
+                    self.stdout.write(f"Reporte {trabajo.pk}: {trabajo.estado}")
+            close_old_connections()
+            if options["once"]:
+                return
+            time.sleep(options["intervalo"])
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrabajoReporte",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("parametros", models.JSONField(default=dict)),
+                ("huella", models.CharField(max_length=64, unique=True)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("PENDIENTE", "Pendiente"),
+                            ("EN_PROCESO", "En proceso"),
+                            ("COMPLETADO", "Completado"),
+                            ("FALLIDO", "Fallido"),
+                        ],
+                        default="PENDIENTE",
+                        max_length=15,
+                    ),
+                ),
+                ("archivo", models.FileField(blank=True, upload_to="reportes/")),
+                ("error", models.TextField(blank=True)),
+                ("creado_en", models.DateTimeField(auto_now_add=True)),
+                ("iniciado_en", models.DateTimeField(blank=True, null=True)),
+                ("terminado_en", models.DateTimeField(blank=True, null=True)),
+                (
+                    "solicitado_por",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="trabajos_reporte",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-creado_en"],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import models
+
+
+class TrabajoReporte(models.Model):
+    """Generación en segundo plano del PDF del reporte único."""
+
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        EN_PROCESO = "EN_PROCESO", "En proceso"
+        COMPLETADO = "COMPLETADO", "Completado"
+        FALLIDO = "FALLIDO", "Fallido"
+
+    parametros = models.JSONField(default=dict)
+    # Parámetros más versión de los datos: los pedidos idénticos comparten trabajo.
+    huella = models.CharField(max_length=64, unique=True)
+    estado = models.CharField(max_length=15, choices=Estado.choices, default=Estado.PENDIENTE)
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="trabajos_reporte",
+    )
+    archivo = models.FileField(upload_to="reportes/", blank=True)
+    error = models.TextField(blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    terminado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-creado_en"]
+
+    def __str__(self):
+        return f"Reporte {self.id} - {self.estado}"
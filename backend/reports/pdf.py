@@ -0,0 +1,393 @@
+"""PDF del reporte único dibujado desde la base de datos, sin recortes.
+
+Cada sección recorre su consulta en lotes por llave (``lotes_por_llave``) y
+dibuja las filas a medida que llegan: lo acotado son las consultas, que nunca
+traen una tabla completa. El documento en sí no lo está, porque el ``Canvas``
+de reportlab guarda las páginas dibujadas hasta ``save()``; su tamaño crece con
+el número de filas del reporte.
+"""
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localtime, now
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from accounts.models import User
+from pitpc.pagination import iterar_por_llave, lotes_por_llave
+from routes.models import RutaColaborador, RutaVisita, RutaZona
+from surveys.models import (
+    CasoCiudadano,
+    CoberturaZonaNecesidad,
+    Encuesta,
+    EncuestaNecesidad,
+)
+from territory.models import Departamento, Municipio, Zona
+from .services import _calcular_estado_cobertura, _porcentaje
+
+LOTE = 1000
+MARGEN = 40
+ALTO_FILA = 13
+FUENTE = "Helvetica"
+FUENTE_NEGRITA = "Helvetica-Bold"
+TAMANO_FUENTE = 8
+
+
+class _Documento:
+    """Lienzo con cursor vertical, salto de página y tablas con encabezado repetido."""
+
+    def __init__(self, destino):
+        self.pdf = canvas.Canvas(destino, pagesize=letter, pageCompression=1)
+        self.ancho, self.alto = letter
+        self.pagina = 1
+        self.y = self.alto - MARGEN
+
+    def _pie(self):
+        self.pdf.setFont(FUENTE, 7)
+        self.pdf.drawRightString(self.ancho - MARGEN, MARGEN / 2, f"Página {self.pagina}")
+
+    def nueva_pagina(self):
+        self._pie()
+        self.pdf.showPage()
+        self.pagina += 1
+        self.y = self.alto - MARGEN
+
+    def espacio(self, alto):
+        if self.y - alto < MARGEN:
+            self.nueva_pagina()
+
+    def texto(self, texto, fuente=FUENTE, tamano=10, sangria=0, alto=14):
+        self.espacio(alto)
+        self.pdf.setFont(fuente, tamano)
+        self.pdf.drawString(MARGEN + sangria, self.y, texto)
+        self.y -= alto
+
+    def seccion(self, titulo):
+        self.y -= 6
+        self.espacio(60)
+        self.texto(titulo, FUENTE_NEGRITA, 12, alto=18)
+
+    def _fila(self, columnas, valores, fuente):
+        # Un solo objeto de texto por fila: drawString crea uno por celda y es
+        # lo que más pesa cuando el reporte tiene miles de páginas.
+        linea = self.pdf.beginText()
+        linea.setFont(fuente, TAMANO_FUENTE)
+        x = MARGEN
+        for (_, ancho, derecha), valor in zip(columnas, valores):
+            texto, ancho_texto = _recortar("" if valor is None else str(valor), fuente, ancho - 4)
+            linea.setTextOrigin(x + ancho - 2 - ancho_texto if derecha else x + 2, self.y)
+            linea.textOut(texto)
+            x += ancho
+        self.pdf.drawText(linea)
+        self.y -= ALTO_FILA
+
+    def _encabezado(self, columnas):
+        total = sum(ancho for _, ancho, _ in columnas)
+        self.pdf.setFillGray(0.88)
+        self.pdf.rect(MARGEN, self.y - 3, total, ALTO_FILA, stroke=0, fill=1)
+        self.pdf.setFillGray(0)
+        self._fila(columnas, [titulo for titulo, _, _ in columnas], FUENTE_NEGRITA)
+
+    def tabla(self, columnas, filas):
+        """``columnas``: (título, ancho, alinear a la derecha); ``filas``: iterable de tuplas."""
+        self.espacio(ALTO_FILA * 2)
+        self._encabezado(columnas)
+        vacia = True
+        for valores in filas:
+            vacia = False
+            if self.y - ALTO_FILA < MARGEN:
+                self.nueva_pagina()
+                self._encabezado(columnas)
+            self._fila(columnas, valores, FUENTE)
+        if vacia:
+            self.texto("Sin registros.", tamano=TAMANO_FUENTE, sangria=2, alto=ALTO_FILA)
+        self.y -= 8
+
+    def cerrar(self):
+        self._pie()
+        self.pdf.showPage()
+        self.pdf.save()
+
+
+@lru_cache(maxsize=4096)
+def _recortar(texto, fuente, ancho):
+    """Texto que cabe en ``ancho`` y su ancho; los valores se repiten mucho entre filas."""
+    medida = stringWidth(texto, fuente, TAMANO_FUENTE)
+    if medida <= ancho:
+        return texto, medida
+    while texto and stringWidth(texto + "…", fuente, TAMANO_FUENTE) > ancho:
+        texto = texto[:-1]
+    return texto + "…", stringWidth(texto + "…", fuente, TAMANO_FUENTE)
+
+
+def _filtrar_fechas(queryset, campo, start_date, end_date):
+    if start_date:
+        queryset = queryset.filter(**{f"{campo}__gte": start_date})
+    if end_date:
+        queryset = queryset.filter(**{f"{campo}__lte": end_date})
+    return queryset
+
+
+def _filas_zonas(start_date, end_date):
+    zonas = Zona.objects.values("id", "nombre", "municipio__nombre").annotate(
+        meta=Coalesce(F("meta__meta_encuestas"), Value(0))
+    )
+    if start_date or end_date:
+        filtro = Q()
+        if start_date:
+            filtro &= Q(encuestas__fecha_creacion__gte=start_date)
+        if end_date:
+            filtro &= Q(encuestas__fecha_creacion__lte=end_date)
+        zonas = zonas.annotate(total=Count("encuestas", filter=filtro))
+    else:
+        # Sin rango de fechas los contadores materializados ya tienen el total.
+        zonas = zonas.annotate(total=Coalesce(F("cobertura__total_encuestas"), Value(0)))
+    for zona in iterar_por_llave(zonas, ("municipio__nombre", "nombre", "id"), LOTE):
+        porcentaje = _porcentaje(zona["total"], zona["meta"])
+        yield (
+            zona["municipio__nombre"],
+            zona["nombre"],
+            zona["total"],
+            zona["meta"],
+            f"{porcentaje}%",
+            _calcular_estado_cobertura(porcentaje),
+        )
+
+
+def _filas_municipios(start_date, end_date):
+    encuestas = {
+        item["zona__municipio_id"]: item["total"]
+        for item in _filtrar_fechas(Encuesta.objects.all(), "fecha_creacion", start_date, end_date)
+        .values("zona__municipio_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    }
+    municipios = Municipio.objects.values("id", "nombre").annotate(
+        total_zonas=Count("zonas"), meta=Coalesce(Sum("zonas__meta__meta_encuestas"), Value(0))
+    )
+    for municipio in iterar_por_llave(municipios, ("nombre", "id"), LOTE):
+        total = encuestas.get(municipio["id"], 0)
+        yield (
+            municipio["nombre"],
+            municipio["total_zonas"],
+            total,
+            municipio["meta"],
+            f"{_porcentaje(total, municipio['meta'])}%",
+        )
+
+
+def _filas_necesidades(start_date, end_date):
+    """Recorre las zonas por llave y agrupa solo las necesidades de cada lote.
+
+    Un keyset directo sobre el agrupado volvería a agrupar toda la tabla de
+    respuestas en cada lote cuando hay rango de fechas.
+    """
+    zonas = Zona.objects.values("id", "nombre", "municipio__nombre")
+    for lote in lotes_por_llave(zonas, ("municipio__nombre", "nombre", "id"), LOTE):
+        yield from _filas_lote_necesidades(lote, start_date, end_date)
+
+
+def _filas_lote_necesidades(zonas, start_date, end_date):
+    ids = [zona["id"] for zona in zonas]
+    if start_date or end_date:
+        detalle = (
+            _filtrar_fechas(
+                EncuestaNecesidad.objects.filter(encuesta__zona_id__in=ids),
+                "encuesta__fecha_creacion",
+                start_date,
+                end_date,
+            )
+            .values("necesidad_id", zona_pk=F("encuesta__zona_id"), necesidad_nombre=F("necesidad__nombre"))
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+    else:
+        detalle = CoberturaZonaNecesidad.objects.filter(zona_id__in=ids, total__gt=0).values(
+            "necesidad_id", "total", zona_pk=F("zona_id"), necesidad_nombre=F("necesidad__nombre")
+        )
+    por_zona = defaultdict(list)
+    for item in detalle:
+        por_zona[item["zona_pk"]].append(item)
+    for zona in zonas:
+        items = sorted(por_zona.get(zona["id"], []), key=lambda item: (item["necesidad_nombre"], item["necesidad_id"]))
+        for item in items:
+            yield zona["municipio__nombre"], zona["nombre"], item["necesidad_nombre"], item["total"]
+
+
+def _filas_rutas():
+    """Avance con totales históricos, como en el reporte en línea."""
+    rutas = RutaVisita.objects.values("id", "nombre_ruta", "estado")
+    for lote in lotes_por_llave(rutas, ("id",), LOTE):
+        yield from _filas_lote_rutas(lote)
+
+
+def _filas_lote_rutas(rutas):
+    ids = [ruta["id"] for ruta in rutas]
+    zonas = defaultdict(list)
+    for item in RutaZona.objects.filter(ruta_id__in=ids).values(
+        "ruta_id",
+        meta=Coalesce(F("zona__meta__meta_encuestas"), Value(0)),
+        total=Coalesce(F("zona__cobertura__total_encuestas"), Value(0)),
+    ):
+        zonas[item["ruta_id"]].append(item)
+    colaboradores = dict(
+        RutaColaborador.objects.filter(ruta_id__in=ids)
+        .values("ruta_id")
+        .annotate(total=Count("id"))
+        .values_list("ruta_id", "total")
+    )
+    for ruta in rutas:
+        items = zonas.get(ruta["id"], [])
+        avance = 0
+        if items:
+            avance = round(
+                sum(min(item["total"] / item["meta"] * 100, 100) for item in items if item["meta"] > 0)
+                / len(items),
+                2,
+            )
+        yield (
+            ruta["nombre_ruta"],
+            ruta["estado"],
+            len(items),
+            colaboradores.get(ruta["id"], 0),
+            f"{avance}%",
+        )
+
+
+def _filas_encuestadores(start_date, end_date):
+    """Recorre los usuarios por llave y agrupa solo las encuestas de cada lote.
+
+    Como en las necesidades: un keyset sobre el agrupado de encuestas volvería a
+    agrupar toda la tabla en cada lote.
+    """
+    usuarios = User.objects.values("id", "name")
+    for lote in lotes_por_llave(usuarios, ("name", "id"), LOTE):
+        yield from _filas_lote_encuestadores(lote, start_date, end_date)
+
+
+def _filas_lote_encuestadores(usuarios, start_date, end_date):
+    totales = {
+        item["colaborador_id"]: item
+        for item in _filtrar_fechas(
+            Encuesta.objects.filter(colaborador_id__in=[usuario["id"] for usuario in usuarios]),
+            "fecha_creacion",
+            start_date,
+            end_date,
+        )
+        .values("colaborador_id")
+        .annotate(total=Count("id"), zonas=Count("zona_id", distinct=True))
+        .order_by()
+    }
+    if not totales:
+        return
+    necesidades = defaultdict(Counter)
+    for item in (
+        _filtrar_fechas(EncuestaNecesidad.objects.all(), "encuesta__fecha_creacion", start_date, end_date)
+        .filter(encuesta__colaborador_id__in=list(totales))
+        .values("encuesta__colaborador_id", "necesidad__nombre")
+        .annotate(total=Count("id"))
+        .order_by()
+    ):
+        necesidades[item["encuesta__colaborador_id"]][item["necesidad__nombre"]] = item["total"]
+    # Solo quienes tienen encuestas en el periodo, en el orden de los usuarios.
+    for usuario in usuarios:
+        item = totales.get(usuario["id"])
+        if item is None:
+            continue
+        top = necesidades[usuario["id"]].most_common(3)
+        yield (
+            usuario["name"],
+            item["total"],
+            item["zonas"],
+            ", ".join(f"{nombre} ({total})" for nombre, total in top),
+        )
+
+
+def escribir_pdf(destino, start_date=None, end_date=None):
+    """Dibuja el reporte único completo en ``destino`` (ruta o archivo binario)."""
+    doc = _Documento(destino)
+    doc.texto("REPORTE ÚNICO DE INTELIGENCIA TERRITORIAL", FUENTE_NEGRITA, 14, alto=20)
+    doc.texto(f"Generado: {localtime(now()).isoformat()}")
+    if start_date or end_date:
+        doc.texto(f"Periodo: {start_date or 'inicio'} a {end_date or 'hoy'}")
+    doc.y -= 10
+
+    encuestas = _filtrar_fechas(Encuesta.objects.all(), "fecha_creacion", start_date, end_date)
+    necesidades = _filtrar_fechas(
+        EncuestaNecesidad.objects.all(), "encuesta__fecha_creacion", start_date, end_date
+    )
+    casos = CasoCiudadano.objects.values("nivel_prioridad", "estado").annotate(total=Count("id"))
+    doc.seccion("1. Resumen general")
+    for etiqueta, valor in [
+        ("Departamentos", Departamento.objects.count()),
+        ("Municipios", Municipio.objects.count()),
+        ("Zonas", Zona.objects.count()),
+        ("Encuestas", encuestas.count()),
+        ("Necesidades registradas", necesidades.count()),
+        ("Casos ciudadanos", sum(item["total"] for item in casos)),
+        ("Encuestadores", encuestas.values("colaborador_id").distinct().count()),
+    ]:
+        doc.texto(f"{etiqueta}: {valor}", sangria=10)
+
+    doc.seccion("2. Cobertura por municipio")
+    doc.tabla(
+        [("Municipio", 200, False), ("Zonas", 60, True), ("Encuestas", 80, True), ("Meta", 80, True), ("Cobertura", 80, True)],
+        _filas_municipios(start_date, end_date),
+    )
+
+    doc.seccion("3. Cobertura por zona")
+    doc.tabla(
+        [
+            ("Municipio", 120, False),
+            ("Zona", 150, False),
+            ("Encuestas", 60, True),
+            ("Meta", 50, True),
+            ("Cobertura", 60, True),
+            ("Estado", 92, False),
+        ],
+        _filas_zonas(start_date, end_date),
+    )
+
+    doc.seccion("4. Necesidades")
+    top = necesidades.values("necesidad__nombre").annotate(total=Count("id")).order_by("-total")[:5]
+    doc.tabla(
+        [("Necesidad principal", 300, False), ("Total", 80, True)],
+        ((item["necesidad__nombre"], item["total"]) for item in top),
+    )
+    doc.tabla(
+        [("Municipio", 130, False), ("Zona", 160, False), ("Necesidad", 170, False), ("Total", 72, True)],
+        _filas_necesidades(start_date, end_date),
+    )
+
+    doc.seccion("5. Casos ciudadanos")
+    doc.tabla(
+        [("Prioridad", 150, False), ("Estado", 150, False), ("Total", 80, True)],
+        (
+            (item["nivel_prioridad"], item["estado"], item["total"])
+            for item in casos.order_by("nivel_prioridad", "estado")
+        ),
+    )
+
+    doc.seccion("6. Rutas de visita")
+    doc.tabla(
+        [("Ruta", 220, False), ("Estado", 90, False), ("Zonas", 60, True), ("Colaboradores", 80, True), ("Avance", 82, True)],
+        _filas_rutas(),
+    )
+
+    doc.seccion("7. Actividad por encuestadores")
+    doc.tabla(
+        [("Encuestador", 160, False), ("Encuestas", 60, True), ("Zonas", 50, True), ("Necesidades principales", 262, False)],
+        _filas_encuestadores(start_date, end_date),
+    )
+
+    doc.y -= 10
+    doc.texto("Nota: Información confidencial para uso institucional.", "Helvetica-Oblique", 9)
+    doc.y -= 10
+    doc.espacio(30)
+    doc.pdf.setFont(FUENTE, 10)
+    doc.pdf.drawString(MARGEN, doc.y, "Firma / Sello:")
+    doc.pdf.line(MARGEN + 70, doc.y - 5, MARGEN + 250, doc.y - 5)
+    doc.cerrar()
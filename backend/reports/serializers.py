@@ -0,0 +1,29 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import TrabajoReporte
+
+
+class TrabajoReporteSerializer(serializers.ModelSerializer):
+    descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TrabajoReporte
+        fields = [
+            "id",
+            "estado",
+            "parametros",
+            "creado_en",
+            "iniciado_en",
+            "terminado_en",
+            "error",
+            "descarga",
+        ]
+        read_only_fields = fields
+
+    def get_descarga(self, obj):
+        if obj.estado != TrabajoReporte.Estado.COMPLETADO:
+            return None
+        url = reverse("reporte-trabajo-descargar", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,342 @@
+import datetime
+from collections import Counter, defaultdict
+
+from django.db.models import Count
+from django.utils.timezone import now
+
+from routes.models import RutaColaborador, RutaVisita, RutaZona
+from surveys.models import CasoCiudadano, Encuesta, EncuestaNecesidad
+from surveys.terms import temas_recurrentes
+from territory.models import Departamento, Municipio, Zona
+
+
+def _parse_date(value: str | None):
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _calcular_estado_cobertura(porcentaje: float):
+    if porcentaje <= 0:
+        return "SIN_COBERTURA"
+    if porcentaje < 50:
+        return "BAJA"
+    if 50 <= porcentaje < 100:
+        return "MEDIA"
+    return "CUMPLIDA"
+
+
+def _porcentaje(total, meta):
+    return round((total / meta) * 100, 2) if meta else 0
+
+
+def _calcular_avance_ruta(zona_ids, metas_por_zona, encuestas_por_zona):
+    if not zona_ids:
+        return 0
+    total = 0
+    for zona_id in zona_ids:
+        meta = metas_por_zona.get(zona_id, 0)
+        if meta > 0:
+            total += min((encuestas_por_zona.get(zona_id, 0) / meta) * 100, 100)
+    return round(total / len(zona_ids), 2)
+
+
+def _build_report_data(start_date=None, end_date=None):
+    """Arma el reporte único con un número fijo de consultas agrupadas.
+
+    Cada consulta agrega por las llaves más finas que necesitan las secciones
+    (zona, colaborador, fecha, necesidad) y el resultado se reparte en memoria,
+    de modo que el costo no crece con el número de zonas, rutas o colaboradores.
+    """
+    encuestas = Encuesta.objects.all()
+    if start_date:
+        encuestas = encuestas.filter(fecha_creacion__gte=start_date)
+    if end_date:
+        encuestas = encuestas.filter(fecha_creacion__lte=end_date)
+
+    zonas = {
+        item["id"]: item
+        for item in Zona.objects.values(
+            "id", "nombre", "municipio__nombre", "meta__meta_encuestas"
+        ).order_by("id")
+    }
+    metas_por_zona = {
+        zona_id: zona["meta__meta_encuestas"] or 0 for zona_id, zona in zonas.items()
+    }
+
+    encuestas_por_zona = Counter()
+    encuestas_por_colaborador = Counter()
+    nombres_colaborador = {}
+    zonas_por_colaborador = defaultdict(set)
+    series_por_colaborador = defaultdict(Counter)
+    for item in (
+        encuestas.values("zona_id", "colaborador_id", "colaborador__name", "fecha_creacion")
+        .annotate(total=Count("id"))
+        .order_by("fecha_creacion")
+    ):
+        colaborador_id = item["colaborador_id"]
+        encuestas_por_zona[item["zona_id"]] += item["total"]
+        encuestas_por_colaborador[colaborador_id] += item["total"]
+        nombres_colaborador[colaborador_id] = item["colaborador__name"]
+        zonas_por_colaborador[colaborador_id].add(zonas[item["zona_id"]]["nombre"])
+        series_por_colaborador[colaborador_id][item["fecha_creacion"]] += item["total"]
+
+    if start_date or end_date:
+        encuestas_historicas_por_zona = {
+            item["zona_id"]: item["total"]
+            for item in Encuesta.objects.values("zona_id").annotate(total=Count("id"))
+        }
+    else:
+        encuestas_historicas_por_zona = encuestas_por_zona
+
+    cobertura_zonas = []
+    resumen_por_municipio = defaultdict(lambda: {"total_zonas": 0, "total_encuestas": 0, "meta_total": 0})
+    for zona_id, zona in zonas.items():
+        meta = metas_por_zona[zona_id]
+        total = encuestas_por_zona.get(zona_id, 0)
+        porcentaje = _porcentaje(total, meta)
+        cobertura_zonas.append(
+            {
+                "id": zona_id,
+                "nombre": zona["nombre"],
+                "municipio": zona["municipio__nombre"],
+                "meta_encuestas": meta,
+                "total_encuestas": total,
+                "cobertura_porcentaje": porcentaje,
+                "estado": _calcular_estado_cobertura(porcentaje),
+            }
+        )
+        resumen = resumen_por_municipio[zona["municipio__nombre"]]
+        resumen["total_zonas"] += 1
+        resumen["total_encuestas"] += total
+        resumen["meta_total"] += meta
+
+    cobertura_municipios = []
+    for municipio_nombre, resumen in resumen_por_municipio.items():
+        meta_total = resumen["meta_total"] or 0
+        cobertura_municipios.append(
+            {
+                "municipio": municipio_nombre,
+                "total_zonas": resumen["total_zonas"],
+                "total_encuestas": resumen["total_encuestas"],
+                "meta_total": meta_total,
+                "cobertura_porcentaje": _porcentaje(resumen["total_encuestas"], meta_total),
+            }
+        )
+
+    necesidades_qs = EncuestaNecesidad.objects.all()
+    if start_date:
+        necesidades_qs = necesidades_qs.filter(encuesta__fecha_creacion__gte=start_date)
+    if end_date:
+        necesidades_qs = necesidades_qs.filter(encuesta__fecha_creacion__lte=end_date)
+
+    total_necesidades = 0
+    necesidades_totales = Counter()
+    necesidades_municipio = Counter()
+    necesidades_zona = Counter()
+    necesidades_zona_detalle = Counter()
+    necesidades_por_colaborador = defaultdict(Counter)
+    for item in necesidades_qs.values(
+        "encuesta__zona_id", "encuesta__colaborador_id", "necesidad__nombre"
+    ).annotate(total=Count("id")):
+        zona_id = item["encuesta__zona_id"]
+        nombre = item["necesidad__nombre"]
+        total = item["total"]
+        total_necesidades += total
+        necesidades_totales[nombre] += total
+        necesidades_municipio[zonas[zona_id]["municipio__nombre"]] += total
+        necesidades_zona[zona_id] += total
+        necesidades_zona_detalle[(zona_id, nombre)] += total
+        necesidades_por_colaborador[item["encuesta__colaborador_id"]][nombre] += total
+
+    top_necesidades = [
+        {"necesidad__nombre": nombre, "total": total}
+        for nombre, total in necesidades_totales.most_common(5)
+    ]
+    necesidades_por_municipio = [
+        {"encuesta__zona__municipio__nombre": municipio, "total": total}
+        for municipio, total in necesidades_municipio.most_common()
+    ]
+    necesidades_por_municipio_zona = sorted(
+        (
+            {
+                "encuesta__zona__id": zona_id,
+                "encuesta__zona__municipio__nombre": zonas[zona_id]["municipio__nombre"],
+                "encuesta__zona__nombre": zonas[zona_id]["nombre"],
+                "total": total,
+            }
+            for zona_id, total in necesidades_zona.items()
+        ),
+        key=lambda item: (item["encuesta__zona__municipio__nombre"], -item["total"]),
+    )
+    necesidades_por_zona_detalle = sorted(
+        (
+            {
+                "encuesta__zona__id": zona_id,
+                "encuesta__zona__nombre": zonas[zona_id]["nombre"],
+                "encuesta__zona__municipio__nombre": zonas[zona_id]["municipio__nombre"],
+                "necesidad__nombre": nombre,
+                "total": total,
+            }
+            for (zona_id, nombre), total in necesidades_zona_detalle.items()
+        ),
+        key=lambda item: (
+            item["encuesta__zona__municipio__nombre"],
+            item["encuesta__zona__nombre"],
+            -item["total"],
+        ),
+    )
+    necesidades_zona_nombre = Counter()
+    for zona_id, total in necesidades_zona.items():
+        necesidades_zona_nombre[(zonas[zona_id]["nombre"], zonas[zona_id]["municipio__nombre"])] += total
+    necesidades_por_zona = [
+        {"encuesta__zona__nombre": zona, "encuesta__zona__municipio__nombre": municipio, "total": total}
+        for (zona, municipio), total in necesidades_zona_nombre.most_common()
+    ]
+
+    comentarios = (
+        encuestas.exclude(comentario_problema__isnull=True)
+        .exclude(comentario_problema__exact="")
+        .values("zona_id", "comentario_problema", "fecha_creacion", "colaborador__name", "caso_critico")
+    )
+    comentarios_data = [
+        {
+            "zona": zonas[item["zona_id"]]["nombre"],
+            "municipio": zonas[item["zona_id"]]["municipio__nombre"],
+            "comentario": item["comentario_problema"],
+            "fecha": item["fecha_creacion"].isoformat(),
+            "encuestador": item["colaborador__name"],
+            "caso_critico": item["caso_critico"],
+        }
+        for item in comentarios
+    ]
+
+    temas = temas_recurrentes(start_date, end_date)
+
+    total_casos = 0
+    casos_prioridad = Counter()
+    casos_estado = Counter()
+    for item in CasoCiudadano.objects.values("nivel_prioridad", "estado").annotate(total=Count("id")):
+        total_casos += item["total"]
+        casos_prioridad[item["nivel_prioridad"]] += item["total"]
+        casos_estado[item["estado"]] += item["total"]
+    casos_por_prioridad = [
+        {"nivel_prioridad": prioridad, "total": total} for prioridad, total in casos_prioridad.items()
+    ]
+    casos_por_estado = [{"estado": estado, "total": total} for estado, total in casos_estado.items()]
+    casos_criticos = [
+        {
+            "id": item["id"],
+            "prioridad": item["nivel_prioridad"],
+            "estado": item["estado"],
+            "zona": item["encuesta__zona__nombre"],
+            "municipio": item["encuesta__zona__municipio__nombre"],
+        }
+        for item in CasoCiudadano.objects.filter(
+            nivel_prioridad=CasoCiudadano.Prioridad.ALTA
+        ).values(
+            "id",
+            "nivel_prioridad",
+            "estado",
+            "encuesta__zona__nombre",
+            "encuesta__zona__municipio__nombre",
+        )[:20]
+    ]
+
+    zonas_por_ruta = defaultdict(list)
+    for item in RutaZona.objects.values("ruta_id", "zona_id").order_by("id"):
+        zonas_por_ruta[item["ruta_id"]].append(item["zona_id"])
+    colaboradores_por_ruta = {
+        item["ruta_id"]: item["total"]
+        for item in RutaColaborador.objects.values("ruta_id").annotate(total=Count("id"))
+    }
+    rutas_resumen = []
+    for ruta in RutaVisita.objects.values("id", "nombre_ruta", "estado"):
+        zona_ids = zonas_por_ruta.get(ruta["id"], [])
+        zona_items = []
+        for zona_id in zona_ids:
+            meta = metas_por_zona.get(zona_id, 0)
+            total = encuestas_por_zona.get(zona_id, 0)
+            zona_items.append(
+                {
+                    "nombre": zonas[zona_id]["nombre"],
+                    "municipio": zonas[zona_id]["municipio__nombre"],
+                    "meta_encuestas": meta,
+                    "total_encuestas": total,
+                    "cobertura_porcentaje": _porcentaje(total, meta),
+                }
+            )
+        rutas_resumen.append(
+            {
+                "id": ruta["id"],
+                "nombre": ruta["nombre_ruta"],
+                "estado": ruta["estado"],
+                "colaboradores": colaboradores_por_ruta.get(ruta["id"], 0),
+                "zonas": zona_items,
+                "avance": _calcular_avance_ruta(
+                    zona_ids, metas_por_zona, encuestas_historicas_por_zona
+                ),
+            }
+        )
+
+    encuestadores = []
+    for colaborador_id in sorted(encuestas_por_colaborador):
+        top_needs = necesidades_por_colaborador.get(colaborador_id, Counter())
+        encuestadores.append(
+            {
+                "id": colaborador_id,
+                "nombre": nombres_colaborador[colaborador_id],
+                "total_encuestas": encuestas_por_colaborador[colaborador_id],
+                "zonas": sorted(zonas_por_colaborador[colaborador_id]),
+                "necesidades_top": [
+                    {"nombre": n, "total": total} for n, total in top_needs.most_common(3)
+                ],
+                "serie": [
+                    {"fecha": fecha.isoformat(), "total": total}
+                    for fecha, total in series_por_colaborador[colaborador_id].items()
+                ],
+            }
+        )
+
+    data = {
+        "titulo": "REPORTE ÚNICO DE INTELIGENCIA TERRITORIAL",
+        "generado_en": now().isoformat(),
+        "resumen_general": {
+            "total_departamentos": Departamento.objects.count(),
+            "total_municipios": Municipio.objects.count(),
+            "total_zonas": len(zonas),
+            "total_encuestas": sum(encuestas_por_zona.values()),
+            "total_necesidades": total_necesidades,
+            "total_casos": total_casos,
+        },
+        "cobertura": {
+            "zonas": cobertura_zonas,
+            "municipios": cobertura_municipios,
+        },
+        "necesidades": {
+            "top": top_necesidades,
+            "por_municipio": necesidades_por_municipio,
+            "por_municipio_zona": necesidades_por_municipio_zona,
+            "por_zona_detalle": necesidades_por_zona_detalle,
+            "por_zona": necesidades_por_zona,
+        },
+        "comentarios": {
+            "detalle": comentarios_data,
+            "temas_recurrentes": temas,
+        },
+        "casos": {
+            "total": total_casos,
+            "por_prioridad": casos_por_prioridad,
+            "por_estado": casos_por_estado,
+            "criticos": casos_criticos,
+        },
+        "rutas": {
+            "total": len(rutas_resumen),
+            "detalle": rutas_resumen,
+        },
+        "encuestadores": encuestadores,
+    }
+    return data
@@ -0,0 +1,383 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import unittest
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings, tag
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from routes.models import RutaVisita, RutaZona
+from surveys.counters import reconstruir_cobertura
+from surveys.models import Encuesta, EncuestaNecesidad, Necesidad
+from territory.models import Departamento, MetaZona, Municipio, Zona
+from .jobs import TIEMPO_MAXIMO, pendientes, procesar, solicitar_reporte
+from .models import TrabajoReporte
+from . import pdf
+from .pdf import escribir_pdf
+
+# Presupuesto del PDF completo con el volumen de referencia.
+PRESUPUESTO_SEGUNDOS = 60
+# Como en ``pitpc.test_benchmarks``: la siembra es lenta y el tiempo varía entre máquinas.
+EJECUTAR = os.environ.get("BENCHMARK") == "1"
+TIEMPOS = os.environ.get("BENCHMARK_TIEMPOS") == "1"
+
+
+class ReportePdfVolumen:
+    """Siembra para el PDF sin recortes; cada suite define el volumen y sus límites."""
+
+    ZONAS = None
+    MUNICIPIOS = None
+    COLABORADORES = None
+    ENCUESTAS = None
+    RUTAS = None
+    PAGINAS_MINIMAS = None
+    PRESUPUESTO_MEMORIA_MB = None
+    LOTE = pdf.LOTE
+
+    @classmethod
+    def setUpTestData(cls):
+        azar = random.Random(7)
+        departamento = Departamento.objects.create(nombre="Departamento")
+        Municipio.objects.bulk_create(
+            Municipio(nombre=f"Municipio {i}", departamento=departamento) for i in range(cls.MUNICIPIOS)
+        )
+        municipios = list(Municipio.objects.values_list("id", flat=True))
+        Zona.objects.bulk_create(
+            Zona(nombre=f"Zona {i}", tipo="BARRIO", municipio_id=municipios[i % cls.MUNICIPIOS])
+            for i in range(cls.ZONAS)
+        )
+        zonas = list(Zona.objects.values_list("id", flat=True))
+        MetaZona.objects.bulk_create(MetaZona(zona_id=zona, meta_encuestas=azar.randint(5, 30)) for zona in zonas)
+        User.objects.bulk_create(
+            User(email=f"colaborador{i}@example.com", name=f"Colaborador {i}", role="COLABORADOR")
+            for i in range(cls.COLABORADORES)
+        )
+        colaboradores = list(User.objects.values_list("id", flat=True))
+        necesidades = [
+            Necesidad.objects.create(nombre=nombre).id for nombre in ("Agua", "Vías", "Empleo", "Salud", "Educación")
+        ]
+        Encuesta.objects.bulk_create(
+            Encuesta(
+                zona_id=azar.choice(zonas),
+                colaborador_id=colaboradores[i % cls.COLABORADORES],
+                cedula=str(i),
+                telefono="3000000000",
+                tipo_vivienda="PROPIA",
+                rango_edad="26-40",
+                ocupacion="OTRO",
+            )
+            for i in range(cls.ENCUESTAS)
+        )
+        EncuestaNecesidad.objects.bulk_create(
+            EncuestaNecesidad(encuesta_id=encuesta, necesidad_id=necesidades[(encuesta + k) % 5], prioridad=k + 1)
+            for encuesta in Encuesta.objects.values_list("id", flat=True)
+            for k in range(2)
+        )
+        RutaVisita.objects.bulk_create(
+            RutaVisita(nombre_ruta=f"Ruta {i}", lider_creador_id=colaboradores[0]) for i in range(cls.RUTAS)
+        )
+        RutaZona.objects.bulk_create(
+            RutaZona(ruta_id=ruta, zona_id=azar.choice(zonas))
+            for ruta in RutaVisita.objects.values_list("id", flat=True)
+            for _ in range(5)
+        )
+        reconstruir_cobertura()
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.destino = os.path.join(directorio.name, "reporte.pdf")
+
+    def test_memoria_acotada_con_rango_de_fechas(self):
+        tracemalloc.start()
+        try:
+            with mock.patch.object(pdf, "LOTE", self.LOTE):
+                escribir_pdf(self.destino, date(2000, 1, 1), None)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(pico / (1024 * 1024), self.PRESUPUESTO_MEMORIA_MB)
+        with open(self.destino, "rb") as archivo:
+            contenido = archivo.read()
+        # Una fila por zona y por encuestador.
+        self.assertGreater(contenido.count(b"/Type /Page\n"), self.PAGINAS_MINIMAS)
+
+
+class ReportePdfMemoriaTests(ReportePdfVolumen, TestCase):
+    """Volumen chico en cada corrida; lotes chicos para que el reporte recorra varios."""
+
+    ZONAS = 600
+    MUNICIPIOS = 12
+    COLABORADORES = 300
+    ENCUESTAS = 3000
+    RUTAS = 120
+    PAGINAS_MINIMAS = 50
+    PRESUPUESTO_MEMORIA_MB = 8
+    LOTE = 100
+
+
+@tag("benchmark")
+@unittest.skipUnless(EJECUTAR, "Suite de rendimiento: correr con BENCHMARK=1.")
+class ReportePdfVolumenTests(ReportePdfVolumen, TestCase):
+    """PDF sin recortes con 10k zonas, 5k encuestadores y 50k encuestas."""
+
+    ZONAS = 10000
+    MUNICIPIOS = 100
+    COLABORADORES = 5000
+    ENCUESTAS = 50000
+    RUTAS = 2000
+    PAGINAS_MINIMAS = 500
+    PRESUPUESTO_MEMORIA_MB = 64
+
+    def test_pdf_completo_dentro_del_presupuesto(self):
+        inicio = time.perf_counter()
+        escribir_pdf(self.destino)
+        duracion = time.perf_counter() - inicio
+
+        if TIEMPOS:
+            self.assertLess(duracion, PRESUPUESTO_SEGUNDOS)
+        with open(self.destino, "rb") as archivo:
+            contenido = archivo.read()
+        # Una fila por zona y por encuestador: el reporte ocupa cientos de páginas.
+        self.assertGreater(contenido.count(b"/Type /Page\n"), self.PAGINAS_MINIMAS)
+
+
+class FilasEncuestadoresTests(TestCase):
+    """La sección de encuestadores recorre los usuarios por llave y agrupa cada lote."""
+
+    @classmethod
+    def setUpTestData(cls):
+        zona = Zona.objects.create(
+            nombre="Zona",
+            tipo="BARRIO",
+            municipio=Municipio.objects.create(
+                nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+            ),
+        )
+        agua = Necesidad.objects.create(nombre="Agua")
+        cls.usuarios = User.objects.bulk_create(
+            User(email=f"u{i}@example.com", name=nombre, role=User.Roles.COLABORADOR)
+            for i, nombre in enumerate(["Beatriz", "Ana", "Carlos", "Ana"])
+        )
+        cedulas = iter(range(1, 100))
+        for usuario, cantidad in zip(cls.usuarios, [2, 1, 0, 3]):
+            for _ in range(cantidad):
+                encuesta = Encuesta.objects.create(
+                    zona=zona,
+                    colaborador=usuario,
+                    cedula=str(next(cedulas)),
+                    telefono="3000000000",
+                    tipo_vivienda="PROPIA",
+                    rango_edad="26-40",
+                    ocupacion="OTRO",
+                )
+                EncuestaNecesidad.objects.create(encuesta=encuesta, necesidad=agua, prioridad=1)
+
+    def test_filas_en_orden_y_sin_usuarios_sin_encuestas(self):
+        esperado = [
+            ("Ana", 1, 1, "Agua (1)"),
+            ("Ana", 3, 1, "Agua (3)"),
+            ("Beatriz", 2, 1, "Agua (2)"),
+        ]
+        self.assertEqual(list(pdf._filas_encuestadores(None, None)), esperado)
+        # Lotes de un usuario: cada uno agrupa solo sus encuestas y el resultado no cambia.
+        with mock.patch.object(pdf, "LOTE", 1):
+            self.assertEqual(list(pdf._filas_encuestadores(None, None)), esperado)
+        self.assertEqual(list(pdf._filas_encuestadores(date(2100, 1, 1), None)), [])
+
+
+class TrabajosTests(TestCase):
+    """Pedidos idénticos comparten trabajo, los perdidos se retoman y la descarga atiende rangos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(email="a@example.com", name="A", role=User.Roles.ADMIN)
+        cls.lider = User.objects.create(email="l@example.com", name="L", role=User.Roles.LIDER)
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=directorio.name, REPORTES_WORKER_LOCAL=False)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client = APIClient(HTTP_HOST="localhost")
+        self.client.force_authenticate(self.admin)
+
+    def _pedir(self, **parametros):
+        with self.captureOnCommitCallbacks() as encolados:
+            respuesta = self.client.post("/api/reportes/trabajos/", parametros, format="json")
+        return respuesta, len(encolados)
+
+    def _vencer(self, trabajo):
+        hace_rato = timezone.now() - TIEMPO_MAXIMO - timedelta(minutes=1)
+        TrabajoReporte.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoReporte.Estado.EN_PROCESO, iniciado_en=hace_rato
+        )
+
+    def test_pedidos_identicos_comparten_trabajo(self):
+        primera, encolados = self._pedir(start_date="2026-01-01")
+        self.assertEqual((primera.status_code, primera.data["estado"], encolados), (202, "PENDIENTE", 1))
+        segunda, encolados = self._pedir(start_date="2026-01-01")
+        self.assertEqual((segunda.data["id"], encolados), (primera.data["id"], 0))
+        # Otros parámetros u otros datos son otro trabajo.
+        self.assertNotEqual(self._pedir(start_date="2026-02-01")[0].data["id"], primera.data["id"])
+        Encuesta.objects.create(
+            zona=self.zona,
+            colaborador=self.admin,
+            cedula="1",
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+        )
+        actual = self._pedir(start_date="2026-01-01")[0].data["id"]
+        self.assertNotEqual(actual, primera.data["id"])
+        self.assertEqual(TrabajoReporte.objects.count(), 3)
+
+        self.assertTrue(procesar(actual))
+        # Ya tomado: otro worker no lo repite.
+        self.assertFalse(procesar(actual))
+        # Terminado, el mismo pedido lo devuelve listo sin encolar nada.
+        respuesta, encolados = self._pedir(start_date="2026-01-01")
+        self.assertEqual((respuesta.status_code, respuesta.data["id"], encolados), (200, actual, 0))
+        self.assertEqual(respuesta.data["estado"], "COMPLETADO")
+
+    def test_retoma_trabajos_vencidos(self):
+        trabajo = solicitar_reporte({"start_date": None, "end_date": None}, self.admin)
+        TrabajoReporte.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoReporte.Estado.EN_PROCESO, iniciado_en=timezone.now()
+        )
+        # En proceso y a tiempo: nadie más lo toma.
+        self.assertEqual(list(pendientes()), [])
+        self.assertEqual(self._pedir()[1], 0)
+        self._vencer(trabajo)
+        self.assertEqual(list(pendientes()), [trabajo])
+        respuesta, encolados = self._pedir()
+        self.assertEqual((respuesta.data["id"], respuesta.data["estado"], encolados), (trabajo.pk, "PENDIENTE", 1))
+        self.assertIsNone(respuesta.data["iniciado_en"])
+
+        # El worker fuera de proceso también lo retoma.
+        self._vencer(trabajo)
+        salida = StringIO()
+        call_command("run_report_worker", "--once", stdout=salida)
+        self.assertIn(f"Reporte {trabajo.pk}: COMPLETADO", salida.getvalue())
+
+    def test_worker_retoma_al_arrancar(self):
+        trabajo = solicitar_reporte({"start_date": None, "end_date": None}, self.admin)
+        # Recién tomado por un worker que murió: aún no vence.
+        TrabajoReporte.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoReporte.Estado.EN_PROCESO, iniciado_en=timezone.now()
+        )
+        call_command("run_report_worker", "--once", "--sin-recuperar", stdout=StringIO())
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, TrabajoReporte.Estado.EN_PROCESO)
+        salida = StringIO()
+        call_command("run_report_worker", "--once", stdout=salida)
+        self.assertIn("1 reportes retomados", salida.getvalue())
+        self.assertIn(f"Reporte {trabajo.pk}: COMPLETADO", salida.getvalue())
+
+    def test_fallido_o_sin_archivo_se_reencola(self):
+        trabajo = solicitar_reporte({"start_date": None, "end_date": None}, self.admin)
+        TrabajoReporte.objects.filter(pk=trabajo.pk).update(estado=TrabajoReporte.Estado.FALLIDO, error="x")
+        respuesta, encolados = self._pedir()
+        self.assertEqual((respuesta.data["estado"], respuesta.data["error"], encolados), ("PENDIENTE", "", 1))
+        procesar(trabajo.pk)
+        trabajo.refresh_from_db()
+        default_storage.delete(trabajo.archivo.name)
+        respuesta, encolados = self._pedir()
+        self.assertEqual((respuesta.data["id"], respuesta.data["estado"], encolados), (trabajo.pk, "PENDIENTE", 1))
+
+    def test_depura_vencidos_y_reemplazados(self):
+        parametros = {"start_date": None, "end_date": None}
+        viejo = solicitar_reporte(parametros, self.admin)
+        procesar(viejo.pk)
+        viejo.refresh_from_db()
+        # Nuevos datos: el mismo pedido es otro trabajo y el anterior queda reemplazado.
+        RutaVisita.objects.create(nombre_ruta="Ruta", lider_creador=self.lider)
+        actual = solicitar_reporte(parametros, self.admin)
+        procesar(actual.pk)
+        actual.refresh_from_db()
+        otro = solicitar_reporte({"start_date": "2026-01-01", "end_date": None}, self.admin)
+        procesar(otro.pk)
+        otro.refresh_from_db()
+        en_curso = solicitar_reporte({"start_date": "2026-03-01", "end_date": None}, self.admin)
+        self.assertNotEqual(actual.pk, viejo.pk)
+
+        salida = StringIO()
+        call_command("prune_report_jobs", stdout=salida)
+        self.assertIn("1 trabajos", salida.getvalue())
+        self.assertEqual(
+            set(TrabajoReporte.objects.values_list("pk", flat=True)), {actual.pk, otro.pk, en_curso.pk}
+        )
+        self.assertFalse(default_storage.exists(viejo.archivo.name))
+        self.assertTrue(default_storage.exists(actual.archivo.name))
+
+        # Terminado hace más de la retención: se borra con su archivo; uno sin terminar no.
+        hace_dias = timezone.now() - timedelta(days=8)
+        TrabajoReporte.objects.filter(pk=otro.pk).update(terminado_en=hace_dias)
+        TrabajoReporte.objects.filter(pk=en_curso.pk).update(creado_en=hace_dias)
+        with override_settings(REPORTES_RETENCION_DIAS=7):
+            call_command("prune_report_jobs", stdout=StringIO())
+        self.assertEqual(set(TrabajoReporte.objects.values_list("pk", flat=True)), {actual.pk, en_curso.pk})
+        self.assertFalse(default_storage.exists(otro.archivo.name))
+
+    def test_pdf_compatible_redirige_a_la_descarga(self):
+        with self.captureOnCommitCallbacks():
+            pendiente = self.client.get("/api/reportes/pdf/", {"start_date": "2026-01-01"})
+        self.assertEqual((pendiente.status_code, pendiente["Retry-After"]), (202, "5"))
+        procesar(pendiente.data["id"])
+        listo = self.client.get("/api/reportes/pdf/", {"start_date": "2026-01-01"}, follow=True)
+        self.assertEqual(
+            listo.redirect_chain, [(f"/api/reportes/trabajos/{pendiente.data['id']}/descargar/", 302)]
+        )
+        self.assertTrue(b"".join(listo.streaming_content).startswith(b"%PDF"))
+        listo.close()
+
+    def test_descarga_con_rangos(self):
+        trabajo = solicitar_reporte({"start_date": None, "end_date": None}, self.admin)
+        ruta = f"/api/reportes/trabajos/{trabajo.pk}/descargar/"
+        self.assertEqual(self.client.get(ruta).status_code, 409)
+        procesar(trabajo.pk)
+        respuesta = self.client.get(f"/api/reportes/trabajos/{trabajo.pk}/")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.data["descarga"].endswith(ruta))
+
+        completo = self.client.get(ruta)
+        self.assertEqual(completo.status_code, 200)
+        self.assertEqual(completo["Accept-Ranges"], "bytes")
+        contenido = b"".join(completo.streaming_content)
+        completo.close()
+        self.assertTrue(contenido.startswith(b"%PDF"))
+        tamano = len(contenido)
+
+        parcial = self.client.get(ruta, HTTP_RANGE="bytes=0-9")
+        self.assertEqual(parcial.status_code, 206)
+        self.assertEqual(parcial["Content-Range"], f"bytes 0-9/{tamano}")
+        self.assertEqual(b"".join(parcial.streaming_content), contenido[:10])
+        # Desde un punto hasta el final y los últimos N bytes.
+        hasta_el_final = self.client.get(ruta, HTTP_RANGE="bytes=100-")
+        self.assertEqual(b"".join(hasta_el_final.streaming_content), contenido[100:])
+        sufijo = self.client.get(ruta, HTTP_RANGE="bytes=-5")
+        self.assertEqual(sufijo["Content-Range"], f"bytes {tamano - 5}-{tamano - 1}/{tamano}")
+        self.assertEqual(b"".join(sufijo.streaming_content), contenido[-5:])
+
+        fuera = self.client.get(ruta, HTTP_RANGE=f"bytes={tamano}-")
+        self.assertEqual(fuera.status_code, 416)
+        self.assertEqual(fuera["Content-Range"], f"bytes */{tamano}")
+
+        lider = APIClient(HTTP_HOST="localhost")
+        lider.force_authenticate(self.lider)
+        self.assertEqual(lider.get(ruta).status_code, 403)
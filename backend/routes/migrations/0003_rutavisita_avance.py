@@ -0,0 +1,42 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def calcular_estado(apps, schema_editor):
+    RutaVisita = apps.get_model("routes", "RutaVisita")
+    RutaZona = apps.get_model("routes", "RutaZona")
+    zonas = defaultdict(list)
+    for ruta_id, meta, hechas in RutaZona.objects.values_list(
+        "ruta_id", "zona__meta__meta_encuestas", "zona__cobertura__total_encuestas"
+    ):
+        zonas[ruta_id].append((meta, hechas or 0))
+    rutas = []
+    for ruta in RutaVisita.objects.only("id"):
+        metas = zonas.get(ruta.id, [])
+        total = sum(min(hechas / meta * 100, 100) for meta, hechas in metas if meta)
+        ruta.avance = round(total / len(metas), 2) if metas else 0
+        if metas and all(hechas >= meta for meta, hechas in metas if meta is not None):
+            ruta.estado = "COMPLETADA"
+        elif ruta.avance > 0:
+            ruta.estado = "EN_CURSO"
+        else:
+            ruta.estado = "PENDIENTE"
+        rutas.append(ruta)
+    RutaVisita.objects.bulk_update(rutas, ["avance", "estado"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("routes", "0002_rutavisita_actualizado_en"),
+        ("surveys", "0010_indices_consultas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rutavisita",
+            name="avance",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_estado, migrations.RunPython.noop),
+    ]
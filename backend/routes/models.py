@@ -1,6 +1,10 @@
+from collections import defaultdict
+
 from django.db import models
+from django.utils import timezone
 
 from accounts.models import User
+from pitpc.pagination import lotes_por_llave
 from territory.models import Zona
 
 
@@ -15,31 +19,17 @@ class RutaVisita(models.Model):
     fecha_inicio = models.DateField(null=True, blank=True)
     fecha_fin = models.DateField(null=True, blank=True)
     estado = models.CharField(max_length=15, choices=Estado.choices, default=Estado.PENDIENTE)
+    # Estado y avance se mantienen con cada escritura de encuestas (``actualizar_rutas_de_zonas``).
+    avance = models.FloatField(default=0, editable=False)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.nombre_ruta
 
-    @property
-    def avance(self):
-        zonas = [rz.zona for rz in self.ruta_zonas.select_related("zona", "zona__meta")]
-        if not zonas:
-            return 0
-        total = 0
-        for zona in zonas:
-            meta = zona.meta.meta_encuestas if hasattr(zona, "meta") else 0
-            hechas = zona.encuestas.count()
-            if meta > 0:
-                total += min((hechas / meta) * 100, 100)
-        return round(total / len(zonas), 2)
-
     def actualizar_estado(self):
-        zonas = [rz.zona for rz in self.ruta_zonas.select_related("zona", "zona__meta")]
-        if zonas and all(zona.encuestas.count() >= zona.meta.meta_encuestas for zona in zonas if hasattr(zona, "meta")):
-            self.estado = self.Estado.COMPLETADA
-        elif self.avance > 0:
-            self.estado = self.Estado.EN_CURSO
-        else:
-            self.estado = self.Estado.PENDIENTE
+        progreso = progreso_de_rutas([self.pk])[self.pk]
+        self.avance = progreso["avance"]
+        self.estado = _estado(progreso)
         self.save()
 
 
@@ -51,3 +41,60 @@ class RutaZona(models.Model):
 class RutaColaborador(models.Model):
     ruta = models.ForeignKey(RutaVisita, on_delete=models.CASCADE, related_name="ruta_colaboradores")
     colaborador = models.ForeignKey(User, on_delete=models.CASCADE, related_name="rutas_asignadas")
+
+
+def progreso_de_rutas(ruta_ids):
+    """``{ruta_id: {"avance", "completa"}}`` desde los contadores de cobertura, en una consulta.
+
+    El avance promedia, por zona, las encuestas hechas sobre la meta (tope 100 %);
+    las zonas sin meta cuentan como 0. La ruta está completa cuando todas sus
+    zonas con meta la alcanzaron.
+    """
+    zonas = defaultdict(list)
+    filas = RutaZona.objects.filter(ruta_id__in=ruta_ids).values_list(
+        "ruta_id", "zona__meta__meta_encuestas", "zona__cobertura__total_encuestas"
+    )
+    for ruta_id, meta, hechas in filas:
+        zonas[ruta_id].append((meta, hechas or 0))
+
+    progreso = {}
+    for ruta_id in ruta_ids:
+        metas = zonas.get(ruta_id, [])
+        total = sum(min(hechas / meta * 100, 100) for meta, hechas in metas if meta)
+        progreso[ruta_id] = {
+            "avance": round(total / len(metas), 2) if metas else 0,
+            "completa": bool(metas) and all(hechas >= meta for meta, hechas in metas if meta is not None),
+        }
+    return progreso
+
+
+def _estado(progreso):
+    if progreso["completa"]:
+        return RutaVisita.Estado.COMPLETADA
+    if progreso["avance"] > 0:
+        return RutaVisita.Estado.EN_CURSO
+    return RutaVisita.Estado.PENDIENTE
+
+
+def actualizar_rutas(rutas):
+    """Recalcula estado y avance de ``rutas`` y guarda solo las filas que cambiaron."""
+    for lote in lotes_por_llave(rutas.values("id", "avance", "estado")):
+        progreso = progreso_de_rutas([fila["id"] for fila in lote])
+        marca = timezone.now()
+        cambios = []
+        for fila in lote:
+            nuevo = progreso[fila["id"]]
+            estado = _estado(nuevo)
+            if (fila["avance"], fila["estado"]) != (nuevo["avance"], estado):
+                cambios.append(
+                    RutaVisita(id=fila["id"], avance=nuevo["avance"], estado=estado, actualizado_en=marca)
+                )
+        RutaVisita.objects.bulk_update(cambios, ["avance", "estado", "actualizado_en"])
+
+
+def actualizar_rutas_de_zonas(zona_ids=None):
+    """Reevalúa solo las rutas que pasan por ``zona_ids`` (índice de ``RutaZona.zona``); todas con ``None``."""
+    rutas = RutaVisita.objects.all()
+    if zona_ids is not None:
+        rutas = rutas.filter(id__in=RutaZona.objects.filter(zona_id__in=zona_ids).values("ruta_id"))
+    actualizar_rutas(rutas)
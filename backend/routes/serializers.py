@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from accounts.serializers import UserSerializer
+from pitpc.serializers import SparseFieldsMixin
 from territory.models import Zona
 from territory.serializers import ZonaSerializer
 from .models import RutaColaborador, RutaVisita, RutaZona
@@ -28,10 +29,9 @@ class RutaColaboradorSerializer(serializers.ModelSerializer):
         fields = ["id", "colaborador", "colaborador_id"]
 
 
-class RutaVisitaSerializer(serializers.ModelSerializer):
+class RutaVisitaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     ruta_zonas = RutaZonaSerializer(many=True, required=False)
     ruta_colaboradores = RutaColaboradorSerializer(many=True, required=False)
-    avance = serializers.FloatField(read_only=True)
 
     class Meta:
         model = RutaVisita
@@ -56,6 +56,7 @@ class RutaVisitaSerializer(serializers.ModelSerializer):
             RutaZona.objects.create(ruta=ruta, **zona)
         for col in colaboradores:
             RutaColaborador.objects.create(ruta=ruta, **col)
+        ruta.actualizar_estado()
         return ruta
 
     def update(self, instance, validated_data):
@@ -70,6 +71,7 @@ class RutaVisitaSerializer(serializers.ModelSerializer):
             instance.ruta_zonas.all().delete()
             for zona in zonas:
                 RutaZona.objects.create(ruta=instance, **zona)
+            instance.actualizar_estado()
 
         if colaboradores is not None:
             instance.ruta_colaboradores.all().delete()
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from surveys.counters import cobertura_actualizada
+from territory.models import MetaZona
+from .models import actualizar_rutas_de_zonas
+
+
+@receiver(cobertura_actualizada)
+def reevaluar_rutas_por_cobertura(sender, zona_ids, **kwargs):
+    actualizar_rutas_de_zonas(zona_ids)
+
+
+@receiver(post_save, sender=MetaZona)
+@receiver(post_delete, sender=MetaZona)
+def reevaluar_rutas_por_meta(sender, instance, **kwargs):
+    actualizar_rutas_de_zonas([instance.zona_id])
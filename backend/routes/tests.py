@@ -1,3 +1,64 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from surveys.models import Encuesta
+from territory.models import Departamento, MetaZona, Municipio, Zona
+from .models import RutaVisita, RutaZona
+
+
+class EstadoRutaTests(TestCase):
+    """El estado y el avance de las rutas siguen a las escrituras de encuestas y metas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zonas = [Zona.objects.create(nombre=f"Zona {i}", tipo="BARRIO", municipio=municipio) for i in range(3)]
+        for zona in cls.zonas[:2]:
+            MetaZona.objects.create(zona=zona, meta_encuestas=2)
+        cls.lider = User.objects.create(email="lider@example.com", name="Líder", role=User.Roles.LIDER)
+        cls.ruta = RutaVisita.objects.create(nombre_ruta="Ruta", lider_creador=cls.lider)
+        cls.otra = RutaVisita.objects.create(nombre_ruta="Otra", lider_creador=cls.lider)
+        for zona in cls.zonas[:2]:
+            RutaZona.objects.create(ruta=cls.ruta, zona=zona)
+        RutaZona.objects.create(ruta=cls.otra, zona=cls.zonas[2])
+
+    def _encuesta(self, zona):
+        return Encuesta.objects.create(
+            zona=zona,
+            colaborador=self.lider,
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+        )
+
+    def _estado(self, ruta):
+        ruta.refresh_from_db()
+        return ruta.estado, ruta.avance
+
+    def test_las_encuestas_avanzan_y_completan_la_ruta(self):
+        self.assertEqual(self._estado(self.ruta), (RutaVisita.Estado.PENDIENTE, 0))
+        self._encuesta(self.zonas[0])
+        self.assertEqual(self._estado(self.ruta), (RutaVisita.Estado.EN_CURSO, 25))
+        for zona in (self.zonas[0], self.zonas[1], self.zonas[1]):
+            self._encuesta(zona)
+        self.assertEqual(self._estado(self.ruta), (RutaVisita.Estado.COMPLETADA, 100))
+
+    def test_borrar_una_encuesta_retrocede_la_ruta(self):
+        encuestas = [self._encuesta(zona) for zona in (self.zonas[0], self.zonas[0], self.zonas[1], self.zonas[1])]
+        encuestas[0].delete()
+        self.assertEqual(self._estado(self.ruta), (RutaVisita.Estado.EN_CURSO, 75))
+
+    def test_solo_se_tocan_las_rutas_de_la_zona(self):
+        antes = RutaVisita.objects.get(pk=self.otra.pk).actualizado_en
+        self._encuesta(self.zonas[0])
+        self.assertEqual(RutaVisita.objects.get(pk=self.otra.pk).actualizado_en, antes)
+
+    def test_cambiar_la_meta_reevalua_la_ruta(self):
+        self._encuesta(self.zonas[0])
+        MetaZona.objects.filter(zona=self.zonas[0]).get().delete()
+        self.assertEqual(self._estado(self.ruta), (RutaVisita.Estado.PENDIENTE, 0))
+        MetaZona.objects.create(zona=self.zonas[0], meta_encuestas=1)
+        self.assertEqual(self._estado(self.ruta), (RutaVisita.Estado.EN_CURSO, 50))
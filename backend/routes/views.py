@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from accounts.permissions import IsLeader, IsLeaderOrAdmin, IsSurveySubmitter
+from pitpc.serializers import incluye_campo
 from .models import RutaColaborador, RutaVisita
 from .serializers import RutaColaboradorSerializer, RutaVisitaSerializer
 
@@ -14,7 +15,7 @@ class RouteViewSet(
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = RutaVisita.objects.prefetch_related("ruta_zonas__zona", "ruta_colaboradores__colaborador")
+    queryset = RutaVisita.objects.all()
     serializer_class = RutaVisitaSerializer
 
     def get_permissions(self):
@@ -31,6 +32,12 @@ class RouteViewSet(
             qs = qs.filter(lider_creador=user)
         if user.is_collaborator:
             qs = qs.filter(ruta_colaboradores__colaborador=user)
+        if incluye_campo(self.request, "ruta_zonas"):
+            qs = qs.prefetch_related(
+                "ruta_zonas__zona__municipio__departamento", "ruta_zonas__zona__meta"
+            )
+        if incluye_campo(self.request, "ruta_colaboradores"):
+            qs = qs.prefetch_related("ruta_colaboradores__colaborador")
         return qs.distinct()
 
     @action(detail=True, methods=["post"], url_path="asignar-colaborador")
@@ -0,0 +1,203 @@
+"""Registro de encuestas en lote para los envíos diferidos de las apps móviles.
+
+Todo el lote se valida contra búsquedas precargadas (una consulta por cédulas,
+zonas, necesidades, asignaciones y claves de idempotencia, más los límites de
+las zonas en memoria) y se escribe con
+inserciones masivas; los contadores derivados se ajustan una sola vez por lote.
+Los elementos cuya clave de idempotencia ya está registrada se responden con la
+encuesta existente, así el cliente puede reenviar un lote completo sin temor.
+"""
+from django.db import IntegrityError, transaction
+
+from territory.geo import actualizar_geohash
+from territory.geofence import indice_geocercas
+from territory.models import Zona, ZonaAsignacion
+from .counters import registrar_encuestas
+from .models import CasoCiudadano, Encuesta, EncuestaNecesidad, Necesidad
+from .serializers import SurveySerializer
+
+
+def _ids(valores):
+    ids = set()
+    for valor in valores:
+        try:
+            ids.add(int(valor))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def _clave(item):
+    clave = item.get("clave_idempotencia") if isinstance(item, dict) else None
+    if clave is None:
+        return None
+    return str(clave).strip() or None
+
+
+def _precargar_lote(items, user):
+    items = [item for item in items if isinstance(item, dict)]
+    zona_ids = _ids(item.get("zona") for item in items)
+    necesidad_ids = _ids(
+        necesidad.get("necesidad_id")
+        for item in items
+        for necesidad in item.get("necesidades") or []
+        if isinstance(necesidad, dict)
+    )
+    cedulas = {str(item["cedula"]) for item in items if item.get("cedula")}
+    claves = {_clave(item) for item in items} - {None}
+    lote = {
+        "objetos": {
+            Zona: Zona.objects.select_related("municipio").in_bulk(zona_ids),
+            Necesidad: Necesidad.objects.in_bulk(necesidad_ids),
+        },
+        "cedulas": set(
+            Encuesta.objects.filter(cedula__in=cedulas).values_list("cedula", flat=True)
+        ),
+        "claves": {
+            clave: (encuesta_id, colaborador_id)
+            for clave, encuesta_id, colaborador_id in Encuesta.objects.filter(
+                clave_idempotencia__in=claves
+            ).values_list("clave_idempotencia", "id", "colaborador_id")
+        }
+        if claves
+        else {},
+        "zonas_asignadas": set(),
+        "municipios_lider": set(),
+        "geocercas": indice_geocercas(),
+    }
+    if user.is_collaborator:
+        lote["zonas_asignadas"] = set(
+            ZonaAsignacion.objects.filter(colaborador=user, zona_id__in=zona_ids).values_list(
+                "zona_id", flat=True
+            )
+        )
+    if user.is_leader:
+        lote["municipios_lider"] = set(user.municipios.values_list("id", flat=True))
+    return lote
+
+
+def _construir(validated_data, user, geocercas):
+    datos = dict(validated_data)
+    necesidades = datos.pop("necesidades")
+    encuesta = Encuesta(colaborador=user, **datos)
+    encuesta._apply_votante_flags()
+    actualizar_geohash(encuesta, {})
+    encuesta._apply_geocerca({}, geocercas)
+    return encuesta, necesidades
+
+
+def _escribir(pendientes):
+    """Inserta las encuestas construidas, sus necesidades y casos, y ajusta contadores."""
+    encuestas = [encuesta for encuesta, _ in pendientes]
+    Encuesta.objects.bulk_create(encuestas)
+    if any(encuesta.pk is None for encuesta in encuestas):
+        # MySQL no devuelve las llaves de un INSERT masivo; la cédula es única.
+        ids = dict(
+            Encuesta.objects.filter(cedula__in=[e.cedula for e in encuestas]).values_list("cedula", "id")
+        )
+        for encuesta in encuestas:
+            encuesta.pk = ids[encuesta.cedula]
+            encuesta._state.adding = False
+    EncuestaNecesidad.objects.bulk_create(
+        EncuestaNecesidad(encuesta=encuesta, **necesidad)
+        for encuesta, necesidades in pendientes
+        for necesidad in necesidades
+    )
+    CasoCiudadano.objects.bulk_create(
+        CasoCiudadano(encuesta=encuesta, nivel_prioridad=CasoCiudadano.Prioridad.ALTA)
+        for encuesta in encuestas
+        if encuesta.caso_critico
+    )
+    estados = {encuesta.pk: encuesta.estado_contadores() for encuesta in encuestas}
+    registrar_encuestas(
+        list(estados.values()),
+        [
+            (estados[encuesta.pk], necesidad["necesidad"].id)
+            for encuesta, necesidades in pendientes
+            for necesidad in necesidades
+        ],
+    )
+    for encuesta in encuestas:
+        encuesta._estado_guardado = encuesta.estado_contadores()
+
+
+def _existente(indice, registrada, user):
+    encuesta_id, colaborador_id = registrada
+    if colaborador_id != user.id:
+        return {
+            "indice": indice,
+            "estado": "error",
+            "errores": {"clave_idempotencia": ["La clave de idempotencia ya fue usada por otro usuario."]},
+        }
+    return {"indice": indice, "estado": "existente", "id": encuesta_id}
+
+
+def registrar_lote(items, request):
+    """Valida y registra ``items``; devuelve un resultado por posición sin abortar por fallos parciales."""
+    user = request.user
+    lote = _precargar_lote(items, user)
+    context = {"request": request, "lote": lote}
+    resultados = [None] * len(items)
+    pendientes = []
+    posiciones = []
+    claves_lote = {}
+    repetidas = {}
+    for indice, item in enumerate(items):
+        clave = _clave(item)
+        if clave in lote["claves"]:
+            resultados[indice] = _existente(indice, lote["claves"][clave], user)
+            continue
+        if clave in claves_lote:
+            repetidas[indice] = claves_lote[clave]
+            continue
+        if clave:
+            claves_lote[clave] = indice
+        serializer = SurveySerializer(data=item, context=context)
+        if not serializer.is_valid():
+            resultados[indice] = {"indice": indice, "estado": "error", "errores": serializer.errors}
+            continue
+        lote["cedulas"].add(serializer.validated_data["cedula"])
+        pendientes.append(_construir(serializer.validated_data, user, lote["geocercas"]))
+        posiciones.append(indice)
+
+    try:
+        with transaction.atomic():
+            _escribir(pendientes)
+        escritos = list(zip(posiciones, pendientes))
+    except IntegrityError:
+        # Otra petición registró alguna cédula entretanto: se reintenta de a una.
+        escritos = []
+        for indice, pendiente in zip(posiciones, pendientes):
+            encuesta = pendiente[0]
+            encuesta.pk = None
+            encuesta._state.adding = True
+            try:
+                with transaction.atomic():
+                    _escribir([pendiente])
+                escritos.append((indice, pendiente))
+            except IntegrityError:
+                registrada = None
+                if encuesta.clave_idempotencia:
+                    registrada = (
+                        Encuesta.objects.filter(clave_idempotencia=encuesta.clave_idempotencia)
+                        .values_list("id", "colaborador_id")
+                        .first()
+                    )
+                if registrada:
+                    resultados[indice] = _existente(indice, registrada, user)
+                    continue
+                if encuesta.cedula and Encuesta.objects.filter(cedula=encuesta.cedula).exists():
+                    mensaje = "Ya existe una encuesta registrada con esta cédula."
+                else:
+                    # Otra restricción (p. ej. una zona o necesidad borrada entretanto).
+                    mensaje = "No se pudo registrar la encuesta por un conflicto con datos existentes."
+                resultados[indice] = {"indice": indice, "estado": "error", "errores": {"non_field_errors": [mensaje]}}
+
+    for indice, (encuesta, _) in escritos:
+        resultados[indice] = {"indice": indice, "estado": "creada", "id": encuesta.pk}
+    for indice, original in repetidas.items():
+        resultado = dict(resultados[original], indice=indice)
+        if resultado["estado"] == "creada":
+            resultado["estado"] = "existente"
+        resultados[indice] = resultado
+    return resultados
@@ -0,0 +1,13 @@
+from django.db.models import Max
+
+from .models import CasoCiudadano, CoberturaZona, CoberturaZonaNecesidad, Necesidad
+
+
+def marca_encuestas(casos=False):
+    """Marcador de datos de encuestas en la base (máximos sobre índices), común a todos los procesos.
+
+    Cambia con cada encuesta registrada, modificada o eliminada porque toda
+    escritura contada marca sus contadores de zona y de necesidad.
+    """
+    modelos = [CoberturaZona, CoberturaZonaNecesidad, Necesidad] + ([CasoCiudadano] if casos else [])
+    return [modelo.objects.aggregate(marca=Max("actualizado_en"))["marca"] for modelo in modelos]
@@ -0,0 +1,487 @@
+"""Contadores materializados de cobertura por zona y de encuestas por líder.
+
+Las escrituras de encuestas ajustan los contadores por delta dentro de la misma
+transacción, así las lecturas no necesitan recontar encuestas.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DateField, F, IntegerField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, Substr
+from django.dispatch import Signal
+from django.utils import timezone
+
+from accounts.models import User
+from pitpc.pagination import iterar_por_llave
+from territory.geofence import afuera, compilar
+from .models import (
+    CeldaMapa,
+    CeldaMapaNecesidad,
+    CoberturaZona,
+    CoberturaZonaNecesidad,
+    Encuesta,
+    EncuestaNecesidad,
+    ResumenLider,
+    TerminoZonaDia,
+)
+from .services import agregados_por_lider, encuestas_de_lider
+from .terms import terminos
+from .tiles import PRECISION_CELDA, celda
+
+# Zonas cuyo total de encuestas cambió (``zona_ids``; ``None`` si se recalcularon todas).
+cobertura_actualizada = Signal()
+
+
+def _aplicar_delta(model, llaves, deltas, extra=None, iniciales=None, sumas=()):
+    """Suma ``deltas`` a la fila de ``llaves`` o la crea; ``sumas`` no son conteos y pueden ser negativas."""
+    deltas = {campo: valor for campo, valor in deltas.items() if valor}
+    if not deltas and not extra:
+        return
+    cambios = {campo: F(campo) + valor for campo, valor in deltas.items()}
+    cambios.update(extra or {})
+    if model.objects.filter(**llaves).update(**cambios):
+        return
+    if any(valor < 0 for campo, valor in deltas.items() if campo not in sumas):
+        # Sin fila previa no hay nada que descontar; los comandos de reconstrucción corrigen la deriva.
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**llaves, **deltas, **(iniciales or {}))
+    except IntegrityError:
+        model.objects.filter(**llaves).update(**cambios)
+
+
+def _aplicar_terminos(deltas):
+    """Suma ``{(zona_id, fecha, termino): total}`` a ``TerminoZonaDia`` como conjunto.
+
+    Un comentario trae decenas de términos: una consulta lee las filas
+    existentes, un ``UPDATE ... CASE`` las ajusta y un ``bulk_create`` agrega
+    las que faltan, sin importar cuántos términos haya.
+    """
+    if not deltas:
+        return
+    existentes = {
+        (zona_id, fecha, termino): pk
+        for pk, zona_id, fecha, termino in TerminoZonaDia.objects.filter(
+            zona_id__in={llave[0] for llave in deltas},
+            fecha__in={llave[1] for llave in deltas},
+            termino__in={llave[2] for llave in deltas},
+        ).values_list("id", "zona_id", "fecha", "termino")
+    }
+    por_pk = {existentes[llave]: total for llave, total in deltas.items() if llave in existentes}
+    if por_pk:
+        TerminoZonaDia.objects.filter(pk__in=por_pk).update(
+            total=F("total")
+            + Case(*(When(pk=pk, then=Value(total)) for pk, total in por_pk.items()), output_field=IntegerField())
+        )
+    # Sin fila previa no hay nada que descontar; los comandos de reconstrucción corrigen la deriva.
+    nuevas = {llave: total for llave, total in deltas.items() if llave not in existentes and total > 0}
+    if not nuevas:
+        return
+    try:
+        with transaction.atomic():
+            TerminoZonaDia.objects.bulk_create(
+                TerminoZonaDia(zona_id=zona_id, fecha=fecha, termino=termino, total=total)
+                for (zona_id, fecha, termino), total in sorted(nuevas.items())
+            )
+    except IntegrityError:
+        # Otra escritura creó alguna de las filas entretanto.
+        for (zona_id, fecha, termino), total in sorted(nuevas.items()):
+            _aplicar_delta(TerminoZonaDia, {"zona_id": zona_id, "fecha": fecha, "termino": termino}, {"total": total})
+
+
+def lideres_por_colaborador(colaborador_ids):
+    """Líder dueño de las encuestas de cada colaborador: él mismo o quien lo creó."""
+    lideres = {}
+    for item in User.objects.filter(id__in=colaborador_ids).values(
+        "id", "role", "created_by_id", "created_by__role"
+    ):
+        if item["role"] == User.Roles.LIDER:
+            lideres[item["id"]] = item["id"]
+        elif item["created_by__role"] == User.Roles.LIDER:
+            lideres[item["id"]] = item["created_by_id"]
+    return lideres
+
+
+class _Deltas:
+    def __init__(self):
+        self.zonas = defaultdict(Counter)
+        self.necesidades = Counter()
+        self.colaboradores = defaultdict(Counter)
+        self.validas_agregadas = {}
+        self.validas_retiradas = {}
+        self.terminos = Counter()
+        self.celdas = defaultdict(Counter)
+        self.celdas_necesidades = Counter()
+
+    def encuesta(self, estado, signo):
+        valida = estado["votante_valido"]
+        punto = _punto(estado)
+        if punto:
+            llave = celda(*punto)
+            self.celdas[llave].update(
+                {
+                    "total_encuestas": signo,
+                    "votantes_validos": signo if valida else 0,
+                    "suma_lat": signo * punto[0],
+                    "suma_lon": signo * punto[1],
+                }
+            )
+        self.zonas[estado["zona_id"]].update(
+            {
+                "total_encuestas": signo,
+                "votantes_validos": signo if valida else 0,
+                "votantes_potenciales": signo if estado["votante_potencial"] else 0,
+                "encuestas_verificadas": signo if estado.get("fuera_de_zona") is not None else 0,
+                "encuestas_fuera_de_zona": signo if estado.get("fuera_de_zona") else 0,
+            }
+        )
+        if estado["fecha_creacion"]:
+            for termino in terminos(estado["comentario_problema"]):
+                self.terminos[(estado["zona_id"], estado["fecha_creacion"], termino)] += signo
+        colaborador_id = estado["colaborador_id"]
+        self.colaboradores[colaborador_id].update(
+            {
+                "total_encuestas": signo,
+                "encuestas_validas": signo if valida else 0,
+                "encuestas_potenciales": signo if estado["votante_potencial"] else 0,
+            }
+        )
+        if valida and estado["fecha_creacion"]:
+            fechas = self.validas_agregadas if signo > 0 else self.validas_retiradas
+            fechas[colaborador_id] = max(
+                fechas.get(colaborador_id, estado["fecha_creacion"]), estado["fecha_creacion"]
+            )
+
+    def necesidad(self, zona_id, punto, necesidad_id, signo):
+        self.necesidades[(zona_id, necesidad_id)] += signo
+        if punto:
+            llave = celda(*punto)
+            self.celdas_necesidades[(llave, necesidad_id)] += signo
+
+    def _aplicar_celdas(self):
+        # La versión de cada celda tocada sube: su suma es la marca de caché de las teselas (ver ``tiles.py``).
+        marca = {"version": F("version") + 1, "actualizado_en": timezone.now()}
+        tocadas = set()
+        for llave in sorted(self.celdas):
+            if any(self.celdas[llave].values()):
+                tocadas.add(llave)
+                _aplicar_delta(
+                    CeldaMapa,
+                    {"celda": llave},
+                    self.celdas[llave],
+                    marca,
+                    iniciales={"version": 1},
+                    sumas=("suma_lat", "suma_lon"),
+                )
+        solo_necesidades = set()
+        for (llave, necesidad_id), total in sorted(self.celdas_necesidades.items()):
+            if total:
+                if llave not in tocadas:
+                    solo_necesidades.add(llave)
+                _aplicar_delta(CeldaMapaNecesidad, {"celda": llave, "necesidad_id": necesidad_id}, {"total": total})
+        if solo_necesidades:
+            CeldaMapa.objects.filter(celda__in=sorted(solo_necesidades)).update(**marca)
+
+    def aplicar(self):
+        self._aplicar_celdas()
+        # ``update()`` no aplica auto_now; la marca alimenta los ETag de los tableros.
+        marca = {"actualizado_en": timezone.now()}
+        for zona_id in sorted(self.zonas):
+            if any(self.zonas[zona_id].values()):
+                _aplicar_delta(CoberturaZona, {"zona_id": zona_id}, self.zonas[zona_id], marca)
+        _aplicar_terminos({llave: total for llave, total in self.terminos.items() if total})
+        zonas = [zona_id for zona_id in sorted(self.zonas) if self.zonas[zona_id]["total_encuestas"]]
+        if zonas:
+            cobertura_actualizada.send(sender=CoberturaZona, zona_ids=zonas)
+        for zona_id, necesidad_id in sorted(self.necesidades):
+            total = self.necesidades[(zona_id, necesidad_id)]
+            if total:
+                _aplicar_delta(
+                    CoberturaZonaNecesidad,
+                    {"zona_id": zona_id, "necesidad_id": necesidad_id},
+                    {"total": total},
+                    marca,
+                )
+        if not self.colaboradores:
+            return
+        lideres = lideres_por_colaborador(self.colaboradores)
+        por_lider = defaultdict(Counter)
+        agregadas = {}
+        retiradas = {}
+        for colaborador_id, deltas in self.colaboradores.items():
+            lider_id = lideres.get(colaborador_id)
+            if lider_id is None:
+                continue
+            por_lider[lider_id].update(deltas)
+            for fechas, destino in (
+                (self.validas_agregadas, agregadas),
+                (self.validas_retiradas, retiradas),
+            ):
+                if colaborador_id in fechas:
+                    destino[lider_id] = max(destino.get(lider_id, fechas[colaborador_id]), fechas[colaborador_id])
+        for lider_id in sorted(por_lider):
+            fecha = agregadas.get(lider_id)
+            extra = None
+            if fecha:
+                extra = {
+                    "ultima_fecha_valida": Greatest(
+                        Coalesce(F("ultima_fecha_valida"), Value(fecha)),
+                        Value(fecha),
+                        output_field=DateField(),
+                    )
+                }
+            _aplicar_delta(
+                ResumenLider,
+                {"lider_id": lider_id},
+                por_lider[lider_id],
+                extra,
+                iniciales={"ultima_fecha_valida": fecha},
+            )
+        for lider_id, fecha in retiradas.items():
+            if ResumenLider.objects.filter(lider_id=lider_id, ultima_fecha_valida__lte=fecha).exists():
+                ultima = (
+                    encuestas_de_lider(lider_id)
+                    .filter(votante_valido=True)
+                    .aggregate(ultima=Max("fecha_creacion"))["ultima"]
+                )
+                ResumenLider.objects.filter(lider_id=lider_id).update(ultima_fecha_valida=ultima)
+
+
+def _punto(estado):
+    """``(lat, lon)`` de un estado de encuesta, o ``None`` sin coordenadas."""
+    if estado.get("lat") is None or estado.get("lon") is None:
+        return None
+    return float(estado["lat"]), float(estado["lon"])
+
+
+def registrar_encuestas(estados, necesidades=(), signo=1):
+    """Suma (o resta con ``signo=-1``) un lote de encuestas y sus necesidades.
+
+    ``necesidades`` son pares ``(estado, necesidad_id)`` con el estado de la encuesta.
+    """
+    deltas = _Deltas()
+    for estado in estados:
+        deltas.encuesta(estado, signo)
+    for estado, necesidad_id in necesidades:
+        deltas.necesidad(estado["zona_id"], _punto(estado), necesidad_id, signo)
+    deltas.aplicar()
+
+
+def actualizar_contadores_encuesta(encuesta_id, anterior, actual):
+    if anterior == actual:
+        return
+    deltas = _Deltas()
+    deltas.encuesta(actual, 1)
+    if anterior:
+        deltas.encuesta(anterior, -1)
+        if anterior["zona_id"] != actual["zona_id"] or _punto(anterior) != _punto(actual):
+            for necesidad_id in EncuestaNecesidad.objects.filter(encuesta_id=encuesta_id).values_list(
+                "necesidad_id", flat=True
+            ):
+                deltas.necesidad(anterior["zona_id"], _punto(anterior), necesidad_id, -1)
+                deltas.necesidad(actual["zona_id"], _punto(actual), necesidad_id, 1)
+    deltas.aplicar()
+
+
+def _ubicacion_de_encuesta(encuesta_id):
+    """``{"zona_id", "lat", "lon"}`` de la encuesta, o ``None`` si ya no existe."""
+    return Encuesta.objects.filter(pk=encuesta_id).values("zona_id", "lat", "lon").first()
+
+
+def actualizar_cobertura_necesidad(instancia, anterior):
+    deltas = _Deltas()
+    encuesta = instancia.encuesta
+    ubicacion = {"zona_id": encuesta.zona_id, "lat": encuesta.lat, "lon": encuesta.lon}
+    deltas.necesidad(ubicacion["zona_id"], _punto(ubicacion), instancia.necesidad_id, 1)
+    if anterior:
+        encuesta_id, necesidad_id = anterior
+        if encuesta_id != instancia.encuesta_id:
+            ubicacion = _ubicacion_de_encuesta(encuesta_id)
+        deltas.necesidad(ubicacion["zona_id"], _punto(ubicacion), necesidad_id, -1)
+    deltas.aplicar()
+
+
+def descontar_necesidad(instancia):
+    estado = getattr(instancia, "_estado_guardado", None)
+    encuesta_id, necesidad_id = estado or (instancia.encuesta_id, instancia.necesidad_id)
+    ubicacion = _ubicacion_de_encuesta(encuesta_id)
+    if ubicacion is not None:
+        registrar_encuestas([], [(ubicacion, necesidad_id)], signo=-1)
+
+
+@transaction.atomic
+def reconstruir_cobertura():
+    """Recalcula todos los contadores de zona desde las encuestas almacenadas."""
+    CoberturaZonaNecesidad.objects.all().delete()
+    CoberturaZona.objects.all().delete()
+    CoberturaZona.objects.bulk_create(
+        CoberturaZona(
+            zona_id=item["zona_id"],
+            total_encuestas=item["total"],
+            votantes_validos=item["validos"],
+            votantes_potenciales=item["potenciales"],
+            encuestas_verificadas=item["verificadas"],
+            encuestas_fuera_de_zona=item["fuera"],
+        )
+        for item in Encuesta.objects.values("zona_id").annotate(
+            total=Count("id"),
+            validos=Count("id", filter=Q(votante_valido=True)),
+            potenciales=Count("id", filter=Q(votante_potencial=True)),
+            verificadas=Count("id", filter=Q(fuera_de_zona__isnull=False)),
+            fuera=Count("id", filter=Q(fuera_de_zona=True)),
+        )
+    )
+    CoberturaZonaNecesidad.objects.bulk_create(
+        CoberturaZonaNecesidad(
+            zona_id=item["encuesta__zona_id"],
+            necesidad_id=item["necesidad_id"],
+            total=item["total"],
+        )
+        for item in EncuestaNecesidad.objects.values("encuesta__zona_id", "necesidad_id").annotate(
+            total=Count("id")
+        )
+    )
+    reconstruir_terminos()
+    reconstruir_celdas()
+    cobertura_actualizada.send(sender=CoberturaZona, zona_ids=None)
+
+
+@transaction.atomic
+def reevaluar_geocerca(zona, tamano=1000):
+    """Verifica de nuevo las encuestas de ``zona`` contra su límite actual y ajusta sus contadores."""
+    geometria = compilar(zona.lat, zona.lon, zona.radio_metros, zona.limite)
+    grupos = {None: [], False: [], True: []}
+    for encuesta_id, lat, lon in Encuesta.objects.filter(zona_id=zona.pk).values_list("id", "lat", "lon"):
+        grupos[afuera(geometria, lat, lon)].append(encuesta_id)
+    for valor, ids in grupos.items():
+        for inicio in range(0, len(ids), tamano):
+            Encuesta.objects.filter(id__in=ids[inicio : inicio + tamano]).update(fuera_de_zona=valor)
+    CoberturaZona.objects.filter(zona_id=zona.pk).update(
+        encuestas_verificadas=len(grupos[False]) + len(grupos[True]),
+        encuestas_fuera_de_zona=len(grupos[True]),
+        actualizado_en=timezone.now(),
+    )
+
+
+@transaction.atomic
+def reconstruir_celdas():
+    """Recalcula los contadores del mapa por celda desde el geohash de las encuestas."""
+    CeldaMapaNecesidad.objects.all().delete()
+    CeldaMapa.objects.all().delete()
+    CeldaMapa.objects.bulk_create(
+        (
+            CeldaMapa(
+                celda=item["llave"],
+                total_encuestas=item["total"],
+                votantes_validos=item["validos"],
+                suma_lat=float(item["suma_lat"]),
+                suma_lon=float(item["suma_lon"]),
+                version=1,
+            )
+            for item in Encuesta.objects.exclude(geohash="")
+            .values(llave=Substr("geohash", 1, PRECISION_CELDA))
+            .annotate(
+                total=Count("id"),
+                validos=Count("id", filter=Q(votante_valido=True)),
+                suma_lat=Sum("lat"),
+                suma_lon=Sum("lon"),
+            )
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+    CeldaMapaNecesidad.objects.bulk_create(
+        (
+            CeldaMapaNecesidad(celda=item["llave"], necesidad_id=item["necesidad_id"], total=item["total"])
+            for item in EncuestaNecesidad.objects.exclude(encuesta__geohash="")
+            .values("necesidad_id", llave=Substr("encuesta__geohash", 1, PRECISION_CELDA))
+            .annotate(total=Count("id"))
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+
+
+@transaction.atomic
+def reconstruir_terminos(tamano=1000):
+    """Recalcula el índice de términos desde los comentarios almacenados."""
+    TerminoZonaDia.objects.all().delete()
+    totales = Counter()
+    comentarios = (
+        Encuesta.objects.exclude(comentario_problema__isnull=True)
+        .exclude(comentario_problema="")
+        .values("id", "zona_id", "fecha_creacion", "comentario_problema")
+    )
+    for item in iterar_por_llave(comentarios, tamano=tamano):
+        for termino in terminos(item["comentario_problema"]):
+            totales[(item["zona_id"], item["fecha_creacion"], termino)] += 1
+    TerminoZonaDia.objects.bulk_create(
+        (
+            TerminoZonaDia(zona_id=zona_id, fecha=fecha, termino=termino, total=total)
+            for (zona_id, fecha, termino), total in totales.items()
+        ),
+        batch_size=tamano,
+    )
+
+
+def conciliar_lideres(corregir=False):
+    """Compara ``ResumenLider`` contra un recuento real y devuelve las diferencias encontradas.
+
+    Con ``corregir=True`` además reescribe las filas con deriva.
+    """
+    esperado = {
+        lider_id: {
+            "total_encuestas": item["total"],
+            "encuestas_validas": item["validas"],
+            "encuestas_potenciales": item["potenciales"],
+            "ultima_fecha_valida": item["ultima_fecha_valida"],
+        }
+        for lider_id, item in agregados_por_lider().items()
+    }
+    vacio = {
+        "total_encuestas": 0,
+        "encuestas_validas": 0,
+        "encuestas_potenciales": 0,
+        "ultima_fecha_valida": None,
+    }
+    actual = {
+        item.pop("lider_id"): item
+        for item in ResumenLider.objects.values("lider_id", *vacio)
+    }
+    diferencias = []
+    for lider_id in sorted(set(esperado) | set(actual)):
+        correcto = esperado.get(lider_id, vacio)
+        guardado = actual.get(lider_id)
+        if guardado == correcto or (guardado is None and correcto == vacio):
+            continue
+        diferencias.append({"lider_id": lider_id, "guardado": guardado, "esperado": correcto})
+        if corregir:
+            ResumenLider.objects.update_or_create(lider_id=lider_id, defaults=correcto)
+    return diferencias
+
+
+@transaction.atomic
+def recontar_lideres(lider_ids):
+    """Reescribe ``ResumenLider`` de ``lider_ids`` desde sus encuestas.
+
+    Se usa cuando cambia de quién son las encuestas (el líder de un colaborador
+    o el rol de un usuario), que no pasa por las escrituras de encuestas.
+    """
+    lider_ids = sorted(set(lider_ids))
+    encuestadores = User.objects.filter(Q(id__in=lider_ids) | Q(created_by_id__in=lider_ids)).values("id")
+    agregados = agregados_por_lider(Encuesta.objects.filter(colaborador_id__in=encuestadores))
+    for lider_id in lider_ids:
+        item = agregados.get(lider_id)
+        if item is None:
+            ResumenLider.objects.filter(lider_id=lider_id).delete()
+            continue
+        ResumenLider.objects.update_or_create(
+            lider_id=lider_id,
+            defaults={
+                "total_encuestas": item["total"],
+                "encuestas_validas": item["validas"],
+                "encuestas_potenciales": item["potenciales"],
+                "ultima_fecha_valida": item["ultima_fecha_valida"],
+            },
+        )
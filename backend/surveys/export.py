@@ -0,0 +1,164 @@
+"""Exportación masiva de encuestas en CSV o Parquet, generada por lotes.
+
+Las encuestas se leen por llave (``lotes_por_llave``) y cada lote trae sus
+necesidades en una sola consulta; nada del resultado completo queda en memoria.
+Parquet solo está disponible si ``pyarrow`` está instalado.
+"""
+import csv
+from collections import defaultdict
+
+from pitpc.pagination import lotes_por_llave
+from .models import EncuestaNecesidad
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = pq = None
+
+LOTE = 2000
+
+# Columna de salida, campo en ``values()`` y tipo para el esquema Parquet.
+CAMPOS = [
+    ("id", "id", "entero"),
+    ("fecha_hora", "fecha_hora", "fecha_hora"),
+    ("fecha_creacion", "fecha_creacion", "fecha"),
+    ("departamento", "zona__municipio__departamento__nombre", "texto"),
+    ("municipio_id", "zona__municipio_id", "entero"),
+    ("municipio", "zona__municipio__nombre", "texto"),
+    ("zona_id", "zona_id", "entero"),
+    ("zona", "zona__nombre", "texto"),
+    ("colaborador_id", "colaborador_id", "entero"),
+    ("colaborador", "colaborador__name", "texto"),
+    ("nombre_ciudadano", "nombre_ciudadano", "texto"),
+    ("cedula", "cedula", "texto"),
+    ("telefono", "telefono", "texto"),
+    ("tipo_vivienda", "tipo_vivienda", "texto"),
+    ("rango_edad", "rango_edad", "texto"),
+    ("ocupacion", "ocupacion", "texto"),
+    ("tiene_ninos", "tiene_ninos", "booleano"),
+    ("tiene_adultos_mayores", "tiene_adultos_mayores", "booleano"),
+    ("tiene_personas_con_discapacidad", "tiene_personas_con_discapacidad", "booleano"),
+    ("comentario_problema", "comentario_problema", "texto"),
+    ("consentimiento", "consentimiento", "booleano"),
+    ("lat", "lat", "decimal"),
+    ("lon", "lon", "decimal"),
+    ("caso_critico", "caso_critico", "booleano"),
+    ("nivel_afinidad", "nivel_afinidad", "entero"),
+    ("disposicion_voto", "disposicion_voto", "entero"),
+    ("capacidad_influencia", "capacidad_influencia", "entero"),
+    ("votante_valido", "votante_valido", "booleano"),
+    ("votante_potencial", "votante_potencial", "booleano"),
+]
+
+# Una columna por prioridad de ``EncuestaNecesidad`` (1 = alta).
+PRIORIDADES = [(1, "necesidad_alta"), (2, "necesidad_media"), (3, "necesidad_baja")]
+
+COLUMNAS = [columna for columna, _, _ in CAMPOS] + [columna for _, columna in PRIORIDADES]
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def parquet_disponible():
+    return pq is not None
+
+
+def filas_exportacion(queryset):
+    """Lotes de filas (dicts por ``COLUMNAS``) del queryset de encuestas ya filtrado por rol."""
+    encuestas = queryset.prefetch_related(None).values(*[campo for _, campo, _ in CAMPOS])
+    for lote in lotes_por_llave(encuestas, ("id",), LOTE):
+        necesidades = defaultdict(dict)
+        for encuesta_id, prioridad, nombre in EncuestaNecesidad.objects.filter(
+            encuesta_id__in=[encuesta["id"] for encuesta in lote]
+        ).values_list("encuesta_id", "prioridad", "necesidad__nombre"):
+            necesidades[encuesta_id][prioridad] = nombre
+        filas = []
+        for encuesta in lote:
+            fila = {columna: encuesta[campo] for columna, campo, _ in CAMPOS}
+            propias = necesidades.get(encuesta["id"], {})
+            for prioridad, columna in PRIORIDADES:
+                fila[columna] = propias.get(prioridad)
+            filas.append(fila)
+        yield filas
+
+
+class _Eco:
+    """Destino de ``csv.writer`` que devuelve lo escrito en vez de guardarlo."""
+
+    def write(self, valor):
+        return valor
+
+
+def csv_en_flujo(lotes):
+    escritor = csv.writer(_Eco())
+    # BOM para que Excel reconozca UTF-8 (tildes y eñes).
+    yield ("\ufeff" + escritor.writerow(COLUMNAS)).encode()
+    for filas in lotes:
+        yield "".join(
+            escritor.writerow(["" if fila[columna] is None else fila[columna] for columna in COLUMNAS])
+            for fila in filas
+        ).encode()
+
+
+class _Sumidero:
+    """Archivo de solo escritura que acumula bytes hasta que se vacían con ``vaciar``."""
+
+    closed = False
+
+    def __init__(self):
+        self.partes = []
+        self.posicion = 0
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self.partes.append(datos)
+        self.posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self.posicion
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def vaciar(self):
+        datos, self.partes = b"".join(self.partes), []
+        return datos
+
+
+def _esquema_parquet():
+    tipos = {
+        "entero": pa.int64(),
+        "texto": pa.string(),
+        "booleano": pa.bool_(),
+        "decimal": pa.float64(),
+        "fecha": pa.date32(),
+        "fecha_hora": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema(
+        [(columna, tipos[tipo]) for columna, _, tipo in CAMPOS]
+        + [(columna, pa.string()) for _, columna in PRIORIDADES]
+    )
+
+
+def parquet_en_flujo(lotes):
+    """Un grupo de filas Parquet por lote; los bytes salen apenas se escribe cada grupo."""
+    decimales = [columna for columna, _, tipo in CAMPOS if tipo == "decimal"]
+    esquema = _esquema_parquet()
+    sumidero = _Sumidero()
+    escritor = pq.ParquetWriter(sumidero, esquema, compression="snappy")
+    for filas in lotes:
+        for fila in filas:
+            for columna in decimales:
+                if fila[columna] is not None:
+                    fila[columna] = float(fila[columna])
+        escritor.write_table(pa.Table.from_pylist(filas, schema=esquema))
+        yield sumidero.vaciar()
+    escritor.close()
+    yield sumidero.vaciar()
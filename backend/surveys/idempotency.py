@@ -0,0 +1,25 @@
+"""Claves de idempotencia para los reenvíos de encuestas desde los clientes.
+
+El cliente genera una clave por encuesta (p. ej. un UUID) y la repite en cada
+reintento; si ya quedó registrada se devuelve la encuesta original en lugar de
+crear otra o fallar por la cédula duplicada.
+"""
+ENCABEZADO = "Idempotency-Key"
+
+
+def clave_de_peticion(request):
+    """Clave enviada en el cuerpo (``clave_idempotencia``) o en el encabezado ``Idempotency-Key``."""
+    clave = None
+    if isinstance(request.data, dict):
+        clave = request.data.get("clave_idempotencia")
+    clave = clave or request.headers.get(ENCABEZADO)
+    if not clave:
+        return None
+    return str(clave).strip() or None
+
+
+def encuesta_registrada(queryset, clave):
+    """Encuesta ya registrada con ``clave`` (una búsqueda por el índice único) o ``None``."""
+    if not clave:
+        return None
+    return queryset.filter(clave_idempotencia=clave).first()
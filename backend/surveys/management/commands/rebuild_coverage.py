@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from surveys.counters import reconstruir_cobertura
+from surveys.models import CoberturaZona
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los contadores de cobertura por zona desde las encuestas"
+
+    def handle(self, *args, **options):
+        reconstruir_cobertura()
+        self.stdout.write(
+            self.style.SUCCESS(f"Cobertura reconstruida para {CoberturaZona.objects.count()} zonas")
+        )
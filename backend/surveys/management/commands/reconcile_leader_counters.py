@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from surveys.counters import conciliar_lideres
+
+
+class Command(BaseCommand):
+    help = "Detecta (y con --fix corrige) deriva en los contadores de encuestas por líder"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Reescribe los contadores con deriva")
+
+    def handle(self, *args, **options):
+        diferencias = conciliar_lideres(corregir=options["fix"])
+        for item in diferencias:
+            self.stdout.write(
+                f"Líder {item['lider_id']}: guardado={item['guardado']} esperado={item['esperado']}"
+            )
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS("Contadores de líderes consistentes"))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(diferencias)} líderes corregidos"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(diferencias)} líderes con deriva"))
@@ -0,0 +1,97 @@
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def poblar_cobertura(apps, schema_editor):
+    Encuesta = apps.get_model("surveys", "Encuesta")
+    EncuestaNecesidad = apps.get_model("surveys", "EncuestaNecesidad")
+    CoberturaZona = apps.get_model("surveys", "CoberturaZona")
+    CoberturaZonaNecesidad = apps.get_model("surveys", "CoberturaZonaNecesidad")
+    CoberturaZona.objects.bulk_create(
+        CoberturaZona(
+            zona_id=item["zona_id"],
+            total_encuestas=item["total"],
+            votantes_validos=item["validos"],
+            votantes_potenciales=item["potenciales"],
+        )
+        for item in Encuesta.objects.values("zona_id").annotate(
+            total=Count("id"),
+            validos=Count("id", filter=Q(votante_valido=True)),
+            potenciales=Count("id", filter=Q(votante_potencial=True)),
+        )
+    )
+    CoberturaZonaNecesidad.objects.bulk_create(
+        CoberturaZonaNecesidad(
+            zona_id=item["encuesta__zona_id"],
+            necesidad_id=item["necesidad_id"],
+            total=item["total"],
+        )
+        for item in EncuestaNecesidad.objects.values(
+            "encuesta__zona_id", "necesidad_id"
+        ).annotate(total=Count("id"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("territory", "0003_zonaasignacion"),
+        ("surveys", "0004_encuesta_candidato_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CoberturaZona",
+            fields=[
+                (
+                    "zona",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="cobertura",
+                        serialize=False,
+                        to="territory.zona",
+                    ),
+                ),
+                ("total_encuestas", models.IntegerField(default=0)),
+                ("votantes_validos", models.IntegerField(default=0)),
+                ("votantes_potenciales", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CoberturaZonaNecesidad",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total", models.IntegerField(default=0)),
+                (
+                    "necesidad",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="surveys.necesidad",
+                    ),
+                ),
+                (
+                    "zona",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cobertura_necesidades",
+                        to="territory.zona",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("zona", "necesidad")},
+            },
+        ),
+        migrations.RunPython(poblar_cobertura, migrations.RunPython.noop),
+    ]
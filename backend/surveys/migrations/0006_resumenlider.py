@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, Max, Q, When
+import django.db.models.deletion
+
+
+def poblar_resumen_lider(apps, schema_editor):
+    Encuesta = apps.get_model("surveys", "Encuesta")
+    ResumenLider = apps.get_model("surveys", "ResumenLider")
+    lider = Case(
+        When(colaborador__role="LIDER", then=F("colaborador_id")),
+        When(colaborador__created_by__role="LIDER", then=F("colaborador__created_by_id")),
+        default=None,
+        output_field=IntegerField(),
+    )
+    ResumenLider.objects.bulk_create(
+        ResumenLider(
+            lider_id=item["lider"],
+            total_encuestas=item["total"],
+            encuestas_validas=item["validas"],
+            encuestas_potenciales=item["potenciales"],
+            ultima_fecha_valida=item["ultima_fecha_valida"],
+        )
+        for item in Encuesta.objects.annotate(lider=lider)
+        .filter(lider__isnull=False)
+        .values("lider")
+        .annotate(
+            total=Count("id"),
+            validas=Count("id", filter=Q(votante_valido=True)),
+            potenciales=Count("id", filter=Q(votante_potencial=True)),
+            ultima_fecha_valida=Max("fecha_creacion", filter=Q(votante_valido=True)),
+        )
+        .order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_user_meta_votantes_positive"),
+        ("surveys", "0005_coberturazona"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumenLider",
+            fields=[
+                (
+                    "lider",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="resumen_encuestas",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("total_encuestas", models.IntegerField(default=0)),
+                ("encuestas_validas", models.IntegerField(default=0)),
+                ("encuestas_potenciales", models.IntegerField(default=0)),
+                ("ultima_fecha_valida", models.DateField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(poblar_resumen_lider, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0006_resumenlider"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="encuesta",
+            name="clave_idempotencia",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0007_encuesta_clave_idempotencia"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="necesidad",
+            name="actualizado_en",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
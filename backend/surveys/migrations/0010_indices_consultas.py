@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0009_actualizado_en"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="encuesta",
+            index=models.Index(fields=["fecha_creacion"], name="surveys_enc_fecha"),
+        ),
+        migrations.AddIndex(
+            model_name="encuesta",
+            index=models.Index(
+                fields=["colaborador", "fecha_creacion"], name="surveys_enc_colab_fecha"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="encuesta",
+            index=models.Index(fields=["zona", "votante_valido"], name="surveys_enc_zona_valido"),
+        ),
+        migrations.AddIndex(
+            model_name="encuestanecesidad",
+            index=models.Index(fields=["necesidad", "encuesta"], name="surveys_encnec_nec_enc"),
+        ),
+        migrations.AddIndex(
+            model_name="casociudadano",
+            index=models.Index(fields=["estado"], name="surveys_caso_estado"),
+        ),
+        migrations.AddIndex(
+            model_name="casociudadano",
+            index=models.Index(
+                fields=["nivel_prioridad", "estado"], name="surveys_caso_prior_estado"
+            ),
+        ),
+    ]
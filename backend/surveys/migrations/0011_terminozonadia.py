@@ -0,0 +1,117 @@
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Copia del tokenizador de ``surveys.terms`` al escribir la migración: no debe cambiar con el código.
+PALABRAS_VACIAS = frozenset(
+    """
+    a al algo algun alguna algunas alguno algunos alli ante antes aqui asi aun aunque bien cada casi como con
+    contra cual cuales cuando cuanto de del desde donde dos el ella ellas ello ellos en entre era eran es esa
+    esas ese eso esos esta estaba estado estan estar estas este esto estos estoy fue fueron ha hace hacen hacer
+    hacia han hasta hay la las le les lo los mas me mi mis mismo mucha muchas mucho muchos muy nada ni no nos
+    nosotros nuestra nuestro nuestros o otra otras otro otros para pero poco por porque pues que quien se sea
+    segun ser si sido siempre sin sobre solo son su sus tal tambien tan tanto te tenemos tener tiene tienen
+    todo todos toda todas tres tu un una uno unos unas usted ustedes va van vez veces y ya yo
+    """.split()
+)
+
+PALABRA = re.compile(r"[a-z]+")
+
+
+def plegar(texto):
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(letra for letra in descompuesto if not unicodedata.combining(letra))
+
+
+def singular(palabra):
+    if len(palabra) > 4 and palabra.endswith("ces"):
+        return palabra[:-3] + "z"
+    if len(palabra) > 4 and palabra.endswith("es") and palabra[-3] in "dljnrz" and palabra[-4] in "aeiou":
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith("s") and palabra[-2] in "aeiou":
+        return palabra[:-1]
+    return palabra
+
+
+def terminos(texto):
+    resultado = []
+    for palabra in PALABRA.findall(plegar(texto or "")):
+        if palabra in PALABRAS_VACIAS:
+            continue
+        raiz = singular(palabra)
+        if len(raiz) >= 3 and raiz not in PALABRAS_VACIAS:
+            resultado.append(raiz[:40])
+    return resultado
+
+
+def poblar_terminos(apps, schema_editor):
+    Encuesta = apps.get_model("surveys", "Encuesta")
+    TerminoZonaDia = apps.get_model("surveys", "TerminoZonaDia")
+    totales = Counter()
+    comentarios = (
+        Encuesta.objects.exclude(comentario_problema__isnull=True)
+        .exclude(comentario_problema="")
+        .values_list("zona_id", "fecha_creacion", "comentario_problema")
+    )
+    for zona_id, fecha, comentario in comentarios.iterator(chunk_size=2000):
+        for termino in terminos(comentario):
+            totales[(zona_id, fecha, termino)] += 1
+    TerminoZonaDia.objects.bulk_create(
+        (
+            TerminoZonaDia(zona_id=zona_id, fecha=fecha, termino=termino, total=total)
+            for (zona_id, fecha, termino), total in totales.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("territory", "0004_actualizado_en"),
+        ("surveys", "0010_indices_consultas"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TerminoZonaDia",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fecha", models.DateField()),
+                ("termino", models.CharField(max_length=40)),
+                ("total", models.IntegerField(default=0)),
+                (
+                    "zona",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="territory.zona",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["fecha", "termino"], name="surveys_termino_fecha"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("zona", "fecha", "termino"),
+                        name="surveys_termino_zona_dia",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(poblar_terminos, migrations.RunPython.noop),
+    ]
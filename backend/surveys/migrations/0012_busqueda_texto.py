@@ -0,0 +1,77 @@
+from django.db import OperationalError, migrations
+
+INDICES_MYSQL = [
+    ("surveys_encuesta", "surveys_enc_comentario_ft", "comentario_problema"),
+    ("surveys_casociudadano", "surveys_caso_notas_ft", "notas_seguimiento"),
+]
+# Tablas FTS5 y triggers de SQLite como estaban al escribir la migración (``surveys.search``
+# los repone tras cada ``migrate`` con su versión vigente).
+FTS_SQLITE = [
+    ("surveys_encuesta", "comentario_problema"),
+    ("surveys_casociudadano", "notas_seguimiento"),
+]
+
+
+def sql_fts(tabla, campo):
+    fts = f"{tabla}_fts"
+    insertar = f"INSERT INTO {fts}(rowid, {campo}) VALUES (new.id, new.{campo});"
+    borrar = f"INSERT INTO {fts}({fts}, rowid, {campo}) VALUES ('delete', old.id, old.{campo});"
+    return fts, [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({campo}, content='{tabla}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN {insertar} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN {borrar} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {campo} ON {tabla} BEGIN {borrar} {insertar} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def instalar_fts(conexion):
+    with conexion.cursor() as cursor:
+        for tabla, campo in FTS_SQLITE:
+            tabla_virtual, *resto = sql_fts(tabla, campo)[1]
+            try:
+                cursor.execute(tabla_virtual)
+            except OperationalError:
+                # SQLite sin FTS5: la búsqueda usa el índice en Python.
+                return
+            for sql in resto:
+                cursor.execute(sql)
+
+
+def retirar_fts(conexion):
+    with conexion.cursor() as cursor:
+        for tabla, campo in FTS_SQLITE:
+            fts = sql_fts(tabla, campo)[0]
+            for sufijo in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{sufijo}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def crear_indices(apps, schema_editor):
+    conexion = schema_editor.connection
+    if conexion.vendor == "mysql":
+        for tabla, indice, columna in INDICES_MYSQL:
+            schema_editor.execute(f"ALTER TABLE `{tabla}` ADD FULLTEXT INDEX `{indice}` (`{columna}`)")
+    elif conexion.vendor == "sqlite":
+        instalar_fts(conexion)
+
+
+def borrar_indices(apps, schema_editor):
+    conexion = schema_editor.connection
+    if conexion.vendor == "mysql":
+        for tabla, indice, _ in INDICES_MYSQL:
+            schema_editor.execute(f"ALTER TABLE `{tabla}` DROP INDEX `{indice}`")
+    elif conexion.vendor == "sqlite":
+        retirar_fts(conexion)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0011_terminozonadia"),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations, models
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat, lon, precision=9):
+    # Copia de ``territory.geo.geohash`` al escribir la migración: no debe cambiar con el código.
+    lat, lon = float(lat), float(lon)
+    lat_min, lat_max, lon_min, lon_max = -90.0, 90.0, -180.0, 180.0
+    codigo = []
+    bits = 0
+    valor = 0
+    par = True
+    while len(codigo) < precision:
+        if par:
+            medio = (lon_min + lon_max) / 2
+            if lon >= medio:
+                valor = valor * 2 + 1
+                lon_min = medio
+            else:
+                valor *= 2
+                lon_max = medio
+        else:
+            medio = (lat_min + lat_max) / 2
+            if lat >= medio:
+                valor = valor * 2 + 1
+                lat_min = medio
+            else:
+                valor *= 2
+                lat_max = medio
+        par = not par
+        bits += 1
+        if bits == 5:
+            codigo.append(BASE32[valor])
+            bits = 0
+            valor = 0
+    return "".join(codigo)
+
+
+def poblar_geohash(apps, schema_editor):
+    Encuesta = apps.get_model("surveys", "Encuesta")
+    puntos = Encuesta.objects.filter(lat__isnull=False, lon__isnull=False).values_list("id", "lat", "lon")
+    lote = []
+    for pk, lat, lon in puntos.iterator(chunk_size=2000):
+        lote.append(Encuesta(id=pk, geohash=geohash(lat, lon)))
+        if len(lote) == 1000:
+            Encuesta.objects.bulk_update(lote, ["geohash"])
+            lote = []
+    Encuesta.objects.bulk_update(lote, ["geohash"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0012_busqueda_texto"),
+        ("territory", "0005_geohash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="encuesta",
+            name="geohash",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=12),
+        ),
+        migrations.RunPython(poblar_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Substr
+import django.db.models.deletion
+
+PRECISION_CELDA = 6
+
+
+def poblar_celdas(apps, schema_editor):
+    Encuesta = apps.get_model("surveys", "Encuesta")
+    EncuestaNecesidad = apps.get_model("surveys", "EncuestaNecesidad")
+    CeldaMapa = apps.get_model("surveys", "CeldaMapa")
+    CeldaMapaNecesidad = apps.get_model("surveys", "CeldaMapaNecesidad")
+    CeldaMapa.objects.bulk_create(
+        (
+            CeldaMapa(
+                celda=item["llave"],
+                total_encuestas=item["total"],
+                votantes_validos=item["validos"],
+                suma_lat=float(item["suma_lat"]),
+                suma_lon=float(item["suma_lon"]),
+            )
+            for item in Encuesta.objects.exclude(geohash="")
+            .values(llave=Substr("geohash", 1, PRECISION_CELDA))
+            .annotate(
+                total=Count("id"),
+                validos=Count("id", filter=Q(votante_valido=True)),
+                suma_lat=Sum("lat"),
+                suma_lon=Sum("lon"),
+            )
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+    CeldaMapaNecesidad.objects.bulk_create(
+        (
+            CeldaMapaNecesidad(celda=item["llave"], necesidad_id=item["necesidad_id"], total=item["total"])
+            for item in EncuestaNecesidad.objects.exclude(encuesta__geohash="")
+            .values("necesidad_id", llave=Substr("encuesta__geohash", 1, PRECISION_CELDA))
+            .annotate(total=Count("id"))
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0013_encuesta_geohash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CeldaMapa",
+            fields=[
+                ("celda", models.CharField(max_length=12, primary_key=True, serialize=False)),
+                ("total_encuestas", models.IntegerField(default=0)),
+                ("votantes_validos", models.IntegerField(default=0)),
+                ("suma_lat", models.FloatField(default=0)),
+                ("suma_lon", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CeldaMapaNecesidad",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("celda", models.CharField(max_length=12)),
+                ("total", models.IntegerField(default=0)),
+                (
+                    "necesidad",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="surveys.necesidad",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("celda", "necesidad"), name="surveys_celda_necesidad")
+                ],
+            },
+        ),
+        migrations.RunPython(poblar_celdas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0014_celdamapa"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="encuesta",
+            name="fuera_de_zona",
+            field=models.BooleanField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="coberturazona",
+            name="encuestas_verificadas",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="coberturazona",
+            name="encuestas_fuera_de_zona",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,22 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0015_geocerca"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="celdamapa",
+            name="version",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="celdamapa",
+            name="actualizado_en",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
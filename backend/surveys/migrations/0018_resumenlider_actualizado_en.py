@@ -0,0 +1,17 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("surveys", "0017_encuesta_actualizado_en"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumenlider",
+            name="actualizado_en",
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
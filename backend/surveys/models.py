@@ -1,12 +1,15 @@
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
 
 from accounts.models import User
+from territory.geo import actualizar_geohash
+from territory.geofence import fuera_de_zona
 from territory.models import Zona
 
 
 class Necesidad(models.Model):
     nombre = models.CharField(max_length=100)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.nombre
@@ -73,6 +76,8 @@ class Encuesta(models.Model):
     consentimiento = models.BooleanField(default=False)
     lat = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     lon = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    # Celda del punto para las consultas por área (ver ``territory.geo``).
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False, db_index=True)
     caso_critico = models.BooleanField(default=False)
     nivel_afinidad = models.PositiveSmallIntegerField(
         choices=NivelAfinidad.choices, null=True, blank=True
@@ -85,15 +90,48 @@ class Encuesta(models.Model):
     )
     votante_valido = models.BooleanField(default=False, editable=False)
     votante_potencial = models.BooleanField(default=False, editable=False)
+    # Si el punto cae fuera del límite de la zona; ``None`` sin coordenadas o si la zona no tiene límite.
+    fuera_de_zona = models.BooleanField(null=True, blank=True, editable=False)
+    clave_idempotencia = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    # Última escritura: el índice de búsqueda en memoria solo relee lo cambiado desde su marca.
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["cedula"], name="unique_encuesta_cedula"),
         ]
+        indexes = [
+            # Series por día y filtros de rango de fechas (tablero, reporte).
+            models.Index(fields=["fecha_creacion"], name="surveys_enc_fecha"),
+            # Avance por colaborador en un rango de fechas.
+            models.Index(fields=["colaborador", "fecha_creacion"], name="surveys_enc_colab_fecha"),
+            # Votantes válidos por zona.
+            models.Index(fields=["zona", "votante_valido"], name="surveys_enc_zona_valido"),
+        ]
 
     def __str__(self):
         return f"Encuesta {self.id} - {self.zona.nombre}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_guardado = instance.estado_contadores()
+        return instance
+
+    def estado_contadores(self):
+        """Campos que alimentan los contadores materializados."""
+        return {
+            "zona_id": self.__dict__.get("zona_id"),
+            "colaborador_id": self.__dict__.get("colaborador_id"),
+            "fecha_creacion": self.__dict__.get("fecha_creacion"),
+            "votante_valido": self.__dict__.get("votante_valido", False),
+            "votante_potencial": self.__dict__.get("votante_potencial", False),
+            "comentario_problema": self.__dict__.get("comentario_problema"),
+            "lat": self.__dict__.get("lat"),
+            "lon": self.__dict__.get("lon"),
+            "fuera_de_zona": self.__dict__.get("fuera_de_zona"),
+        }
+
     def _apply_votante_flags(self):
         self.votante_valido = False
         self.votante_potencial = False
@@ -114,34 +152,28 @@ class Encuesta(models.Model):
         ):
             self.votante_potencial = True
 
-    def _update_leader_score(self):
-        leader = None
-        if self.colaborador_id and self.colaborador.is_leader:
-            leader = self.colaborador
-        elif (
-            self.colaborador_id
-            and self.colaborador.created_by_id
-            and self.colaborador.created_by.is_leader
-        ):
-            leader = self.colaborador.created_by
-        if not leader:
+    def _apply_geocerca(self, kwargs, indice=None):
+        """Verifica el punto contra el límite de la zona (ver ``territory.geofence``)."""
+        campos = kwargs.get("update_fields")
+        if campos is not None and not {"zona", "zona_id", "lat", "lon"} & set(campos):
             return
-        from django.db.models import Q
-
-        qs = Encuesta.objects.filter(
-            Q(colaborador=leader) | Q(colaborador__created_by=leader)
-        )
-        total = qs.count()
-        validos = qs.filter(votante_valido=True).count()
-        score = round((validos / total) * 100, 2) if total else 0
-        if leader.score_confiabilidad != score:
-            leader.score_confiabilidad = score
-            leader.save(update_fields=["score_confiabilidad"])
+        self.fuera_de_zona = fuera_de_zona(self.zona_id, self.lat, self.lon, indice)
+        if campos is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "fuera_de_zona"}
 
     def save(self, *args, **kwargs):
+        from .counters import actualizar_contadores_encuesta
+
         self._apply_votante_flags()
-        super().save(*args, **kwargs)
-        self._update_leader_score()
+        actualizar_geohash(self, kwargs)
+        self._apply_geocerca(kwargs)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "actualizado_en"}
+        anterior = None if self._state.adding else getattr(self, "_estado_guardado", None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            actualizar_contadores_encuesta(self.pk, anterior, self.estado_contadores())
+        self._estado_guardado = self.estado_contadores()
 
 
 class EncuestaNecesidad(models.Model):
@@ -151,6 +183,28 @@ class EncuestaNecesidad(models.Model):
 
     class Meta:
         unique_together = ("encuesta", "prioridad")
+        indexes = [
+            # Conteos por necesidad sin pasar por la tabla.
+            models.Index(fields=["necesidad", "encuesta"], name="surveys_encnec_nec_enc"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_guardado = (
+            instance.__dict__.get("encuesta_id"),
+            instance.__dict__.get("necesidad_id"),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .counters import actualizar_cobertura_necesidad
+
+        anterior = None if self._state.adding else getattr(self, "_estado_guardado", None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            actualizar_cobertura_necesidad(self, anterior)
+        self._estado_guardado = (self.encuesta_id, self.necesidad_id)
 
 
 class CasoCiudadano(models.Model):
@@ -168,6 +222,116 @@ class CasoCiudadano(models.Model):
     nivel_prioridad = models.CharField(max_length=10, choices=Prioridad.choices)
     estado = models.CharField(max_length=15, choices=Estado.choices, default=Estado.REGISTRADO)
     notas_seguimiento = models.TextField(blank=True, null=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Casos activos del tablero.
+            models.Index(fields=["estado"], name="surveys_caso_estado"),
+            # Casos críticos y conteos por prioridad y estado del reporte.
+            models.Index(fields=["nivel_prioridad", "estado"], name="surveys_caso_prior_estado"),
+        ]
 
     def __str__(self):
         return f"Caso {self.id} - {self.nivel_prioridad}"
+
+
+class CoberturaZona(models.Model):
+    """Contadores de encuestas por zona, mantenidos en cada escritura de encuesta."""
+
+    zona = models.OneToOneField(
+        Zona, on_delete=models.CASCADE, primary_key=True, related_name="cobertura"
+    )
+    total_encuestas = models.IntegerField(default=0)
+    votantes_validos = models.IntegerField(default=0)
+    votantes_potenciales = models.IntegerField(default=0)
+    # Encuestas con el punto verificado contra el límite de la zona, y cuántas cayeron fuera.
+    encuestas_verificadas = models.IntegerField(default=0)
+    encuestas_fuera_de_zona = models.IntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Cobertura {self.zona_id}: {self.total_encuestas}"
+
+
+class CoberturaZonaNecesidad(models.Model):
+    zona = models.ForeignKey(Zona, on_delete=models.CASCADE, related_name="cobertura_necesidades")
+    necesidad = models.ForeignKey(Necesidad, on_delete=models.CASCADE, related_name="+")
+    total = models.IntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ("zona", "necesidad")
+
+
+class CeldaMapa(models.Model):
+    """Contadores de encuestas por celda de geohash (ver ``tiles.py``), mantenidos como los de zona."""
+
+    celda = models.CharField(max_length=12, primary_key=True)
+    total_encuestas = models.IntegerField(default=0)
+    votantes_validos = models.IntegerField(default=0)
+    # Sumas de coordenadas para el centroide de los puntos de la celda.
+    suma_lat = models.FloatField(default=0)
+    suma_lon = models.FloatField(default=0)
+    # Sube con cada cambio de la celda o de sus necesidades; con ``actualizado_en``
+    # (que cambia al reconstruir) forma la marca de caché de las teselas.
+    version = models.IntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Celda {self.celda}: {self.total_encuestas}"
+
+
+class CeldaMapaNecesidad(models.Model):
+    celda = models.CharField(max_length=12)
+    necesidad = models.ForeignKey(Necesidad, on_delete=models.CASCADE, related_name="+")
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["celda", "necesidad"], name="surveys_celda_necesidad"),
+        ]
+
+
+class TerminoZonaDia(models.Model):
+    """Frecuencia de cada término de ``comentario_problema`` por zona y día (ver ``terms.py``)."""
+
+    zona = models.ForeignKey(Zona, on_delete=models.CASCADE, related_name="+")
+    fecha = models.DateField()
+    termino = models.CharField(max_length=40)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["zona", "fecha", "termino"], name="surveys_termino_zona_dia"),
+        ]
+        indexes = [
+            # Temas de todo el territorio en un rango de fechas.
+            models.Index(fields=["fecha", "termino"], name="surveys_termino_fecha"),
+        ]
+
+    def __str__(self):
+        return f"{self.termino} ({self.zona_id}, {self.fecha}): {self.total}"
+
+
+class ResumenLider(models.Model):
+    """Totales de encuestas atribuidas a un líder (propias o de sus colaboradores)."""
+
+    lider = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="resumen_encuestas"
+    )
+    total_encuestas = models.IntegerField(default=0)
+    encuestas_validas = models.IntegerField(default=0)
+    encuestas_potenciales = models.IntegerField(default=0)
+    ultima_fecha_valida = models.DateField(null=True, blank=True)
+    # Se mueve al recontar (cambia el dueño de las encuestas); las sumas por encuesta mueven ``marca_encuestas``.
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Resumen {self.lider_id}: {self.encuestas_validas}/{self.total_encuestas}"
+
+    @property
+    def score_confiabilidad(self):
+        if not self.total_encuestas:
+            return 0
+        return round((self.encuestas_validas / self.total_encuestas) * 100, 2)
@@ -0,0 +1,397 @@
+"""Búsqueda de texto en ``comentario_problema`` y ``notas_seguimiento``.
+
+Usa el índice de texto de la base cuando existe: FULLTEXT en MySQL y tablas
+FTS5 en SQLite (las crea la migración 0012 y se reponen tras cada ``migrate``,
+porque SQLite pierde los triggers cuando rehace la tabla). En otros motores, o
+si SQLite no trae FTS5, usa un índice invertido en memoria por proceso que se
+pone al día releyendo solo las filas escritas desde su marca. Cada palabra de
+la consulta busca por prefijo y sin tildes; los resultados salen por relevancia
+(BM25 en SQLite y en Python, la relevancia de MySQL en MySQL). Cada motor
+devuelve solo las primeras filas que pide la página y cuenta el total aparte.
+"""
+import heapq
+import html
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import OperationalError, connection
+from django.db.models import Count, Max, Q
+from django.db.models.expressions import RawSQL
+
+from pitpc.pagination import iterar_por_llave
+from .models import CasoCiudadano, Encuesta
+from .services import encuestas_visibles
+from .terms import PALABRAS_VACIAS, plegar
+
+FUENTES = {
+    "encuestas": {"modelo": Encuesta, "campo": "comentario_problema", "prefijo": "", "tipo": "encuesta"},
+    "casos": {"modelo": CasoCiudadano, "campo": "notas_seguimiento", "prefijo": "encuesta__", "tipo": "caso"},
+}
+LARGO_MINIMO = 3
+PALABRAS_MAXIMAS = 8
+FRAGMENTO = 160
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+
+
+def palabras_consulta(texto):
+    """Palabras útiles de la consulta, sin tildes ni repetidas."""
+    palabras = []
+    for palabra in _PALABRA.findall(plegar(texto or "")):
+        if len(palabra) >= LARGO_MINIMO and palabra not in PALABRAS_VACIAS and palabra not in palabras:
+            palabras.append(palabra)
+    return palabras[:PALABRAS_MAXIMAS]
+
+
+# SQLite FTS5
+
+
+def _objetos_fts(fuente):
+    tabla = fuente["modelo"]._meta.db_table
+    fts = f"{tabla}_fts"
+    campo = fuente["campo"]
+    insertar = f"INSERT INTO {fts}(rowid, {campo}) VALUES (new.id, new.{campo});"
+    borrar = f"INSERT INTO {fts}({fts}, rowid, {campo}) VALUES ('delete', old.id, old.{campo});"
+    return fts, {
+        f"{fts}_ai": f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN {insertar} END",
+        f"{fts}_ad": f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN {borrar} END",
+        f"{fts}_au": f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {campo} ON {tabla} BEGIN {borrar} {insertar} END",
+    }, (
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({campo}, content='{tabla}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def _existentes(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+    return {nombre for (nombre,) in cursor.fetchall()}
+
+
+def instalar_fts(conexion):
+    """Crea las tablas FTS5 y sus triggers que falten y las repuebla; ``False`` si SQLite no trae FTS5."""
+    with conexion.cursor() as cursor:
+        existentes = _existentes(cursor)
+        for fuente in FUENTES.values():
+            fts, triggers, tabla_virtual = _objetos_fts(fuente)
+            if {fts, *triggers} <= existentes:
+                continue
+            if fts not in existentes:
+                try:
+                    cursor.execute(tabla_virtual)
+                except OperationalError:
+                    return False
+            for nombre, sql in triggers.items():
+                if nombre not in existentes:
+                    cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return True
+
+
+def retirar_fts(conexion):
+    with conexion.cursor() as cursor:
+        for fuente in FUENTES.values():
+            fts, triggers, _ = _objetos_fts(fuente)
+            for nombre in triggers:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def _fts_instalado():
+    with connection.cursor() as cursor:
+        existentes = _existentes(cursor)
+    return all({fts, *triggers} <= existentes for fts, triggers, _ in map(_objetos_fts, FUENTES.values()))
+
+
+def _consulta_sqlite(fuente, palabras, alcance, columnas):
+    fts = _objetos_fts(fuente)[0]
+    sql = f"SELECT {columnas.format(fts=fts)} FROM {fts} WHERE {fts} MATCH %s"
+    params = [" OR ".join(f'"{palabra}"*' for palabra in palabras)]
+    if alcance is not None:
+        subconsulta, subparams = alcance.values("pk").query.sql_with_params()
+        sql += f" AND rowid IN ({subconsulta})"
+        params.extend(subparams)
+    return fts, sql, params
+
+
+def _buscar_sqlite(fuente, palabras, alcance, limite=None):
+    fts, sql, params = _consulta_sqlite(fuente, palabras, alcance, "rowid, -bm25({fts})")
+    sql += f" ORDER BY bm25({fts}), rowid DESC"
+    if limite is not None:
+        sql += " LIMIT %s"
+        params.append(limite)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _contar_sqlite(fuente, palabras, alcance):
+    _, sql, params = _consulta_sqlite(fuente, palabras, alcance, "COUNT(*)")
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+
+
+# MySQL FULLTEXT
+
+
+def _coincidencias_mysql(fuente, palabras, alcance):
+    modelo = fuente["modelo"]
+    columna = f"{connection.ops.quote_name(modelo._meta.db_table)}.{connection.ops.quote_name(fuente['campo'])}"
+    # Modo booleano sin operadores: cualquier palabra, cada una por prefijo.
+    relevancia = RawSQL(f"MATCH ({columna}) AGAINST (%s IN BOOLEAN MODE)", (" ".join(f"{p}*" for p in palabras),))
+    filas = modelo.objects.all() if alcance is None else alcance
+    return filas.annotate(relevancia=relevancia).filter(relevancia__gt=0)
+
+
+def _buscar_mysql(fuente, palabras, alcance, limite=None):
+    filas = _coincidencias_mysql(fuente, palabras, alcance).order_by("-relevancia", "-pk")
+    filas = filas.values_list("pk", "relevancia")
+    return list(filas if limite is None else filas[:limite])
+
+
+def _contar_mysql(fuente, palabras, alcance):
+    return _coincidencias_mysql(fuente, palabras, alcance).count()
+
+
+# Índice invertido en Python
+
+_indices = {}
+_candado = threading.Lock()
+# Margen para filas guardadas antes de la marca pero confirmadas después.
+SOLAPE = timedelta(seconds=10)
+
+
+def _marca(fuente):
+    # El conteo y el último id delatan altas y borrados; la fecha, las ediciones.
+    return fuente["modelo"].objects.aggregate(total=Count("pk"), ultimo=Max("pk"), fecha=Max("actualizado_en"))
+
+
+def _quitar(indice, pk):
+    indice["largos"].pop(pk, None)
+    for palabra in indice["terminos"].pop(pk, ()):
+        documentos = indice["documentos"][palabra]
+        del documentos[pk]
+        if not documentos:
+            del indice["documentos"][palabra]
+
+
+def _agregar(indice, pk, texto):
+    palabras = _PALABRA.findall(plegar(texto or ""))
+    if not palabras:
+        return
+    veces = Counter(palabras)
+    indice["largos"][pk] = len(palabras)
+    indice["terminos"][pk] = tuple(veces)
+    for palabra, total in veces.items():
+        indice["documentos"].setdefault(palabra, {})[pk] = total
+
+
+def _indice(nombre):
+    """Índice de la fuente al día con la base; quien llama tiene ``_candado``.
+
+    La primera vez lee todos los textos; después solo las filas escritas desde
+    la marca anterior (más ``SOLAPE``) o nuevas, y los ids si hubo borrados.
+    """
+    fuente = FUENTES[nombre]
+    modelo, campo = fuente["modelo"], fuente["campo"]
+    marca = _marca(fuente)
+    indice = _indices.get(nombre)
+    if indice is not None and indice["marca"] == marca:
+        return indice
+    if indice is None or indice["marca"]["fecha"] is None:
+        indice = {"documentos": {}, "largos": {}, "terminos": {}}
+        cambiadas = modelo.objects.exclude(**{f"{campo}__isnull": True}).exclude(**{campo: ""})
+        nuevas = 0
+    else:
+        anterior = indice["marca"]
+        cambiadas = modelo.objects.filter(
+            Q(actualizado_en__gte=anterior["fecha"] - SOLAPE) | Q(pk__gt=anterior["ultimo"])
+        )
+        nuevas = cambiadas.filter(pk__gt=anterior["ultimo"]).count()
+        if marca["total"] != anterior["total"] + nuevas:
+            vivos = set(modelo.objects.values_list("pk", flat=True))
+            for pk in [pk for pk in indice["largos"] if pk not in vivos]:
+                _quitar(indice, pk)
+    for fila in iterar_por_llave(cambiadas.values("id", campo)):
+        _quitar(indice, fila["id"])
+        _agregar(indice, fila["id"], fila[campo])
+    largos = indice["largos"]
+    indice.update(marca=marca, promedio=sum(largos.values()) / len(largos) if largos else 0)
+    _indices[nombre] = indice
+    return indice
+
+
+def _puntajes_python(fuente, palabras, alcance, k1=1.2, b=0.75):
+    nombre = next(clave for clave, valor in FUENTES.items() if valor is fuente)
+    permitidos = None if alcance is None else set(alcance.values_list("pk", flat=True))
+    puntajes = Counter()
+    with _candado:
+        indice = _indice(nombre)
+        total = len(indice["largos"])
+        for palabra in palabras:
+            frecuencias = Counter()
+            for termino, documentos in indice["documentos"].items():
+                if termino.startswith(palabra):
+                    frecuencias.update(documentos)
+            idf = math.log(1 + (total - len(frecuencias) + 0.5) / (len(frecuencias) + 0.5))
+            for documento, tf in frecuencias.items():
+                if permitidos is not None and documento not in permitidos:
+                    continue
+                largo = indice["largos"][documento] / indice["promedio"]
+                puntajes[documento] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * largo))
+    return puntajes
+
+
+def _buscar_python(fuente, palabras, alcance, limite=None):
+    puntajes = _puntajes_python(fuente, palabras, alcance)
+    limite = len(puntajes) if limite is None else limite
+    return heapq.nlargest(limite, puntajes.items(), key=lambda par: (par[1], par[0]))
+
+
+def _contar_python(fuente, palabras, alcance):
+    return len(_puntajes_python(fuente, palabras, alcance))
+
+
+def motor():
+    """``"mysql"``, ``"sqlite"`` (FTS5) o ``"python"`` según la base por defecto."""
+    if connection.vendor == "mysql":
+        return "mysql"
+    if connection.vendor == "sqlite" and _fts_instalado():
+        return "sqlite"
+    return "python"
+
+
+BUSCADORES = {"mysql": _buscar_mysql, "sqlite": _buscar_sqlite, "python": _buscar_python}
+CONTADORES = {"mysql": _contar_mysql, "sqlite": _contar_sqlite, "python": _contar_python}
+
+
+def _fuentes_con_alcance(user, fuentes):
+    for nombre in fuentes:
+        fuente = FUENTES[nombre]
+        modelo = fuente["modelo"]
+        yield fuente, None if user.is_admin else encuestas_visibles(modelo.objects.all(), user, fuente["prefijo"])
+
+
+def buscar_texto(user, consulta, fuentes=tuple(FUENTES), con_motor=None, limite=None):
+    """``[(puntaje, tipo, id)]`` de mayor a menor relevancia, limitado a lo que ``user`` puede ver.
+
+    Con ``limite`` cada motor devuelve solo sus ``limite`` primeras filas y se
+    mezclan esas: las primeras del total siempre están entre ellas.
+    """
+    palabras = palabras_consulta(consulta)
+    if not palabras:
+        return []
+    buscador = BUSCADORES[con_motor or motor()]
+    resultados = []
+    for fuente, alcance in _fuentes_con_alcance(user, fuentes):
+        resultados.extend(
+            (float(puntaje), fuente["tipo"], pk) for pk, puntaje in buscador(fuente, palabras, alcance, limite)
+        )
+    resultados.sort(key=lambda item: (-item[0], item[1], -item[2]))
+    return resultados[:limite]
+
+
+def contar_texto(user, consulta, fuentes=tuple(FUENTES), con_motor=None):
+    """Cuántos resultados tendría ``buscar_texto`` sin límite."""
+    palabras = palabras_consulta(consulta)
+    if not palabras:
+        return 0
+    contador = CONTADORES[con_motor or motor()]
+    return sum(contador(fuente, palabras, alcance) for fuente, alcance in _fuentes_con_alcance(user, fuentes))
+
+
+class Busqueda:
+    """Resultados para el paginador: cuenta con ``contar_texto`` y cada página pide solo hasta su final."""
+
+    def __init__(self, user, consulta, fuentes=tuple(FUENTES)):
+        self.user, self.consulta, self.fuentes = user, consulta, fuentes
+
+    def count(self):
+        return contar_texto(self.user, self.consulta, self.fuentes)
+
+    def __getitem__(self, corte):
+        return buscar_texto(self.user, self.consulta, self.fuentes, limite=corte.stop)[corte]
+
+
+def resaltar(texto, palabras, ancho=FRAGMENTO):
+    """Fragmento de ``texto`` alrededor de la primera coincidencia, escapado y con ``<mark>``."""
+    texto = texto or ""
+    # Un carácter plegado por carácter original, así las posiciones coinciden.
+    plegado = "".join((plegar(letra) or letra)[:1] for letra in texto)
+    patron = re.compile(r"(?<![a-z0-9])(?:%s)[a-z0-9]*" % "|".join(map(re.escape, palabras)))
+    coincidencias = list(patron.finditer(plegado))
+    inicio = 0
+    if coincidencias and len(texto) > ancho:
+        inicio = max(0, coincidencias[0].start() - ancho // 3)
+        espacio = texto.rfind(" ", 0, inicio)
+        inicio = espacio + 1 if espacio >= 0 else 0
+    fin = min(len(texto), inicio + ancho)
+    partes = ["…" if inicio else ""]
+    cursor = inicio
+    for coincidencia in coincidencias:
+        if coincidencia.start() < inicio:
+            continue
+        if coincidencia.end() > fin:
+            break
+        partes.append(html.escape(texto[cursor : coincidencia.start()]))
+        partes.append(f"<mark>{html.escape(texto[coincidencia.start() : coincidencia.end()])}</mark>")
+        cursor = coincidencia.end()
+    partes.append(html.escape(texto[cursor:fin]))
+    partes.append("…" if fin < len(texto) else "")
+    return "".join(partes)
+
+
+def detallar(pagina, consulta):
+    """Datos de los resultados de una página: dos consultas, una por fuente."""
+    palabras = palabras_consulta(consulta)
+    ids = defaultdict(list)
+    for _, tipo, pk in pagina:
+        ids[tipo].append(pk)
+    filas = {}
+    for item in Encuesta.objects.filter(id__in=ids["encuesta"]).values(
+        "id", "comentario_problema", "fecha_creacion", "zona__nombre", "zona__municipio__nombre"
+    ):
+        filas["encuesta", item["id"]] = {
+            "encuesta_id": item["id"],
+            "texto": item["comentario_problema"],
+            "fecha": item["fecha_creacion"],
+            "zona": item["zona__nombre"],
+            "municipio": item["zona__municipio__nombre"],
+        }
+    for item in CasoCiudadano.objects.filter(id__in=ids["caso"]).values(
+        "id",
+        "notas_seguimiento",
+        "encuesta_id",
+        "encuesta__fecha_creacion",
+        "encuesta__zona__nombre",
+        "encuesta__zona__municipio__nombre",
+    ):
+        filas["caso", item["id"]] = {
+            "encuesta_id": item["encuesta_id"],
+            "texto": item["notas_seguimiento"],
+            "fecha": item["encuesta__fecha_creacion"],
+            "zona": item["encuesta__zona__nombre"],
+            "municipio": item["encuesta__zona__municipio__nombre"],
+        }
+    resultados = []
+    for puntaje, tipo, pk in pagina:
+        fila = filas.get((tipo, pk))
+        if fila is None:
+            # Borrada entre la búsqueda y el detalle.
+            continue
+        resultados.append(
+            {
+                "tipo": tipo,
+                "id": pk,
+                "encuesta_id": fila["encuesta_id"],
+                "zona": fila["zona"],
+                "municipio": fila["municipio"],
+                "fecha": fila["fecha"],
+                "puntaje": round(puntaje, 4),
+                "fragmento": resaltar(fila["texto"], palabras),
+            }
+        )
+    return resultados
@@ -1,10 +1,31 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
 from accounts.models import User
+from pitpc.serializers import SparseFieldsMixin
+from territory.geofence import fuera_de_zona
 from territory.models import MetaZona, Zona, ZonaAsignacion
 from .models import CasoCiudadano, Encuesta, EncuestaNecesidad, Necesidad
 
 
+class LotePrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resuelve la llave contra los objetos precargados del lote (``context["lote"]``) si existen."""
+
+    def to_internal_value(self, data):
+        lote = self.context.get("lote")
+        if lote is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return lote["objetos"][self.queryset.model][int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
 class NeedSerializer(serializers.ModelSerializer):
     class Meta:
         model = Necesidad
@@ -13,7 +34,7 @@ class NeedSerializer(serializers.ModelSerializer):
 
 class SurveyNeedSerializer(serializers.ModelSerializer):
     necesidad = NeedSerializer(read_only=True)
-    necesidad_id = serializers.PrimaryKeyRelatedField(
+    necesidad_id = LotePrimaryKeyRelatedField(
         queryset=Necesidad.objects.all(), source="necesidad", write_only=True
     )
 
@@ -22,8 +43,9 @@ class SurveyNeedSerializer(serializers.ModelSerializer):
         fields = ["prioridad", "necesidad", "necesidad_id"]
 
 
-class SurveySerializer(serializers.ModelSerializer):
+class SurveySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     necesidades = SurveyNeedSerializer(many=True)
+    zona = LotePrimaryKeyRelatedField(queryset=Zona.objects.all())
     zona_nombre = serializers.CharField(source="zona.nombre", read_only=True)
     municipio_nombre = serializers.CharField(source="zona.municipio.nombre", read_only=True)
     colaborador_nombre = serializers.CharField(source="colaborador.name", read_only=True)
@@ -33,6 +55,10 @@ class SurveySerializer(serializers.ModelSerializer):
     capacidad_influencia = serializers.IntegerField(required=False, allow_null=True)
     votante_valido = serializers.BooleanField(read_only=True)
     votante_potencial = serializers.BooleanField(read_only=True)
+    fuera_de_zona = serializers.BooleanField(read_only=True, allow_null=True)
+    clave_idempotencia = serializers.CharField(
+        max_length=64, required=False, allow_blank=True, allow_null=True
+    )
 
     class Meta:
         model = Encuesta
@@ -64,6 +90,8 @@ class SurveySerializer(serializers.ModelSerializer):
             "capacidad_influencia",
             "votante_valido",
             "votante_potencial",
+            "fuera_de_zona",
+            "clave_idempotencia",
             "necesidades",
         ]
         read_only_fields = ["colaborador", "fecha_hora", "fecha_creacion"]
@@ -82,12 +110,19 @@ class SurveySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La cédula solo debe contener números")
         if len(str(cedula)) > 15:
             raise serializers.ValidationError("La cédula no puede superar 15 dígitos")
-        cedula_qs = Encuesta.objects.filter(cedula=str(cedula))
-        if self.instance:
-            cedula_qs = cedula_qs.exclude(pk=self.instance.pk)
-        if cedula_qs.exists():
+        lote = self.context.get("lote")
+        if lote is not None:
+            cedula_existe = str(cedula) in lote["cedulas"]
+        else:
+            cedula_qs = Encuesta.objects.filter(cedula=str(cedula))
+            if self.instance:
+                cedula_qs = cedula_qs.exclude(pk=self.instance.pk)
+            cedula_existe = cedula_qs.exists()
+        if cedula_existe:
             raise serializers.ValidationError("Ya existe una encuesta registrada con esta cédula.")
         attrs["cedula"] = str(cedula)
+        if "clave_idempotencia" in attrs:
+            attrs["clave_idempotencia"] = (attrs["clave_idempotencia"] or "").strip() or None
         if attrs.get("consentimiento") is False:
             raise serializers.ValidationError("Debe contar con consentimiento")
         nivel_afinidad = attrs.get("nivel_afinidad")
@@ -115,20 +150,32 @@ class SurveySerializer(serializers.ModelSerializer):
         user = self.context["request"].user
         zona = attrs.get("zona")
         if user.is_collaborator and zona:
-            has_assignment = ZonaAsignacion.objects.filter(
-                colaborador=user, zona=zona
-            ).exists()
+            if lote is not None:
+                has_assignment = zona.id in lote["zonas_asignadas"]
+            else:
+                has_assignment = ZonaAsignacion.objects.filter(
+                    colaborador=user, zona=zona
+                ).exists()
             if not has_assignment:
                 raise serializers.ValidationError(
                     "Esta zona no está asignada a tu usuario"
                 )
         if user.is_leader and zona:
-            if not zona.municipio.lideres.filter(id=user.id).exists():
+            if lote is not None:
+                lidera_municipio = zona.municipio_id in lote["municipios_lider"]
+            else:
+                lidera_municipio = zona.municipio.lideres.filter(id=user.id).exists()
+            if not lidera_municipio:
                 raise serializers.ValidationError(
                     "Solo puedes registrar encuestas en municipios asignados"
                 )
+        if settings.GEOCERCA_RECHAZAR and zona:
+            punto = [attrs.get(campo, getattr(self.instance, campo, None)) for campo in ("lat", "lon")]
+            if fuera_de_zona(zona.id, *punto, lote["geocercas"] if lote is not None else None):
+                raise serializers.ValidationError("La ubicación está fuera de los límites de la zona.")
         return attrs
 
+    @transaction.atomic
     def create(self, validated_data):
         necesidades = validated_data.pop("necesidades")
         validated_data["colaborador"] = self.context["request"].user
@@ -156,3 +203,6 @@ class CoverageSerializer(serializers.Serializer):
     total_encuestas = serializers.IntegerField()
     cobertura_porcentaje = serializers.FloatField()
     estado_cobertura = serializers.CharField()
+    encuestas_verificadas = serializers.IntegerField(required=False)
+    encuestas_fuera_de_zona = serializers.IntegerField(required=False)
+    geocerca_sospechosa = serializers.BooleanField(required=False)
@@ -1,70 +1,181 @@
-from django.db.models import Count, Q
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Max, Q, When
 
-from territory.models import MetaZona, Zona
-from .models import EncuestaNecesidad
+from accounts.models import User
+from territory.geo import dentro, q_caja
+from territory.models import Zona
+from .models import CoberturaZona, CoberturaZonaNecesidad, Encuesta, EncuestaNecesidad
 
 
-def calcular_cobertura_por_zona(user=None):
-    data = []
-    zona_filter = Q()
-    if user and getattr(user, "is_collaborator", False):
-        zona_filter = Q(encuestas__colaborador=user) | Q(asignaciones__colaborador=user)
-
-    zonas = (
-        Zona.objects.filter(zona_filter)
-        .select_related("municipio", "municipio__departamento", "meta")
-        .distinct()
+def lider_propietario():
+    """Expresión con el líder dueño de cada encuesta: el encuestador si es líder o quien lo creó."""
+    return Case(
+        When(colaborador__role=User.Roles.LIDER, then=F("colaborador_id")),
+        When(colaborador__created_by__role=User.Roles.LIDER, then=F("colaborador__created_by_id")),
+        default=None,
+        output_field=IntegerField(),
+    )
+
+
+def encuestas_de_lider(lider_id):
+    # Filtra por la lista de encuestadores del líder para usar el índice por colaborador;
+    # un OR sobre el join obliga a recorrer todas las encuestas.
+    encuestadores = User.objects.filter(
+        Q(id=lider_id) | (Q(created_by_id=lider_id) & ~Q(role=User.Roles.LIDER))
+    ).values("id")
+    return Encuesta.objects.filter(colaborador_id__in=encuestadores)
+
+
+def encuestas_visibles(queryset, user, prefijo=""):
+    """Limita ``queryset`` a las encuestas que ve ``user``; ``prefijo`` lleva hasta la encuesta (``"encuesta__"``)."""
+    if user.is_collaborator:
+        return queryset.filter(**{f"{prefijo}colaborador": user})
+    if user.is_leader:
+        return queryset.filter(**{f"{prefijo}zona__municipio_id__in": user.municipios.values("id")})
+    return queryset
+
+
+def agregados_por_lider(encuestas=None):
+    """Totales por líder dueño en una sola consulta agrupada."""
+    encuestas = Encuesta.objects.all() if encuestas is None else encuestas
+    return {
+        item["lider"]: item
+        for item in encuestas.annotate(lider=lider_propietario())
+        .filter(lider__isnull=False)
+        .values("lider")
+        .annotate(
+            total=Count("id"),
+            validas=Count("id", filter=Q(votante_valido=True)),
+            potenciales=Count("id", filter=Q(votante_potencial=True)),
+            ultima_fecha=Max("fecha_creacion"),
+            ultima_fecha_valida=Max("fecha_creacion", filter=Q(votante_valido=True)),
+        )
+        .order_by()
+    }
+
+
+def _estado_cobertura(porcentaje):
+    if porcentaje <= 0:
+        return "SIN_COBERTURA"
+    if porcentaje < 50:
+        return "BAJA"
+    if porcentaje < 100:
+        return "MEDIA"
+    return "CUMPLIDA"
+
+
+def geocerca_sospechosa(verificadas, fuera):
+    """Si la proporción de encuestas fuera de la zona supera el umbral, con una muestra suficiente."""
+    return (
+        verificadas >= settings.GEOCERCA_ALERTA_MINIMO
+        and fuera * 100 >= settings.GEOCERCA_ALERTA_PORCENTAJE * verificadas
     )
-    needs_qs = EncuestaNecesidad.objects.all()
-    if user and getattr(user, "is_collaborator", False):
-        needs_qs = needs_qs.filter(encuesta__colaborador=user)
 
+
+def zonas_fuera_de_area():
+    """Zonas sospechosas por encuestas registradas fuera de su límite, desde los contadores de cobertura."""
+    filas = CoberturaZona.objects.filter(
+        encuestas_verificadas__gte=settings.GEOCERCA_ALERTA_MINIMO, encuestas_fuera_de_zona__gt=0
+    ).values("zona_id", "zona__nombre", "zona__municipio__nombre", "encuestas_verificadas", "encuestas_fuera_de_zona")
+    return [
+        {
+            "zona": fila["zona_id"],
+            "zona_nombre": fila["zona__nombre"],
+            "municipio_nombre": fila["zona__municipio__nombre"],
+            "encuestas_verificadas": fila["encuestas_verificadas"],
+            "encuestas_fuera_de_zona": fila["encuestas_fuera_de_zona"],
+            "porcentaje_fuera": round(fila["encuestas_fuera_de_zona"] / fila["encuestas_verificadas"] * 100, 2),
+        }
+        for fila in filas.order_by("zona_id")
+        if geocerca_sospechosa(fila["encuestas_verificadas"], fila["encuestas_fuera_de_zona"])
+    ]
+
+
+def zonas_en_area(zonas, area):
+    """Zonas cuyo punto cae en ``area`` (ver ``territory.geo.area_de_peticion``); sin coordenadas, el del municipio."""
+    sin_punto = Q(lat__isnull=True) | Q(lon__isnull=True)
+    return zonas.filter(q_caja(area["caja"]) | (sin_punto & q_caja(area["caja"], "municipio__")))
+
+
+def calcular_cobertura_por_zona(user=None, area=None):
+    es_colaborador = bool(user and getattr(user, "is_collaborator", False))
+    zonas = Zona.objects.select_related("municipio", "meta").order_by("id")
+    if area:
+        zonas = zonas_en_area(zonas, area)
     necesidades_por_zona = {}
-    for item in (
-        needs_qs.values("encuesta__zona_id", "necesidad__nombre")
-        .annotate(total=Count("id"))
-        .order_by("-total")
-    ):
-        zona_id = item["encuesta__zona_id"]
-        necesidades_por_zona.setdefault(zona_id, []).append(
+    if es_colaborador:
+        # Los contadores materializados son globales; el alcance por colaborador se agrega aparte.
+        zonas = zonas.filter(
+            Q(encuestas__colaborador=user) | Q(asignaciones__colaborador=user)
+        ).distinct()
+        totales = {
+            item["zona_id"]: item["total"]
+            for item in user.encuestas.values("zona_id").annotate(total=Count("id"))
+        }
+        needs_qs = (
+            EncuestaNecesidad.objects.filter(encuesta__colaborador=user)
+            .values("encuesta__zona_id", "necesidad__nombre")
+            .annotate(total=Count("id"))
+            .order_by("-total")
+        )
+        zona_key = "encuesta__zona_id"
+    else:
+        zonas = zonas.select_related("cobertura")
+        totales = None
+        needs_qs = (
+            CoberturaZonaNecesidad.objects.filter(total__gt=0)
+            .values("zona_id", "necesidad__nombre", "total")
+            .order_by("-total")
+        )
+        zona_key = "zona_id"
+    if area:
+        needs_qs = needs_qs.filter(**{f"{zona_key}__in": zonas.values("id")})
+
+    for item in needs_qs:
+        necesidades_por_zona.setdefault(item[zona_key], []).append(
             {"nombre": item["necesidad__nombre"], "total": item["total"]}
         )
+
+    data = []
     for zona in zonas:
-        try:
-            meta_obj = zona.meta
-            meta = meta_obj.meta_encuestas if meta_obj else 0
-        except MetaZona.DoesNotExist:
-            meta = 0
-        encuestas_qs = zona.encuestas.all()
-        if user and getattr(user, "is_collaborator", False):
-            encuestas_qs = encuestas_qs.filter(colaborador=user)
-        total = encuestas_qs.count()
+        lat = zona.lat or zona.municipio.lat
+        lon = zona.lon or zona.municipio.lon
+        if area and area["radio"] is not None and not dentro(area, lat, lon):
+            continue
+        meta_obj = getattr(zona, "meta", None)
+        meta = meta_obj.meta_encuestas if meta_obj else 0
+        if totales is not None:
+            total = totales.get(zona.id, 0)
+        else:
+            cobertura = getattr(zona, "cobertura", None)
+            total = cobertura.total_encuestas if cobertura else 0
         porcentaje = 0
         if meta > 0:
             porcentaje = round((total / meta) * 100, 2)
-        estado = "SIN_COBERTURA"
-        if porcentaje == 0:
-            estado = "SIN_COBERTURA"
-        elif 0 < porcentaje < 50:
-            estado = "BAJA"
-        elif 50 <= porcentaje < 100:
-            estado = "MEDIA"
-        elif porcentaje >= 100:
-            estado = "CUMPLIDA"
+        geocerca = {}
+        if totales is None:
+            verificadas = cobertura.encuestas_verificadas if cobertura else 0
+            fuera = cobertura.encuestas_fuera_de_zona if cobertura else 0
+            geocerca = {
+                "encuestas_verificadas": verificadas,
+                "encuestas_fuera_de_zona": fuera,
+                "geocerca_sospechosa": geocerca_sospechosa(verificadas, fuera),
+            }
         data.append(
             {
                 "zona": zona.id,
                 "zona_nombre": zona.nombre,
                 "municipio_nombre": zona.municipio.nombre,
-                "lat": zona.lat or zona.municipio.lat,
-                "lon": zona.lon or zona.municipio.lon,
+                "lat": lat,
+                "lon": lon,
                 "municipio_lat": zona.municipio.lat,
                 "municipio_lon": zona.municipio.lon,
                 "necesidades": necesidades_por_zona.get(zona.id, []),
                 "meta_encuestas": meta,
                 "total_encuestas": total,
                 "cobertura_porcentaje": porcentaje,
-                "estado_cobertura": estado,
+                "estado_cobertura": _estado_cobertura(porcentaje),
+                **geocerca,
             }
         )
     return data
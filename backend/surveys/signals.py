@@ -0,0 +1,52 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from territory.models import Zona
+from .counters import descontar_necesidad, recontar_lideres, reevaluar_geocerca, registrar_encuestas
+from .models import Encuesta, EncuestaNecesidad
+from .search import instalar_fts
+
+
+@receiver(post_delete, sender=Encuesta)
+def descontar_encuesta(sender, instance, **kwargs):
+    estado = getattr(instance, "_estado_guardado", None) or instance.estado_contadores()
+    registrar_encuestas([estado], signo=-1)
+
+
+@receiver(post_delete, sender=EncuestaNecesidad)
+def descontar_encuesta_necesidad(sender, instance, **kwargs):
+    descontar_necesidad(instance)
+
+
+@receiver(pre_save, sender=User)
+def recordar_lider(sender, instance, raw=False, update_fields=None, **kwargs):
+    # El líder dueño de las encuestas sale del rol y de ``created_by`` (ver ``lider_propietario``).
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"role", "created_by", "created_by_id"} & set(update_fields):
+        return
+    instance._lider_anterior = User.objects.filter(pk=instance.pk).values("role", "created_by_id").first()
+
+
+@receiver(post_save, sender=User)
+def recontar_lideres_afectados(sender, instance, **kwargs):
+    anterior = instance.__dict__.pop("_lider_anterior", None)
+    if not anterior or anterior == {"role": instance.role, "created_by_id": instance.created_by_id}:
+        return
+    recontar_lideres({instance.pk, anterior["created_by_id"], instance.created_by_id} - {None})
+
+
+@receiver(post_save, sender=Zona)
+def reevaluar_encuestas_de_zona(sender, instance, created, **kwargs):
+    if getattr(instance, "_geocerca_cambiada", False):
+        reevaluar_geocerca(instance)
+
+
+@receiver(post_migrate)
+def reponer_busqueda(sender, using, **kwargs):
+    # SQLite rehace la tabla en cada cambio de columnas y se lleva los triggers de FTS5.
+    conexion = connections[using]
+    if sender.name == "surveys" and conexion.vendor == "sqlite":
+        instalar_fts(conexion)
@@ -0,0 +1,79 @@
+"""Índice de términos de ``comentario_problema`` por zona y día.
+
+Los comentarios se normalizan (minúsculas, sin tildes, sin palabras vacías y
+con el plural reducido al singular) y cada término suma en ``TerminoZonaDia``
+con las mismas deltas que los contadores de cobertura. Los temas recurrentes
+salen de sumar esas filas, sin volver a leer los comentarios.
+"""
+import re
+import unicodedata
+
+from django.db.models import Sum
+
+from .models import TerminoZonaDia
+
+LARGO_MAXIMO = 40
+
+PALABRAS_VACIAS = frozenset(
+    """
+    a al algo algun alguna algunas alguno algunos alli ante antes aqui asi aun aunque bien cada casi como con
+    contra cual cuales cuando cuanto de del desde donde dos el ella ellas ello ellos en entre era eran es esa
+    esas ese eso esos esta estaba estado estan estar estas este esto estos estoy fue fueron ha hace hacen hacer
+    hacia han hasta hay la las le les lo los mas me mi mis mismo mucha muchas mucho muchos muy nada ni no nos
+    nosotros nuestra nuestro nuestros o otra otras otro otros para pero poco por porque pues que quien se sea
+    segun ser si sido siempre sin sobre solo son su sus tal tambien tan tanto te tenemos tener tiene tienen
+    todo todos toda todas tres tu un una uno unos unas usted ustedes va van vez veces y ya yo
+    """.split()
+)
+
+_PALABRA = re.compile(r"[a-z]+")
+
+
+def plegar(texto):
+    """Minúsculas y sin tildes ni diéresis (``ñ`` queda como ``n``)."""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(letra for letra in descompuesto if not unicodedata.combining(letra))
+
+
+def _singular(palabra):
+    """Plurales regulares: luces -> luz, ladrones -> ladron, calles -> calle."""
+    if len(palabra) > 4 and palabra.endswith("ces"):
+        return palabra[:-3] + "z"
+    if len(palabra) > 4 and palabra.endswith("es") and palabra[-3] in "dljnrz" and palabra[-4] in "aeiou":
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith("s") and palabra[-2] in "aeiou":
+        return palabra[:-1]
+    return palabra
+
+
+def terminos(texto):
+    """Términos normalizados de un comentario, con repeticiones."""
+    resultado = []
+    for palabra in _PALABRA.findall(plegar(texto or "")):
+        if palabra in PALABRAS_VACIAS:
+            continue
+        raiz = _singular(palabra)
+        if len(raiz) >= 3 and raiz not in PALABRAS_VACIAS:
+            resultado.append(raiz[:LARGO_MAXIMO])
+    return resultado
+
+
+def temas_recurrentes(inicio=None, fin=None, zona_ids=None, municipio_ids=None, limite=8):
+    """Los ``limite`` términos más frecuentes en el rango de fechas y territorio pedidos."""
+    filas = TerminoZonaDia.objects.all()
+    if inicio:
+        filas = filas.filter(fecha__gte=inicio)
+    if fin:
+        filas = filas.filter(fecha__lte=fin)
+    if zona_ids is not None:
+        filas = filas.filter(zona_id__in=zona_ids)
+    if municipio_ids is not None:
+        filas = filas.filter(zona__municipio_id__in=municipio_ids)
+    totales = (
+        filas.values("termino")
+        .annotate(suma=Sum("total"))
+        .filter(suma__gt=0)
+        .order_by("-suma", "termino")
+        .values_list("termino", "suma")[:limite]
+    )
+    return [{"tema": termino, "total": total} for termino, total in totales]
@@ -1,3 +1,990 @@
-from django.test import TestCase
+import csv
+import io
+import unittest
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from territory.models import Departamento, Municipio, Zona, ZonaAsignacion
+from .counters import conciliar_lideres, reconstruir_celdas, reconstruir_cobertura, reconstruir_terminos
+from .models import (
+    CasoCiudadano,
+    CeldaMapa,
+    CeldaMapaNecesidad,
+    CoberturaZona,
+    CoberturaZonaNecesidad,
+    Encuesta,
+    EncuestaNecesidad,
+    Necesidad,
+    ResumenLider,
+    TerminoZonaDia,
+)
+from . import bulk, search
+from .export import COLUMNAS, parquet_disponible
+from .search import buscar_texto, contar_texto, motor, resaltar
+from .services import calcular_cobertura_por_zona, zonas_fuera_de_area
+from .terms import temas_recurrentes, terminos
+from .tiles import caja_de_tesela, marca_tesela, tesela, tesela_de_punto
+
+
+class TerminosTests(TestCase):
+    def test_normaliza_tildes_palabras_vacias_y_plurales(self):
+        self.assertEqual(
+            terminos("Las calles tienen HUECOS, faltan luces y hay ladrones; niños sin colegio."),
+            ["calle", "hueco", "faltan", "luz", "ladron", "nino", "colegio"],
+        )
+
+    def test_texto_vacio(self):
+        self.assertEqual(terminos(None), [])
+        self.assertEqual(terminos("y de la que"), [])
+
+
+class IndiceTerminosTests(TestCase):
+    """El índice se mantiene con cada escritura y coincide con una reconstrucción."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.otro = Municipio.objects.create(nombre="Otro", departamento=municipio.departamento)
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        cls.zona_otra = Zona.objects.create(nombre="Zona otra", tipo="BARRIO", municipio=cls.otro)
+        cls.colaborador = User.objects.create(email="c@example.com", name="C", role=User.Roles.COLABORADOR)
+
+    def _encuesta(self, zona, comentario):
+        return Encuesta.objects.create(
+            zona=zona,
+            colaborador=self.colaborador,
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+            comentario_problema=comentario,
+        )
+
+    def _indice(self):
+        return {
+            (fila.zona_id, fila.fecha, fila.termino): fila.total
+            for fila in TerminoZonaDia.objects.filter(total__gt=0)
+        }
+
+    def test_escrituras_mantienen_el_indice(self):
+        primera = self._encuesta(self.zona, "Falta agua")
+        segunda = self._encuesta(self.zona, "Huecos en las calles y falta agua")
+        self._encuesta(self.zona_otra, "Inseguridad")
+        segunda.comentario_problema = "Calles oscuras"
+        segunda.save()
+        primera.zona = self.zona_otra
+        primera.save()
+        self._encuesta(self.zona, "Alumbrado").delete()
+
+        incremental = self._indice()
+        reconstruir_terminos()
+        self.assertEqual(incremental, self._indice())
+        self.assertEqual(
+            temas_recurrentes(limite=3),
+            [{"tema": "agua", "total": 1}, {"tema": "calle", "total": 1}, {"tema": "falta", "total": 1}],
+        )
+
+    def test_consultas_no_dependen_de_los_terminos(self):
+        def comentario(inicio, cantidad):
+            return " ".join(f"palabra{chr(97 + i % 26)}{chr(97 + i // 26)}" for i in range(inicio, inicio + cantidad))
+
+        self._encuesta(self.zona, "")
+        consultas = []
+        # Términos nuevos y luego los mismos ya existentes, con comentarios de 2 y de 40 términos.
+        for texto in (comentario(0, 2), comentario(100, 40), comentario(0, 2), comentario(100, 40)):
+            with CaptureQueriesContext(connection) as capturadas:
+                self._encuesta(self.zona, texto)
+            consultas.append(len(capturadas))
+        self.assertEqual(consultas[0], consultas[1])
+        self.assertEqual(consultas[2], consultas[3])
+        incremental = self._indice()
+        reconstruir_terminos()
+        self.assertEqual(incremental, self._indice())
+
+    def test_filtros_por_territorio_y_fecha(self):
+        self._encuesta(self.zona, "Falta agua, mucha agua")
+        self._encuesta(self.zona_otra, "Inseguridad")
+        self.assertEqual(temas_recurrentes(zona_ids=[self.zona.id], limite=1), [{"tema": "agua", "total": 2}])
+        self.assertEqual(
+            temas_recurrentes(municipio_ids=[self.otro.id]), [{"tema": "inseguridad", "total": 1}]
+        )
+        self.assertEqual(temas_recurrentes(fin=date(2000, 1, 1)), [])
+
+
+class BusquedaTests(TestCase):
+    """La búsqueda de texto respeta lo que cada rol ve y ordena por relevancia."""
+
+    @classmethod
+    def setUpTestData(cls):
+        departamento = Departamento.objects.create(nombre="Departamento")
+        municipio = Municipio.objects.create(nombre="Municipio", departamento=departamento)
+        otro = Municipio.objects.create(nombre="Otro", departamento=departamento)
+        zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        zona_otra = Zona.objects.create(nombre="Zona otra", tipo="BARRIO", municipio=otro)
+        cls.admin = User.objects.create(email="a@example.com", name="A", role=User.Roles.ADMIN)
+        cls.lider = User.objects.create(email="l@example.com", name="L", role=User.Roles.LIDER)
+        municipio.lideres.add(cls.lider)
+        cls.colaborador = User.objects.create(email="c@example.com", name="C", role=User.Roles.COLABORADOR)
+        otro_colaborador = User.objects.create(email="o@example.com", name="O", role=User.Roles.COLABORADOR)
+        cls.agua = cls._encuesta(zona, cls.colaborador, "Falta agua, el agua llega turbia")
+        cls.camion = cls._encuesta(zona, otro_colaborador, "No pasa el camión de la basura")
+        cls.lejos = cls._encuesta(zona_otra, otro_colaborador, "Sin agua desde enero")
+        cls._encuesta(zona, cls.colaborador, "Calles oscuras")
+        cls.caso = CasoCiudadano.objects.create(encuesta=cls.lejos, notas_seguimiento="Se pidió el carrotanque de agua")
+
+    @classmethod
+    def _encuesta(cls, zona, colaborador, comentario):
+        return Encuesta.objects.create(
+            zona=zona,
+            colaborador=colaborador,
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+            comentario_problema=comentario,
+        )
+
+    def setUp(self):
+        # Cada test revierte sus escrituras: el índice en memoria no debe sobrevivirlas.
+        search._indices.clear()
+
+    def _ids(self, user, consulta, **kwargs):
+        return [(tipo, pk) for _, tipo, pk in buscar_texto(user, consulta, **kwargs)]
+
+    def test_indice_nativo_y_respaldo_en_python_coinciden(self):
+        self.assertEqual(motor(), "sqlite")
+        esperado = [("encuesta", self.agua.pk), ("encuesta", self.lejos.pk), ("caso", self.caso.pk)]
+        self.assertEqual(sorted(self._ids(self.admin, "AGUA")), sorted(esperado))
+        self.assertEqual(sorted(self._ids(self.admin, "AGUA", con_motor="python")), sorted(esperado))
+        # Dos apariciones en un comentario corto pesan más que una.
+        self.assertEqual(self._ids(self.admin, "agua", fuentes=("encuestas",))[0], ("encuesta", self.agua.pk))
+        # Prefijo y sin tildes.
+        self.assertEqual(self._ids(self.admin, "camion"), [("encuesta", self.camion.pk)])
+        self.assertEqual(self._ids(self.admin, "cami", con_motor="python"), [("encuesta", self.camion.pk)])
+
+    def test_indice_sigue_las_escrituras(self):
+        self.camion.comentario_problema = "Ya pasa el carro"
+        self.camion.save()
+        self.lejos.delete()
+        for motor_busqueda in ("sqlite", "python"):
+            with self.subTest(motor=motor_busqueda):
+                self.assertEqual(self._ids(self.admin, "camion", con_motor=motor_busqueda), [])
+                self.assertEqual(self._ids(self.admin, "agua", con_motor=motor_busqueda), [("encuesta", self.agua.pk)])
+
+    def test_indice_en_python_relee_solo_lo_cambiado(self):
+        self.assertEqual(len(self._ids(self.admin, "agua", con_motor="python")), 3)
+        indice = search._indices["encuestas"]
+        with self.assertNumQueries(1):
+            # Sin escrituras solo se lee la marca.
+            search._indice("encuestas")
+        self.camion.comentario_problema = "Ya llega el agua"
+        self.camion.save()
+        self.lejos.delete()
+        nueva = self._encuesta(self.agua.zona, self.colaborador, "Agua potable para la escuela")
+        self.assertEqual(
+            sorted(self._ids(self.admin, "agua", fuentes=("encuestas",), con_motor="python")),
+            sorted([("encuesta", self.agua.pk), ("encuesta", self.camion.pk), ("encuesta", nueva.pk)]),
+        )
+        self.assertIs(search._indices["encuestas"], indice)
+        self.assertNotIn("camion", indice["documentos"])
+
+    def test_limite_y_conteo_en_cada_motor(self):
+        for motor_busqueda in ("sqlite", "python"):
+            with self.subTest(motor=motor_busqueda):
+                todos = buscar_texto(self.admin, "agua camion", con_motor=motor_busqueda)
+                self.assertEqual(contar_texto(self.admin, "agua camion", con_motor=motor_busqueda), len(todos))
+                for limite in (1, 2, 3):
+                    self.assertEqual(
+                        buscar_texto(self.admin, "agua camion", con_motor=motor_busqueda, limite=limite),
+                        todos[:limite],
+                    )
+        self.assertEqual(contar_texto(self.colaborador, "agua camion"), 1)
+
+    def test_alcance_por_rol(self):
+        for motor_busqueda in ("sqlite", "python"):
+            with self.subTest(motor=motor_busqueda):
+                self.assertEqual(
+                    sorted(self._ids(self.lider, "agua camion", con_motor=motor_busqueda)),
+                    sorted([("encuesta", self.agua.pk), ("encuesta", self.camion.pk)]),
+                )
+                self.assertEqual(
+                    self._ids(self.colaborador, "agua camion", con_motor=motor_busqueda), [("encuesta", self.agua.pk)]
+                )
+
+    def test_resaltado(self):
+        self.assertEqual(
+            resaltar("El CAMIÓN <no> pasa", ["camion"]), "El <mark>CAMIÓN</mark> &lt;no&gt; pasa"
+        )
+        fragmento = resaltar("relleno " * 40 + "falta agua " + "relleno " * 40, ["agua"], ancho=60)
+        self.assertTrue(fragmento.startswith("…") and fragmento.endswith("…"))
+        self.assertIn("<mark>agua</mark>", fragmento)
+
+    def test_endpoint_paginado(self):
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(self.lider)
+        respuesta = cliente.get("/api/encuestas/buscar/", {"q": "agua camión", "page_size": 1})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data["count"], 2)
+        self.assertEqual(len(respuesta.data["results"]), 1)
+        segunda = cliente.get(respuesta.data["next"])
+        self.assertEqual(
+            {respuesta.data["results"][0]["id"], segunda.data["results"][0]["id"]}, {self.agua.pk, self.camion.pk}
+        )
+        self.assertEqual(cliente.get("/api/encuestas/buscar/", {"q": "de la"}).status_code, 400)
+        self.assertEqual(cliente.get("/api/encuestas/buscar/", {"q": "agua", "fuente": "x"}).status_code, 400)
+
+
+class CoberturaTests(TestCase):
+    """Los contadores de zona y de necesidad siguen cada escritura y coinciden con la reconstrucción."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        cls.otra = Zona.objects.create(nombre="Otra", tipo="BARRIO", municipio=municipio)
+        cls.admin = User.objects.create(email="a@example.com", name="A", role=User.Roles.ADMIN)
+        cls.agua = Necesidad.objects.create(nombre="Agua")
+        cls.vias = Necesidad.objects.create(nombre="Vías")
+
+    def _encuesta(self, cedula, zona=None, valida=True, necesidades=()):
+        encuesta = Encuesta.objects.create(
+            zona=zona or self.zona,
+            colaborador=self.admin,
+            cedula=cedula,
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+            nivel_afinidad=1,
+            disposicion_voto=1 if valida else 3,
+        )
+        for prioridad, necesidad in enumerate(necesidades, start=1):
+            EncuestaNecesidad.objects.create(encuesta=encuesta, necesidad=necesidad, prioridad=prioridad)
+        return encuesta
+
+    def _contadores(self):
+        # Las filas en cero que deja un descuento equivalen a no tener fila.
+        zonas = {
+            zona_id: valores
+            for zona_id, *valores in CoberturaZona.objects.values_list(
+                "zona_id", "total_encuestas", "votantes_validos", "votantes_potenciales"
+            )
+            if any(valores)
+        }
+        necesidades = {
+            (zona_id, necesidad_id): total
+            for zona_id, necesidad_id, total in CoberturaZonaNecesidad.objects.filter(total__gt=0).values_list(
+                "zona_id", "necesidad_id", "total"
+            )
+        }
+        return zonas, necesidades
+
+    def assertCuadra(self, zonas, necesidades):
+        self.assertEqual(self._contadores(), (zonas, necesidades))
+        salida = io.StringIO()
+        call_command("rebuild_coverage", stdout=salida)
+        self.assertIn("Cobertura reconstruida", salida.getvalue())
+        self.assertEqual(self._contadores(), (zonas, necesidades))
+
+    def test_crear_por_la_api(self):
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(self.admin)
+        datos = {
+            "zona": self.zona.id,
+            "cedula": "1",
+            "telefono": "3000000000",
+            "tipo_vivienda": "PROPIA",
+            "rango_edad": "26-40",
+            "ocupacion": "OTRO",
+            "consentimiento": True,
+            "nivel_afinidad": 3,
+            "disposicion_voto": 1,
+            "capacidad_influencia": 1,
+            "necesidades": [
+                {"prioridad": 1, "necesidad_id": self.agua.id},
+                {"prioridad": 2, "necesidad_id": self.vias.id},
+            ],
+        }
+        self.assertEqual(cliente.post("/api/encuestas/", datos, format="json").status_code, 201)
+        self.assertCuadra(
+            {self.zona.id: [1, 0, 1]}, {(self.zona.id, self.agua.id): 1, (self.zona.id, self.vias.id): 1}
+        )
+
+    def test_editar_y_cambiar_de_zona(self):
+        encuesta = self._encuesta("1", necesidades=[self.agua, self.vias])
+        self._encuesta("2", valida=False, necesidades=[self.agua])
+        self.assertCuadra(
+            {self.zona.id: [2, 1, 0]}, {(self.zona.id, self.agua.id): 2, (self.zona.id, self.vias.id): 1}
+        )
+
+        encuesta.disposicion_voto = 3
+        encuesta.save()
+        self.assertCuadra(
+            {self.zona.id: [2, 0, 0]}, {(self.zona.id, self.agua.id): 2, (self.zona.id, self.vias.id): 1}
+        )
+
+        # La encuesta y sus necesidades pasan a la otra zona.
+        encuesta = Encuesta.objects.get(pk=encuesta.pk)
+        encuesta.zona = self.otra
+        encuesta.disposicion_voto = 1
+        encuesta.save()
+        self.assertCuadra(
+            {self.zona.id: [1, 0, 0], self.otra.id: [1, 1, 0]},
+            {(self.zona.id, self.agua.id): 1, (self.otra.id, self.agua.id): 1, (self.otra.id, self.vias.id): 1},
+        )
+
+        # Cambiar la necesidad de una respuesta mueve su conteo.
+        respuesta = EncuestaNecesidad.objects.get(encuesta=encuesta, necesidad=self.vias)
+        respuesta.necesidad = Necesidad.objects.create(nombre="Luz")
+        respuesta.save()
+        self.assertCuadra(
+            {self.zona.id: [1, 0, 0], self.otra.id: [1, 1, 0]},
+            {
+                (self.zona.id, self.agua.id): 1,
+                (self.otra.id, self.agua.id): 1,
+                (self.otra.id, respuesta.necesidad_id): 1,
+            },
+        )
+
+    def test_borrar(self):
+        encuesta = self._encuesta("1", necesidades=[self.agua, self.vias])
+        self._encuesta("2", necesidades=[self.agua])
+        EncuestaNecesidad.objects.get(encuesta=encuesta, necesidad=self.vias).delete()
+        self.assertCuadra({self.zona.id: [2, 2, 0]}, {(self.zona.id, self.agua.id): 2})
+        encuesta.delete()
+        self.assertCuadra({self.zona.id: [1, 1, 0]}, {(self.zona.id, self.agua.id): 1})
+
+    def test_borrado_en_cascada(self):
+        self._encuesta("1", necesidades=[self.agua, self.vias])
+        self._encuesta("2", zona=self.otra, necesidades=[self.vias])
+        self._encuesta("3", zona=self.otra, necesidades=[self.agua])
+        # Borrar una necesidad se lleva sus respuestas.
+        self.vias.delete()
+        self.assertCuadra(
+            {self.zona.id: [1, 1, 0], self.otra.id: [2, 2, 0]},
+            {(self.zona.id, self.agua.id): 1, (self.otra.id, self.agua.id): 1},
+        )
+        # Borrar una zona se lleva sus encuestas y sus contadores.
+        otra_id = self.otra.id
+        self.otra.delete()
+        self.assertFalse(CoberturaZona.objects.filter(zona_id=otra_id).exists())
+        self.assertCuadra({self.zona.id: [1, 1, 0]}, {(self.zona.id, self.agua.id): 1})
+        # Borrar al encuestador se lleva sus encuestas.
+        self.admin.delete()
+        self.assertCuadra({}, {})
+
+
+class ResumenLiderTests(TestCase):
+    """Los totales por líder se ajustan por delta y se recuentan cuando cambia de quién son las encuestas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        cls.lider = User.objects.create(email="l@example.com", name="L", role=User.Roles.LIDER)
+        cls.otro_lider = User.objects.create(email="o@example.com", name="O", role=User.Roles.LIDER)
+        cls.colaborador = User.objects.create(
+            email="c@example.com", name="C", role=User.Roles.COLABORADOR, created_by=cls.lider
+        )
+        cls.cedula = 0
+
+    def _encuesta(self, colaborador, valida=True):
+        type(self).cedula += 1
+        return Encuesta.objects.create(
+            zona=self.zona,
+            colaborador=colaborador,
+            cedula=str(self.cedula),
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+            nivel_afinidad=1,
+            disposicion_voto=1 if valida else 3,
+        )
+
+    def _resumenes(self):
+        return {
+            lider_id: valores
+            for lider_id, *valores in ResumenLider.objects.values_list(
+                "lider_id", "total_encuestas", "encuestas_validas", "ultima_fecha_valida"
+            )
+            if any(valores)
+        }
+
+    def assertResumenes(self, esperado):
+        self.assertEqual(self._resumenes(), esperado)
+        self.assertEqual(conciliar_lideres(), [])
+
+    def test_escrituras_y_borrado(self):
+        hoy = date.today()
+        self._encuesta(self.lider)
+        encuesta = self._encuesta(self.colaborador)
+        self._encuesta(self.colaborador, valida=False)
+        self.assertResumenes({self.lider.id: [3, 2, hoy]})
+        encuesta.disposicion_voto = 3
+        encuesta.save()
+        self.assertResumenes({self.lider.id: [3, 1, hoy]})
+        Encuesta.objects.filter(colaborador=self.lider).delete()
+        # Sin encuestas válidas la última fecha válida se recalcula a vacía.
+        self.assertResumenes({self.lider.id: [2, 0, None]})
+
+    def test_colaborador_cambia_de_lider(self):
+        self._encuesta(self.lider)
+        self._encuesta(self.colaborador)
+        self._encuesta(self.colaborador, valida=False)
+        self.colaborador.created_by = self.otro_lider
+        self.colaborador.save()
+        self.assertResumenes({self.lider.id: [1, 1, date.today()], self.otro_lider.id: [2, 1, date.today()]})
+        # Ascendido a líder, sus encuestas pasan a ser suyas.
+        self.colaborador.role = User.Roles.LIDER
+        self.colaborador.save()
+        self.assertResumenes({self.lider.id: [1, 1, date.today()], self.colaborador.id: [2, 1, date.today()]})
+        # Un líder que deja de serlo ya no tiene resumen.
+        self.lider.role = User.Roles.COLABORADOR
+        self.lider.save()
+        self.assertResumenes({self.colaborador.id: [2, 1, date.today()]})
+
+    def test_guardar_sin_cambiar_de_lider_no_recuenta(self):
+        self._encuesta(self.colaborador)
+        with self.assertNumQueries(1):
+            self.colaborador.save(update_fields=["name"])
+        with self.assertNumQueries(2):
+            # Lee el rol y el creador guardados; como no cambiaron, no recuenta.
+            self.colaborador.save()
+
+    def test_conciliar_y_corregir(self):
+        self._encuesta(self.lider)
+        self._encuesta(self.colaborador)
+        ResumenLider.objects.filter(lider=self.lider).update(total_encuestas=7)
+        ResumenLider.objects.create(lider=self.otro_lider, total_encuestas=1)
+        diferencias = conciliar_lideres()
+        self.assertEqual([item["lider_id"] for item in diferencias], [self.lider.id, self.otro_lider.id])
+        self.assertEqual(diferencias[0]["guardado"]["total_encuestas"], 7)
+        self.assertEqual(diferencias[0]["esperado"]["total_encuestas"], 2)
+        # Sin ``corregir`` no se escribe nada.
+        self.assertEqual(len(conciliar_lideres()), 2)
+        self.assertEqual(len(conciliar_lideres(corregir=True)), 2)
+        self.assertResumenes({self.lider.id: [2, 2, date.today()]})
+
+    def test_comando_de_conciliacion(self):
+        self._encuesta(self.colaborador)
+        ResumenLider.objects.filter(lider=self.lider).update(encuestas_validas=0)
+        salida = io.StringIO()
+        call_command("reconcile_leader_counters", stdout=salida)
+        self.assertIn("1 líderes con deriva", salida.getvalue())
+        self.assertEqual(ResumenLider.objects.get(lider=self.lider).encuestas_validas, 0)
+        salida = io.StringIO()
+        call_command("reconcile_leader_counters", "--fix", stdout=salida)
+        self.assertIn("1 líderes corregidos", salida.getvalue())
+        salida = io.StringIO()
+        call_command("reconcile_leader_counters", stdout=salida)
+        self.assertIn("Contadores de líderes consistentes", salida.getvalue())
+
+    def test_score_confiabilidad(self):
+        # La columna se retiró de ``User``: el puntaje sale del resumen.
+        self.assertNotIn("score_confiabilidad", {campo.name for campo in User._meta.get_fields()})
+        self.assertEqual(User.objects.get(pk=self.lider.pk).score_confiabilidad, 0)
+        self._encuesta(self.colaborador)
+        self._encuesta(self.colaborador, valida=False)
+        self._encuesta(self.colaborador, valida=False)
+        lider = User.objects.select_related("resumen_encuestas").get(pk=self.lider.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(lider.score_confiabilidad, 33.33)
+
+
+class TeselasTests(TestCase):
+    """Los contadores por celda siguen a las escrituras y las teselas se descartan al cambiar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        cls.colaborador = User.objects.create(email="c@example.com", name="C", role=User.Roles.COLABORADOR)
+        cls.agua = Necesidad.objects.create(nombre="Agua")
+        cls.vias = Necesidad.objects.create(nombre="Vías")
+
+    def setUp(self):
+        cache.clear()
+
+    def _encuesta(self, lat, lon, cedula=None, **kwargs):
+        return Encuesta.objects.create(
+            zona=self.zona,
+            colaborador=self.colaborador,
+            cedula=cedula,
+            telefono="3000000000",
+            tipo_vivienda="PROPIA",
+            rango_edad="26-40",
+            ocupacion="OTRO",
+            lat=lat,
+            lon=lon,
+            **kwargs,
+        )
+
+    def _contadores(self):
+        return (
+            {
+                fila.celda: (fila.total_encuestas, fila.votantes_validos, round(fila.suma_lat, 6), round(fila.suma_lon, 6))
+                for fila in CeldaMapa.objects.filter(total_encuestas__gt=0)
+            },
+            {(fila.celda, fila.necesidad_id): fila.total for fila in CeldaMapaNecesidad.objects.filter(total__gt=0)},
+        )
+
+    def test_escrituras_mantienen_los_contadores(self):
+        primera = self._encuesta(6.2518, -75.5636, cedula="1", nivel_afinidad=1, disposicion_voto=1)
+        segunda = self._encuesta(6.2519, -75.5637)
+        self._encuesta(None, None)
+        necesidad = EncuestaNecesidad.objects.create(encuesta=primera, necesidad=self.agua, prioridad=1)
+        EncuestaNecesidad.objects.create(encuesta=segunda, necesidad=self.vias, prioridad=1)
+        primera.lat, primera.lon = 4.60971234, -74.08175
+        primera.save()
+        necesidad.necesidad = self.vias
+        necesidad.save()
+        segunda.delete()
+
+        incremental = self._contadores()
+        reconstruir_celdas()
+        self.assertEqual(incremental, self._contadores())
+        self.assertEqual(list(incremental[0].values()), [(1, 1, 4.609712, -74.08175)])
+
+    def test_tesela_agrupa_y_se_descarta_al_escribir(self):
+        for i in range(3):
+            encuesta = self._encuesta(6.2518 + i / 10000, -75.5636)
+            EncuestaNecesidad.objects.create(encuesta=encuesta, necesidad=self.agua if i else self.vias, prioridad=1)
+        # Zoom bajo desde los contadores por celda: los tres puntos en una celda.
+        datos = tesela(10, *tesela_de_punto(6.2519, -75.5636, 10))
+        self.assertEqual(datos["total"], 3)
+        self.assertEqual(datos["celdas"][0]["necesidad"], {"id": self.agua.id, "total": 2, "nombre": "Agua"})
+        # Zoom alto desde las encuestas: celdas de unos 40 m.
+        datos = tesela(16, *tesela_de_punto(6.2519, -75.5636, 16))
+        self.assertEqual(datos["total"], 3)
+        self.assertGreater(len(datos["celdas"]), 1)
+
+        x, y = tesela_de_punto(6.2519, -75.5636, 16)
+        with self.assertNumQueries(2):
+            # En caché solo se leen la marca de las celdas y los nombres de las necesidades.
+            tesela(16, x, y)
+        # La marca sale de la base: una escritura de cualquier proceso cambia la llave sin avisar a la caché.
+        nueva = self._encuesta(6.2519, -75.5636)
+        self.assertEqual(tesela(16, x, y)["total"], 4)
+        self.assertEqual(tesela(10, *tesela_de_punto(6.2519, -75.5636, 10))["total"], 4)
+        # Un cambio solo en las necesidades también mueve la marca.
+        for item in (nueva, encuesta):
+            EncuestaNecesidad.objects.create(encuesta=item, necesidad=self.vias, prioridad=2)
+        datos = tesela(10, *tesela_de_punto(6.2519, -75.5636, 10))
+        self.assertEqual(datos["celdas"][0]["necesidad"], {"id": self.vias.id, "total": 3, "nombre": "Vías"})
+
+    def test_reconstruir_cambia_la_marca(self):
+        self._encuesta(6.2518, -75.5636)
+        caja = caja_de_tesela(10, *tesela_de_punto(6.2518, -75.5636, 10))
+        antes = marca_tesela(caja)
+        reconstruir_celdas()
+        self.assertNotEqual(marca_tesela(caja), antes)
+
+
+@override_settings(GEOCERCA_MARGEN_METROS=100, GEOCERCA_ALERTA_PORCENTAJE=20, GEOCERCA_ALERTA_MINIMO=3)
+class GeocercaTests(TestCase):
+    """Las encuestas se marcan fuera de su zona en todas las rutas y las zonas sospechosas se señalan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(
+            nombre="Zona", tipo="BARRIO", municipio=municipio, lat=6.245, lon=-75.565, radio_metros=1000
+        )
+        cls.admin = User.objects.create(email="a@example.com", name="A", role=User.Roles.ADMIN)
+        cls.agua = Necesidad.objects.create(nombre="Agua")
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST="localhost")
+        self.client.force_authenticate(self.admin)
+
+    def _datos(self, cedula, lat, lon):
+        return {
+            "zona": self.zona.id,
+            "cedula": cedula,
+            "telefono": "3000000000",
+            "tipo_vivienda": "PROPIA",
+            "rango_edad": "26-40",
+            "ocupacion": "OTRO",
+            "consentimiento": True,
+            "nivel_afinidad": 1,
+            "disposicion_voto": 1,
+            "capacidad_influencia": 1,
+            "lat": lat,
+            "lon": lon,
+            "necesidades": [{"prioridad": 1, "necesidad_id": self.agua.id}],
+        }
+
+    def _contadores(self):
+        return CoberturaZona.objects.values_list("encuestas_verificadas", "encuestas_fuera_de_zona").get()
+
+    def test_registro_individual_y_en_lote(self):
+        respuesta = self.client.post("/api/encuestas/", self._datos("1", 6.246, -75.566), format="json")
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        self.assertIs(respuesta.data["fuera_de_zona"], False)
+        lote = [self._datos("2", 6.3, -75.565), self._datos("3", None, None), self._datos("4", 6.35, -75.6)]
+        respuesta = self.client.post("/api/encuestas/bulk/", lote, format="json")
+        self.assertEqual(respuesta.data["creadas"], 3, respuesta.data)
+        marcas = dict(Encuesta.objects.values_list("cedula", "fuera_de_zona"))
+        self.assertEqual(marcas, {"1": False, "2": True, "3": None, "4": True})
+        self.assertEqual(self._contadores(), (3, 2))
+
+        cobertura = calcular_cobertura_por_zona()[0]
+        self.assertEqual((cobertura["encuestas_verificadas"], cobertura["encuestas_fuera_de_zona"]), (3, 2))
+        self.assertTrue(cobertura["geocerca_sospechosa"])
+        self.assertEqual([zona["porcentaje_fuera"] for zona in zonas_fuera_de_area()], [66.67])
+
+    def test_cambio_de_limite_reevalua_las_encuestas(self):
+        for cedula, lat in (("1", 6.246), ("2", 6.3), ("3", 6.35)):
+            self.client.post("/api/encuestas/", self._datos(cedula, lat, -75.565), format="json")
+        self.assertEqual(self._contadores(), (3, 2))
+        zona = Zona.objects.get(pk=self.zona.pk)
+        zona.radio_metros = 20000
+        zona.save()
+        self.assertEqual(self._contadores(), (3, 0))
+        zona.radio_metros = None
+        zona.save()
+        self.assertEqual(set(Encuesta.objects.values_list("fuera_de_zona", flat=True)), {None})
+        self.assertEqual(self._contadores(), (0, 0))
+        # Cambiar el nombre no vuelve a recorrer las encuestas de la zona.
+        zona.nombre = "Otra"
+        with CaptureQueriesContext(connection) as consultas:
+            zona.save()
+        self.assertFalse([consulta for consulta in consultas if "surveys_" in consulta["sql"]])
+        reconstruir_cobertura()
+        self.assertEqual(self._contadores(), (0, 0))
+
+    @override_settings(GEOCERCA_RECHAZAR=True)
+    def test_rechazo_opcional(self):
+        respuesta = self.client.post("/api/encuestas/", self._datos("1", 6.3, -75.565), format="json")
+        self.assertEqual(respuesta.status_code, 400)
+        respuesta = self.client.post("/api/encuestas/bulk/", [self._datos("2", 6.3, -75.565)], format="json")
+        self.assertEqual(respuesta.data["fallidas"], 1)
+        self.assertFalse(Encuesta.objects.exists())
+
+
+class ExportacionTests(TestCase):
+    """La exportación respeta lo que ve cada rol y no pierde ni repite filas entre lotes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        departamento = Departamento.objects.create(nombre="Departamento")
+        municipio = Municipio.objects.create(nombre="Municipio", departamento=departamento)
+        otro = Municipio.objects.create(nombre="Otro", departamento=departamento)
+        zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        zona_otra = Zona.objects.create(nombre="Zona otra", tipo="BARRIO", municipio=otro)
+        cls.admin = User.objects.create(email="a@example.com", name="A", role=User.Roles.ADMIN)
+        cls.lider = User.objects.create(email="l@example.com", name="L", role=User.Roles.LIDER)
+        municipio.lideres.add(cls.lider)
+        cls.colaborador = User.objects.create(email="c@example.com", name="C", role=User.Roles.COLABORADOR)
+        otro_colaborador = User.objects.create(email="o@example.com", name="O", role=User.Roles.COLABORADOR)
+        agua = Necesidad.objects.create(nombre="Agua")
+        vias = Necesidad.objects.create(nombre="Vías")
+        cls.encuestas = {}
+        for indice, (zona_encuesta, colaborador) in enumerate(
+            [(zona, cls.colaborador)] * 3 + [(zona, otro_colaborador), (zona_otra, otro_colaborador)]
+        ):
+            encuesta = Encuesta.objects.create(
+                zona=zona_encuesta,
+                colaborador=colaborador,
+                cedula=str(indice + 1),
+                telefono="3000000000",
+                tipo_vivienda="PROPIA",
+                rango_edad="26-40",
+                ocupacion="OTRO",
+                comentario_problema=f"Comentario, con coma {indice}",
+            )
+            EncuestaNecesidad.objects.create(encuesta=encuesta, necesidad=agua, prioridad=1)
+            if indice % 2:
+                EncuestaNecesidad.objects.create(encuesta=encuesta, necesidad=vias, prioridad=3)
+            cls.encuestas[encuesta.pk] = encuesta
+
+    def _ids(self, condicion):
+        return {pk for pk, encuesta in self.encuestas.items() if condicion(encuesta)}
+
+    def _exportar(self, usuario, **params):
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(usuario)
+        return cliente.get("/api/encuestas/exportar/", params)
+
+    def _filas(self, respuesta):
+        texto = b"".join(respuesta.streaming_content).decode()
+        self.assertTrue(texto.startswith("\ufeff"))
+        return list(csv.DictReader(io.StringIO(texto[1:])))
+
+    def test_csv_por_rol(self):
+        esperadas = {
+            self.admin: set(self.encuestas),
+            self.lider: self._ids(lambda encuesta: encuesta.zona.nombre == "Zona"),
+            self.colaborador: self._ids(lambda encuesta: encuesta.colaborador == self.colaborador),
+        }
+        for usuario, ids in esperadas.items():
+            with self.subTest(rol=usuario.role):
+                respuesta = self._exportar(usuario)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(respuesta["Content-Disposition"], 'attachment; filename="encuestas.csv"')
+                self.assertEqual({int(fila["id"]) for fila in self._filas(respuesta)}, ids)
+
+    def test_lider_exporta_las_de_sus_municipios(self):
+        # El alcance sale de los municipios asignados, no de quién registró la encuesta.
+        respuesta = self._exportar(self.lider)
+        self.assertEqual(respuesta.status_code, 200)
+        filas = self._filas(respuesta)
+        self.assertEqual({fila["municipio"] for fila in filas}, {"Municipio"})
+        self.assertEqual({int(fila["id"]) for fila in filas}, self._ids(lambda e: e.zona.nombre == "Zona"))
+        # Con otro municipio asignado también exporta sus encuestas; sin municipios, ninguna.
+        Municipio.objects.get(nombre="Otro").lideres.add(self.lider)
+        self.assertEqual({int(fila["id"]) for fila in self._filas(self._exportar(self.lider))}, set(self.encuestas))
+        self.lider.municipios.clear()
+        self.assertEqual(self._filas(self._exportar(self.lider)), [])
+
+    def test_lotes_sin_perdidas_ni_repetidas(self):
+        for lote in (1, 2, 5, 6):
+            with self.subTest(lote=lote), mock.patch("surveys.export.LOTE", lote):
+                filas = self._filas(self._exportar(self.admin))
+                self.assertEqual(sorted(int(fila["id"]) for fila in filas), sorted(self.encuestas))
+                # Las necesidades de cada lote son las de sus propias encuestas.
+                for fila in filas:
+                    self.assertEqual(fila["necesidad_alta"], "Agua")
+                    self.assertEqual(fila["necesidad_media"], "")
+                self.assertEqual(sum(fila["necesidad_baja"] == "Vías" for fila in filas), 2)
+                self.assertEqual(
+                    {fila["comentario_problema"] for fila in filas}, {f"Comentario, con coma {i}" for i in range(5)}
+                )
+
+    def test_consultas_por_lote(self):
+        with mock.patch("surveys.export.LOTE", 2), CaptureQueriesContext(connection) as consultas:
+            self._filas(self._exportar(self.admin))
+        # Tres lotes (2 + 2 + 1): una consulta de encuestas y una de necesidades por lote.
+        self.assertEqual(sum("surveys_encuestanecesidad" in consulta["sql"] for consulta in consultas), 3)
+
+    def test_parquet_sin_pyarrow(self):
+        with mock.patch("surveys.export.pq", None):
+            respuesta = self._exportar(self.admin, formato="parquet")
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(self._exportar(self.admin, formato="xlsx").status_code, 400)
+
+    @unittest.skipUnless(parquet_disponible(), "pyarrow no está instalado")
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        with mock.patch("surveys.export.LOTE", 2):
+            respuesta = self._exportar(self.lider, formato="parquet")
+        tabla = pq.read_table(io.BytesIO(b"".join(respuesta.streaming_content)))
+        self.assertEqual(tabla.column_names, COLUMNAS)
+        self.assertEqual(
+            set(tabla.column("id").to_pylist()), self._ids(lambda encuesta: encuesta.zona.nombre == "Zona")
+        )
+
+
+class IdempotenciaTests(TestCase):
+    """Un reintento con la misma clave devuelve la encuesta original sin registrar otra."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        cls.colaborador = User.objects.create(email="c@example.com", name="C", role=User.Roles.COLABORADOR)
+        cls.otro = User.objects.create(email="o@example.com", name="O", role=User.Roles.COLABORADOR)
+        for colaborador in (cls.colaborador, cls.otro):
+            ZonaAsignacion.objects.create(colaborador=colaborador, zona=cls.zona)
+        cls.agua = Necesidad.objects.create(nombre="Agua")
+
+    def _cliente(self, usuario):
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(usuario)
+        return cliente
+
+    def _datos(self, cedula, **extra):
+        return {
+            "zona": self.zona.id,
+            "cedula": cedula,
+            "telefono": "3000000000",
+            "tipo_vivienda": "PROPIA",
+            "rango_edad": "26-40",
+            "ocupacion": "OTRO",
+            "consentimiento": True,
+            "nivel_afinidad": 1,
+            "disposicion_voto": 1,
+            "capacidad_influencia": 1,
+            "necesidades": [{"prioridad": 1, "necesidad_id": self.agua.id}],
+            **extra,
+        }
+
+    def assertRepetida(self, respuesta, original):
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta["Idempotent-Replayed"], "true")
+        self.assertEqual(respuesta.data["id"], original.data["id"])
+
+    def test_reintento_con_la_clave_en_el_cuerpo(self):
+        cliente = self._cliente(self.colaborador)
+        original = cliente.post("/api/encuestas/", self._datos("1", clave_idempotencia="k1"), format="json")
+        self.assertEqual(original.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", original)
+        self.assertRepetida(
+            cliente.post("/api/encuestas/", self._datos("1", clave_idempotencia="k1"), format="json"), original
+        )
+        self.assertEqual(Encuesta.objects.count(), 1)
+        self.assertEqual(CoberturaZona.objects.get().total_encuestas, 1)
+
+    def test_reintento_con_el_encabezado(self):
+        cliente = self._cliente(self.colaborador)
+        original = cliente.post("/api/encuestas/", self._datos("1"), format="json", HTTP_IDEMPOTENCY_KEY=" k1 ")
+        self.assertEqual(original.status_code, 201)
+        self.assertEqual(Encuesta.objects.get().clave_idempotencia, "k1")
+        # El reintento se reconoce por la clave aunque el cuerpo cambie.
+        self.assertRepetida(
+            cliente.post("/api/encuestas/", self._datos("2"), format="json", HTTP_IDEMPOTENCY_KEY="k1"), original
+        )
+        self.assertEqual(Encuesta.objects.count(), 1)
+        # Sin clave, la cédula repetida es un error de validación.
+        self.assertEqual(cliente.post("/api/encuestas/", self._datos("1"), format="json").status_code, 400)
+
+    def test_clave_de_otro_usuario(self):
+        self._cliente(self.colaborador).post(
+            "/api/encuestas/", self._datos("1", clave_idempotencia="k1"), format="json"
+        )
+        respuesta = self._cliente(self.otro).post(
+            "/api/encuestas/", self._datos("2", clave_idempotencia="k1"), format="json"
+        )
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertNotIn("cedula", respuesta.data)
+        self.assertEqual(Encuesta.objects.count(), 1)
+
+    def test_reintento_simultaneo(self):
+        cliente = self._cliente(self.colaborador)
+        original = cliente.post("/api/encuestas/", self._datos("1", clave_idempotencia="k1"), format="json")
+        # El reintento no ve la clave al empezar: la otra petición la registra entretanto.
+        with mock.patch("surveys.views.encuesta_registrada", side_effect=[None, Encuesta.objects.get()]):
+            respuesta = cliente.post("/api/encuestas/", self._datos("2", clave_idempotencia="k1"), format="json")
+        self.assertRepetida(respuesta, original)
+        self.assertEqual(Encuesta.objects.count(), 1)
+        self.assertEqual(CoberturaZona.objects.get().total_encuestas, 1)
+
+
+class LoteTests(TestCase):
+    """El lote registra lo válido, informa cada fallo por posición y deja los contadores al día."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipio = Municipio.objects.create(
+            nombre="Municipio", departamento=Departamento.objects.create(nombre="Departamento")
+        )
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=municipio)
+        cls.admin = User.objects.create(email="a@example.com", name="A", role=User.Roles.ADMIN)
+        cls.agua = Necesidad.objects.create(nombre="Agua")
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST="localhost")
+        self.client.force_authenticate(self.admin)
+
+    def _datos(self, cedula, **extra):
+        return {
+            "zona": self.zona.id,
+            "cedula": cedula,
+            "telefono": "3000000000",
+            "tipo_vivienda": "PROPIA",
+            "rango_edad": "26-40",
+            "ocupacion": "OTRO",
+            "consentimiento": True,
+            "nivel_afinidad": 1,
+            "disposicion_voto": 1,
+            "capacidad_influencia": 1,
+            "comentario_problema": "Falta agua potable",
+            "necesidades": [{"prioridad": 1, "necesidad_id": self.agua.id}],
+            **extra,
+        }
+
+    def _enviar(self, lote):
+        respuesta = self.client.post("/api/encuestas/bulk/", lote, format="json")
+        return respuesta, [(item["estado"], item.get("errores")) for item in respuesta.data["resultados"]]
+
+    def _contadores(self):
+        return (
+            list(CoberturaZona.objects.values_list("zona_id", "total_encuestas", "votantes_validos")),
+            list(CoberturaZonaNecesidad.objects.values_list("zona_id", "necesidad_id", "total")),
+            sorted(TerminoZonaDia.objects.filter(total__gt=0).values_list("termino", "total")),
+        )
+
+    def assertContadoresCuadran(self):
+        incremental = self._contadores()
+        reconstruir_cobertura()
+        reconstruir_terminos()
+        self.assertEqual(incremental, self._contadores())
+        return incremental
+
+    def test_fallo_parcial(self):
+        self.client.post("/api/encuestas/", self._datos("100"), format="json")
+        respuesta, estados = self._enviar(
+            [self._datos("1"), self._datos("abc"), self._datos("100"), self._datos("2", zona=0), self._datos("3")]
+        )
+        self.assertEqual(respuesta.status_code, 207)
+        self.assertEqual([estado for estado, _ in estados], ["creada", "error", "error", "error", "creada"])
+        self.assertEqual(estados[1][1], {"non_field_errors": ["La cédula solo debe contener números"]})
+        self.assertEqual(estados[2][1], {"non_field_errors": ["Ya existe una encuesta registrada con esta cédula."]})
+        self.assertEqual((respuesta.data["creadas"], respuesta.data["fallidas"]), (2, 3))
+        self.assertEqual(set(Encuesta.objects.values_list("cedula", flat=True)), {"100", "1", "3"})
+        incremental = self.assertContadoresCuadran()
+        self.assertEqual(incremental[0], [(self.zona.id, 3, 3)])
+
+    def test_carrera_de_cedulas_cae_a_una_por_una(self):
+        precargar = bulk._precargar_lote
+
+        def precargar_y_competir(items, user):
+            lote = precargar(items, user)
+            # Otra petición registra la cédula "2" después de la validación del lote.
+            self.client.post("/api/encuestas/", self._datos("2"), format="json")
+            return lote
+
+        with mock.patch("surveys.bulk._precargar_lote", precargar_y_competir):
+            respuesta, estados = self._enviar([self._datos("1"), self._datos("2"), self._datos("3")])
+        self.assertEqual([estado for estado, _ in estados], ["creada", "error", "creada"])
+        self.assertEqual(estados[1][1], {"non_field_errors": ["Ya existe una encuesta registrada con esta cédula."]})
+        self.assertEqual(Encuesta.objects.count(), 3)
+        self.assertEqual(EncuestaNecesidad.objects.count(), 3)
+        incremental = self.assertContadoresCuadran()
+        self.assertEqual(incremental[0], [(self.zona.id, 3, 3)])
+        self.assertEqual(incremental[1], [(self.zona.id, self.agua.id, 3)])
+
+    def test_otro_conflicto_no_se_informa_como_cedula(self):
+        escribir = bulk._escribir
+
+        def escribir_con_conflicto(pendientes):
+            if any(encuesta.cedula == "2" for encuesta, _ in pendientes):
+                raise IntegrityError("FOREIGN KEY constraint failed")
+            escribir(pendientes)
+
+        with mock.patch("surveys.bulk._escribir", escribir_con_conflicto):
+            _, estados = self._enviar([self._datos("1"), self._datos("2")])
+        self.assertEqual(estados[0][0], "creada")
+        self.assertEqual(estados[1][0], "error")
+        self.assertNotIn("cédula", estados[1][1]["non_field_errors"][0])
+        self.assertContadoresCuadran()
+
+    def test_clave_repetida_en_el_lote_y_reenvio(self):
+        lote = [self._datos("1", clave_idempotencia="k1"), self._datos("1", clave_idempotencia="k1")]
+        _, estados = self._enviar(lote)
+        self.assertEqual([estado for estado, _ in estados], ["creada", "existente"])
+        _, estados = self._enviar(lote)
+        self.assertEqual([estado for estado, _ in estados], ["existente", "existente"])
+        self.assertEqual(self.assertContadoresCuadran()[0], [(self.zona.id, 1, 1)])
@@ -0,0 +1,193 @@
+"""Teselas del mapa de encuestas: puntos agrupados por celda en cada nivel de zoom.
+
+Una tesela ``z/x/y`` (la grilla de OpenStreetMap) trae sus encuestas
+agrupadas en celdas de geohash, unas 8 a 32 por lado: conteo, centroide,
+votantes válidos y necesidad principal. Sirven igual para marcadores
+agrupados (centroide y conteo) que para mapas de calor (conteo por celda).
+
+Hasta el zoom ``ZOOM_CELDAS`` las celdas salen de los contadores
+``CeldaMapa``/``CeldaMapaNecesidad`` (celdas de ``PRECISION_CELDA``
+caracteres, ubicadas en la tesela por su centro); desde ahí, de las encuestas
+de la tesela por el índice de geohash. Cada tesela queda en caché bajo una
+marca leída de la base (las versiones de las ``CeldaMapa`` que la cubren), así
+cualquier escritura de encuestas, desde cualquier proceso, o una reconstrucción
+de los contadores la descarta sin depender de una caché compartida.
+"""
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.models.functions import Substr
+
+from territory.geo import PRECISION, caja_de_geohash, geohash, q_caja, q_celdas
+from .models import CeldaMapa, CeldaMapaNecesidad, Encuesta, EncuestaNecesidad, Necesidad
+
+PRECISION_CELDA = 6
+ZOOM_MAXIMO = 20
+# Último zoom con celdas de ``PRECISION_CELDA`` o más grandes.
+ZOOM_CELDAS = 12
+LATITUD_MAXIMA = 85.0511287798
+
+
+def celda(lat, lon):
+    """Celda de ``CeldaMapa`` de un punto, o ``None`` sin coordenadas."""
+    return geohash(lat, lon, PRECISION_CELDA) or None
+
+
+def precision_de_zoom(z):
+    """Largo del geohash de las celdas de una tesela: unas 8 columnas o más por tesela."""
+    return max(1, min(PRECISION, math.ceil(2 * (z + 3) / 5)))
+
+
+def caja_de_tesela(z, x, y):
+    """``(sur, oeste, norte, este)`` de la tesela (Web Mercator)."""
+    n = 2**z
+
+    def latitud(fila):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * fila / n))))
+
+    return latitud(y + 1), x / n * 360 - 180, latitud(y), (x + 1) / n * 360 - 180
+
+
+def tesela_de_punto(lat, lon, z):
+    n = 2**z
+    lat = max(-LATITUD_MAXIMA, min(LATITUD_MAXIMA, float(lat)))
+    x = int((float(lon) + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def marca_tesela(caja):
+    """Marcador de los datos de la tesela: cambia con cada escritura confirmada en sus celdas.
+
+    La suma de versiones crece con toda escritura, aunque su hora sea anterior
+    a otra ya confirmada; el máximo de ``actualizado_en`` y el conteo cambian
+    al reconstruir los contadores.
+    """
+    marca = CeldaMapa.objects.filter(q_celdas(caja, "celda", PRECISION_CELDA)).aggregate(
+        celdas=Count("celda"), version=Sum("version"), fecha=Max("actualizado_en")
+    )
+    fecha = marca["fecha"].timestamp() if marca["fecha"] else 0
+    return f"{marca['celdas']}-{marca['version'] or 0}-{fecha}"
+
+
+def _llave(z, x, y, marca):
+    return f"surveys:tesela:{z}:{x}:{y}:{marca}"
+
+
+def _dentro(caja, lat, lon):
+    sur, oeste, norte, este = caja
+    return sur <= lat < norte and oeste <= lon < este
+
+
+def _desde_contadores(caja, precision):
+    """Celdas de la tesela agregadas desde ``CeldaMapa``: la celda cuenta donde cae su centro."""
+    cubre = q_celdas(caja, "celda", PRECISION_CELDA)
+    grupos = defaultdict(Counter)
+    celdas = {}
+    for fila in CeldaMapa.objects.filter(cubre, total_encuestas__gt=0).values(
+        "celda", "total_encuestas", "votantes_validos", "suma_lat", "suma_lon"
+    ):
+        sur, oeste, norte, este = caja_de_geohash(fila["celda"])
+        if not _dentro(caja, (sur + norte) / 2, (oeste + este) / 2):
+            continue
+        grupo = fila["celda"][:precision]
+        celdas[fila["celda"]] = grupo
+        grupos[grupo].update(
+            {
+                "total": fila["total_encuestas"],
+                "validos": fila["votantes_validos"],
+                "suma_lat": fila["suma_lat"],
+                "suma_lon": fila["suma_lon"],
+            }
+        )
+    necesidades = defaultdict(Counter)
+    for fila in CeldaMapaNecesidad.objects.filter(cubre, total__gt=0).values("celda", "necesidad_id", "total"):
+        if fila["celda"] in celdas:
+            necesidades[celdas[fila["celda"]]][fila["necesidad_id"]] += fila["total"]
+    return {
+        grupo: {
+            "total": datos["total"],
+            "validos": datos["validos"],
+            "lat": datos["suma_lat"] / datos["total"],
+            "lon": datos["suma_lon"] / datos["total"],
+        }
+        for grupo, datos in grupos.items()
+    }, necesidades
+
+
+def _desde_encuestas(caja, precision):
+    """Celdas de la tesela agregadas desde las encuestas, por el índice de geohash."""
+    # Bordes norte y este abiertos: cada punto cae en una sola tesela.
+    def filtro(prefijo=""):
+        return q_caja(caja, prefijo) & Q(**{f"{prefijo}lat__lt": caja[2], f"{prefijo}lon__lt": caja[3]})
+
+    grupos = {
+        item["grupo"]: {"total": item["total"], "validos": item["validos"], "lat": item["lat"], "lon": item["lon"]}
+        for item in Encuesta.objects.filter(filtro())
+        .annotate(grupo=Substr("geohash", 1, precision))
+        .values("grupo")
+        .annotate(
+            total=Count("id"),
+            validos=Count("id", filter=Q(votante_valido=True)),
+            lat=Avg("lat"),
+            lon=Avg("lon"),
+        )
+        .order_by()
+    }
+    necesidades = defaultdict(Counter)
+    for item in (
+        EncuestaNecesidad.objects.filter(filtro("encuesta__"))
+        .annotate(grupo=Substr("encuesta__geohash", 1, precision))
+        .values("grupo", "necesidad_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    ):
+        necesidades[item["grupo"]][item["necesidad_id"]] = item["total"]
+    return grupos, necesidades
+
+
+def _calcular(z, x, y):
+    caja = caja_de_tesela(z, x, y)
+    precision = precision_de_zoom(z)
+    if z <= ZOOM_CELDAS:
+        grupos, necesidades = _desde_contadores(caja, precision)
+    else:
+        grupos, necesidades = _desde_encuestas(caja, precision)
+    celdas = []
+    for grupo in sorted(grupos):
+        datos = grupos[grupo]
+        # La más frecuente; en empate, la de menor id.
+        principal = min(necesidades[grupo].items(), key=lambda par: (-par[1], par[0]), default=None)
+        celdas.append(
+            {
+                "geohash": grupo,
+                "lat": round(float(datos["lat"]), 6),
+                "lon": round(float(datos["lon"]), 6),
+                "total": datos["total"],
+                "votantes_validos": datos["validos"],
+                "porcentaje_validos": round(datos["validos"] / datos["total"] * 100, 2),
+                "necesidad": {"id": principal[0], "total": principal[1]} if principal else None,
+            }
+        )
+    return {"z": z, "x": x, "y": y, "precision": precision, "celdas": celdas}
+
+
+def tesela(z, x, y):
+    """La tesela desde la caché o calculada; con los nombres de las necesidades al día."""
+    llave = _llave(z, x, y, marca_tesela(caja_de_tesela(z, x, y)))
+    datos = cache.get(llave)
+    if datos is None:
+        datos = _calcular(z, x, y)
+        cache.set(llave, datos, settings.TESELAS_CACHE_SEGUNDOS)
+    ids = {item["necesidad"]["id"] for item in datos["celdas"] if item["necesidad"]}
+    nombres = dict(Necesidad.objects.filter(id__in=ids).values_list("id", "nombre")) if ids else {}
+    celdas = [
+        {**item, "necesidad": {**item["necesidad"], "nombre": nombres.get(item["necesidad"]["id"])}}
+        if item["necesidad"]
+        else item
+        for item in datos["celdas"]
+    ]
+    return {**datos, "total": sum(item["total"] for item in celdas), "celdas": celdas}
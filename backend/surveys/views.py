@@ -1,15 +1,28 @@
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
 from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounts.permissions import IsAdmin, IsCollaborator, IsLeader, IsSurveySubmitter
+from pitpc.conditional import condicional
+from pitpc.pagination import RankingPagination
+from pitpc.serializers import incluye_campo
+from sync.services import marca_territorio
+from .bulk import registrar_lote
+from .cache import marca_encuestas
+from .export import FORMATOS, csv_en_flujo, filas_exportacion, parquet_disponible, parquet_en_flujo
+from .idempotency import clave_de_peticion, encuesta_registrada
 from .models import Encuesta, Necesidad
+from .search import FUENTES, LARGO_MINIMO, Busqueda, detallar, palabras_consulta
 from .serializers import CoverageSerializer, NeedSerializer, SurveySerializer
-from .services import calcular_cobertura_por_zona
+from .services import calcular_cobertura_por_zona, encuestas_visibles
 
 
 class SurveyViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
-    queryset = Encuesta.objects.select_related("zona", "colaborador")
+    queryset = Encuesta.objects.select_related("zona__municipio", "colaborador")
     serializer_class = SurveySerializer
 
     def get_permissions(self):
@@ -17,17 +30,109 @@ class SurveyViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.Gen
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if user.is_collaborator:
-            qs = qs.filter(colaborador=user)
-        elif user.is_leader:
-            municipios = user.municipio_set.values_list("id", flat=True) if hasattr(user, "municipio_set") else []
-            qs = qs.filter(zona__municipio_id__in=municipios)
+        qs = encuestas_visibles(super().get_queryset(), self.request.user)
+        if incluye_campo(self.request, "necesidades"):
+            qs = qs.prefetch_related("necesidades__necesidad")
         return qs
 
-    def perform_create(self, serializer):
-        serializer.save()
+    def create(self, request, *args, **kwargs):
+        clave = clave_de_peticion(request)
+        registradas = self.queryset.prefetch_related("necesidades__necesidad")
+        existente = encuesta_registrada(registradas, clave)
+        if existente is None:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            try:
+                self.perform_create(serializer, clave)
+            except IntegrityError:
+                # Un reintento simultáneo ganó la carrera con la misma clave.
+                existente = encuesta_registrada(registradas, clave)
+                if existente is None:
+                    raise
+            else:
+                headers = self.get_success_headers(serializer.data)
+                return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+        return self._repetida(existente)
+
+    def perform_create(self, serializer, clave=None):
+        if clave:
+            serializer.save(clave_idempotencia=clave)
+        else:
+            serializer.save()
+
+    def _repetida(self, encuesta):
+        if encuesta.colaborador_id != self.request.user.id:
+            return Response(
+                {"detail": "La clave de idempotencia ya fue usada por otro usuario."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        serializer = self.get_serializer(encuesta)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={"Idempotent-Replayed": "true"})
+
+    @action(detail=False, methods=["get"], url_path="exportar")
+    def exportar(self, request):
+        # ``formato`` y no ``format``: DRF reserva ``format`` para elegir el renderer.
+        formato = request.query_params.get("formato", "csv").lower()
+        if formato not in FORMATOS:
+            return Response(
+                {"detail": "Formato no soportado. Usa csv o parquet."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if formato == "parquet" and not parquet_disponible():
+            return Response(
+                {"detail": "La exportación Parquet no está disponible en este servidor."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Mismo alcance que el listado (``encuestas_visibles``): el líder exporta las de sus municipios.
+        lotes = filas_exportacion(self.get_queryset())
+        contenido = csv_en_flujo(lotes) if formato == "csv" else parquet_en_flujo(lotes)
+        content_type, extension = FORMATOS[formato]
+        response = StreamingHttpResponse(contenido, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="encuestas.{extension}"'
+        return response
+
+    @action(detail=False, methods=["get"], url_path="buscar")
+    def buscar(self, request):
+        fuente = request.query_params.get("fuente")
+        if fuente and fuente not in FUENTES:
+            return Response(
+                {"detail": "Fuente no soportada. Usa encuestas o casos."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        consulta = request.query_params.get("q", "")
+        if not palabras_consulta(consulta):
+            return Response(
+                {"detail": f"Escribe al menos una palabra de {LARGO_MINIMO} letras."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        resultados = Busqueda(request.user, consulta, (fuente,) if fuente else tuple(FUENTES))
+        paginador = RankingPagination()
+        pagina = paginador.paginate_queryset(resultados, request, view=self)
+        return paginador.get_paginated_response(detallar(pagina, consulta))
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        items = request.data.get("encuestas") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"detail": "Envía una lista de encuestas."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        limite = settings.ENCUESTAS_LOTE_MAXIMO
+        if len(items) > limite:
+            return Response(
+                {"detail": f"El lote no puede superar {limite} encuestas."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        resultados = registrar_lote(items, request)
+        estados = [item["estado"] for item in resultados]
+        fallidas = estados.count("error")
+        return Response(
+            {
+                "creadas": estados.count("creada"),
+                "existentes": estados.count("existente"),
+                "fallidas": fallidas,
+                "resultados": resultados,
+            },
+            status=status.HTTP_207_MULTI_STATUS if fallidas else status.HTTP_201_CREATED,
+        )
 
 
 class NeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
@@ -36,9 +141,17 @@ class NeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     permission_classes = [IsSurveySubmitter]
 
 
+def _version_cobertura(request):
+    user = request.user
+    # Para el colaborador la respuesta depende de sus asignaciones y de sus encuestas.
+    alcance = user.id if user.is_collaborator else "global"
+    return [alcance] + marca_encuestas() + marca_territorio(asignaciones=user.is_collaborator)
+
+
 class CoverageView(APIView):
     permission_classes = [IsSurveySubmitter]
 
+    @condicional(_version_cobertura)
     def get(self, request):
         data = calcular_cobertura_por_zona(request.user)
         serializer = CoverageSerializer(data, many=True)
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.models import Eliminacion
+
+
+class Command(BaseCommand):
+    help = "Elimina las lápidas de sincronización más viejas que SYNC_RETENCION_DIAS"
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=settings.SYNC_RETENCION_DIAS)
+        borradas, _ = Eliminacion.objects.filter(eliminado_en__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"{borradas} lápidas eliminadas"))
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Eliminacion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("recurso", models.CharField(max_length=30)),
+                ("objeto_id", models.BigIntegerField()),
+                ("usuario_id", models.BigIntegerField(blank=True, null=True)),
+                ("eliminado_en", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["eliminado_en", "recurso"], name="sync_elim_fecha_recurso"
+                    )
+                ],
+            },
+        ),
+    ]
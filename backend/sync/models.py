@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class Eliminacion(models.Model):
+    """Lápida de un registro borrado (o que dejó de ser visible para ``usuario_id``)."""
+
+    recurso = models.CharField(max_length=30)
+    objeto_id = models.BigIntegerField()
+    # Sin llave foránea: la lápida debe sobrevivir al borrado del propio usuario.
+    usuario_id = models.BigIntegerField(null=True, blank=True)
+    eliminado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["eliminado_en", "recurso"], name="sync_elim_fecha_recurso"),
+        ]
+
+    def __str__(self):
+        return f"{self.recurso} {self.objeto_id}"
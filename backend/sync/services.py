@@ -0,0 +1,15 @@
+from django.db.models import Max
+
+from territory.models import Zona, ZonaAsignacion
+from .models import Eliminacion
+
+
+def marca_territorio(asignaciones=False):
+    """Marcador de cambios del territorio: zonas (con municipio y meta), borrados y, si se pide, asignaciones."""
+    marcas = [
+        Zona.objects.aggregate(marca=Max("actualizado_en"))["marca"],
+        Eliminacion.objects.aggregate(marca=Max("id"))["marca"],
+    ]
+    if asignaciones:
+        marcas.append(ZonaAsignacion.objects.aggregate(marca=Max("actualizado_en"))["marca"])
+    return marcas
@@ -0,0 +1,116 @@
+"""Mantiene las marcas de cambio y las lápidas de los catálogos sincronizados.
+
+Los serializadores anidan datos de otros modelos (la zona incluye municipio y
+meta; la asignación, nombres de zona y municipio; la ruta, sus zonas y
+colaboradores), así que un cambio en ellos también marca a los registros que
+los muestran.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from routes.models import RutaColaborador, RutaVisita, RutaZona
+from surveys.models import Necesidad
+from territory.models import Departamento, MetaZona, Municipio, Zona, ZonaAsignacion
+from .models import Eliminacion
+
+RECURSOS = {
+    Zona: "zonas",
+    Necesidad: "necesidades",
+    ZonaAsignacion: "asignaciones",
+    RutaVisita: "rutas",
+}
+
+
+def marcar(model, **filtros):
+    model.objects.filter(**filtros).update(actualizado_en=timezone.now())
+
+
+def marcar_territorio(prefijo, valor):
+    """Marca zonas, asignaciones y rutas bajo ``prefijo`` (p. ej. ``municipio_id__in``)."""
+    marcar(Zona, **{prefijo: valor})
+    marcar(ZonaAsignacion, **{f"zona__{prefijo}": valor})
+    marcar(RutaVisita, **{f"ruta_zonas__zona__{prefijo}": valor})
+
+
+def registrar_eliminacion(sender, instance, **kwargs):
+    Eliminacion.objects.create(recurso=RECURSOS[sender], objeto_id=instance.pk)
+
+
+for _modelo in RECURSOS:
+    post_delete.connect(registrar_eliminacion, sender=_modelo)
+
+
+@receiver(post_delete, sender=ZonaAsignacion)
+def retirar_zona_asignada(sender, instance, **kwargs):
+    # El colaborador solo ve las zonas que tiene asignadas.
+    Eliminacion.objects.create(
+        recurso="zonas", objeto_id=instance.zona_id, usuario_id=instance.colaborador_id
+    )
+
+
+@receiver(post_save, sender=Zona)
+def marcar_zona(sender, instance, created, **kwargs):
+    if not created:
+        marcar(ZonaAsignacion, zona_id=instance.pk)
+        marcar(RutaVisita, ruta_zonas__zona_id=instance.pk)
+
+
+@receiver(post_save, sender=MetaZona)
+@receiver(post_delete, sender=MetaZona)
+def marcar_meta(sender, instance, **kwargs):
+    marcar(Zona, pk=instance.zona_id)
+    marcar(RutaVisita, ruta_zonas__zona_id=instance.zona_id)
+
+
+@receiver(post_save, sender=Municipio)
+def marcar_municipio(sender, instance, created, **kwargs):
+    if not created:
+        marcar_territorio("municipio_id", instance.pk)
+
+
+@receiver(post_save, sender=Departamento)
+def marcar_departamento(sender, instance, created, **kwargs):
+    if not created:
+        marcar_territorio("municipio__departamento_id", instance.pk)
+
+
+@receiver(m2m_changed, sender=Municipio.lideres.through)
+def cambiar_lideres(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "pre_remove", "pre_clear"):
+        return
+    if reverse:
+        lideres = {instance.pk}
+        municipios = pk_set or set(instance.municipios.values_list("id", flat=True))
+    else:
+        municipios = {instance.pk}
+        lideres = pk_set or set(instance.lideres.values_list("id", flat=True))
+    if action == "post_add":
+        marcar_territorio("municipio_id__in", municipios)
+        return
+    # El líder deja de ver las zonas y asignaciones de esos municipios.
+    zonas = list(Zona.objects.filter(municipio_id__in=municipios).values_list("id", flat=True))
+    asignaciones = list(
+        ZonaAsignacion.objects.filter(zona_id__in=zonas).values_list("id", flat=True)
+    )
+    Eliminacion.objects.bulk_create(
+        Eliminacion(recurso=recurso, objeto_id=objeto_id, usuario_id=lider_id)
+        for lider_id in lideres
+        for recurso, ids in (("zonas", zonas), ("asignaciones", asignaciones))
+        for objeto_id in ids
+    )
+
+
+@receiver(post_save, sender=RutaZona)
+@receiver(post_delete, sender=RutaZona)
+@receiver(post_save, sender=RutaColaborador)
+def marcar_ruta(sender, instance, **kwargs):
+    marcar(RutaVisita, pk=instance.ruta_id)
+
+
+@receiver(post_delete, sender=RutaColaborador)
+def retirar_ruta_asignada(sender, instance, **kwargs):
+    marcar(RutaVisita, pk=instance.ruta_id)
+    Eliminacion.objects.create(
+        recurso="rutas", objeto_id=instance.ruta_id, usuario_id=instance.colaborador_id
+    )
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from surveys.models import Necesidad
+from territory.models import Departamento, Municipio, Zona, ZonaAsignacion
+from .models import Eliminacion
+
+
+@override_settings(SYNC_RETENCION_DIAS=30)
+class SyncTests(TestCase):
+    """La sincronización devuelve solo lo cambiado desde la marca, con lápidas y el alcance de cada rol."""
+
+    @classmethod
+    def setUpTestData(cls):
+        departamento = Departamento.objects.create(nombre="Departamento")
+        cls.municipio = Municipio.objects.create(nombre="Municipio", departamento=departamento)
+        cls.otro = Municipio.objects.create(nombre="Otro", departamento=departamento)
+        cls.zonas = [
+            Zona.objects.create(nombre=f"Zona {i}", tipo="BARRIO", municipio=cls.municipio) for i in range(3)
+        ]
+        cls.zona_otra = Zona.objects.create(nombre="Zona otra", tipo="BARRIO", municipio=cls.otro)
+        cls.admin = User.objects.create(email="a@example.com", name="A", role=User.Roles.ADMIN)
+        cls.lider = User.objects.create(email="l@example.com", name="L", role=User.Roles.LIDER)
+        cls.municipio.lideres.add(cls.lider)
+        cls.colaborador = User.objects.create(
+            email="c@example.com", name="C", role=User.Roles.COLABORADOR, created_by=cls.lider
+        )
+        cls.candidato = User.objects.create(email="k@example.com", name="K", role=User.Roles.CANDIDATO)
+        cls.asignacion = ZonaAsignacion.objects.create(colaborador=cls.colaborador, zona=cls.zonas[0])
+        cls.agua = Necesidad.objects.create(nombre="Agua")
+
+    def setUp(self):
+        # Todo lo sembrado queda antes de la marca (y de su margen de solape).
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        for modelo in (Zona, ZonaAsignacion, Necesidad):
+            modelo.objects.update(actualizado_en=hace_una_hora)
+        Eliminacion.objects.update(eliminado_en=hace_una_hora)
+        self.desde = (timezone.now() - timedelta(minutes=5)).isoformat()
+
+    def _sync(self, usuario, **params):
+        cliente = APIClient(HTTP_HOST="localhost")
+        cliente.force_authenticate(usuario)
+        return cliente.get("/api/sync/", params)
+
+    def _ids(self, respuesta, recurso):
+        return sorted(item["id"] for item in respuesta.data[recurso]["cambios"])
+
+    def test_cambios_y_eliminados_desde_la_marca(self):
+        respuesta = self._sync(self.admin, desde=self.desde)
+        self.assertFalse(respuesta.data["completo"])
+        self.assertEqual(self._ids(respuesta, "zonas"), [])
+
+        nueva = Zona.objects.create(nombre="Nueva", tipo="BARRIO", municipio=self.municipio)
+        editada = self.zonas[1]
+        editada.nombre = "Editada"
+        editada.save()
+        borrada_id = self.zonas[2].pk
+        self.zonas[2].delete()
+
+        respuesta = self._sync(self.admin, desde=self.desde)
+        self.assertEqual(self._ids(respuesta, "zonas"), sorted([nueva.pk, editada.pk]))
+        self.assertEqual(respuesta.data["zonas"]["eliminados"], [borrada_id])
+        # La marca de la respuesta sirve de ``desde`` para la siguiente llamada.
+        self.assertEqual(self._sync(self.admin, desde=respuesta.data["marca"]).status_code, 200)
+
+    def test_lapida_tras_eliminar(self):
+        agua_id = self.agua.pk
+        respuesta = self._sync(self.admin, desde=self.desde, recursos="necesidades")
+        self.assertEqual(respuesta.data["necesidades"]["eliminados"], [])
+        self.agua.delete()
+        self.assertTrue(Eliminacion.objects.filter(recurso="necesidades", objeto_id=agua_id).exists())
+        respuesta = self._sync(self.admin, desde=self.desde, recursos="necesidades")
+        self.assertEqual(respuesta.data["necesidades"]["eliminados"], [agua_id])
+        self.assertNotIn("zonas", respuesta.data)
+        # Una lápida anterior a la marca ya no se repite.
+        Eliminacion.objects.update(eliminado_en=timezone.now() - timedelta(hours=1))
+        respuesta = self._sync(self.admin, desde=self.desde, recursos="necesidades")
+        self.assertEqual(respuesta.data["necesidades"]["eliminados"], [])
+
+    def test_poda_de_lapidas(self):
+        vieja = Eliminacion.objects.create(recurso="zonas", objeto_id=1)
+        reciente = Eliminacion.objects.create(recurso="zonas", objeto_id=2)
+        Eliminacion.objects.filter(pk=vieja.pk).update(eliminado_en=timezone.now() - timedelta(days=31))
+        call_command("prune_tombstones", stdout=StringIO())
+        self.assertEqual(list(Eliminacion.objects.values_list("pk", flat=True)), [reciente.pk])
+        # Una marca más vieja que la retención recibe los catálogos completos.
+        desde = (timezone.now() - timedelta(days=31)).isoformat()
+        respuesta = self._sync(self.admin, desde=desde)
+        self.assertTrue(respuesta.data["completo"])
+        self.assertEqual(len(respuesta.data["zonas"]["cambios"]), 4)
+        self.assertEqual(respuesta.data["zonas"]["eliminados"], [])
+
+    def test_alcance_por_rol(self):
+        self.assertEqual(self._ids(self._sync(self.colaborador), "zonas"), [self.zonas[0].pk])
+        self.assertEqual(self._ids(self._sync(self.lider), "zonas"), sorted(zona.pk for zona in self.zonas))
+        self.assertEqual(self._sync(self.candidato).status_code, 403)
+
+        # Una asignación nueva hace visible una zona que no cambió.
+        ZonaAsignacion.objects.create(colaborador=self.colaborador, zona=self.zonas[1])
+        respuesta = self._sync(self.colaborador, desde=self.desde)
+        self.assertEqual(self._ids(respuesta, "zonas"), [self.zonas[1].pk])
+
+        # Al retirar la asignación la zona se elimina solo para ese colaborador.
+        self.asignacion.delete()
+        respuesta = self._sync(self.colaborador, desde=self.desde)
+        self.assertEqual(respuesta.data["zonas"]["eliminados"], [self.zonas[0].pk])
+        self.assertEqual(self._sync(self.admin, desde=self.desde).data["zonas"]["eliminados"], [])
+
+    def test_marca_invalida(self):
+        self.assertEqual(self._sync(self.admin, desde="ayer").status_code, 400)
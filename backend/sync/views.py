@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsNonCandidate
+from routes.views import RouteViewSet
+from surveys.views import NeedViewSet
+from territory.views import ZonaAsignacionViewSet, ZoneViewSet
+from .models import Eliminacion
+
+RECURSOS = {
+    "zonas": ZoneViewSet,
+    "necesidades": NeedViewSet,
+    "asignaciones": ZonaAsignacionViewSet,
+    "rutas": RouteViewSet,
+}
+
+# Margen para cambios guardados antes de la marca pero confirmados después.
+SOLAPE = timedelta(seconds=10)
+
+
+def filtro_cambios(recurso, desde, user):
+    cambios = Q(actualizado_en__gt=desde)
+    if recurso == "zonas" and user.is_collaborator:
+        # Una asignación nueva hace visible una zona que no cambió.
+        cambios |= Q(asignaciones__colaborador=user, asignaciones__actualizado_en__gt=desde)
+    return cambios
+
+
+class SyncView(APIView):
+    """Sincronización incremental de catálogos para las apps móviles.
+
+    Sin ``desde`` (o con una marca más vieja que la retención de lápidas)
+    devuelve los catálogos completos; con ``desde`` devuelve solo lo creado o
+    modificado después de esa marca y los ids eliminados. El cliente guarda la
+    ``marca`` de la respuesta y la envía en la siguiente llamada.
+    """
+
+    permission_classes = [IsNonCandidate]
+
+    def get(self, request):
+        marca = timezone.now()
+        desde = request.query_params.get("desde")
+        if desde:
+            desde = parse_datetime(desde.replace(" ", "+"))
+            if desde is None:
+                return Response(
+                    {"detail": "La marca 'desde' no es una fecha válida."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if timezone.is_naive(desde):
+                desde = timezone.make_aware(desde)
+        completo = not desde or desde < marca - timedelta(days=settings.SYNC_RETENCION_DIAS)
+        solicitados = request.query_params.get("recursos")
+        solicitados = set(solicitados.split(",")) if solicitados else set(RECURSOS)
+
+        eliminados = {}
+        if not completo:
+            desde -= SOLAPE
+            for recurso, objeto_id in Eliminacion.objects.filter(
+                Q(usuario_id__isnull=True) | Q(usuario_id=request.user.id),
+                eliminado_en__gt=desde,
+                recurso__in=solicitados,
+            ).values_list("recurso", "objeto_id"):
+                eliminados.setdefault(recurso, set()).add(objeto_id)
+
+        data = {"marca": marca.isoformat(), "completo": completo}
+        for recurso, viewset in RECURSOS.items():
+            if recurso not in solicitados:
+                continue
+            vista = viewset(request=request, args=(), kwargs={}, format_kwarg=None, action="list")
+            if not all(permiso.has_permission(request, vista) for permiso in vista.get_permissions()):
+                continue
+            queryset = vista.get_queryset()
+            if not completo:
+                queryset = queryset.filter(filtro_cambios(recurso, desde, request.user))
+            objetos = list(queryset)
+            # Lo que sigue visible no se elimina aunque tenga lápida (p. ej. reasignado).
+            visibles = {objeto.pk for objeto in objetos}
+            data[recurso] = {
+                "cambios": vista.get_serializer(objetos, many=True).data,
+                "eliminados": sorted(eliminados.get(recurso, set()) - visibles),
+            }
+        return Response(data)
@@ -0,0 +1,238 @@
+"""Índice espacial por geohash para ``lat``/``lon`` de encuestas, zonas y municipios.
+
+Cada fila guarda el geohash de su punto (se recalcula al guardar). Un geohash
+es una celda de la grilla y sus prefijos son las celdas que la contienen, así
+que un área se cubre con unas pocas celdas del tamaño adecuado y cada celda es
+un rango sobre el índice de la columna ``geohash``. El filtro exacto por
+``lat``/``lon`` (y por distancia en los radios) se aplica sobre ese rango.
+"""
+import math
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+
+PRECISION = 9
+CELDAS_MAXIMAS = 16
+RADIO_TIERRA = 6371008.8
+RADIO_MAXIMO = 500000
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat, lon, precision=PRECISION):
+    """Geohash del punto, o ``""`` si falta alguna coordenada."""
+    if lat is None or lon is None:
+        return ""
+    lat, lon = float(lat), float(lon)
+    lat_min, lat_max, lon_min, lon_max = -90.0, 90.0, -180.0, 180.0
+    codigo = []
+    bits = 0
+    valor = 0
+    par = True
+    while len(codigo) < precision:
+        if par:
+            medio = (lon_min + lon_max) / 2
+            if lon >= medio:
+                valor = valor * 2 + 1
+                lon_min = medio
+            else:
+                valor *= 2
+                lon_max = medio
+        else:
+            medio = (lat_min + lat_max) / 2
+            if lat >= medio:
+                valor = valor * 2 + 1
+                lat_min = medio
+            else:
+                valor *= 2
+                lat_max = medio
+        par = not par
+        bits += 1
+        if bits == 5:
+            codigo.append(_BASE32[valor])
+            bits = 0
+            valor = 0
+    return "".join(codigo)
+
+
+def caja_de_geohash(codigo):
+    """``(sur, oeste, norte, este)`` de la celda ``codigo``."""
+    lat_min, lat_max, lon_min, lon_max = -90.0, 90.0, -180.0, 180.0
+    par = True
+    for caracter in codigo:
+        valor = _BASE32.index(caracter)
+        for bit in range(4, -1, -1):
+            alto = (valor >> bit) & 1
+            if par:
+                medio = (lon_min + lon_max) / 2
+                lon_min, lon_max = (medio, lon_max) if alto else (lon_min, medio)
+            else:
+                medio = (lat_min + lat_max) / 2
+                lat_min, lat_max = (medio, lat_max) if alto else (lat_min, medio)
+            par = not par
+    return lat_min, lon_min, lat_max, lon_max
+
+
+def actualizar_geohash(instancia, kwargs):
+    """Recalcula ``instancia.geohash`` antes de ``save(**kwargs)``, también con ``update_fields``.
+
+    Deja ``lat``/``lon`` con los decimales que guarda la base, así el punto en
+    memoria (y su celda) es el mismo que se lee después.
+    """
+    for nombre in ("lat", "lon"):
+        valor = getattr(instancia, nombre)
+        if valor is not None:
+            decimales = instancia._meta.get_field(nombre).decimal_places
+            setattr(instancia, nombre, Decimal(str(valor)).quantize(Decimal(1).scaleb(-decimales)))
+    instancia.geohash = geohash(instancia.lat, instancia.lon)
+    campos = kwargs.get("update_fields")
+    if campos is not None and {"lat", "lon"} & set(campos):
+        kwargs["update_fields"] = {*campos, "geohash"}
+
+
+def _tamano_celda(precision):
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def celdas(caja, precision_maxima=PRECISION):
+    """Prefijos de geohash que cubren la caja ``(sur, oeste, norte, este)``, tan finos como se pueda."""
+    # Un margen mínimo para que los bordes no dependan del redondeo.
+    sur, oeste, norte, este = caja[0] - 1e-9, caja[1] - 1e-9, caja[2] + 1e-9, caja[3] + 1e-9
+    elegidas = [""]
+    for precision in range(1, precision_maxima + 1):
+        alto, ancho = _tamano_celda(precision)
+        filas = range(
+            math.floor((max(sur, -90) + 90) / alto),
+            math.floor((min(norte, 90 - alto / 2) + 90) / alto) + 1,
+        )
+        columnas = range(
+            math.floor((max(oeste, -180) + 180) / ancho),
+            math.floor((min(este, 180 - ancho / 2) + 180) / ancho) + 1,
+        )
+        if len(filas) * len(columnas) > CELDAS_MAXIMAS:
+            break
+        elegidas = [
+            geohash((fila + 0.5) * alto - 90, (columna + 0.5) * ancho - 180, precision)
+            for fila in filas
+            for columna in columnas
+        ]
+    return sorted(elegidas)
+
+
+def _siguiente(prefijo):
+    """El primer geohash posterior a todos los que empiezan por ``prefijo`` (``None`` si no hay)."""
+    while prefijo and prefijo[-1] == _BASE32[-1]:
+        prefijo = prefijo[:-1]
+    if not prefijo:
+        return None
+    return prefijo[:-1] + _BASE32[_BASE32.index(prefijo[-1]) + 1]
+
+
+def _rangos(prefijos):
+    """Rangos ``[desde, hasta)`` de geohash, uniendo prefijos contiguos."""
+    rangos = []
+    for prefijo in prefijos:
+        if rangos and rangos[-1][1] == prefijo:
+            rangos[-1][1] = _siguiente(prefijo)
+        else:
+            rangos.append([prefijo, _siguiente(prefijo)])
+    return rangos
+
+
+def q_celdas(caja, campo="geohash", precision=PRECISION):
+    """Filtro por rangos de ``campo`` de las celdas de hasta ``precision`` caracteres que cubren la caja.
+
+    Rangos y no ``startswith``: SQLite no usa el índice con ``LIKE`` y los
+    caracteres del geohash ordenan igual en cualquier collation.
+    """
+    por_celda = Q()
+    for desde, hasta in _rangos(celdas(caja, precision)):
+        rango = Q(**{f"{campo}__gte": desde}) if desde else Q(**{f"{campo}__gt": ""})
+        if hasta:
+            rango &= Q(**{f"{campo}__lt": hasta})
+        por_celda |= rango
+    return por_celda
+
+
+def q_caja(caja, prefijo=""):
+    """Filtro de las filas cuyo punto cae en la caja ``(sur, oeste, norte, este)``."""
+    sur, oeste, norte, este = caja
+    return q_celdas(caja, f"{prefijo}geohash") & Q(
+        **{
+            f"{prefijo}lat__gte": Decimal(str(sur)),
+            f"{prefijo}lat__lte": Decimal(str(norte)),
+            f"{prefijo}lon__gte": Decimal(str(oeste)),
+            f"{prefijo}lon__lte": Decimal(str(este)),
+        }
+    )
+
+
+def distancia(lat1, lon1, lat2, lon2):
+    """Distancia en metros sobre la esfera (haversine)."""
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float, (lat1, lon1, lat2, lon2)))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA * math.asin(min(1.0, math.sqrt(h)))
+
+
+def caja_de_radio(lat, lon, metros):
+    """Caja que contiene el círculo de ``metros`` alrededor del punto."""
+    alto = math.degrees(metros / RADIO_TIERRA)
+    coseno = math.cos(math.radians(lat))
+    ancho = 180.0 if coseno < 1e-6 else min(180.0, alto / coseno)
+    return max(-90.0, lat - alto), max(-180.0, lon - ancho), min(90.0, lat + alto), min(180.0, lon + ancho)
+
+
+def en_radio(queryset, lat, lon, metros, prefijo=""):
+    """``queryset`` limitado a los puntos a ``metros`` o menos: caja por índice y distancia exacta."""
+    candidatos = queryset.filter(q_caja(caja_de_radio(lat, lon, metros), prefijo)).values_list(
+        "pk", f"{prefijo}lat", f"{prefijo}lon"
+    )
+    ids = [pk for pk, punto_lat, punto_lon in candidatos if distancia(lat, lon, punto_lat, punto_lon) <= metros]
+    return queryset.filter(pk__in=ids)
+
+
+def _numero(valor, minimo, maximo, nombre):
+    try:
+        numero = float(Decimal(valor.strip()))
+    except (InvalidOperation, ValueError, AttributeError):
+        raise ValueError(f"{nombre} debe ser un número.")
+    if not minimo <= numero <= maximo:
+        raise ValueError(f"{nombre} debe estar entre {minimo} y {maximo}.")
+    return numero
+
+
+def area_de_peticion(params):
+    """Área pedida en la query string, o ``None``; ``ValueError`` con el mensaje si es inválida.
+
+    ``bbox=oeste,sur,este,norte`` (el orden de GeoJSON) o ``lat``, ``lon`` y
+    ``radio`` en metros. Devuelve ``{"caja", "centro", "radio"}``; ``centro``
+    y ``radio`` solo en el caso del radio.
+    """
+    if params.get("bbox"):
+        partes = params["bbox"].split(",")
+        if len(partes) != 4:
+            raise ValueError("bbox debe ser oeste,sur,este,norte.")
+        oeste = _numero(partes[0], -180, 180, "oeste")
+        sur = _numero(partes[1], -90, 90, "sur")
+        este = _numero(partes[2], -180, 180, "este")
+        norte = _numero(partes[3], -90, 90, "norte")
+        if sur > norte or oeste > este:
+            raise ValueError("bbox debe ser oeste,sur,este,norte con oeste <= este y sur <= norte.")
+        return {"caja": (sur, oeste, norte, este), "centro": None, "radio": None}
+    if params.get("radio"):
+        lat = _numero(params.get("lat"), -90, 90, "lat")
+        lon = _numero(params.get("lon"), -180, 180, "lon")
+        radio = _numero(params["radio"], 0, RADIO_MAXIMO, "radio")
+        return {"caja": caja_de_radio(lat, lon, radio), "centro": (lat, lon), "radio": radio}
+    return None
+
+
+def dentro(area, lat, lon):
+    """Si el punto cae en el área (con la distancia exacta en el caso del radio)."""
+    if lat is None or lon is None:
+        return False
+    if area["radio"] is not None:
+        return distancia(*area["centro"], lat, lon) <= area["radio"]
+    sur, oeste, norte, este = area["caja"]
+    return sur <= float(lat) <= norte and oeste <= float(lon) <= este
@@ -0,0 +1,151 @@
+"""Geocercas de las zonas: si el punto de una encuesta cae dentro del límite de su zona.
+
+Una zona se delimita con un polígono (``Zona.limite``, un anillo
+``[[lon, lat], ...]`` como en GeoJSON) o con un radio en metros alrededor de
+su ``lat``/``lon`` (``Zona.radio_metros``); sin ninguno no hay verificación.
+Los límites de todas las zonas se compilan una vez por proceso (vértices
+proyectados a metros alrededor de la zona y su caja), así verificar un punto
+es aritmética en memoria. La compilación se rehace cuando cambia la marca de
+las zonas, leída de la base (cuántas hay y su último ``actualizado_en``): un
+cambio hecho por cualquier proceso se ve sin depender de una caché compartida.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+
+from .geo import RADIO_TIERRA
+from .models import Zona
+
+VERTICES_MAXIMOS = 1000
+METROS_POR_GRADO = math.radians(1) * RADIO_TIERRA
+
+_indice = {"marca": None, "zonas": {}}
+
+
+def validar_limite(valor):
+    """Anillo ``[[lon, lat], ...]`` normalizado (sin el vértice de cierre); ``ValueError`` si es inválido."""
+    if not isinstance(valor, (list, tuple)):
+        raise ValueError("El límite debe ser una lista de vértices [lon, lat].")
+    vertices = []
+    for vertice in valor:
+        if (
+            not isinstance(vertice, (list, tuple))
+            or len(vertice) != 2
+            or not all(isinstance(numero, (int, float)) and not isinstance(numero, bool) for numero in vertice)
+        ):
+            raise ValueError("Cada vértice del límite debe ser [lon, lat].")
+        lon, lat = float(vertice[0]), float(vertice[1])
+        if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+            raise ValueError("Los vértices del límite deben tener lon entre -180 y 180 y lat entre -90 y 90.")
+        vertices.append([lon, lat])
+    if len(vertices) > 1 and vertices[0] == vertices[-1]:
+        vertices.pop()
+    if len(vertices) < 3:
+        raise ValueError("El límite necesita al menos tres vértices.")
+    if len(vertices) > VERTICES_MAXIMOS:
+        raise ValueError(f"El límite no puede superar {VERTICES_MAXIMOS} vértices.")
+    return vertices
+
+
+def compilar(lat, lon, radio_metros, limite):
+    """Geometría de la zona lista para verificar puntos, o ``None`` si no tiene límite.
+
+    El polígono tiene prioridad sobre el radio. Las coordenadas se proyectan a
+    metros en un plano tangente a la zona; a la escala de una zona el error es
+    despreciable frente al margen del GPS.
+    """
+    if limite:
+        lat0 = sum(vertice[1] for vertice in limite) / len(limite)
+        lon0 = sum(vertice[0] for vertice in limite) / len(limite)
+    elif radio_metros is not None and lat is not None and lon is not None:
+        lat0, lon0 = float(lat), float(lon)
+    else:
+        return None
+    geometria = {"lat0": lat0, "lon0": lon0, "coseno": math.cos(math.radians(lat0)), "radio": None}
+    if not limite:
+        geometria["radio"] = float(radio_metros)
+        return geometria
+    vertices = [_proyectar(geometria, vertice[1], vertice[0]) for vertice in limite]
+    geometria["vertices"] = vertices
+    geometria["caja"] = (
+        min(x for x, _ in vertices),
+        min(y for _, y in vertices),
+        max(x for x, _ in vertices),
+        max(y for _, y in vertices),
+    )
+    return geometria
+
+
+def _proyectar(geometria, lat, lon):
+    return (
+        (float(lon) - geometria["lon0"]) * geometria["coseno"] * METROS_POR_GRADO,
+        (float(lat) - geometria["lat0"]) * METROS_POR_GRADO,
+    )
+
+
+def _distancia_a_segmento(x, y, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    largo = dx * dx + dy * dy
+    t = 0.0 if not largo else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / largo))
+    return math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+
+
+def afuera(geometria, lat, lon, margen=None):
+    """Si el punto queda fuera de la geometría por más de ``margen`` metros; ``None`` si no se puede decir."""
+    if geometria is None or lat is None or lon is None:
+        return None
+    margen = settings.GEOCERCA_MARGEN_METROS if margen is None else margen
+    x, y = _proyectar(geometria, lat, lon)
+    if geometria["radio"] is not None:
+        return x * x + y * y > (geometria["radio"] + margen) ** 2
+    x_min, y_min, x_max, y_max = geometria["caja"]
+    if x < x_min - margen or x > x_max + margen or y < y_min - margen or y > y_max + margen:
+        return True
+    vertices = geometria["vertices"]
+    dentro = False
+    x1, y1 = vertices[-1]
+    for x2, y2 in vertices:
+        # Cruce del rayo horizontal hacia el este con la arista.
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            dentro = not dentro
+        x1, y1 = x2, y2
+    if dentro:
+        return False
+    x1, y1 = vertices[-1]
+    for x2, y2 in vertices:
+        if _distancia_a_segmento(x, y, x1, y1, x2, y2) <= margen:
+            return False
+        x1, y1 = x2, y2
+    return True
+
+
+def _marca():
+    # El conteo delata las zonas borradas; la fecha, las creadas o editadas.
+    marca = Zona.objects.aggregate(zonas=Count("id"), fecha=Max("actualizado_en"))
+    return marca["zonas"], marca["fecha"]
+
+
+def indice_geocercas():
+    """``{zona_id: geometria}`` de las zonas con límite, compilado una vez por proceso y marca."""
+    marca = _marca()
+    if _indice["marca"] != marca:
+        con_limite = Q(limite__isnull=False) | Q(radio_metros__isnull=False, lat__isnull=False, lon__isnull=False)
+        zonas = {}
+        for item in Zona.objects.filter(con_limite).values("id", "lat", "lon", "radio_metros", "limite"):
+            geometria = compilar(item["lat"], item["lon"], item["radio_metros"], item["limite"])
+            if geometria is not None:
+                zonas[item["id"]] = geometria
+        _indice.update(marca=marca, zonas=zonas)
+    return _indice["zonas"]
+
+
+def fuera_de_zona(zona_id, lat, lon, indice=None):
+    """Si el punto queda fuera del límite de la zona; ``None`` sin coordenadas o sin límite.
+
+    En lotes conviene pasar ``indice`` (de ``indice_geocercas``) para leer la marca una sola vez.
+    """
+    if lat is None or lon is None or zona_id is None:
+        return None
+    indice = indice_geocercas() if indice is None else indice
+    return afuera(indice.get(zona_id), lat, lon)
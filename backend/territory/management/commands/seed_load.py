@@ -0,0 +1,400 @@
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.models import User
+from agenda.models import Agenda
+from candidates.models import Candidato
+from routes.models import RutaColaborador, RutaVisita, RutaZona
+from surveys.counters import conciliar_lideres, reconstruir_cobertura
+from surveys.models import CasoCiudadano, Encuesta, EncuestaNecesidad, Necesidad
+from territory.geo import actualizar_geohash
+from territory.models import Departamento, MetaZona, Municipio, Zona, ZonaAsignacion
+
+DOMINIO = "carga.pitpc.com"
+NECESIDADES = [
+    "Salud",
+    "Educación",
+    "Vías",
+    "Empleo",
+    "Seguridad",
+    "Agua potable",
+    "Vivienda",
+    "Alumbrado",
+    "Transporte",
+    "Recreación",
+]
+FRASES = [
+    "La vía principal está destapada y se inunda cuando llueve.",
+    "No hay servicio de agua potable desde hace semanas.",
+    "Falta alumbrado público en el parque del barrio.",
+    "El puesto de salud no tiene médico los fines de semana.",
+    "Los jóvenes necesitan oportunidades de empleo formal.",
+    "Hay problemas de seguridad en la noche cerca del colegio.",
+    "El transporte público pasa muy poco por la vereda.",
+    "La escuela necesita reparación del techo y los baños.",
+    "Piden una cancha y espacios de recreación para los niños.",
+    "Muchas familias viven en arriendo y buscan subsidio de vivienda.",
+]
+
+
+def _siguiente_id(modelo):
+    # Ids explícitos: MySQL no devuelve las llaves de un bulk_create.
+    return (modelo.objects.aggregate(maximo=Max("pk"))["maximo"] or 0) + 1
+
+
+def _coordenada(base, dispersion, azar):
+    return Decimal(str(round(base + azar.uniform(-dispersion, dispersion), 6)))
+
+
+def _pesos_zipf(total, exponente):
+    return list(accumulate(1 / (rango**exponente) for rango in range(1, total + 1)))
+
+
+@contextmanager
+def _fechas_explicitas(modelo, *campos):
+    """Desactiva ``auto_now_add`` para insertar fechas históricas."""
+    campos = [modelo._meta.get_field(campo) for campo in campos]
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = "Genera un volumen configurable de datos sintéticos para pruebas de carga"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1, help="Semilla; la misma semilla produce los mismos datos")
+        parser.add_argument("--departamentos", type=int, default=5)
+        parser.add_argument("--municipios", type=int, default=60)
+        parser.add_argument("--zonas", type=int, default=3000)
+        parser.add_argument("--lideres", type=int, default=60)
+        parser.add_argument("--colaboradores", type=int, default=1500)
+        parser.add_argument("--encuestas", type=int, default=100000)
+        parser.add_argument("--rutas", type=int, default=600)
+        parser.add_argument("--agendas", type=int, default=1500)
+        parser.add_argument("--dias", type=int, default=180, help="Días de historia de las encuestas")
+        parser.add_argument(
+            "--hasta", type=date.fromisoformat, default=None, help="Último día de la serie (AAAA-MM-DD); por defecto hoy"
+        )
+        parser.add_argument("--zipf", type=float, default=1.1, help="Exponente de la actividad por colaborador")
+        parser.add_argument("--rafagas", type=int, default=6, help="Número de jornadas intensivas en la serie")
+        parser.add_argument("--critico", type=float, default=0.04, help="Fracción de encuestas con caso crítico")
+        parser.add_argument("--lote", type=int, default=5000, help="Filas por inserción masiva")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email__endswith=f"@{DOMINIO}").exists():
+            raise CommandError("La base ya tiene datos de carga; usa una base vacía.")
+        if options["lideres"] < 1 or options["colaboradores"] < 1 or options["zonas"] < options["municipios"]:
+            raise CommandError("Se necesita al menos un líder, un colaborador y una zona por municipio.")
+        self.azar = random.Random(options["seed"])
+        # Generador aparte para los puntos de las encuestas: no altera el resto de la serie.
+        self.azar_puntos = random.Random(f"{options['seed']}-puntos")
+        self.lote = options["lote"]
+        self.hasta = options["hasta"] or timezone.localdate()
+        self.dias = options["dias"]
+
+        self._territorio(options["departamentos"], options["municipios"], options["zonas"])
+        self._usuarios(options["lideres"], options["colaboradores"])
+        self._encuestas(options["encuestas"], options["zipf"], options["rafagas"], options["critico"])
+        self._rutas(options["rutas"])
+        self._agendas(options["agendas"])
+
+        reconstruir_cobertura()
+        conciliar_lideres(corregir=True)
+        self.stdout.write(self.style.SUCCESS("Datos de carga creados y contadores reconstruidos"))
+
+    def _informar(self, texto):
+        self.stdout.write(f"  {texto}")
+
+    def _territorio(self, total_departamentos, total_municipios, total_zonas):
+        azar = self.azar
+        inicio = _siguiente_id(Departamento)
+        departamentos = [
+            Departamento(id=inicio + i, nombre=f"Departamento Carga {i + 1}") for i in range(total_departamentos)
+        ]
+        Departamento.objects.bulk_create(departamentos)
+
+        inicio = _siguiente_id(Municipio)
+        self.municipios = [
+            Municipio(
+                id=inicio + i,
+                nombre=f"Municipio Carga {i + 1}",
+                departamento=departamentos[i % total_departamentos],
+                lat=_coordenada(6.0, 4.5, azar),
+                lon=_coordenada(-74.5, 2.5, azar),
+            )
+            for i in range(total_municipios)
+        ]
+        # ``bulk_create`` no pasa por ``save()``: el geohash se calcula aquí.
+        for municipio in self.municipios:
+            actualizar_geohash(municipio, {})
+        Municipio.objects.bulk_create(self.municipios, batch_size=self.lote)
+
+        # Municipios grandes y pequeños: las zonas se reparten con sesgo.
+        pesos = _pesos_zipf(total_municipios, 0.8)
+        asignados = self.municipios + azar.choices(self.municipios, cum_weights=pesos, k=total_zonas - total_municipios)
+        inicio = _siguiente_id(Zona)
+        tipos = [valor for valor, _ in Zona.Tipo.choices]
+        self.zonas_por_municipio = {municipio.id: [] for municipio in self.municipios}
+        zonas = []
+        for i, municipio in enumerate(asignados):
+            zona = Zona(
+                id=inicio + i,
+                nombre=f"Zona Carga {i + 1}",
+                tipo=azar.choice(tipos),
+                municipio=municipio,
+                lat=_coordenada(float(municipio.lat), 0.05, azar),
+                lon=_coordenada(float(municipio.lon), 0.05, azar),
+            )
+            actualizar_geohash(zona, {})
+            zonas.append(zona)
+            self.zonas_por_municipio[municipio.id].append(zona.id)
+        Zona.objects.bulk_create(zonas, batch_size=self.lote)
+        self.punto_zona = {zona.id: (float(zona.lat), float(zona.lon)) for zona in zonas}
+        MetaZona.objects.bulk_create(
+            (MetaZona(zona_id=zona.id, meta_encuestas=azar.randint(10, 60)) for zona in zonas), batch_size=self.lote
+        )
+        self.zonas = [zona.id for zona in zonas]
+
+        existentes = set(Necesidad.objects.values_list("nombre", flat=True))
+        Necesidad.objects.bulk_create(Necesidad(nombre=nombre) for nombre in NECESIDADES if nombre not in existentes)
+        self.necesidades = list(Necesidad.objects.order_by("id").values_list("id", flat=True))
+        self._informar(f"{total_departamentos} departamentos, {total_municipios} municipios, {total_zonas} zonas")
+
+    def _usuarios(self, total_lideres, total_colaboradores):
+        azar = self.azar
+        clave = make_password("carga123")
+        inicio = _siguiente_id(User)
+        lideres = [
+            User(
+                id=inicio + i,
+                email=f"lider{i + 1}@{DOMINIO}",
+                name=f"Líder Carga {i + 1}",
+                role=User.Roles.LIDER,
+                password=clave,
+                meta_votantes=azar.randint(200, 2000),
+            )
+            for i in range(total_lideres)
+        ]
+        User.objects.bulk_create(lideres, batch_size=self.lote)
+        self.lideres = [lider.id for lider in lideres]
+
+        # Cada líder responde por uno a tres municipios.
+        Enlace = Municipio.lideres.through
+        enlaces = []
+        self.zonas_por_lider = {}
+        for lider in self.lideres:
+            propios = azar.sample(self.municipios, min(azar.randint(1, 3), len(self.municipios)))
+            enlaces.extend(Enlace(municipio_id=municipio.id, user_id=lider) for municipio in propios)
+            self.zonas_por_lider[lider] = [
+                zona for municipio in propios for zona in self.zonas_por_municipio[municipio.id]
+            ]
+        Enlace.objects.bulk_create(enlaces, batch_size=self.lote)
+
+        inicio = _siguiente_id(User)
+        self.lider_de = {}
+        colaboradores = []
+        for i in range(total_colaboradores):
+            lider = azar.choice(self.lideres)
+            colaboradores.append(
+                User(
+                    id=inicio + i,
+                    email=f"colaborador{i + 1}@{DOMINIO}",
+                    name=f"Colaborador Carga {i + 1}",
+                    role=User.Roles.COLABORADOR,
+                    password=clave,
+                    created_by_id=lider,
+                )
+            )
+            self.lider_de[inicio + i] = lider
+        User.objects.bulk_create(colaboradores, batch_size=self.lote)
+        self.colaboradores = [colaborador.id for colaborador in colaboradores]
+
+        self.zonas_por_colaborador = {}
+        asignaciones = []
+        for colaborador in self.colaboradores:
+            disponibles = self.zonas_por_lider[self.lider_de[colaborador]]
+            propias = azar.sample(disponibles, min(azar.randint(1, 5), len(disponibles)))
+            self.zonas_por_colaborador[colaborador] = propias
+            asignaciones.extend(
+                ZonaAsignacion(colaborador_id=colaborador, zona_id=zona, asignado_por_id=self.lider_de[colaborador])
+                for zona in propias
+            )
+        ZonaAsignacion.objects.bulk_create(asignaciones, batch_size=self.lote)
+        self._informar(f"{total_lideres} líderes, {total_colaboradores} colaboradores, {len(asignaciones)} asignaciones")
+
+    def _pesos_dias(self, rafagas):
+        """Peso de cada día: crece hacia el cierre, baja el fin de semana y sube en las jornadas."""
+        azar = self.azar
+        dias = [self.hasta - timedelta(days=self.dias - 1 - i) for i in range(self.dias)]
+        pesos = [(0.4 + 0.6 * i / max(self.dias - 1, 1)) * (0.5 if dia.weekday() >= 5 else 1.0) for i, dia in enumerate(dias)]
+        for _ in range(rafagas):
+            centro, ancho, factor = azar.randrange(self.dias), azar.randint(1, 3), azar.uniform(4, 8)
+            for i in range(max(centro - ancho, 0), min(centro + ancho + 1, self.dias)):
+                pesos[i] *= factor
+        return dias, list(accumulate(pesos))
+
+    def _encuestas(self, total, exponente, rafagas, critico):
+        azar = self.azar
+        # Pocos colaboradores concentran la mayoría de las encuestas (Zipf).
+        ranking = self.colaboradores[:]
+        azar.shuffle(ranking)
+        pesos_colaboradores = _pesos_zipf(len(ranking), exponente)
+        dias, pesos_dias = self._pesos_dias(rafagas)
+        pesos_necesidades = _pesos_zipf(len(self.necesidades), 0.7)
+        opciones = {
+            "tipo_vivienda": [valor for valor, _ in Encuesta.TipoVivienda.choices],
+            "rango_edad": [valor for valor, _ in Encuesta.RangoEdad.choices],
+            "ocupacion": [valor for valor, _ in Encuesta.Ocupacion.choices],
+        }
+        estados_caso = [valor for valor, _ in CasoCiudadano.Estado.choices]
+        zona_tz = timezone.get_current_timezone()
+
+        inicio = _siguiente_id(Encuesta)
+        creadas = casos = 0
+        with _fechas_explicitas(Encuesta, "fecha_hora", "fecha_creacion"):
+            while creadas < total:
+                cantidad = min(self.lote, total - creadas)
+                autores = azar.choices(ranking, cum_weights=pesos_colaboradores, k=cantidad)
+                fechas = azar.choices(dias, cum_weights=pesos_dias, k=cantidad)
+                encuestas, respuestas, nuevos_casos = [], [], []
+                for indice, (colaborador, fecha) in enumerate(zip(autores, fechas)):
+                    encuesta_id = inicio + creadas + indice
+                    propias = self.zonas_por_colaborador[colaborador]
+                    if azar.random() < 0.85:
+                        zona = azar.choice(propias)
+                    else:
+                        zona = azar.choice(self.zonas_por_lider[self.lider_de[colaborador]])
+                    momento = datetime.combine(fecha, time(azar.randint(7, 18), azar.randrange(60)))
+                    encuesta = Encuesta(
+                        id=encuesta_id,
+                        zona_id=zona,
+                        colaborador_id=colaborador,
+                        fecha_hora=timezone.make_aware(momento, zona_tz),
+                        fecha_creacion=fecha,
+                        nombre_ciudadano=f"Ciudadano {encuesta_id}",
+                        cedula=f"9{encuesta_id:09d}" if azar.random() < 0.9 else None,
+                        telefono=f"3{azar.randrange(10**9):09d}",
+                        tipo_vivienda=azar.choice(opciones["tipo_vivienda"]),
+                        rango_edad=azar.choice(opciones["rango_edad"]),
+                        ocupacion=azar.choice(opciones["ocupacion"]),
+                        tiene_ninos=azar.random() < 0.4,
+                        tiene_adultos_mayores=azar.random() < 0.25,
+                        tiene_personas_con_discapacidad=azar.random() < 0.08,
+                        comentario_problema=" ".join(azar.sample(FRASES, azar.randint(1, 3)))
+                        if azar.random() < 0.35
+                        else None,
+                        consentimiento=True,
+                        caso_critico=azar.random() < critico,
+                        nivel_afinidad=azar.choices([1, 2, 3, 4, 5, None], weights=[3, 3, 2, 1, 1, 1])[0],
+                        disposicion_voto=azar.choices([1, 2, 3, None], weights=[4, 3, 2, 1])[0],
+                        capacidad_influencia=azar.choice([0, 1, 2, 3, None]),
+                    )
+                    if self.azar_puntos.random() < 0.9:
+                        # A unos cientos de metros del punto de la zona; algunas sin GPS.
+                        lat, lon = self.punto_zona[zona]
+                        encuesta.lat = _coordenada(lat, 0.004, self.azar_puntos)
+                        encuesta.lon = _coordenada(lon, 0.004, self.azar_puntos)
+                    encuesta._apply_votante_flags()
+                    actualizar_geohash(encuesta, {})
+                    encuestas.append(encuesta)
+                    elegidas = []
+                    cantidad_necesidades = azar.choices([1, 2, 3], weights=[2, 3, 5])[0]
+                    while len(elegidas) < cantidad_necesidades:
+                        necesidad = azar.choices(self.necesidades, cum_weights=pesos_necesidades)[0]
+                        if necesidad not in elegidas:
+                            elegidas.append(necesidad)
+                    respuestas.extend(
+                        EncuestaNecesidad(encuesta_id=encuesta_id, necesidad_id=necesidad, prioridad=prioridad)
+                        for prioridad, necesidad in enumerate(elegidas, start=1)
+                    )
+                    if encuesta.caso_critico:
+                        nuevos_casos.append(
+                            CasoCiudadano(
+                                encuesta_id=encuesta_id,
+                                nivel_prioridad=CasoCiudadano.Prioridad.ALTA,
+                                estado=azar.choice(estados_caso),
+                            )
+                        )
+                Encuesta.objects.bulk_create(encuestas)
+                EncuestaNecesidad.objects.bulk_create(respuestas)
+                CasoCiudadano.objects.bulk_create(nuevos_casos)
+                creadas += cantidad
+                casos += len(nuevos_casos)
+                self._informar(f"{creadas}/{total} encuestas")
+        self._informar(f"{casos} casos críticos")
+
+    def _rutas(self, total):
+        azar = self.azar
+        estados = [valor for valor, _ in RutaVisita.Estado.choices]
+        colaboradores_por_lider = {}
+        for colaborador, lider in self.lider_de.items():
+            colaboradores_por_lider.setdefault(lider, []).append(colaborador)
+        inicio = _siguiente_id(RutaVisita)
+        rutas, zonas, integrantes = [], [], []
+        for i in range(total):
+            lider = azar.choice(self.lideres)
+            fecha_inicio = self.hasta - timedelta(days=azar.randrange(self.dias))
+            rutas.append(
+                RutaVisita(
+                    id=inicio + i,
+                    nombre_ruta=f"Ruta Carga {i + 1}",
+                    lider_creador_id=lider,
+                    fecha_inicio=fecha_inicio,
+                    fecha_fin=fecha_inicio + timedelta(days=azar.randint(1, 14)),
+                    estado=azar.choice(estados),
+                )
+            )
+            disponibles = self.zonas_por_lider[lider]
+            zonas.extend(
+                RutaZona(ruta_id=inicio + i, zona_id=zona)
+                for zona in azar.sample(disponibles, min(azar.randint(3, 8), len(disponibles)))
+            )
+            propios = colaboradores_por_lider.get(lider, [])
+            integrantes.extend(
+                RutaColaborador(ruta_id=inicio + i, colaborador_id=colaborador)
+                for colaborador in azar.sample(propios, min(azar.randint(1, 4), len(propios)))
+            )
+        RutaVisita.objects.bulk_create(rutas, batch_size=self.lote)
+        RutaZona.objects.bulk_create(zonas, batch_size=self.lote)
+        RutaColaborador.objects.bulk_create(integrantes, batch_size=self.lote)
+        self._informar(f"{total} rutas")
+
+    def _agendas(self, total):
+        if not total:
+            return
+        azar = self.azar
+        usuario = User.objects.create(
+            email=f"candidato@{DOMINIO}", name="Candidato Carga", role=User.Roles.CANDIDATO, password=make_password(None)
+        )
+        candidato = Candidato.objects.create(usuario=usuario, nombre="Candidato Carga", cargo="Alcaldía", partido="Carga")
+        estados = [valor for valor, _ in Agenda.Estados.choices]
+        agendas = []
+        for i in range(total):
+            hora = azar.randint(7, 18)
+            agendas.append(
+                Agenda(
+                    lider_id=azar.choice(self.lideres),
+                    candidato=candidato,
+                    titulo=f"Evento Carga {i + 1}",
+                    fecha=self.hasta - timedelta(days=azar.randrange(-30, self.dias)),
+                    hora_inicio=time(hora),
+                    hora_fin=time(hora + 1),
+                    lugar=f"Lugar {azar.randint(1, 200)}",
+                    estado=azar.choice(estados),
+                )
+            )
+        Agenda.objects.bulk_create(agendas, batch_size=self.lote)
+        self._informar(f"{total} agendas")
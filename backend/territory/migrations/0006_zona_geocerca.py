@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("territory", "0005_geohash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="zona",
+            name="radio_metros",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="zona",
+            name="limite",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.db import models
 
+from .geo import actualizar_geohash
+
 
 class Departamento(models.Model):
     nombre = models.CharField(max_length=150)
@@ -15,10 +17,16 @@ class Municipio(models.Model):
     lideres = models.ManyToManyField("accounts.User", blank=True, related_name="municipios")
     lat = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     lon = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    # Celda del punto para las consultas por área (ver ``territory.geo``).
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False, db_index=True)
 
     def __str__(self):
         return f"{self.nombre} - {self.departamento.nombre}"
 
+    def save(self, *args, **kwargs):
+        actualizar_geohash(self, kwargs)
+        super().save(*args, **kwargs)
+
 
 class Zona(models.Model):
     class Tipo(models.TextChoices):
@@ -32,10 +40,36 @@ class Zona(models.Model):
     municipio = models.ForeignKey(Municipio, on_delete=models.CASCADE, related_name="zonas")
     lat = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     lon = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    # Celda del punto para las consultas por área (ver ``territory.geo``).
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False, db_index=True)
+    # Límite para verificar el punto de las encuestas (ver ``territory.geofence``):
+    # un polígono ``[[lon, lat], ...]`` o, sin él, un radio alrededor de ``lat``/``lon``.
+    radio_metros = models.PositiveIntegerField(null=True, blank=True)
+    limite = models.JSONField(null=True, blank=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.nombre} ({self.tipo})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._geocerca_guardada = instance.geocerca()
+        return instance
+
+    def geocerca(self):
+        """Campos que definen el límite de la zona."""
+        return tuple(self.__dict__.get(nombre) for nombre in ("lat", "lon", "radio_metros", "limite"))
+
+    def save(self, *args, **kwargs):
+        actualizar_geohash(self, kwargs)
+        # Lo leen las señales para recalcular las encuestas de la zona solo si cambió su límite.
+        self._geocerca_cambiada = (
+            not self._state.adding and getattr(self, "_geocerca_guardada", None) != self.geocerca()
+        )
+        super().save(*args, **kwargs)
+        self._geocerca_guardada = self.geocerca()
+
 
 class ZonaAsignacion(models.Model):
     colaborador = models.ForeignKey(
@@ -50,6 +84,7 @@ class ZonaAsignacion(models.Model):
         related_name="asignaciones_realizadas",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("colaborador", "zona")
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
 from accounts.models import User
+from pitpc.serializers import SparseFieldsMixin
+from .geofence import validar_limite
 from .models import Departamento, MetaZona, Municipio, Zona, ZonaAsignacion
 
 
@@ -16,10 +18,11 @@ class MunicipioSerializer(serializers.ModelSerializer):
     departamento_id = serializers.PrimaryKeyRelatedField(
         queryset=Departamento.objects.all(), source="departamento", write_only=True
     )
+    total_zonas = serializers.IntegerField(read_only=True, required=False)
 
     class Meta:
         model = Municipio
-        fields = ["id", "nombre", "departamento", "departamento_detalle", "departamento_id", "lat", "lon"]
+        fields = ["id", "nombre", "departamento", "departamento_detalle", "departamento_id", "lat", "lon", "total_zonas"]
 
     def validate_departamento_id(self, value):
         if value is None:
@@ -33,7 +36,7 @@ class MetaZonaSerializer(serializers.ModelSerializer):
         fields = ["meta_encuestas"]
 
 
-class ZonaSerializer(serializers.ModelSerializer):
+class ZonaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     municipio = MunicipioSerializer(read_only=True)
     municipio_id = serializers.PrimaryKeyRelatedField(
         queryset=Municipio.objects.all(), source="municipio", write_only=True
@@ -48,6 +51,8 @@ class ZonaSerializer(serializers.ModelSerializer):
             "tipo",
             "lat",
             "lon",
+            "radio_metros",
+            "limite",
             "municipio",
             "municipio_id",
             "meta",
@@ -63,8 +68,27 @@ class ZonaSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Debe seleccionar un municipio")
         return value
 
+    def validate_limite(self, value):
+        if value is None:
+            return value
+        try:
+            return validar_limite(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+
+    def validate(self, attrs):
+        def valor(campo):
+            if campo in attrs:
+                return attrs[campo]
+            return getattr(self.instance, campo, None)
+
+        if valor("radio_metros") is not None and not valor("limite"):
+            if valor("lat") is None or valor("lon") is None:
+                raise serializers.ValidationError("El radio de la zona requiere su lat y lon.")
+        return attrs
+
 
-class ZonaAsignacionSerializer(serializers.ModelSerializer):
+class ZonaAsignacionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     colaborador_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.filter(role=User.Roles.COLABORADOR), source="colaborador"
     )
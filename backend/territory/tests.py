@@ -1,3 +1,116 @@
+import random
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .geo import celdas, distancia, en_radio, geohash, q_caja
+from .geofence import afuera, compilar, fuera_de_zona, validar_limite
+from .models import Departamento, Municipio, Zona
+from .serializers import ZonaSerializer
+
+
+class GeohashTests(TestCase):
+    """Las consultas por área usan el índice y devuelven lo mismo que el filtro directo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        azar = random.Random(1)
+        departamento = Departamento.objects.create(nombre="Departamento")
+        municipio = Municipio.objects.create(nombre="Municipio", departamento=departamento, lat=6.25, lon=-75.57)
+        for i in range(200):
+            Zona.objects.create(
+                nombre=f"Zona {i}",
+                tipo="BARRIO",
+                municipio=municipio,
+                lat=round(6 + azar.random(), 6),
+                lon=round(-76 + azar.random(), 6),
+            )
+        Zona.objects.create(nombre="Sin punto", tipo="BARRIO", municipio=municipio)
+
+    def test_geohash(self):
+        self.assertEqual(geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash(None, 10), "")
+        self.assertEqual(Municipio.objects.get().geohash, geohash(6.25, -75.57))
+
+    def test_se_mantiene_al_guardar(self):
+        zona = Zona.objects.get(nombre="Sin punto")
+        self.assertEqual(zona.geohash, "")
+        zona.lat, zona.lon = 4.6, -74.08
+        zona.save(update_fields=["lat", "lon"])
+        zona.refresh_from_db()
+        self.assertEqual(zona.geohash, geohash(4.6, -74.08))
+
+    def test_caja_igual_al_filtro_directo(self):
+        azar = random.Random(2)
+        for _ in range(50):
+            sur, oeste = 6 + azar.random(), -76 + azar.random()
+            alto, ancho = (azar.random() / 10 ** azar.randint(0, 3) for _ in range(2))
+            caja = (sur, oeste, sur + alto, oeste + ancho)
+            with self.subTest(caja=caja):
+                self.assertLessEqual(len(celdas(caja)), 16)
+                esperadas = Zona.objects.filter(
+                    lat__gte=caja[0], lat__lte=caja[2], lon__gte=caja[1], lon__lte=caja[3]
+                )
+                self.assertEqual(set(Zona.objects.filter(q_caja(caja))), set(esperadas))
+
+    def test_radio_por_distancia_exacta(self):
+        for metros in (500, 5000, 40000):
+            with self.subTest(metros=metros):
+                esperadas = {
+                    zona
+                    for zona in Zona.objects.exclude(lat=None)
+                    if distancia(6.5, -75.5, zona.lat, zona.lon) <= metros
+                }
+                self.assertEqual(set(en_radio(Zona.objects.all(), 6.5, -75.5, metros)), esperadas)
+
+
+class GeocercaTests(TestCase):
+    """El punto se verifica contra el polígono o el radio de la zona, con el margen del GPS."""
+
+    CUADRO = [[-75.57, 6.24], [-75.56, 6.24], [-75.56, 6.25], [-75.57, 6.25], [-75.57, 6.24]]
+
+    @classmethod
+    def setUpTestData(cls):
+        departamento = Departamento.objects.create(nombre="Departamento")
+        cls.municipio = Municipio.objects.create(nombre="Municipio", departamento=departamento)
+        cls.zona = Zona.objects.create(nombre="Zona", tipo="BARRIO", municipio=cls.municipio)
+
+    def test_poligono_y_radio(self):
+        poligono = compilar(None, None, None, validar_limite(self.CUADRO))
+        self.assertFalse(afuera(poligono, 6.245, -75.565, margen=0))
+        self.assertTrue(afuera(poligono, 6.245, -75.58, margen=0))
+        # A unos 55 m del borde este: fuera sin margen, dentro con 100 m.
+        self.assertTrue(afuera(poligono, 6.245, -75.5595, margen=0))
+        self.assertFalse(afuera(poligono, 6.245, -75.5595, margen=100))
+        self.assertIsNone(afuera(poligono, None, -75.56))
+
+        radio = compilar(6.245, -75.565, 1000, None)
+        self.assertFalse(afuera(radio, 6.2535, -75.565, margen=0))
+        self.assertTrue(afuera(radio, 6.2545, -75.565, margen=0))
+        self.assertIsNone(compilar(None, None, 1000, None))
+
+    def test_limite_invalido(self):
+        for limite in ([[0, 0], [1, 1]], [[0, 0], [1, 1], [200, 0]], [[0, 0], [1], [1, 1]], "0,0"):
+            with self.subTest(limite=limite):
+                with self.assertRaises(ValueError):
+                    validar_limite(limite)
+        serializer = ZonaSerializer(self.zona, data={"radio_metros": 500}, partial=True)
+        self.assertFalse(serializer.is_valid())
 
-# Create your tests here.
+    def test_indice_se_recompila_al_cambiar_la_zona(self):
+        self.assertIsNone(fuera_de_zona(self.zona.id, 6.245, -75.58))
+        self.zona.limite = validar_limite(self.CUADRO)
+        self.zona.save()
+        self.assertTrue(fuera_de_zona(self.zona.id, 6.245, -75.58))
+        with self.assertNumQueries(1):
+            # Sin cambios solo se lee la marca de las zonas.
+            self.assertFalse(fuera_de_zona(self.zona.id, 6.245, -75.565))
+        # Un cambio sin señales ni caché compartida, como el de otro proceso, también se ve.
+        Zona.objects.filter(pk=self.zona.pk).update(limite=None, actualizado_en=timezone.now())
+        self.assertIsNone(fuera_de_zona(self.zona.id, 6.245, -75.58))
+        otra = Zona.objects.create(
+            nombre="Otra", tipo="BARRIO", municipio=self.municipio, lat=6.245, lon=-75.565, radio_metros=100
+        )
+        self.assertTrue(fuera_de_zona(otra.id, 6.245, -75.58))
+        otra.delete()
+        self.assertIsNone(fuera_de_zona(otra.id, 6.245, -75.58))
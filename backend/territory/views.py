@@ -1,3 +1,5 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -56,6 +58,15 @@ class MunicipioViewSet(
                 qs = qs.filter(lideres=user)
             elif user.is_collaborator:
                 qs = qs.filter(zonas__asignaciones__colaborador=user)
+        # Conteo en subconsulta: la lista de zonas llega por páginas y no sirve para contarlas.
+        zonas = (
+            Zona.objects.filter(municipio=OuterRef("pk"))
+            .order_by()
+            .values("municipio")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        qs = qs.annotate(total_zonas=Coalesce(Subquery(zonas, output_field=IntegerField()), 0))
         return qs.distinct()
 
 
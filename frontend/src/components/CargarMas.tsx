@@ -0,0 +1,18 @@
+type CargarMasProps = {
+  hayMas: boolean;
+  cargando: boolean;
+  onClick: () => void;
+};
+
+const CargarMas: React.FC<CargarMasProps> = ({ hayMas, cargando, onClick }) => {
+  if (!hayMas) return null;
+  return (
+    <div className="text-center mt-2">
+      <button type="button" className="btn btn-outline-secondary btn-sm" onClick={onClick} disabled={cargando}>
+        {cargando ? "Cargando..." : "Cargar más"}
+      </button>
+    </div>
+  );
+};
+
+export default CargarMas;
@@ -0,0 +1,57 @@
+import { useCallback, useEffect, useRef, useState } from "react";
+import { obtenerPagina } from "../services/api";
+
+type Opciones = {
+  params?: Record<string, unknown>;
+  // Sin habilitar no se pide nada (p. ej. mientras no hay usuario o falta un filtro).
+  habilitada?: boolean;
+};
+
+/** Listado por páginas: carga la primera y ``cargarMas`` pide la siguiente con su cursor. */
+export const useListaPaginada = <T,>(url: string, { params, habilitada = true }: Opciones = {}) => {
+  const [items, setItems] = useState<T[]>([]);
+  const [siguiente, setSiguiente] = useState<string | null>(null);
+  const [cargando, setCargando] = useState(false);
+  const [error, setError] = useState(false);
+  const clave = JSON.stringify(params ?? {});
+  // Descarta respuestas de una carga anterior si cambian la ruta o los filtros.
+  const version = useRef(0);
+
+  const pedir = useCallback(
+    async (cursor: string | null) => {
+      const actual = version.current;
+      setCargando(true);
+      setError(false);
+      try {
+        const pagina = await obtenerPagina<T>(url, JSON.parse(clave), cursor);
+        if (actual !== version.current) return;
+        setItems((previos) => (cursor ? [...previos, ...pagina.results] : pagina.results));
+        setSiguiente(pagina.next);
+      } catch (err) {
+        console.error(err);
+        if (actual === version.current) setError(true);
+      } finally {
+        if (actual === version.current) setCargando(false);
+      }
+    },
+    [url, clave]
+  );
+
+  const recargar = useCallback(async () => {
+    version.current += 1;
+    await pedir(null);
+  }, [pedir]);
+
+  useEffect(() => {
+    version.current += 1;
+    setItems([]);
+    setSiguiente(null);
+    if (habilitada) pedir(null);
+  }, [pedir, habilitada]);
+
+  const cargarMas = useCallback(async () => {
+    if (siguiente && !cargando) await pedir(siguiente);
+  }, [siguiente, cargando, pedir]);
+
+  return { items, setItems, cargando, error, hayMas: Boolean(siguiente), cargarMas, recargar };
+};
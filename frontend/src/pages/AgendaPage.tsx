@@ -1,7 +1,9 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
-import api from "../services/api";
+import CargarMas from "../components/CargarMas";
+import api, { obtenerTodo } from "../services/api";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 type Candidate = {
   id: number;
@@ -37,9 +39,8 @@ const estadoBadge: Record<Agenda["estado"], string> = {
 
 const AgendaPage = () => {
   const { user } = useAuth();
-  const [agendas, setAgendas] = useState<Agenda[]>([]);
   const [candidatos, setCandidatos] = useState<Candidate[]>([]);
-  const [loading, setLoading] = useState(false);
+  const [loadingCandidatos, setLoadingCandidatos] = useState(false);
   const [saving, setSaving] = useState(false);
   const [alert, setAlert] = useState<string | null>(null);
   const [editingId, setEditingId] = useState<number | null>(null);
@@ -54,28 +55,35 @@ const AgendaPage = () => {
   });
 
   const puedeUsarAgenda = user?.role === "ADMIN" || user?.role === "LIDER";
+  const {
+    items: agendas,
+    cargando: loadingAgendas,
+    error,
+    hayMas,
+    cargarMas,
+    recargar: load,
+  } = useListaPaginada<Agenda>("/agendas/", { habilitada: puedeUsarAgenda });
+  const loading = loadingAgendas || loadingCandidatos;
 
-  const load = async () => {
-    setLoading(true);
-    try {
-      const [agendasRes, candidatosRes] = await Promise.all([
-        api.get<Agenda[]>("/agendas/"),
-        api.get<Candidate[]>("/candidatos/"),
-      ]);
-      setAgendas(agendasRes.data);
-      setCandidatos(candidatosRes.data);
-    } catch (err) {
-      console.error(err);
-      setAlert("No fue posible cargar la agenda.");
-    } finally {
-      setLoading(false);
-    }
-  };
+  useEffect(() => {
+    if (error) setAlert("No fue posible cargar la agenda.");
+  }, [error]);
 
   useEffect(() => {
-    if (puedeUsarAgenda) {
-      load();
-    }
+    if (!puedeUsarAgenda) return;
+    const loadCandidatos = async () => {
+      setLoadingCandidatos(true);
+      try {
+        // Todos: son las opciones del selector de candidato.
+        setCandidatos(await obtenerTodo<Candidate>("/candidatos/"));
+      } catch (err) {
+        console.error(err);
+        setAlert("No fue posible cargar la agenda.");
+      } finally {
+        setLoadingCandidatos(false);
+      }
+    };
+    loadCandidatos();
   }, [puedeUsarAgenda]);
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -318,12 +326,16 @@ const AgendaPage = () => {
                 </div>
               </div>
             </div>
+            {hayMas && <p className="col-12 text-muted small mb-0">Totales sobre las agendas cargadas.</p>}
           </div>
 
           <div className="card card-outline card-secondary">
             <div className="card-header d-flex justify-content-between align-items-center">
               <h3 className="card-title mb-0">Agendas registradas</h3>
-              <span className="badge badge-light">{agendas.length} registros</span>
+              <span className="badge badge-light">
+                {agendas.length}
+                {hayMas ? "+" : ""} registros
+              </span>
             </div>
             <div className="card-body table-responsive p-0" style={{ maxHeight: 520 }}>
               <table className="table table-hover text-nowrap">
@@ -389,6 +401,7 @@ const AgendaPage = () => {
                   )}
                 </tbody>
               </table>
+              <CargarMas hayMas={hayMas} cargando={loadingAgendas} onClick={cargarMas} />
             </div>
           </div>
         </div>
@@ -1,7 +1,9 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
-import api from "../services/api";
+import CargarMas from "../components/CargarMas";
+import api, { obtenerTodo } from "../services/api";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 interface Collaborator {
   id: number;
@@ -36,7 +38,6 @@ const AssignmentsPage = () => {
   const { user } = useAuth();
   const [collaborators, setCollaborators] = useState<Collaborator[]>([]);
   const [municipios, setMunicipios] = useState<Municipio[]>([]);
-  const [zones, setZones] = useState<ZonaOption[]>([]);
   const [assignments, setAssignments] = useState<Asignacion[]>([]);
   const [selectedCollaborator, setSelectedCollaborator] = useState("");
   const [selectedMunicipio, setSelectedMunicipio] = useState("");
@@ -50,30 +51,39 @@ const AssignmentsPage = () => {
 
   const isLeaderOrAdmin = user?.role === "ADMIN" || user?.role === "LIDER";
   const isLeader = user?.role === "LIDER";
+  const {
+    items: zones,
+    setItems: setZones,
+    cargando: loadingZones,
+    error: zonesError,
+    hayMas,
+    cargarMas,
+  } = useListaPaginada<ZonaOption>("/zonas/", {
+    params: selectedMunicipio ? { municipio: selectedMunicipio } : undefined,
+    habilitada: isLeaderOrAdmin,
+  });
 
   useEffect(() => {
     const loadBaseData = async () => {
       setError(null);
       try {
-        const { data: collabData } = await api.get<Collaborator[]>("/usuarios/", {
-          params: { role: "COLABORADOR" },
-        });
-        const muniRequest = isLeader
-          ? api.get<Municipio[]>(`/usuarios/${user?.id}/municipios/`)
-          : api.get<Municipio[]>("/municipios/");
-        const [muniRes] = await Promise.all([muniRequest]);
+        // Completos: son las opciones de los selectores.
+        const [collabData, munis] = await Promise.all([
+          obtenerTodo<Collaborator>("/usuarios/", { role: "COLABORADOR" }),
+          obtenerTodo<Municipio>(isLeader ? `/usuarios/${user?.id}/municipios/` : "/municipios/"),
+        ]);
 
         setCollaborators(
           isLeader
             ? collabData.filter((col) => col.id !== user?.id)
             : collabData
         );
-        setMunicipios(muniRes.data);
-        if (isLeader && muniRes.data.length === 0) {
+        setMunicipios(munis);
+        if (isLeader && munis.length === 0) {
           setError("Tu usuario aún no tiene municipios asignados por el administrador.");
         }
-        if (!selectedMunicipio && muniRes.data.length > 0) {
-          setSelectedMunicipio(String(muniRes.data[0].id));
+        if (!selectedMunicipio && munis.length > 0) {
+          setSelectedMunicipio(String(munis[0].id));
         }
       } catch (err) {
         console.error(err);
@@ -91,23 +101,8 @@ const AssignmentsPage = () => {
   }, [zones, selectedMunicipio]);
 
   useEffect(() => {
-    const fetchZones = async () => {
-      setError(null);
-      try {
-        const { data } = await api.get<ZonaOption[]>("/zonas/", {
-          params: selectedMunicipio ? { municipio: selectedMunicipio } : undefined,
-        });
-        setZones(data);
-      } catch (err) {
-        console.error(err);
-        setError("No fue posible cargar las zonas para el municipio seleccionado");
-      }
-    };
-
-    if (isLeaderOrAdmin) {
-      fetchZones();
-    }
-  }, [isLeaderOrAdmin, selectedMunicipio]);
+    if (zonesError) setError("No fue posible cargar las zonas para el municipio seleccionado");
+  }, [zonesError]);
 
   const loadAssignments = async (colabId: string) => {
     if (!colabId) {
@@ -118,11 +113,10 @@ const AssignmentsPage = () => {
     setAlert(null);
     setError(null);
     try {
-      const { data } = await api.get<Asignacion[]>("/asignaciones/", {
-        params: {
-          colaborador: colabId,
-          municipio: selectedMunicipio || undefined,
-        },
+      // Completas: los interruptores de la tabla de zonas necesitan todas las del colaborador.
+      const data = await obtenerTodo<Asignacion>("/asignaciones/", {
+        colaborador: colabId,
+        municipio: selectedMunicipio || undefined,
       });
       setAssignments(data);
     } catch (err) {
@@ -219,7 +213,7 @@ const AssignmentsPage = () => {
             Define en qué municipios y zonas pueden diligenciar encuestas los colaboradores.
           </p>
         </div>
-        {loadingAssignments && <span className="badge badge-info">Actualizando...</span>}
+        {(loadingAssignments || loadingZones) && <span className="badge badge-info">Actualizando...</span>}
       </div>
 
       {alert && <div className="alert alert-success py-2">{alert}</div>}
@@ -314,7 +308,10 @@ const AssignmentsPage = () => {
       <div className="card card-outline card-secondary">
         <div className="card-header d-flex justify-content-between align-items-center">
           <h3 className="card-title mb-0">Zonas disponibles</h3>
-          <span className="badge badge-light">{filteredZones.length} zonas</span>
+          <span className="badge badge-light">
+            {filteredZones.length}
+            {hayMas ? "+" : ""} zonas
+          </span>
         </div>
         <div className="card-body p-0">
           <div className="table-responsive" style={{ maxHeight: 420 }}>
@@ -363,6 +360,7 @@ const AssignmentsPage = () => {
               </tbody>
             </table>
           </div>
+          <CargarMas hayMas={hayMas} cargando={loadingZones} onClick={cargarMas} />
         </div>
       </div>
 
@@ -1,4 +1,6 @@
 import { useEffect, useState } from "react";
+import CargarMas from "../components/CargarMas";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 import api from "../services/api";
 
 type Agenda = {
@@ -24,26 +26,19 @@ const badgeClasses: Record<Agenda["estado"], string> = {
 };
 
 const CandidateAgendaPage = () => {
-  const [agendas, setAgendas] = useState<Agenda[]>([]);
-  const [loading, setLoading] = useState(false);
+  const {
+    items: agendas,
+    cargando: loading,
+    error,
+    hayMas,
+    cargarMas,
+    recargar: load,
+  } = useListaPaginada<Agenda>("/agendas/");
   const [alert, setAlert] = useState<string | null>(null);
 
-  const load = async () => {
-    setLoading(true);
-    try {
-      const { data } = await api.get<Agenda[]>("/agendas/");
-      setAgendas(data);
-    } catch (err) {
-      console.error(err);
-      setAlert("No fue posible cargar tus agendas.");
-    } finally {
-      setLoading(false);
-    }
-  };
-
   useEffect(() => {
-    load();
-  }, []);
+    if (error) setAlert("No fue posible cargar tus agendas.");
+  }, [error]);
 
   const responder = async (agenda: Agenda, accion: "aceptar" | "rechazar" | "reprogramar") => {
     let motivo = "";
@@ -135,6 +130,7 @@ const CandidateAgendaPage = () => {
           </div>
         )}
       </div>
+      <CargarMas hayMas={hayMas} cargando={loading} onClick={cargarMas} />
     </div>
   );
 };
@@ -1,7 +1,9 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
+import CargarMas from "../components/CargarMas";
 import api from "../services/api";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 export type Candidate = {
   id: number;
@@ -36,30 +38,23 @@ const emptyForm: CandidateForm = {
 
 const CandidatesPage = () => {
   const { user } = useAuth();
-  const [candidates, setCandidates] = useState<Candidate[]>([]);
+  const {
+    items: candidates,
+    cargando: cargandoLista,
+    error,
+    hayMas,
+    cargarMas,
+    recargar: load,
+  } = useListaPaginada<Candidate>("/candidatos/");
   const [form, setForm] = useState<CandidateForm>(emptyForm);
   const [loading, setLoading] = useState(false);
   const [editingId, setEditingId] = useState<number | null>(null);
   const [alert, setAlert] = useState<string | null>(null);
   const [credentialNote, setCredentialNote] = useState<string | null>(null);
 
-  const load = async () => {
-    setLoading(true);
-    setAlert(null);
-    try {
-      const { data } = await api.get<Candidate[]>("/candidatos/");
-      setCandidates(data);
-    } catch (err) {
-      console.error(err);
-      setAlert("No fue posible cargar los candidatos.");
-    } finally {
-      setLoading(false);
-    }
-  };
-
   useEffect(() => {
-    load();
-  }, []);
+    if (error) setAlert("No fue posible cargar los candidatos.");
+  }, [error]);
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -139,7 +134,7 @@ const CandidatesPage = () => {
           <h1 className="h4 font-weight-bold mb-0">Gestión de candidatos</h1>
           <p className="text-muted mb-0">Crea usuarios con rol candidato y administra su información.</p>
         </div>
-        {loading && <span className="badge badge-info">Procesando...</span>}
+        {(loading || cargandoLista) && <span className="badge badge-info">Procesando...</span>}
       </div>
 
       {alert && <div className="alert alert-info">{alert}</div>}
@@ -249,7 +244,10 @@ const CandidatesPage = () => {
           <div className="card card-outline card-secondary">
             <div className="card-header d-flex justify-content-between align-items-center">
               <h3 className="card-title mb-0">Candidatos registrados</h3>
-              <span className="badge badge-light">{candidates.length}</span>
+              <span className="badge badge-light">
+                {candidates.length}
+                {hayMas ? "+" : ""}
+              </span>
             </div>
             <div className="card-body table-responsive p-0" style={{ maxHeight: 520 }}>
               <table className="table table-hover text-nowrap">
@@ -289,6 +287,7 @@ const CandidatesPage = () => {
                   ))}
                 </tbody>
               </table>
+              <CargarMas hayMas={hayMas} cargando={cargandoLista} onClick={cargarMas} />
             </div>
           </div>
         </div>
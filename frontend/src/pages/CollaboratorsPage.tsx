@@ -1,7 +1,9 @@
 import { useEffect, useState } from "react";
 import { Navigate } from "react-router-dom";
+import CargarMas from "../components/CargarMas";
 import api from "../services/api";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 type Collaborator = {
   id: number;
@@ -15,8 +17,14 @@ type Collaborator = {
 
 const CollaboratorsPage = () => {
   const { user } = useAuth();
-  const [collaborators, setCollaborators] = useState<Collaborator[]>([]);
-  const [loading, setLoading] = useState(false);
+  const {
+    items: collaborators,
+    cargando: loading,
+    error,
+    hayMas,
+    cargarMas,
+    recargar: load,
+  } = useListaPaginada<Collaborator>("/usuarios/", { params: { role: "COLABORADOR" } });
   const [alert, setAlert] = useState<string | null>(null);
   const [form, setForm] = useState({
     name: "",
@@ -28,22 +36,9 @@ const CollaboratorsPage = () => {
   });
   const [editingId, setEditingId] = useState<number | null>(null);
 
-  const load = async () => {
-    setLoading(true);
-    try {
-      const { data } = await api.get<Collaborator[]>("/usuarios/", { params: { role: "COLABORADOR" } });
-      setCollaborators(data.filter((u) => u.role === "COLABORADOR"));
-    } catch (err) {
-      console.error(err);
-      setAlert("No fue posible cargar los colaboradores.");
-    } finally {
-      setLoading(false);
-    }
-  };
-
   useEffect(() => {
-    load();
-  }, []);
+    if (error) setAlert("No fue posible cargar los colaboradores.");
+  }, [error]);
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -218,7 +213,9 @@ const CollaboratorsPage = () => {
           <div className="card card-outline card-secondary">
             <div className="card-header d-flex justify-content-between align-items-center">
               <h3 className="card-title">Colaboradores registrados</h3>
-              <span className="badge badge-light">{collaborators.length} colaboradores</span>
+              <span className="badge badge-light">{collaborators.length}
+                {hayMas ? "+" : ""} colaboradores
+              </span>
             </div>
             <div className="card-body table-responsive p-0" style={{ maxHeight: 520 }}>
               <table className="table table-hover text-nowrap">
@@ -260,6 +257,7 @@ const CollaboratorsPage = () => {
                   ))}
                 </tbody>
               </table>
+              <CargarMas hayMas={hayMas} cargando={loading} onClick={cargarMas} />
             </div>
           </div>
         </div>
@@ -1,7 +1,9 @@
 import { useEffect, useState } from "react";
 import { Navigate } from "react-router-dom";
-import api from "../services/api";
+import CargarMas from "../components/CargarMas";
+import api, { obtenerTodo } from "../services/api";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 type Leader = {
   id: number;
@@ -21,8 +23,14 @@ type Municipio = {
 
 const LeadersPage = () => {
   const { user } = useAuth();
-  const [leaders, setLeaders] = useState<Leader[]>([]);
-  const [loading, setLoading] = useState(false);
+  const {
+    items: leaders,
+    cargando: loading,
+    error,
+    hayMas,
+    cargarMas,
+    recargar: load,
+  } = useListaPaginada<Leader>("/usuarios/", { params: { role: "LIDER" } });
   const [alert, setAlert] = useState<string | null>(null);
   const [form, setForm] = useState({
     name: "",
@@ -42,25 +50,15 @@ const LeadersPage = () => {
   const [metaValue, setMetaValue] = useState<string>("");
   const [savingMeta, setSavingMeta] = useState(false);
 
-  const load = async () => {
-    setLoading(true);
-    try {
-      const { data } = await api.get<Leader[]>("/usuarios/", { params: { role: "LIDER" } });
-      setLeaders(data.filter((u) => u.role === "LIDER"));
-    } catch (err) {
-      console.error(err);
-      setAlert("No fue posible cargar los líderes.");
-    } finally {
-      setLoading(false);
-    }
-  };
+  useEffect(() => {
+    if (error) setAlert("No fue posible cargar los líderes.");
+  }, [error]);
 
   useEffect(() => {
-    load();
     const loadMunicipios = async () => {
       try {
-        const { data } = await api.get<Municipio[]>("/municipios/");
-        setMunicipios(data);
+        // Todos: son las opciones para asignar municipios a un líder.
+        setMunicipios(await obtenerTodo<Municipio>("/municipios/"));
       } catch (err) {
         console.error(err);
         setAlert("No fue posible cargar los municipios.");
@@ -320,7 +318,10 @@ const LeadersPage = () => {
           <div className="card card-outline card-secondary">
             <div className="card-header d-flex justify-content-between align-items-center">
               <h3 className="card-title">Líderes registrados</h3>
-              <span className="badge badge-light">{leaders.length} líderes</span>
+              <span className="badge badge-light">
+                {leaders.length}
+                {hayMas ? "+" : ""} líderes
+              </span>
             </div>
             <div className="card-body table-responsive p-0" style={{ maxHeight: 520 }}>
               <table className="table table-hover text-nowrap">
@@ -376,6 +377,7 @@ const LeadersPage = () => {
                   ))}
                 </tbody>
               </table>
+              <CargarMas hayMas={hayMas} cargando={loading} onClick={cargarMas} />
             </div>
           </div>
         </div>
@@ -1,6 +1,8 @@
 import { useEffect, useMemo, useState } from "react";
-import api from "../services/api";
+import CargarMas from "../components/CargarMas";
+import api, { obtenerTodo } from "../services/api";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 interface Ruta {
   id: number;
@@ -26,8 +28,16 @@ interface ZonaOption {
 
 const RoutesPage = () => {
   const { user } = useAuth();
-  const [rutas, setRutas] = useState<Ruta[]>([]);
-  const [loading, setLoading] = useState(true);
+  const endpointRutas = user?.role === "COLABORADOR" ? "/rutas/mis-rutas/" : "/rutas/";
+  const {
+    items: rutas,
+    setItems: setRutas,
+    cargando: loading,
+    error: rutasConError,
+    hayMas,
+    cargarMas,
+    recargar: recargarRutas,
+  } = useListaPaginada<Ruta>(endpointRutas, { habilitada: Boolean(user) });
   const [zones, setZones] = useState<ZonaOption[]>([]);
   const [municipios, setMunicipios] = useState<Municipio[]>([]);
   const [selectedMunicipio, setSelectedMunicipio] = useState("");
@@ -48,22 +58,8 @@ const RoutesPage = () => {
   const [zonesError, setZonesError] = useState<string | null>(null);
 
   useEffect(() => {
-    const fetchData = async () => {
-      setLoading(true);
-      setRoutesError(null);
-      try {
-        const endpoint = user?.role === "COLABORADOR" ? "/rutas/mis-rutas/" : "/rutas/";
-        const { data } = await api.get<Ruta[]>(endpoint);
-        setRutas(data);
-      } catch (err) {
-        console.error(err);
-        setRoutesError("No fue posible cargar las rutas");
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchData();
-  }, [user]);
+    setRoutesError(rutasConError ? "No fue posible cargar las rutas" : null);
+  }, [rutasConError]);
 
   const filteredZones = useMemo(() => {
     if (!selectedMunicipio) return zones;
@@ -74,12 +70,13 @@ const RoutesPage = () => {
     const loadTerritory = async () => {
       if (user?.role === "LIDER" || user?.role === "ADMIN") {
         try {
-          const [zonesRes, muniRes] = await Promise.all([
-            api.get<ZonaOption[]>("/zonas/"),
-            api.get<Municipio[]>("/municipios/"),
+          // Todas: son las opciones para armar una ruta.
+          const [zonas, munis] = await Promise.all([
+            obtenerTodo<ZonaOption>("/zonas/"),
+            obtenerTodo<Municipio>("/municipios/"),
           ]);
-          setZones(zonesRes.data);
-          setMunicipios(muniRes.data);
+          setZones(zonas);
+          setMunicipios(munis);
         } catch (err) {
           console.error(err);
         }
@@ -134,9 +131,7 @@ const RoutesPage = () => {
       setFechaInicio("");
       setFechaFin("");
       setEditingRouteId(null);
-      const endpoint = user?.role === "COLABORADOR" ? "/rutas/mis-rutas/" : "/rutas/";
-      const { data } = await api.get<Ruta[]>(endpoint);
-      setRutas(data);
+      await recargarRutas();
     } catch (err) {
       console.error(err);
       setFormError("No fue posible guardar la ruta. Verifica la información");
@@ -383,27 +378,14 @@ const RoutesPage = () => {
               <button
                 className="btn btn-default btn-sm"
                 type="button"
-                onClick={async () => {
-                  setLoading(true);
-                  setRoutesError(null);
-                  try {
-                    const endpoint = user?.role === "COLABORADOR" ? "/rutas/mis-rutas/" : "/rutas/";
-                    const { data } = await api.get<Ruta[]>(endpoint);
-                    setRutas(data);
-                  } catch (err) {
-                    console.error(err);
-                    setRoutesError("No fue posible actualizar las rutas");
-                  } finally {
-                    setLoading(false);
-                  }
-                }}
+                onClick={recargarRutas}
               >
                 <i className="fas fa-sync-alt mr-1" /> Refrescar
               </button>
             </div>
             <div className="card-body">
               {routesError && <div className="alert alert-danger py-2">{routesError}</div>}
-              {loading ? (
+              {loading && rutas.length === 0 ? (
                 <p className="text-muted mb-0">Cargando rutas...</p>
               ) : rutas.length === 0 ? (
                 <p className="text-muted mb-0">No hay rutas registradas.</p>
@@ -455,6 +437,7 @@ const RoutesPage = () => {
                   ))}
                 </div>
               )}
+              <CargarMas hayMas={hayMas} cargando={loading} onClick={cargarMas} />
             </div>
           </div>
         </div>
@@ -1,6 +1,7 @@
-import { useEffect, useMemo, useState } from "react";
-import api from "../services/api";
+import { useMemo, useState } from "react";
+import CargarMas from "../components/CargarMas";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 interface SurveyNeed {
   prioridad: number;
@@ -26,29 +27,15 @@ interface SurveyRow {
 
 const SurveyDataPage = () => {
   const { user } = useAuth();
-  const [surveys, setSurveys] = useState<SurveyRow[]>([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState<string | null>(null);
+  const {
+    items: surveys,
+    cargando: loading,
+    error,
+    hayMas,
+    cargarMas,
+  } = useListaPaginada<SurveyRow>("/encuestas/", { habilitada: user?.role === "ADMIN" });
   const [selectedMunicipio, setSelectedMunicipio] = useState<string>("");
 
-  useEffect(() => {
-    const fetchSurveys = async () => {
-      if (user?.role !== "ADMIN") return;
-      setLoading(true);
-      setError(null);
-      try {
-        const { data } = await api.get<SurveyRow[]>("/encuestas/");
-        setSurveys(data);
-      } catch (err) {
-        console.error(err);
-        setError("No fue posible cargar las encuestas");
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchSurveys();
-  }, [user]);
-
   const municipiosDisponibles = useMemo(
     () =>
       Array.from(new Set(surveys.map((s) => s.municipio_nombre).filter(Boolean))) as string[],
@@ -94,8 +81,8 @@ const SurveyDataPage = () => {
           </div>
         </div>
         <div className="card-body">
-          {error && <div className="alert alert-danger py-2">{error}</div>}
-          {loading ? (
+          {error && <div className="alert alert-danger py-2">No fue posible cargar las encuestas</div>}
+          {loading && surveys.length === 0 ? (
             <p className="text-muted mb-0">Cargando encuestas...</p>
           ) : filteredSurveys.length === 0 ? (
             <p className="text-muted mb-0">No hay encuestas registradas para el filtro seleccionado.</p>
@@ -141,6 +128,8 @@ const SurveyDataPage = () => {
               </table>
             </div>
           )}
+          {/* El filtro por municipio aplica sobre las páginas ya cargadas. */}
+          <CargarMas hayMas={hayMas} cargando={loading} onClick={cargarMas} />
         </div>
       </div>
     </div>
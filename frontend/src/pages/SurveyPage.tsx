@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from "react";
-import api from "../services/api";
+import api, { obtenerTodo } from "../services/api";
 import { useAuth } from "../context/AuthContext";
 
 interface Zona {
@@ -119,12 +119,13 @@ const SurveyPage = () => {
     const load = async () => {
       try {
         if (isCollaborator) {
-          const [asignacionesRes, necesidadRes] = await Promise.all([
-            api.get<ZonaAsignada[]>("/asignaciones/"),
-            api.get<Necesidad[]>("/necesidades/"),
+          // Catálogos completos: son las opciones del formulario.
+          const [asignaciones, necesidadesData] = await Promise.all([
+            obtenerTodo<ZonaAsignada>("/asignaciones/"),
+            obtenerTodo<Necesidad>("/necesidades/"),
           ]);
           const zonasUnicasMap = new Map<number, Zona>();
-          asignacionesRes.data.forEach((asig) => {
+          asignaciones.forEach((asig) => {
             zonasUnicasMap.set(asig.zona_id, {
               id: asig.zona_id,
               nombre: asig.zona_nombre,
@@ -140,21 +141,21 @@ const SurveyPage = () => {
           });
           setZonas(zonasAsignadas);
           setMunicipios(Array.from(municipiosAsignadosMap.values()));
-          setNecesidades(necesidadRes.data);
+          setNecesidades(necesidadesData);
           if (zonasAsignadas.length === 0) {
             setError(
               "No tienes zonas asignadas. Solicita a tu líder o administrador que te asigne una zona."
             );
           }
         } else {
-          const [municipioRes, zonaRes, necesidadRes] = await Promise.all([
-            api.get<Municipio[]>("/municipios/"),
-            api.get<Zona[]>("/zonas/"),
-            api.get<Necesidad[]>("/necesidades/"),
+          const [municipiosData, zonasData, necesidadesData] = await Promise.all([
+            obtenerTodo<Municipio>("/municipios/"),
+            obtenerTodo<Zona>("/zonas/"),
+            obtenerTodo<Necesidad>("/necesidades/"),
           ]);
-          setMunicipios(municipioRes.data);
-          setZonas(zonaRes.data);
-          setNecesidades(necesidadRes.data);
+          setMunicipios(municipiosData);
+          setZonas(zonasData);
+          setNecesidades(necesidadesData);
         }
       } catch (err) {
         console.error(err);
@@ -1,7 +1,9 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
-import api from "../services/api";
+import CargarMas from "../components/CargarMas";
+import api, { obtenerTodo } from "../services/api";
 import { useAuth } from "../context/AuthContext";
+import { useListaPaginada } from "../hooks/useListaPaginada";
 
 type Departamento = { id: number; nombre: string };
 type Municipio = {
@@ -11,6 +13,7 @@ type Municipio = {
   departamento_detalle?: Departamento;
   lat?: number;
   lon?: number;
+  total_zonas?: number;
 };
 type Zona = {
   id: number;
@@ -34,7 +37,14 @@ const TerritoryPage = () => {
   const [depForm, setDepForm] = useState({ nombre: "" });
   const [departamentos, setDepartamentos] = useState<Departamento[]>([]);
   const [municipios, setMunicipios] = useState<Municipio[]>([]);
-  const [zonas, setZonas] = useState<Zona[]>([]);
+  const {
+    items: zonas,
+    cargando: cargandoZonas,
+    error: zonasConError,
+    hayMas,
+    cargarMas,
+    recargar: recargarZonas,
+  } = useListaPaginada<Zona>("/zonas/", { habilitada: user?.role === "ADMIN" });
   const [munForm, setMunForm] = useState({ nombre: "", departamento_id: "", lat: "", lon: "" });
   const [zonaForm, setZonaForm] = useState({ nombre: "", tipo: "VEREDA", municipio_id: "", lat: "", lon: "", meta: "" });
   const [editingDepartamentoId, setEditingDepartamentoId] = useState<number | null>(null);
@@ -48,14 +58,13 @@ const TerritoryPage = () => {
       setLoading(true);
       setAlert(null);
       try {
-        const [depsRes, munRes, zonasRes] = await Promise.all([
-          api.get<Departamento[]>("/departamentos/"),
-          api.get<Municipio[]>("/municipios/"),
-          api.get<Zona[]>("/zonas/"),
+        // Departamentos y municipios completos: son las opciones de los formularios.
+        const [deps, munis] = await Promise.all([
+          obtenerTodo<Departamento>("/departamentos/"),
+          obtenerTodo<Municipio>("/municipios/"),
         ]);
-        setDepartamentos(depsRes.data);
-        setMunicipios(munRes.data);
-        setZonas(zonasRes.data);
+        setDepartamentos(deps);
+        setMunicipios(munis);
       } catch (err) {
         console.error(err);
         setAlert("No fue posible cargar los catálogos de territorio.");
@@ -66,19 +75,21 @@ const TerritoryPage = () => {
     load();
   }, []);
 
+  useEffect(() => {
+    if (zonasConError) setAlert("No fue posible cargar los catálogos de territorio.");
+  }, [zonasConError]);
+
   const refreshMunicipios = async () => {
-    const { data } = await api.get<Municipio[]>("/municipios/");
-    setMunicipios(data);
+    setMunicipios(await obtenerTodo<Municipio>("/municipios/"));
   };
 
+  // Los municipios traen el total de zonas, así que se recargan junto con ellas.
   const refreshZonas = async () => {
-    const { data } = await api.get<Zona[]>("/zonas/");
-    setZonas(data);
+    await Promise.all([recargarZonas(), refreshMunicipios()]);
   };
 
   const refreshDepartamentos = async () => {
-    const { data } = await api.get<Departamento[]>("/departamentos/");
-    setDepartamentos(data);
+    setDepartamentos(await obtenerTodo<Departamento>("/departamentos/"));
   };
 
   const handleDepartamentoSubmit = async (e: React.FormEvent) => {
@@ -243,7 +254,7 @@ const TerritoryPage = () => {
           <h1 className="h4 font-weight-bold mb-0">Gestión de territorio</h1>
           <p className="text-muted mb-0">Administra municipios y zonas (veredas, barrios, comunas).</p>
         </div>
-        {loading && <span className="badge badge-info">Cargando...</span>}
+        {(loading || cargandoZonas) && <span className="badge badge-info">Cargando...</span>}
       </div>
 
       {alert && (
@@ -532,7 +543,10 @@ const TerritoryPage = () => {
           <div className="card card-outline card-secondary">
             <div className="card-header d-flex justify-content-between align-items-center">
               <h3 className="card-title">Zonas registradas</h3>
-              <span className="badge badge-light">{zonas.length} zonas</span>
+              <span className="badge badge-light">
+                {zonas.length}
+                {hayMas ? "+" : ""} zonas
+              </span>
             </div>
             <div className="card-body table-responsive p-0" style={{ maxHeight: 600 }}>
               <table className="table table-hover text-nowrap">
@@ -579,6 +593,7 @@ const TerritoryPage = () => {
                 </tbody>
               </table>
             </div>
+            <CargarMas hayMas={hayMas} cargando={cargandoZonas} onClick={cargarMas} />
           </div>
 
           <div className="card card-outline card-info">
@@ -610,7 +625,7 @@ const TerritoryPage = () => {
                           <em>Sin coordenadas</em>
                         )}
                       </td>
-                      <td>{(zonas.filter((z) => z.municipio?.id === m.id) || []).length}</td>
+                      <td>{m.total_zonas ?? 0}</td>
                       <td className="text-right">
                         <button className="btn btn-xs btn-link" onClick={() => handleEditMunicipio(m)}>
                           <i className="fas fa-edit" />
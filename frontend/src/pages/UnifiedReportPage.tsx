@@ -110,6 +110,13 @@ interface ReporteUnico {
   encuestadores: EncuestadorDetalle[];
 }
 
+interface TrabajoReporte {
+  id: number;
+  estado: "PENDIENTE" | "EN_PROCESO" | "COMPLETADO" | "FALLIDO";
+  error: string;
+  descarga: string | null;
+}
+
 const estadoColors: Record<string, string> = {
   SIN_COBERTURA: "badge badge-danger",
   BAJA: "badge badge-warning",
@@ -122,6 +129,7 @@ const piePalette = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#edc
 const UnifiedReportPage = () => {
   const [reporte, setReporte] = useState<ReporteUnico | null>(null);
   const [loading, setLoading] = useState(false);
+  const [generandoPdf, setGenerandoPdf] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [startDate, setStartDate] = useState("");
   const [endDate, setEndDate] = useState("");
@@ -153,12 +161,21 @@ const UnifiedReportPage = () => {
   }, []);
 
   const descargarPdf = async () => {
+    setGenerandoPdf(true);
+    setError(null);
     try {
-      const res = await api.get("/reportes/pdf/", {
-        params: {
-          start_date: startDate || undefined,
-          end_date: endDate || undefined,
-        },
+      let { data: trabajo } = await api.post<TrabajoReporte>("/reportes/trabajos/", {
+        start_date: startDate || undefined,
+        end_date: endDate || undefined,
+      });
+      while (trabajo.estado === "PENDIENTE" || trabajo.estado === "EN_PROCESO") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        ({ data: trabajo } = await api.get<TrabajoReporte>(`/reportes/trabajos/${trabajo.id}/`));
+      }
+      if (trabajo.estado !== "COMPLETADO") {
+        throw new Error(trabajo.error || "El reporte no se pudo generar");
+      }
+      const res = await api.get(`/reportes/trabajos/${trabajo.id}/descargar/`, {
         responseType: "blob",
       });
       const blob = new Blob([res.data], { type: "application/pdf" });
@@ -173,6 +190,8 @@ const UnifiedReportPage = () => {
     } catch (err) {
       console.error(err);
       setError("No pudimos generar el PDF. Intenta nuevamente.");
+    } finally {
+      setGenerandoPdf(false);
     }
   };
 
@@ -268,8 +287,8 @@ const UnifiedReportPage = () => {
           <button className="btn btn-primary mr-2" onClick={load} disabled={loading}>
             {loading ? "Buscando..." : "Actualizar"}
           </button>
-          <button className="btn btn-outline-secondary" onClick={descargarPdf}>
-            <i className="fas fa-file-pdf mr-1" /> PDF
+          <button className="btn btn-outline-secondary" onClick={descargarPdf} disabled={generandoPdf}>
+            <i className="fas fa-file-pdf mr-1" /> {generandoPdf ? "Generando..." : "PDF"}
           </button>
         </div>
       </div>
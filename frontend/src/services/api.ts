@@ -10,4 +10,35 @@ if (stored) {
   api.defaults.headers.common.Authorization = `Bearer ${parsed.access}`;
 }
 
+// Las listas responden por páginas con cursor ({ next, previous, results }).
+export type Pagina<T> = { results: T[]; next: string | null };
+
+type Parametros = Record<string, unknown>;
+
+/** Primera página de ``url`` o, con ``siguiente`` (el ``next`` de la anterior), la que sigue. */
+export const obtenerPagina = async <T,>(url: string, params?: Parametros, siguiente?: string | null) => {
+  const { data } = siguiente
+    ? await api.get<Pagina<T> | T[]>(siguiente)
+    : await api.get<Pagina<T> | T[]>(url, { params });
+  // Con LISTAS_SIN_PAGINAR el servidor todavía puede responder la lista completa.
+  if (Array.isArray(data)) return { results: data, next: null } as Pagina<T>;
+  return { results: data.results, next: data.next } as Pagina<T>;
+};
+
+/**
+ * Todas las páginas de ``url`` en un arreglo. Solo para catálogos que una
+ * pantalla necesita completos (opciones de un selector); los listados usan
+ * ``useListaPaginada`` y piden más páginas a demanda.
+ */
+export const obtenerTodo = async <T,>(url: string, params?: Parametros) => {
+  const items: T[] = [];
+  let pagina = await obtenerPagina<T>(url, { page_size: 500, ...params });
+  items.push(...pagina.results);
+  while (pagina.next) {
+    pagina = await obtenerPagina<T>(url, undefined, pagina.next);
+    items.push(...pagina.results);
+  }
+  return items;
+};
+
 export default api;